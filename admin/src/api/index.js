@@ -275,6 +275,11 @@ export const updateWatermarkFreeConfig = async (data) => {
   return response.data
 }
 
+export const getSoraConcurrencyStatus = async () => {
+  const response = await api.get('/admin/concurrency/sora')
+  return response.data
+}
+
 export const listSystemLogsV2 = async (params) => {
   const response = await api.get('/admin/logs', { params })
   return response.data
@@ -3,23 +3,32 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import StreamingResponse
 
 from app.core.auth import get_current_active_user
+from app.core.config import settings
 from app.core.sse import format_sse_event
 from app.core.stream_auth import require_user_from_query_token
-from app.db.sqlite import sqlite_db
-from app.models.logs import LogEventListResponse, LogEventStatsResponse
+from app.db.sqlite import async_db
+from app.models.logs import (
+    LogArchiveQueryResponse,
+    LogArchiveSegmentItem,
+    LogEventListResponse,
+    LogEventStatsResponse,
+)
 from app.models.settings import (
     ScanSchedulerEnvelope,
     ScanSchedulerSettings,
+    SoraConcurrencyStatus,
     SystemSettings,
     SystemSettingsEnvelope,
     WatermarkFreeSettings,
+    WorkerQueueWaitStatus,
 )
+from app.services.ixbrowser_service import ixbrowser_service
 from app.services.system_settings import (
     get_scan_scheduler_envelope,
     get_system_settings_envelope,
@@ -30,6 +39,7 @@ from app.services.watermark_settings import (
     get_watermark_free_settings,
     update_watermark_free_settings,
 )
+from app.services.worker_runner import worker_runner
 
 router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
 
@@ -74,7 +84,7 @@ async def list_system_logs(
     del current_user
     start_at_str = _parse_datetime(start_at)
     end_at_str = _parse_datetime(end_at)
-    result = sqlite_db.list_event_logs(
+    result = await async_db.list_event_logs(
         source=source,
         status=status,
         level=level,
@@ -112,7 +122,7 @@ async def get_system_log_stats(
     del current_user
     start_at_str = _parse_datetime(start_at)
     end_at_str = _parse_datetime(end_at)
-    stats = sqlite_db.stats_event_logs(
+    stats = await async_db.stats_event_logs(
         source=source,
         status=status,
         level=level,
@@ -129,6 +139,48 @@ async def get_system_log_stats(
     return LogEventStatsResponse.model_validate(stats)
 
 
+@router.get("/logs/archive", response_model=LogArchiveQueryResponse)
+async def query_archived_logs(
+    start_at: Optional[str] = Query(None, description="开始时间"),
+    end_at: Optional[str] = Query(None, description="结束时间"),
+    trace_id: Optional[str] = Query(None, description="链路ID"),
+    request_id: Optional[str] = Query(None, description="请求ID"),
+    resource_type: Optional[str] = Query(None, description="资源类型"),
+    resource_id: Optional[str] = Query(None, description="资源ID"),
+    after_id: int = Query(0, ge=0, description="从该 id 之后继续（按 id 升序翻页）"),
+    limit: int = Query(200, ge=1, le=1000, description="返回条数"),
+    current_user: dict = Depends(get_current_active_user),
+):
+    del current_user
+    result = await async_db.query_event_log_archive(
+        start_at=_parse_datetime(start_at),
+        end_at=_parse_datetime(end_at),
+        trace_id=trace_id,
+        request_id=request_id,
+        resource_type=resource_type,
+        resource_id=resource_id,
+        after_id=after_id,
+        limit=limit,
+    )
+    return LogArchiveQueryResponse.model_validate(result)
+
+
+@router.get("/logs/archive/segments", response_model=List[LogArchiveSegmentItem])
+async def list_archived_log_segments(
+    start_at: Optional[str] = Query(None, description="开始时间"),
+    end_at: Optional[str] = Query(None, description="结束时间"),
+    limit: int = Query(200, ge=1, le=1000, description="返回条数"),
+    current_user: dict = Depends(get_current_active_user),
+):
+    del current_user
+    rows = await async_db.list_event_log_archive_segments(
+        start_at=_parse_datetime(start_at),
+        end_at=_parse_datetime(end_at),
+        limit=limit,
+    )
+    return [LogArchiveSegmentItem.model_validate(row) for row in rows]
+
+
 @router.get("/logs/stream")
 async def stream_system_logs(
     source: str = Query("all", description="日志来源过滤"),
@@ -142,7 +194,7 @@ async def stream_system_logs(
         last_id = 0
         # 仅推送连接建立后的增量，避免首次连接回放大量历史日志导致前端阻塞。
         try:
-            latest = sqlite_db.list_event_logs(source=source_value, limit=1).get("items", [])
+            latest = (await async_db.list_event_logs(source=source_value, limit=1)).get("items", [])
             if latest:
                 last_id = int(latest[0].get("id") or 0)
         except Exception:
@@ -150,7 +202,7 @@ async def stream_system_logs(
         idle_ticks = 0
         try:
             while True:
-                rows = sqlite_db.list_event_logs_since(after_id=last_id, source=source_value, limit=200)
+                rows = await async_db.list_event_logs_since(after_id=last_id, source=source_value, limit=200)
                 if rows:
                     idle_ticks = 0
                     for row in rows:
@@ -201,6 +253,22 @@ async def put_scan_scheduler_settings(
     return update_scan_scheduler_settings(payload)
 
 
+@router.get("/concurrency/sora", response_model=SoraConcurrencyStatus)
+async def get_sora_concurrency_status(current_user: dict = Depends(get_current_active_user)):
+    del current_user
+    return SoraConcurrencyStatus(**ixbrowser_service.sora_concurrency_snapshot())
+
+
+@router.get("/worker/queue-wait", response_model=WorkerQueueWaitStatus)
+async def get_worker_queue_wait_stats(current_user: dict = Depends(get_current_active_user)):
+    del current_user
+    return WorkerQueueWaitStatus(
+        owner=worker_runner.owner,
+        embedded=bool(settings.worker_embedded_enabled),
+        queues=worker_runner.queue_wait_stats(),
+    )
+
+
 @router.get("/settings/watermark-free", response_model=WatermarkFreeSettings)
 async def get_watermark_free_settings_api(current_user: dict = Depends(get_current_active_user)):
     del current_user
@@ -18,7 +18,7 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
     user = sqlite_db.get_user_by_username(form_data.username)
     if not user or not verify_password(form_data.password, user["password"]):
         try:
-            sqlite_db.create_audit_log(
+            sqlite_db.enqueue_audit_log(
                 category="audit",
                 action="auth.login",
                 status="failed",
@@ -51,7 +51,7 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
     }
 
     try:
-        sqlite_db.create_audit_log(
+        sqlite_db.enqueue_audit_log(
             category="audit",
             action="auth.login",
             status="success",
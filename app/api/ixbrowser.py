@@ -22,7 +22,9 @@ from app.models.ixbrowser import (
     IXBrowserScanRequest,
     IXBrowserScanRunSummary,
     IXBrowserSessionScanResponse,
+    IXBrowserWindowArbiterStats,
 )
+from app.services.ixbrowser.window_arbiter import window_arbiter
 from app.services.ixbrowser_service import (
     ixbrowser_service,
 )
@@ -88,6 +90,12 @@ async def get_ixbrowser_group_windows(current_user: dict = Depends(get_current_a
     return await ixbrowser_service.list_group_windows()
 
 
+@router.get("/window-arbiter", response_model=IXBrowserWindowArbiterStats)
+async def get_ixbrowser_window_arbiter_stats(current_user: dict = Depends(get_current_active_user)):
+    del current_user
+    return IXBrowserWindowArbiterStats(**window_arbiter.stats())
+
+
 @router.post("/profiles/{profile_id}/open", response_model=IXBrowserOpenProfileResponse)
 async def open_ixbrowser_profile_window(
     profile_id: int,
@@ -9,6 +9,7 @@ from app.core.audit import log_audit
 from app.core.auth import get_current_active_user
 from app.core.sse import format_sse_event
 from app.core.stream_auth import require_user_from_query_token
+from app.db.sqlite import async_db
 from app.models.ixbrowser import (
     SoraAccountWeight,
     SoraJob,
@@ -138,7 +139,8 @@ async def list_sora_jobs(
         await ixbrowser_service.ensure_proxy_bindings()
     except Exception:  # noqa: BLE001
         pass
-    return ixbrowser_service.list_sora_jobs(
+    return await async_db.run(
+        ixbrowser_service.list_sora_jobs,
         group_title=group_title,
         profile_id=profile_id,
         status=status,
@@ -179,10 +181,12 @@ async def stream_sora_jobs(
 
     async def event_generator():
         try:
-            snapshot_jobs = sora_job_stream_service.list_jobs(stream_filter)
+            snapshot_jobs = await async_db.run(sora_job_stream_service.list_jobs, stream_filter)
             fingerprints = sora_job_stream_service.build_fingerprint_map(snapshot_jobs)
             visible_ids = set(fingerprints.keys())
-            last_phase_event_id = sora_job_stream_service.get_latest_phase_event_id() if with_events else 0
+            last_phase_event_id = (
+                await async_db.run(sora_job_stream_service.get_latest_phase_event_id) if with_events else 0
+            )
             last_emit_at = time.monotonic()
             snapshot_payload = sora_job_stream_service.build_snapshot_payload(snapshot_jobs)
             yield format_sse_event("snapshot", snapshot_payload)
@@ -191,7 +195,7 @@ async def stream_sora_jobs(
                 await asyncio.sleep(poll_interval)
                 has_output = False
 
-                latest_jobs = sora_job_stream_service.list_jobs(stream_filter)
+                latest_jobs = await async_db.run(sora_job_stream_service.list_jobs, stream_filter)
                 changed_jobs, removed_job_ids, fingerprints, visible_ids = sora_job_stream_service.diff_jobs(
                     fingerprints,
                     latest_jobs,
@@ -204,7 +208,8 @@ async def stream_sora_jobs(
                     has_output = True
 
                 if with_events:
-                    phase_events, last_phase_event_id = sora_job_stream_service.list_phase_events_since(
+                    phase_events, last_phase_event_id = await async_db.run(
+                        sora_job_stream_service.list_phase_events_since,
                         after_id=last_phase_event_id,
                         visible_job_ids=visible_ids,
                         limit=int(sora_job_stream_service.phase_poll_limit),
@@ -245,7 +250,7 @@ async def get_sora_job(
         await ixbrowser_service.ensure_proxy_bindings()
     except Exception:  # noqa: BLE001
         pass
-    return ixbrowser_service.get_sora_job(job_id, follow_retry=follow_retry)
+    return await async_db.run(ixbrowser_service.get_sora_job, job_id, follow_retry=follow_retry)
 
 
 @router.post("/jobs/{job_id}/retry", response_model=SoraJob)
@@ -353,4 +358,4 @@ async def list_sora_job_events(
     current_user: dict = Depends(get_current_active_user),
 ):
     del current_user
-    return ixbrowser_service.list_sora_job_events(job_id)
+    return await async_db.run(ixbrowser_service.list_sora_job_events, job_id)
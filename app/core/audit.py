@@ -51,7 +51,7 @@ def log_audit(
         if op_name is None:
             op_name = operator_username
 
-        sqlite_db.create_audit_log(
+        sqlite_db.enqueue_audit_log(
             category="audit",
             action=action,
             status=status,
@@ -24,11 +24,27 @@ class Settings(BaseSettings):
     event_log_retention_days: int = 30
     event_log_cleanup_interval_sec: int = 3600
     event_log_max_mb: int = 100
+    event_log_flush_interval_ms: int = 200
+    event_log_flush_batch_size: int = 500
+    event_log_queue_max: int = 20000
+    event_log_archive_enabled: bool = True
+    event_log_archive_dir: str = ""
     api_log_capture_mode: str = "all"
     api_slow_threshold_ms: int = 2000
     log_mask_mode: str = "basic"
     system_logger_ingest_level: str = "DEBUG"
 
+    sqlite_async_max_workers: int = 4
+    worker_queue_poll_interval_sec: float = 5.0
+    worker_embedded_enabled: bool = True
+    leader_lease_ttl_sec: int = 30
+    browser_max_open_windows: int = 6
+    nurture_batch_parallelism: int = 2
+    nurture_max_open_windows: int = 4
+    nurture_max_concurrent_batches: int = 2
+    sora_deferred_retry_sec: int = 300
+    sora_deferred_max_wait_hours: int = 24
+
     audit_log_retention_days: int = 3
     audit_log_cleanup_interval_sec: int = 3600
 
@@ -64,7 +64,7 @@ def _safe_log_system_event(
     meta: Optional[Dict[str, Any]] = None,
 ) -> None:
     try:
-        sqlite_db.create_event_log(
+        sqlite_db.enqueue_event_log(
             source="system",
             action=f"error.{str(error_type or 'unknown')}",
             status="failed",
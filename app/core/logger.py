@@ -96,7 +96,7 @@ class EventLogIngestHandler(logging.Handler):
             try:
                 from app.db.sqlite import sqlite_db
 
-                sqlite_db.create_event_log(**payload)
+                sqlite_db.enqueue_event_log(**payload)
             except Exception:
                 pass
             finally:
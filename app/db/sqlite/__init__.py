@@ -3,16 +3,22 @@
 说明：
 - 保持原有 `SQLiteDB/sqlite_db` 对外接口不变。
 - 具体表与领域逻辑拆分在 `app/db/sqlite/*.py` 的 mixin 中。
+- 协程内请使用 `async_db`（线程池执行），避免同步 I/O 阻塞事件循环。
 """
 
 from __future__ import annotations
 
+from app.db.sqlite.async_db import AsyncSQLiteDB
 from app.db.sqlite.connection import SQLiteConnectionMixin
+from app.db.sqlite.event_log_archive import SQLiteEventLogArchiveMixin
+from app.db.sqlite.event_log_partitions import SQLiteEventLogPartitionsMixin
 from app.db.sqlite.ixbrowser_repo import SQLiteIXBrowserRepo
 from app.db.sqlite.locks_repo import SQLiteLocksRepo
 from app.db.sqlite.logs_repo import SQLiteLogsRepo
 from app.db.sqlite.nurture_repo import SQLiteNurtureRepo
+from app.db.sqlite.profile_state_repo import SQLiteProfileStateRepo
 from app.db.sqlite.proxy_repo import SQLiteProxyRepo
+from app.db.sqlite.scan_blobs import SQLiteScanBlobsMixin
 from app.db.sqlite.schema import SQLiteSchemaMixin
 from app.db.sqlite.settings_repo import SQLiteSettingsRepo
 from app.db.sqlite.sora_repo import SQLiteSoraRepo
@@ -22,8 +28,12 @@ from app.db.sqlite.users_repo import SQLiteUsersRepo
 class SQLiteDB(
     SQLiteConnectionMixin,
     SQLiteSchemaMixin,
+    SQLiteEventLogPartitionsMixin,
+    SQLiteEventLogArchiveMixin,
+    SQLiteScanBlobsMixin,
     SQLiteUsersRepo,
     SQLiteIXBrowserRepo,
+    SQLiteProfileStateRepo,
     SQLiteSoraRepo,
     SQLiteLocksRepo,
     SQLiteSettingsRepo,
@@ -46,4 +56,13 @@ class SQLiteDB(
         self._last_event_cleanup_at = 0.0
 
 
+def _async_max_workers() -> int:
+    try:
+        from app.core.config import settings
+    except Exception:
+        return 4
+    return max(1, int(getattr(settings, "sqlite_async_max_workers", 4) or 4))
+
+
 sqlite_db = SQLiteDB()
+async_db = AsyncSQLiteDB(sqlite_db, max_workers=_async_max_workers())
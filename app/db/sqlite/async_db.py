@@ -0,0 +1,79 @@
+"""SQLite 异步门面：把同步仓储调用放到专用有界线程池执行。
+
+说明：
+- `async_db.get_sora_job(...)` 与 `sqlite_db.get_sora_job(...)` 参数一致，只是返回 awaitable。
+- 方法在调用时才从底层实例解析，测试中对 `sqlite_db` 的 monkeypatch 同样生效。
+- 组合调用（例如 service 层封装的多次查询）可用 `await async_db.run(fn, *args)`。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncSQLiteDB:
+    def __init__(self, db: Any, *, max_workers: int = 4) -> None:
+        self._db = db
+        self._max_workers = max(1, int(max_workers))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        executor = self._executor
+        if executor is not None:
+            return executor
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="sqlite-io",
+                )
+            return self._executor
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def set_max_workers(self, n: int) -> None:
+        """调整线程池大小；旧线程池在已提交任务完成后回收。"""
+        n_int = max(1, int(n))
+        if n_int == self._max_workers:
+            return
+        with self._executor_lock:
+            old = self._executor
+            self._max_workers = n_int
+            self._executor = None
+        if old is not None:
+            old.shutdown(wait=False)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs) if (args or kwargs) else fn
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._executor_lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __getattr__(self, name: str) -> Any:
+        # 私有属性/方法不对外暴露，同时避免 `_db` 未初始化时递归。
+        if name.startswith("_"):
+            raise AttributeError(name)
+        target = getattr(self._db, name)
+        if not callable(target):
+            return target
+
+        async def _call(*args: Any, **kwargs: Any) -> Any:
+            return await self.run(getattr(self._db, name), *args, **kwargs)
+
+        _call.__name__ = name
+        return _call
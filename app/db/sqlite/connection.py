@@ -4,22 +4,61 @@ from __future__ import annotations
 
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Iterator
+from typing import Iterator, List, Optional
 
 
-class SQLiteConnectionMixin:
-    _db_path: str
+class PooledConnection(sqlite3.Connection):
+    """可归还连接：`close()` 时优先归还连接池，而不是真正关闭。
 
-    def _ensure_data_dir(self) -> None:
-        os.makedirs(os.path.dirname(self._db_path), exist_ok=True)
+    兼容旧代码：仓库内大量 `conn = self._get_conn() ... conn.close()` 写法无需改动。
+    """
 
-    def _now_str(self) -> str:
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    _pool: Optional["SQLiteConnectionPool"] = None
+    _idle_in_pool: bool = False
 
-    def _get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self._db_path, timeout=5.0)
+    def close(self) -> None:
+        if self._idle_in_pool:
+            return
+        pool = self._pool
+        if pool is not None and pool.release(self):
+            return
+        super().close()
+
+    def discard(self) -> None:
+        """跳过连接池，直接关闭底层连接。"""
+        self._pool = None
+        self._idle_in_pool = False
+        super().close()
+
+
+class SQLiteConnectionPool:
+    """按数据库文件维护的有界空闲连接池。
+
+    - 连接只在创建时执行一次 PRAGMA；
+    - 归还时若仍处于事务中会先 rollback（与“未 commit 直接 close”语义一致）；
+    - 空闲连接超过 `max_idle` 时直接关闭，`max_idle=0` 等价于不复用。
+    """
+
+    def __init__(self, db_path: str, *, max_idle: int = 8, timeout: float = 5.0) -> None:
+        self.db_path = str(db_path)
+        self.max_idle = max(0, int(max_idle))
+        self.timeout = float(timeout)
+        self._idle: List[PooledConnection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.opened_count = 0
+        self.reused_count = 0
+
+    def _open(self) -> PooledConnection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            factory=PooledConnection,
+            check_same_thread=False,
+        )
         conn.row_factory = sqlite3.Row
         try:
             conn.execute("PRAGMA journal_mode=WAL")
@@ -28,8 +67,104 @@ class SQLiteConnectionMixin:
             conn.execute("PRAGMA busy_timeout=5000")
         except Exception:
             pass
+        conn._pool = self
+        with self._lock:
+            self.opened_count += 1
         return conn
 
+    def acquire(self) -> PooledConnection:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                conn._idle_in_pool = False
+                self.reused_count += 1
+        if conn is not None:
+            return conn
+        return self._open()
+
+    def release(self, conn: PooledConnection) -> bool:
+        """归还连接；返回 False 表示调用方应真正关闭该连接。"""
+        if self._closed or self.max_idle <= 0:
+            return False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            return False
+        with self._lock:
+            if self._closed or len(self._idle) >= self.max_idle:
+                return False
+            conn._idle_in_pool = True
+            self._idle.append(conn)
+        return True
+
+    def close_all(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn in idle:
+            try:
+                conn.discard()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "max_idle": self.max_idle,
+                "idle": len(self._idle),
+                "opened": int(self.opened_count),
+                "reused": int(self.reused_count),
+            }
+
+
+class SQLiteConnectionMixin:
+    _db_path: str
+    _pool_max_idle: int = 8
+    _pool: Optional[SQLiteConnectionPool] = None
+    _pool_lock = threading.Lock()
+
+    def _ensure_data_dir(self) -> None:
+        os.makedirs(os.path.dirname(self._db_path), exist_ok=True)
+
+    def _now_str(self) -> str:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def _get_pool(self) -> SQLiteConnectionPool:
+        pool = self._pool
+        if pool is not None and pool.db_path == self._db_path and pool.max_idle == self._pool_max_idle:
+            return pool
+        with self._pool_lock:
+            pool = self._pool
+            if pool is None or pool.db_path != self._db_path or pool.max_idle != self._pool_max_idle:
+                # 测试会切换 `_db_path`：旧文件的空闲连接直接丢弃。
+                if pool is not None:
+                    pool.close_all()
+                pool = SQLiteConnectionPool(self._db_path, max_idle=self._pool_max_idle)
+                self._pool = pool
+        return pool
+
+    def _get_conn(self) -> sqlite3.Connection:
+        return self._get_pool().acquire()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """从连接池借出连接，退出时自动归还。"""
+        conn = self._get_conn()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close_pool(self) -> None:
+        with self._pool_lock:
+            pool = self._pool
+            self._pool = None
+        if pool is not None:
+            pool.close_all()
+
     @contextmanager
     def transaction(self, conn: sqlite3.Connection, *, immediate: bool = True) -> Iterator[sqlite3.Cursor]:
         """统一事务包装。
@@ -46,4 +181,3 @@ class SQLiteConnectionMixin:
         except Exception:
             conn.rollback()
             raise
-
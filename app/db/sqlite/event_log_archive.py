@@ -0,0 +1,274 @@
+"""event_logs 冷归档：过期行先写入 gzip 压缩的 NDJSON 段文件，再从热表删除。
+
+说明：
+- 每次清理对每个分区（或分区内被删除的一段）生成一个段文件，文件名含分区日与 id 区间。
+- 段文件在读快照里写出，不持有写锁；随后的短写事务只登记索引并按快照里的 max_id 删除/DROP。
+- 段索引（时间范围、id 范围、行数）落在 `event_log_archive_segments`，查询时先按索引裁剪段，
+  再逐行流式解压过滤，不会把整个段读入内存。
+- 归档目录默认与数据库同级（`<db_dir>/event_log_archive`），可用 `EVENT_LOG_ARCHIVE_DIR` 覆盖。
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.db.sqlite.event_log_partitions import EVENT_LOG_COLUMNS
+
+_ARCHIVE_SUFFIX = ".ndjson.gz"
+
+
+class SQLiteEventLogArchiveMixin:
+    def _ensure_event_log_archive_table(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS event_log_archive_segments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                file_name TEXT NOT NULL UNIQUE,
+                partition_day TEXT NOT NULL,
+                start_at TIMESTAMP NOT NULL,
+                end_at TIMESTAMP NOT NULL,
+                min_id INTEGER NOT NULL,
+                max_id INTEGER NOT NULL,
+                row_count INTEGER NOT NULL DEFAULT 0,
+                size_bytes INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP NOT NULL
+            )
+            '''
+        )
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_event_log_archive_segments_range '
+            'ON event_log_archive_segments(start_at, end_at)'
+        )
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_event_log_archive_segments_min_id '
+            'ON event_log_archive_segments(min_id)'
+        )
+
+    def _event_log_archive_enabled(self) -> bool:
+        try:
+            from app.core.config import settings
+        except Exception:
+            return True
+        return bool(getattr(settings, "event_log_archive_enabled", True))
+
+    def _event_log_archive_dir(self) -> str:
+        try:
+            from app.core.config import settings
+
+            configured = str(getattr(settings, "event_log_archive_dir", "") or "").strip()
+        except Exception:
+            configured = ""
+        if configured:
+            return configured
+        return os.path.join(os.path.dirname(os.path.abspath(self._db_path)), "event_log_archive")
+
+    def _write_event_log_archive_segment(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        where: str = "",
+        params: Sequence[Any] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """把 `table` 中满足 where 的行流式写入一个段文件，返回段信息（无行时返回 None）。
+
+        只读取，不登记索引：调用方在读快照里写文件，之后在短写事务里用
+        `_register_event_log_archive_segment` 登记；事务失败时由调用方删除段文件（`path`）。
+        """
+        if not self._event_log_archive_enabled():
+            return None
+        archive_dir = self._event_log_archive_dir()
+        os.makedirs(archive_dir, exist_ok=True)
+        day = self._event_log_partition_day_of(table)
+        tmp_path = os.path.join(archive_dir, f".{table}.writing")
+        columns = ("id",) + EVENT_LOG_COLUMNS
+        reader = conn.execute(
+            f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY id ASC",
+            tuple(params),
+        )
+        row_count = 0
+        min_id = max_id = 0
+        start_at = end_at = ""
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as fp:
+                while True:
+                    rows = reader.fetchmany(1000)
+                    if not rows:
+                        break
+                    for row in rows:
+                        data = {column: row[column] for column in columns}
+                        fp.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+                        fp.write("\n")
+                        created_at = str(data.get("created_at") or "")
+                        if row_count == 0:
+                            min_id = int(data["id"])
+                            start_at = end_at = created_at
+                        max_id = int(data["id"])
+                        start_at = min(start_at, created_at)
+                        end_at = max(end_at, created_at)
+                        row_count += 1
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            reader.close()
+
+        if row_count == 0:
+            os.remove(tmp_path)
+            return None
+
+        file_name = f"{table}-{min_id}-{max_id}{_ARCHIVE_SUFFIX}"
+        final_path = os.path.join(archive_dir, file_name)
+        os.replace(tmp_path, final_path)
+        return {
+            "path": final_path,
+            "file_name": file_name,
+            "partition_day": day,
+            "start_at": start_at,
+            "end_at": end_at,
+            "min_id": min_id,
+            "max_id": max_id,
+            "row_count": row_count,
+            "size_bytes": os.path.getsize(final_path),
+        }
+
+    def _register_event_log_archive_segment(self, cursor: sqlite3.Cursor, segment: Dict[str, Any]) -> None:
+        cursor.execute(
+            '''
+            INSERT OR REPLACE INTO event_log_archive_segments (
+                file_name, partition_day, start_at, end_at, min_id, max_id, row_count, size_bytes, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            (
+                segment["file_name"],
+                segment["partition_day"],
+                segment["start_at"],
+                segment["end_at"],
+                segment["min_id"],
+                segment["max_id"],
+                segment["row_count"],
+                segment["size_bytes"],
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            ),
+        )
+
+    def _event_log_archive_segment_conditions(
+        self,
+        *,
+        start_at: Optional[str],
+        end_at: Optional[str],
+        after_id: int = 0,
+    ) -> Tuple[str, List[Any]]:
+        conditions: List[str] = []
+        params: List[Any] = []
+        if start_at:
+            conditions.append("end_at >= ?")
+            params.append(start_at)
+        if end_at:
+            conditions.append("start_at <= ?")
+            params.append(end_at)
+        if after_id > 0:
+            conditions.append("max_id > ?")
+            params.append(int(after_id))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
+
+    def list_event_log_archive_segments(
+        self,
+        *,
+        start_at: Optional[str] = None,
+        end_at: Optional[str] = None,
+        limit: int = 200,
+    ) -> List[Dict[str, Any]]:
+        where, params = self._event_log_archive_segment_conditions(start_at=start_at, end_at=end_at)
+        conn = self._get_conn()
+        cursor_obj = conn.cursor()
+        cursor_obj.execute(
+            f"SELECT * FROM event_log_archive_segments {where} ORDER BY min_id DESC LIMIT ?",
+            params + [max(1, min(int(limit), 1000))],
+        )
+        rows = cursor_obj.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def query_event_log_archive(
+        self,
+        *,
+        start_at: Optional[str] = None,
+        end_at: Optional[str] = None,
+        trace_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        after_id: int = 0,
+        limit: int = 200,
+    ) -> Dict[str, Any]:
+        """按时间 / trace_id / request_id / 资源查询归档日志，结果按 id 升序，用 after_id 继续翻页。"""
+        safe_limit = max(1, min(int(limit), 1000))
+        after_id_int = max(0, int(after_id or 0))
+        where, params = self._event_log_archive_segment_conditions(
+            start_at=start_at,
+            end_at=end_at,
+            after_id=after_id_int,
+        )
+        conn = self._get_conn()
+        cursor_obj = conn.cursor()
+        cursor_obj.execute(
+            f"SELECT file_name FROM event_log_archive_segments {where} ORDER BY min_id ASC",
+            params,
+        )
+        file_names = [str(row["file_name"]) for row in cursor_obj.fetchall()]
+        conn.close()
+
+        filters = {
+            "trace_id": str(trace_id).strip() if trace_id else None,
+            "request_id": str(request_id).strip() if request_id else None,
+            "resource_type": str(resource_type).strip() if resource_type else None,
+            "resource_id": str(resource_id).strip() if resource_id else None,
+        }
+        filters = {key: value for key, value in filters.items() if value}
+
+        archive_dir = self._event_log_archive_dir()
+        items: List[Dict[str, Any]] = []
+        has_more = False
+        scanned = 0
+        for file_name in file_names:
+            path = os.path.join(archive_dir, file_name)
+            if not os.path.exists(path):
+                continue
+            scanned += 1
+            with gzip.open(path, "rt", encoding="utf-8") as fp:
+                for line in fp:
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except Exception:  # noqa: BLE001
+                        continue
+                    if int(data.get("id") or 0) <= after_id_int:
+                        continue
+                    created_at = str(data.get("created_at") or "")
+                    if start_at and created_at < start_at:
+                        continue
+                    if end_at and created_at > end_at:
+                        continue
+                    if any(str(data.get(key) or "") != value for key, value in filters.items()):
+                        continue
+                    if len(items) >= safe_limit:
+                        has_more = True
+                        break
+                    items.append(self._decode_event_log_row(data))
+            if has_more:
+                break
+
+        return {
+            "items": items,
+            "has_more": has_more,
+            "next_after_id": int(items[-1]["id"]) if has_more and items else None,
+            "segments_scanned": scanned,
+        }
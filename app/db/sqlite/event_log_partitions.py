@@ -0,0 +1,498 @@
+"""event_logs 按天分区存储：分区建表、触发器、统一视图与全局 id 分配。
+
+说明：
+- 每天一张 `event_logs_pYYYYMMDD`，结构与旧 event_logs 表一致；`event_logs` 为覆盖全部分区的只读视图。
+- id 由 `event_log_id_seq` 全局分配，跨分区单调递增，游标分页与 SSE after_id 语义不变。
+- 每个分区自带 FTS5 索引、容量计数（table_size_stats 中一行）与分钟 rollup 触发器；
+  过期整天直接 DROP TABLE，不再对大表做批量 DELETE。
+- 旧库的 event_logs 实表在初始化时按天迁入分区（保留 id），随后替换为视图。
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+EVENT_LOG_PARTITION_PREFIX = "event_logs_p"
+
+# 与 INSERT 行元组顺序一致（不含 id）
+EVENT_LOG_COLUMNS: Tuple[str, ...] = (
+    "created_at",
+    "source",
+    "action",
+    "event",
+    "phase",
+    "status",
+    "level",
+    "message",
+    "trace_id",
+    "request_id",
+    "method",
+    "path",
+    "query_text",
+    "status_code",
+    "duration_ms",
+    "is_slow",
+    "operator_user_id",
+    "operator_username",
+    "ip",
+    "user_agent",
+    "resource_type",
+    "resource_id",
+    "error_type",
+    "error_code",
+    "metadata_json",
+)
+
+_DAY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# 单条 compound SELECT 的分支上限（SQLite 默认 500），超过时分组嵌套
+_VIEW_UNION_CHUNK = 400
+
+
+class SQLiteEventLogPartitionsMixin:
+    # 单行近似字节数：各列文本长度之和 + 64 字节行开销
+    _EVENT_LOGS_APPROX_BYTES_SQL = (
+        "LENGTH(COALESCE(created_at, '')) + LENGTH(COALESCE(source, '')) + "
+        "LENGTH(COALESCE(action, '')) + LENGTH(COALESCE(event, '')) + "
+        "LENGTH(COALESCE(phase, '')) + LENGTH(COALESCE(status, '')) + "
+        "LENGTH(COALESCE(level, '')) + LENGTH(COALESCE(message, '')) + "
+        "LENGTH(COALESCE(trace_id, '')) + LENGTH(COALESCE(request_id, '')) + "
+        "LENGTH(COALESCE(method, '')) + LENGTH(COALESCE(path, '')) + "
+        "LENGTH(COALESCE(query_text, '')) + LENGTH(COALESCE(CAST(status_code AS TEXT), '')) + "
+        "LENGTH(COALESCE(CAST(duration_ms AS TEXT), '')) + LENGTH(COALESCE(CAST(is_slow AS TEXT), '')) + "
+        "LENGTH(COALESCE(CAST(operator_user_id AS TEXT), '')) + LENGTH(COALESCE(operator_username, '')) + "
+        "LENGTH(COALESCE(ip, '')) + LENGTH(COALESCE(user_agent, '')) + "
+        "LENGTH(COALESCE(resource_type, '')) + LENGTH(COALESCE(resource_id, '')) + "
+        "LENGTH(COALESCE(error_type, '')) + LENGTH(COALESCE(CAST(error_code AS TEXT), '')) + "
+        "LENGTH(COALESCE(metadata_json, '')) + 64"
+    )
+
+    # keyword 检索字段；与 logs_repo 中 LIKE 回退的字段保持一致
+    _EVENT_LOGS_FTS_COLUMNS = (
+        "message",
+        "action",
+        "path",
+        "query_text",
+        "resource_id",
+        "operator_username",
+        "trace_id",
+        "request_id",
+    )
+
+    # 分钟级 rollup 的耗时直方图上界（ms），最后一档为 > 最大上界
+    _EVENT_LOG_LATENCY_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2000, 3000, 5000, 10000, 30000, 60000)
+
+    # ---------- 初始化 / 迁移 ----------
+
+    def _init_event_log_storage(self, cursor: sqlite3.Cursor) -> None:
+        self._event_logs_fts_enabled = self._probe_event_logs_fts(cursor)
+        cursor.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS event_log_id_seq (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_id INTEGER NOT NULL DEFAULT 0
+            )
+            '''
+        )
+        cursor.execute("INSERT OR IGNORE INTO event_log_id_seq (id, last_id) VALUES (1, 0)")
+        cursor.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS table_size_stats (
+                table_name TEXT PRIMARY KEY,
+                row_count INTEGER NOT NULL DEFAULT 0,
+                approx_bytes INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP
+            )
+            '''
+        )
+        self._ensure_event_log_rollups_table(cursor)
+        self._ensure_event_log_archive_table(cursor)
+
+        cursor.execute("SELECT type FROM sqlite_master WHERE name = 'event_logs'")
+        row = cursor.fetchone()
+        if row is not None and row["type"] == "table":
+            self._migrate_legacy_event_logs(cursor)
+        else:
+            self._refresh_event_logs_view(cursor)
+
+    def _probe_event_logs_fts(self, cursor: sqlite3.Cursor) -> bool:
+        # 当前 SQLite 不支持 FTS5 或 trigram 时，keyword 检索回退到 LIKE
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.event_logs_fts_probe USING fts5(x, tokenize='trigram')")
+            cursor.execute("DROP TABLE temp.event_logs_fts_probe")
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def _migrate_legacy_event_logs(self, cursor: sqlite3.Cursor) -> None:
+        """旧版单表 event_logs → 按天分区（保留 id），rollup 由分区触发器重新累计。"""
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'")
+        has_sequence = cursor.fetchone() is not None
+        last_id = 0
+        if has_sequence:
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'event_logs'")
+            seq_row = cursor.fetchone()
+            last_id = int(seq_row["seq"] or 0) if seq_row else 0
+        cursor.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM event_logs")
+        last_id = max(last_id, int(cursor.fetchone()["max_id"] or 0))
+        cursor.execute("UPDATE event_log_id_seq SET last_id = MAX(last_id, ?) WHERE id = 1", (last_id,))
+
+        cursor.execute("DELETE FROM event_log_rollups_minute")
+        columns = ", ".join(EVENT_LOG_COLUMNS)
+        cursor.execute("SELECT DISTINCT SUBSTR(created_at, 1, 10) AS day FROM event_logs")
+        days = [str(item["day"] or "") for item in cursor.fetchall()]
+        for day in days:
+            table = self._ensure_event_log_partition(cursor, self._event_log_partition_day(day), refresh_view=False)
+            cursor.execute(
+                f"INSERT INTO {table} (id, {columns}) SELECT id, {columns} FROM event_logs "
+                "WHERE SUBSTR(created_at, 1, 10) IS ?",
+                (day,),
+            )
+
+        cursor.execute("DROP TABLE event_logs")
+        cursor.execute("DROP TABLE IF EXISTS event_logs_fts")
+        cursor.execute("DELETE FROM table_size_stats WHERE table_name = 'event_logs'")
+        self._refresh_event_logs_view(cursor)
+
+    # ---------- 分区 ----------
+
+    @staticmethod
+    def _event_log_partition_day(value: Optional[str]) -> str:
+        text = str(value or "")[:10]
+        if _DAY_RE.match(text):
+            return text
+        return datetime.now().strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _event_log_partition_table(day: str) -> str:
+        return f"{EVENT_LOG_PARTITION_PREFIX}{day.replace('-', '')}"
+
+    @staticmethod
+    def _event_log_partition_day_of(table: str) -> str:
+        raw = table[len(EVENT_LOG_PARTITION_PREFIX):]
+        return f"{raw[0:4]}-{raw[4:6]}-{raw[6:8]}"
+
+    def _list_event_log_partitions(self, cursor: sqlite3.Cursor) -> List[str]:
+        """按日期升序返回全部分区表名。"""
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name ASC",
+            (f"{EVENT_LOG_PARTITION_PREFIX}[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]",),
+        )
+        return [str(row["name"]) for row in cursor.fetchall()]
+
+    def _event_log_partition_bounds(
+        self,
+        cursor: sqlite3.Cursor,
+        *,
+        start_at: Optional[str] = None,
+        end_at: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """每个非空分区的 day / min_id / max_id，按日期升序；按 start_at/end_at 的日期裁掉无关分区。"""
+        start_day = str(start_at)[:10] if start_at else None
+        end_day = str(end_at)[:10] if end_at else None
+        result: List[Dict[str, Any]] = []
+        for table in self._list_event_log_partitions(cursor):
+            day = self._event_log_partition_day_of(table)
+            if (start_day and day < start_day) or (end_day and day > end_day):
+                continue
+            cursor.execute(f"SELECT MIN(id) AS min_id, MAX(id) AS max_id FROM {table}")
+            row = cursor.fetchone()
+            if not row or row["max_id"] is None:
+                continue
+            result.append(
+                {
+                    "table": table,
+                    "day": day,
+                    "min_id": int(row["min_id"]),
+                    "max_id": int(row["max_id"]),
+                }
+            )
+        return result
+
+    def _ensure_event_log_partition(self, cursor: sqlite3.Cursor, day: str, *, refresh_view: bool = True) -> str:
+        table = self._event_log_partition_table(day)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        if cursor.fetchone() is not None:
+            return table
+
+        cursor.execute(
+            f'''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY,
+                created_at TIMESTAMP NOT NULL,
+                source TEXT NOT NULL,
+                action TEXT NOT NULL,
+                event TEXT,
+                phase TEXT,
+                status TEXT,
+                level TEXT,
+                message TEXT,
+                trace_id TEXT,
+                request_id TEXT,
+                method TEXT,
+                path TEXT,
+                query_text TEXT,
+                status_code INTEGER,
+                duration_ms INTEGER,
+                is_slow INTEGER NOT NULL DEFAULT 0,
+                operator_user_id INTEGER,
+                operator_username TEXT,
+                ip TEXT,
+                user_agent TEXT,
+                resource_type TEXT,
+                resource_id TEXT,
+                error_type TEXT,
+                error_code INTEGER,
+                metadata_json TEXT,
+                approx_bytes INTEGER GENERATED ALWAYS AS ({self._EVENT_LOGS_APPROX_BYTES_SQL}) VIRTUAL
+            )
+            '''
+        )
+        cursor.execute(f'CREATE INDEX idx_{table}_created ON {table}(created_at DESC)')
+        cursor.execute(f'CREATE INDEX idx_{table}_source_created ON {table}(source, created_at DESC)')
+        cursor.execute(f'CREATE INDEX idx_{table}_status_created ON {table}(status, created_at DESC)')
+        cursor.execute(f'CREATE INDEX idx_{table}_level_created ON {table}(level, created_at DESC)')
+        cursor.execute(f'CREATE INDEX idx_{table}_operator_created ON {table}(operator_username, created_at DESC)')
+        cursor.execute(f'CREATE INDEX idx_{table}_trace_id ON {table}(trace_id)')
+        cursor.execute(f'CREATE INDEX idx_{table}_request_id ON {table}(request_id)')
+        cursor.execute(f'CREATE INDEX idx_{table}_resource_created ON {table}(resource_type, resource_id, created_at DESC)')
+        cursor.execute(
+            f'CREATE INDEX idx_{table}_task_fail_lookup '
+            f'ON {table}(source, resource_type, event, created_at DESC, resource_id)'
+        )
+
+        self._create_event_log_size_triggers(cursor, table)
+        self._create_event_log_rollup_triggers(cursor, table)
+        if getattr(self, "_event_logs_fts_enabled", False):
+            self._create_event_log_fts(cursor, table)
+        if refresh_view:
+            self._refresh_event_logs_view(cursor)
+        return table
+
+    def _drop_event_log_partition(self, cursor: sqlite3.Cursor, table: str) -> int:
+        """整天过期：DROP 分区及其 FTS，清掉对应计数与 rollup，返回删除的行数。"""
+        cursor.execute("SELECT row_count FROM table_size_stats WHERE table_name = ?", (table,))
+        row = cursor.fetchone()
+        row_count = int(row["row_count"] or 0) if row else 0
+        day = self._event_log_partition_day_of(table)
+        next_day = (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        cursor.execute("DELETE FROM table_size_stats WHERE table_name = ?", (table,))
+        cursor.execute(
+            "DELETE FROM event_log_rollups_minute WHERE bucket_minute >= ? AND bucket_minute < ?",
+            (day, next_day),
+        )
+        return row_count
+
+    @staticmethod
+    def _event_log_union_all(selects: Sequence[str]) -> str:
+        if len(selects) <= _VIEW_UNION_CHUNK:
+            return " UNION ALL ".join(selects)
+        chunks = []
+        for offset in range(0, len(selects), _VIEW_UNION_CHUNK):
+            chunks.append(f"SELECT * FROM ({' UNION ALL '.join(selects[offset:offset + _VIEW_UNION_CHUNK])})")
+        return " UNION ALL ".join(chunks)
+
+    def _refresh_event_logs_view(self, cursor: sqlite3.Cursor) -> None:
+        select_columns = ", ".join(("id",) + EVENT_LOG_COLUMNS + ("approx_bytes",))
+        tables = self._list_event_log_partitions(cursor)
+        if tables:
+            body = self._event_log_union_all([f"SELECT {select_columns} FROM {table}" for table in tables])
+        else:
+            empty_columns = ", ".join(f"NULL AS {col}" for col in ("id",) + EVENT_LOG_COLUMNS + ("approx_bytes",))
+            body = f"SELECT {empty_columns} WHERE 0"
+        cursor.execute("DROP VIEW IF EXISTS event_logs")
+        cursor.execute(f"CREATE VIEW event_logs AS {body}")
+
+    # ---------- 写入 ----------
+
+    def _insert_event_log_rows(self, cursor: sqlite3.Cursor, rows: Sequence[Tuple[Any, ...]]) -> List[int]:
+        """在调用方已开启的写事务内分配全局 id 并按天写入分区，返回与 rows 对应的 id。"""
+        if not rows:
+            return []
+        cursor.execute("UPDATE event_log_id_seq SET last_id = last_id + ? WHERE id = 1", (len(rows),))
+        cursor.execute("SELECT last_id FROM event_log_id_seq WHERE id = 1")
+        last_id = int(cursor.fetchone()["last_id"])
+        first_id = last_id - len(rows) + 1
+
+        grouped: Dict[str, List[Tuple[Any, ...]]] = {}
+        ids: List[int] = []
+        for offset, row in enumerate(rows):
+            row_id = first_id + offset
+            ids.append(row_id)
+            grouped.setdefault(self._event_log_partition_day(row[0]), []).append((row_id,) + tuple(row))
+
+        columns = ", ".join(("id",) + EVENT_LOG_COLUMNS)
+        placeholders = ", ".join(["?"] * (len(EVENT_LOG_COLUMNS) + 1))
+        for day, day_rows in grouped.items():
+            table = self._ensure_event_log_partition(cursor, day)
+            cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", day_rows)
+        return ids
+
+    # ---------- 分区触发器 ----------
+
+    def _create_event_log_size_triggers(self, cursor: sqlite3.Cursor, table: str) -> None:
+        cursor.execute(
+            "INSERT OR REPLACE INTO table_size_stats (table_name, row_count, approx_bytes, updated_at) VALUES (?, 0, 0, ?)",
+            (table, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        cursor.execute(
+            f'''
+            CREATE TRIGGER trg_{table}_size_ai AFTER INSERT ON {table} BEGIN
+                UPDATE table_size_stats
+                SET row_count = row_count + 1, approx_bytes = approx_bytes + new.approx_bytes
+                WHERE table_name = '{table}';
+            END
+            '''
+        )
+        cursor.execute(
+            f'''
+            CREATE TRIGGER trg_{table}_size_ad AFTER DELETE ON {table} BEGIN
+                UPDATE table_size_stats
+                SET row_count = row_count - 1, approx_bytes = approx_bytes - old.approx_bytes
+                WHERE table_name = '{table}';
+            END
+            '''
+        )
+        cursor.execute(
+            f'''
+            CREATE TRIGGER trg_{table}_size_au AFTER UPDATE ON {table} BEGIN
+                UPDATE table_size_stats
+                SET approx_bytes = approx_bytes - old.approx_bytes + new.approx_bytes
+                WHERE table_name = '{table}';
+            END
+            '''
+        )
+
+    def _create_event_log_fts(self, cursor: sqlite3.Cursor, table: str) -> None:
+        columns = ", ".join(self._EVENT_LOGS_FTS_COLUMNS)
+        new_values = ", ".join(f"new.{col}" for col in self._EVENT_LOGS_FTS_COLUMNS)
+        old_values = ", ".join(f"old.{col}" for col in self._EVENT_LOGS_FTS_COLUMNS)
+        fts = f"{table}_fts"
+        cursor.execute(
+            f'''
+            CREATE VIRTUAL TABLE {fts} USING fts5(
+                {columns},
+                content='{table}',
+                content_rowid='id',
+                tokenize='trigram'
+            )
+            '''
+        )
+        cursor.execute(
+            f'''
+            CREATE TRIGGER trg_{table}_fts_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+            END
+            '''
+        )
+        cursor.execute(
+            f'''
+            CREATE TRIGGER trg_{table}_fts_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            END
+            '''
+        )
+        cursor.execute(
+            f'''
+            CREATE TRIGGER trg_{table}_fts_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+            END
+            '''
+        )
+
+    def _event_log_rollup_hist_columns(self) -> list:
+        return [f"h{idx:02d}" for idx in range(len(self._EVENT_LOG_LATENCY_BOUNDS_MS) + 1)]
+
+    def _event_log_rollup_hist_exprs(self, ref: str) -> list:
+        exprs = []
+        lower = None
+        for upper in list(self._EVENT_LOG_LATENCY_BOUNDS_MS) + [None]:
+            parts = [f"{ref}.duration_ms IS NOT NULL"]
+            if lower is not None:
+                parts.append(f"{ref}.duration_ms > {lower}")
+            if upper is not None:
+                parts.append(f"{ref}.duration_ms <= {upper}")
+            exprs.append(f"({' AND '.join(parts)})")
+            lower = upper
+        return exprs
+
+    def _ensure_event_log_rollups_table(self, cursor: sqlite3.Cursor) -> None:
+        """event_logs 分钟级预聚合（按 source + action），由各分区的插入/删除触发器同步增减。
+
+        `stats_event_logs` 在仅按来源/时间过滤时直接读取这里，p95 由直方图估算。
+        """
+        hist_ddl = ",\n".join(f"                {col} INTEGER NOT NULL DEFAULT 0" for col in self._event_log_rollup_hist_columns())
+        cursor.execute(
+            f'''
+            CREATE TABLE IF NOT EXISTS event_log_rollups_minute (
+                bucket_minute TEXT NOT NULL,
+                source TEXT NOT NULL,
+                action TEXT NOT NULL,
+                total_count INTEGER NOT NULL DEFAULT 0,
+                failed_count INTEGER NOT NULL DEFAULT 0,
+                slow_count INTEGER NOT NULL DEFAULT 0,
+                duration_count INTEGER NOT NULL DEFAULT 0,
+                max_duration_ms INTEGER,
+{hist_ddl},
+                PRIMARY KEY (bucket_minute, source, action)
+            )
+            '''
+        )
+
+    def _create_event_log_rollup_triggers(self, cursor: sqlite3.Cursor, table: str) -> None:
+        hist_columns = self._event_log_rollup_hist_columns()
+
+        def _add_sql(ref: str) -> str:
+            hist_exprs = self._event_log_rollup_hist_exprs(ref)
+            hist_updates = ", ".join(f"{col} = {col} + excluded.{col}" for col in hist_columns)
+            return f'''
+                INSERT INTO event_log_rollups_minute (
+                    bucket_minute, source, action, total_count, failed_count, slow_count,
+                    duration_count, max_duration_ms, {", ".join(hist_columns)}
+                ) VALUES (
+                    SUBSTR({ref}.created_at, 1, 16), {ref}.source, {ref}.action, 1,
+                    COALESCE({ref}.status, '') = 'failed', COALESCE({ref}.is_slow, 0) = 1,
+                    {ref}.duration_ms IS NOT NULL, {ref}.duration_ms, {", ".join(hist_exprs)}
+                )
+                ON CONFLICT (bucket_minute, source, action) DO UPDATE SET
+                    total_count = total_count + 1,
+                    failed_count = failed_count + excluded.failed_count,
+                    slow_count = slow_count + excluded.slow_count,
+                    duration_count = duration_count + excluded.duration_count,
+                    max_duration_ms = CASE
+                        WHEN excluded.max_duration_ms IS NULL THEN max_duration_ms
+                        WHEN max_duration_ms IS NULL OR excluded.max_duration_ms > max_duration_ms
+                            THEN excluded.max_duration_ms
+                        ELSE max_duration_ms
+                    END,
+                    {hist_updates};
+            '''
+
+        def _sub_sql(ref: str) -> str:
+            # max_duration_ms 删除后不回退，仅作为 p95 估算的上界截断
+            hist_exprs = self._event_log_rollup_hist_exprs(ref)
+            hist_updates = ", ".join(f"{col} = {col} - {expr}" for col, expr in zip(hist_columns, hist_exprs))
+            return f'''
+                UPDATE event_log_rollups_minute SET
+                    total_count = total_count - 1,
+                    failed_count = failed_count - (COALESCE({ref}.status, '') = 'failed'),
+                    slow_count = slow_count - (COALESCE({ref}.is_slow, 0) = 1),
+                    duration_count = duration_count - ({ref}.duration_ms IS NOT NULL),
+                    {hist_updates}
+                WHERE bucket_minute = SUBSTR({ref}.created_at, 1, 16)
+                  AND source = {ref}.source
+                  AND action = {ref}.action;
+            '''
+
+        cursor.execute(f"CREATE TRIGGER trg_{table}_rollup_ai AFTER INSERT ON {table} BEGIN {_add_sql('new')} END")
+        cursor.execute(f"CREATE TRIGGER trg_{table}_rollup_ad AFTER DELETE ON {table} BEGIN {_sub_sql('old')} END")
+        cursor.execute(
+            f"CREATE TRIGGER trg_{table}_rollup_au "
+            f"AFTER UPDATE OF created_at, source, action, status, is_slow, duration_ms ON {table} "
+            f"BEGIN {_sub_sql('old')} {_add_sql('new')} END"
+        )
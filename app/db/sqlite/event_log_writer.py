@@ -0,0 +1,135 @@
+"""event_logs 组提交写入器：内存缓冲 + 后台线程批量 executemany。
+
+说明：
+- `submit()` 只做入队（fire-and-forget），队列满时丢弃并计数，绝不阻塞调用方。
+- 后台线程每 `flush_interval_ms` 或累计 `batch_size` 行触发一次 flush，一个批次一个事务。
+- `flush()` 为同步接口：关停、测试、以及读日志前的“读己之写”都走它。
+- 每行携带入队时的数据库路径，测试切换 `_db_path` 时不会把行写进别的库。
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+WriteBatchFn = Callable[[str, Sequence[Tuple[Any, ...]]], None]
+
+
+class EventLogWriter:
+    def __init__(
+        self,
+        write_batch: WriteBatchFn,
+        *,
+        flush_interval_ms: int = 200,
+        batch_size: int = 500,
+        max_queue_size: int = 20000,
+        on_flushed: Callable[[], None] | None = None,
+    ) -> None:
+        self._write_batch = write_batch
+        self._on_flushed = on_flushed
+        self._flush_interval = max(0.01, int(flush_interval_ms) / 1000.0)
+        self._batch_size = max(1, int(batch_size))
+        self._queue: queue.Queue[Tuple[str, Tuple[Any, ...]]] = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._flush_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.submitted_count = 0
+        self.flushed_count = 0
+        self.dropped_count = 0
+        self.failed_count = 0
+        self.batch_count = 0
+
+    def _ensure_thread(self) -> None:
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._state_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, db_path: str, row: Tuple[Any, ...]) -> bool:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((str(db_path), row))
+        except queue.Full:
+            with self._state_lock:
+                self.dropped_count += 1
+            return False
+        with self._state_lock:
+            self.submitted_count += 1
+        if self._queue.qsize() >= self._batch_size:
+            self._wake.set()
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> int:
+        """同步写出当前缓冲，返回成功落库的行数。"""
+        with self._flush_lock:
+            items: List[Tuple[str, Tuple[Any, ...]]] = []
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not items:
+                return 0
+
+            grouped: Dict[str, List[Tuple[Any, ...]]] = {}
+            for db_path, row in items:
+                grouped.setdefault(db_path, []).append(row)
+
+            written = 0
+            for db_path, rows in grouped.items():
+                try:
+                    self._write_batch(db_path, rows)
+                except Exception:
+                    with self._state_lock:
+                        self.failed_count += len(rows)
+                    continue
+                written += len(rows)
+            with self._state_lock:
+                self.flushed_count += written
+                self.batch_count += 1
+        if written and self._on_flushed is not None:
+            try:
+                self._on_flushed()
+            except Exception:
+                pass
+        return written
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """停止后台线程并写出剩余缓冲；之后再 submit 会自动重启线程。"""
+        with self._state_lock:
+            thread = self._thread
+            self._thread = None
+        self._stop.set()
+        self._wake.set()
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._state_lock:
+            return {
+                "pending": int(self._queue.qsize()),
+                "submitted": int(self.submitted_count),
+                "flushed": int(self.flushed_count),
+                "dropped": int(self.dropped_count),
+                "failed": int(self.failed_count),
+                "batches": int(self.batch_count),
+            }
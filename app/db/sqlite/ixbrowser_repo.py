@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -45,17 +44,16 @@ class SQLiteIXBrowserRepo:
                 item_scanned_at = item_scanned_at.strip()
             if not item_scanned_at:
                 item_scanned_at = scanned_at
-            session_json = item.get("session")
-            quota_payload = item.get("quota_payload")
+            session_hash, session_raw_hash, quota_payload_hash = self._put_scan_result_blobs(cursor, item)
             cursor.execute(
                 '''
                 INSERT INTO ixbrowser_scan_results (
                     run_id, profile_id, window_name, group_id, group_title,
                     session_status, account, account_plan,
                     proxy_mode, proxy_id, proxy_type, proxy_ip, proxy_port, real_ip,
-                    session_json, session_raw,
+                    session_blob_hash, session_raw_blob_hash,
                     quota_remaining_count, quota_total_count, quota_reset_at, quota_source,
-                    quota_payload_json, quota_error, success, close_success, error, duration_ms, scanned_at
+                    quota_payload_blob_hash, quota_error, success, close_success, error, duration_ms, scanned_at
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''',
                 (
@@ -73,13 +71,13 @@ class SQLiteIXBrowserRepo:
                     item.get("proxy_ip"),
                     item.get("proxy_port"),
                     item.get("real_ip"),
-                    json.dumps(session_json, ensure_ascii=False) if isinstance(session_json, dict) else None,
-                    item.get("session_raw"),
+                    session_hash,
+                    session_raw_hash,
                     item.get("quota_remaining_count"),
                     item.get("quota_total_count"),
                     item.get("quota_reset_at"),
                     item.get("quota_source"),
-                    json.dumps(quota_payload, ensure_ascii=False) if isinstance(quota_payload, dict) else None,
+                    quota_payload_hash,
                     item.get("quota_error"),
                     1 if item.get("success") else 0,
                     1 if item.get("close_success") else 0,
@@ -88,6 +86,7 @@ class SQLiteIXBrowserRepo:
                     item_scanned_at,
                 )
             )
+            self._record_ixbrowser_profile_state(cursor, int(cursor.lastrowid))
 
         group_title = str(run_data.get("group_title") or "")
         if keep_latest_runs > 0 and group_title:
@@ -320,55 +319,26 @@ class SQLiteIXBrowserRepo:
         return [dict(row) for row in rows]
 
     def get_latest_ixbrowser_profile_session(self, group_title: str, profile_id: int) -> Optional[Dict[str, Any]]:
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        cursor.execute(
-            '''
-            SELECT run_id, profile_id, group_title, session_json, session_raw, scanned_at
-            FROM ixbrowser_scan_results
-            WHERE group_title = ?
-              AND profile_id = ?
-              AND session_json IS NOT NULL
-              AND TRIM(session_json) != ''
-            ORDER BY run_id DESC, id DESC
-            LIMIT 1
-            ''',
-            (str(group_title or ""), int(profile_id)),
-        )
-        row = cursor.fetchone()
-        conn.close()
-        if not row:
+        state = self.get_ixbrowser_profile_state(group_title, profile_id)
+        if not state or not state.get("session_run_id") or not isinstance(state.get("session_json"), dict):
             return None
-        data = dict(row)
-        session_json = data.get("session_json")
-        if isinstance(session_json, str):
-            try:
-                data["session_json"] = json.loads(session_json)
-            except Exception:
-                data["session_json"] = None
-        return data
+        return {
+            "run_id": int(state["session_run_id"]),
+            "profile_id": int(state["profile_id"]),
+            "group_title": state["group_title"],
+            "session_json": state.get("session_json"),
+            "session_raw": state.get("session_raw"),
+            "scanned_at": state.get("session_scanned_at"),
+        }
 
-    def get_ixbrowser_scan_results_by_run(self, run_id: int) -> List[Dict[str, Any]]:
+    def get_ixbrowser_scan_results_by_run(self, run_id: int, include_blobs: bool = True) -> List[Dict[str, Any]]:
+        """include_blobs=False 时不读取 session/quota 大字段（对应键为 None）。"""
         conn = self._get_conn()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM ixbrowser_scan_results WHERE run_id = ? ORDER BY profile_id DESC', (run_id,))
         rows = cursor.fetchall()
+        data = self._resolve_scan_blobs(cursor, [dict(row) for row in rows], fields=None if include_blobs else ())
         conn.close()
-
-        data: List[Dict[str, Any]] = []
-        for row in rows:
-            item = dict(row)
-            if item.get("session_json"):
-                try:
-                    item["session_json"] = json.loads(item["session_json"])
-                except Exception:
-                    item["session_json"] = None
-            if item.get("quota_payload_json"):
-                try:
-                    item["quota_payload_json"] = json.loads(item["quota_payload_json"])
-                except Exception:
-                    item["quota_payload_json"] = None
-            data.append(item)
         return data
 
     def upsert_ixbrowser_scan_result(self, run_id: int, item: Dict[str, Any]) -> int:
@@ -388,8 +358,7 @@ class SQLiteIXBrowserRepo:
         )
         row = cursor.fetchone()
 
-        session_json = item.get("session")
-        quota_payload = item.get("quota_payload")
+        session_hash, session_raw_hash, quota_payload_hash = self._put_scan_result_blobs(cursor, item)
 
         payload = (
             item.get("window_name"),
@@ -404,13 +373,13 @@ class SQLiteIXBrowserRepo:
             item.get("proxy_ip"),
             item.get("proxy_port"),
             item.get("real_ip"),
-            json.dumps(session_json, ensure_ascii=False) if isinstance(session_json, dict) else None,
-            item.get("session_raw"),
+            session_hash,
+            session_raw_hash,
             item.get("quota_remaining_count"),
             item.get("quota_total_count"),
             item.get("quota_reset_at"),
             item.get("quota_source"),
-            json.dumps(quota_payload, ensure_ascii=False) if isinstance(quota_payload, dict) else None,
+            quota_payload_hash,
             item.get("quota_error"),
             1 if item.get("success") else 0,
             1 if item.get("close_success") else 0,
@@ -435,13 +404,13 @@ class SQLiteIXBrowserRepo:
                     proxy_ip = ?,
                     proxy_port = ?,
                     real_ip = ?,
-                    session_json = ?,
-                    session_raw = ?,
+                    session_blob_hash = ?,
+                    session_raw_blob_hash = ?,
                     quota_remaining_count = ?,
                     quota_total_count = ?,
                     quota_reset_at = ?,
                     quota_source = ?,
-                    quota_payload_json = ?,
+                    quota_payload_blob_hash = ?,
                     quota_error = ?,
                     success = ?,
                     close_success = ?,
@@ -460,9 +429,9 @@ class SQLiteIXBrowserRepo:
                     run_id, profile_id, window_name, group_id, group_title,
                     session_status, account, account_plan,
                     proxy_mode, proxy_id, proxy_type, proxy_ip, proxy_port, real_ip,
-                    session_json, session_raw,
+                    session_blob_hash, session_raw_blob_hash,
                     quota_remaining_count, quota_total_count, quota_reset_at, quota_source,
-                    quota_payload_json, quota_error, success, close_success, error, duration_ms, scanned_at
+                    quota_payload_blob_hash, quota_error, success, close_success, error, duration_ms, scanned_at
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''',
                 (
@@ -480,13 +449,13 @@ class SQLiteIXBrowserRepo:
                     item.get("proxy_ip"),
                     item.get("proxy_port"),
                     item.get("real_ip"),
-                    json.dumps(session_json, ensure_ascii=False) if isinstance(session_json, dict) else None,
-                    item.get("session_raw"),
+                    session_hash,
+                    session_raw_hash,
                     item.get("quota_remaining_count"),
                     item.get("quota_total_count"),
                     item.get("quota_reset_at"),
                     item.get("quota_source"),
-                    json.dumps(quota_payload, ensure_ascii=False) if isinstance(quota_payload, dict) else None,
+                    quota_payload_hash,
                     item.get("quota_error"),
                     1 if item.get("success") else 0,
                     1 if item.get("close_success") else 0,
@@ -497,6 +466,7 @@ class SQLiteIXBrowserRepo:
             )
             row_id = int(cursor.lastrowid)
 
+        self._record_ixbrowser_profile_state(cursor, row_id)
         conn.commit()
         conn.close()
         return row_id
@@ -526,55 +496,92 @@ class SQLiteIXBrowserRepo:
             'UPDATE ixbrowser_scan_runs SET total_windows = ?, success_count = ?, failed_count = ?, scanned_at = ? WHERE id = ?',
             (int(total_windows), int(success_count), int(failed_count), scanned_at, int(run_id))
         )
+        # 物化状态里记录的 run 时间随之刷新
+        cursor.execute(
+            'UPDATE ixbrowser_profile_state SET good_run_scanned_at = ? WHERE good_run_id = ?',
+            (scanned_at, int(run_id))
+        )
+        cursor.execute(
+            'UPDATE ixbrowser_profile_state SET prev_good_run_scanned_at = ? WHERE prev_good_run_id = ?',
+            (scanned_at, int(run_id))
+        )
         conn.commit()
         conn.close()
 
     def get_ixbrowser_latest_success_results_before_run(self, group_title: str, before_run_id: int) -> List[Dict[str, Any]]:
+        """每个窗口在 before_run_id 之前最近一次有效结果。
+
+        优先取物化表的 good/prev_good 槽位；两者都不满足（例如查询较早的历史 run）时回退原表聚合。
+        """
         conn = self._get_conn()
         cursor = conn.cursor()
         cursor.execute(
-            '''
-            SELECT r.*, runs.scanned_at AS run_scanned_at
-            FROM ixbrowser_scan_results r
-            JOIN (
-                SELECT profile_id, MAX(run_id) AS max_run_id
-                FROM ixbrowser_scan_results
-                WHERE group_title = ?
-                  AND run_id < ?
-                  AND success = 1
-                  AND (
-                    (account IS NOT NULL AND TRIM(account) != '')
-                    OR (account_plan IS NOT NULL AND TRIM(account_plan) != '')
-                    OR quota_remaining_count IS NOT NULL
-                    OR (quota_reset_at IS NOT NULL AND TRIM(quota_reset_at) != '')
-                  )
-                GROUP BY profile_id
-            ) latest
-              ON latest.profile_id = r.profile_id
-             AND latest.max_run_id = r.run_id
-            LEFT JOIN ixbrowser_scan_runs runs
-              ON runs.id = r.run_id
-            ORDER BY r.profile_id DESC
-            ''',
-            (group_title, before_run_id)
+            'SELECT * FROM ixbrowser_profile_state WHERE group_title = ? AND good_run_id IS NOT NULL',
+            (str(group_title or ""),),
         )
-        rows = cursor.fetchall()
-        conn.close()
+        states = [dict(row) for row in cursor.fetchall()]
 
         data: List[Dict[str, Any]] = []
-        for row in rows:
-            item = dict(row)
-            if item.get("session_json"):
-                try:
-                    item["session_json"] = json.loads(item["session_json"])
-                except Exception:
-                    item["session_json"] = None
-            if item.get("quota_payload_json"):
-                try:
-                    item["quota_payload_json"] = json.loads(item["quota_payload_json"])
-                except Exception:
-                    item["quota_payload_json"] = None
-            data.append(item)
+        unresolved: List[int] = []
+        for state in states:
+            prefix = None
+            if int(state["good_run_id"]) < int(before_run_id):
+                prefix = "good_"
+            elif state.get("prev_good_run_id") and int(state["prev_good_run_id"]) < int(before_run_id):
+                prefix = "prev_good_"
+            if prefix is None:
+                unresolved.append(int(state["profile_id"]))
+                continue
+            data.append(
+                {
+                    "run_id": int(state[f"{prefix}run_id"]),
+                    "run_scanned_at": state.get(f"{prefix}run_scanned_at"),
+                    "profile_id": int(state["profile_id"]),
+                    "group_title": state["group_title"],
+                    "window_name": state.get("window_name"),
+                    "account": state.get(f"{prefix}account"),
+                    "account_plan": state.get(f"{prefix}account_plan"),
+                    "quota_remaining_count": state.get(f"{prefix}quota_remaining_count"),
+                    "quota_total_count": state.get(f"{prefix}quota_total_count"),
+                    "quota_reset_at": state.get(f"{prefix}quota_reset_at"),
+                    "session_blob_hash": state.get(f"{prefix}session_blob_hash"),
+                }
+            )
+        self._resolve_scan_blobs(cursor, data, fields=("session_json",))
+
+        for offset in range(0, len(unresolved), 500):
+            chunk = unresolved[offset:offset + 500]
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor.execute(
+                f'''
+                SELECT r.*, runs.scanned_at AS run_scanned_at
+                FROM ixbrowser_scan_results r
+                JOIN (
+                    SELECT profile_id, MAX(run_id) AS max_run_id
+                    FROM ixbrowser_scan_results
+                    WHERE group_title = ?
+                      AND run_id < ?
+                      AND profile_id IN ({placeholders})
+                      AND success = 1
+                      AND (
+                        (account IS NOT NULL AND TRIM(account) != '')
+                        OR (account_plan IS NOT NULL AND TRIM(account_plan) != '')
+                        OR quota_remaining_count IS NOT NULL
+                        OR (quota_reset_at IS NOT NULL AND TRIM(quota_reset_at) != '')
+                      )
+                    GROUP BY profile_id
+                ) latest
+                  ON latest.profile_id = r.profile_id
+                 AND latest.max_run_id = r.run_id
+                LEFT JOIN ixbrowser_scan_runs runs
+                  ON runs.id = r.run_id
+                WHERE r.group_title = ?
+                ''',
+                [group_title, before_run_id, *chunk, group_title],
+            )
+            data.extend(self._resolve_scan_blobs(cursor, [dict(row) for row in cursor.fetchall()]))
+        conn.close()
+        data.sort(key=lambda item: int(item["profile_id"]), reverse=True)
         return data
 
     def create_ixbrowser_generate_job(self, data: Dict[str, Any]) -> int:
@@ -633,7 +640,7 @@ class SQLiteIXBrowserRepo:
             "status", "task_id", "task_url", "error", "submit_attempts", "poll_attempts",
             "elapsed_ms", "started_at", "finished_at", "window_name", "progress",
             "publish_status", "publish_url", "publish_error", "publish_attempts", "published_at",
-            "generation_id", "publish_post_id", "publish_permalink",
+            "generation_id", "publish_post_id", "publish_permalink", "publish_next_at",
         }
         sets = []
         params = []
@@ -659,6 +666,44 @@ class SQLiteIXBrowserRepo:
         conn.close()
         return success
 
+    def claim_ixbrowser_generate_publish(self, job_id: int) -> bool:
+        """开始一次发布尝试；已有尝试在执行（重复的重试定时器）时返回 False。"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            '''
+            UPDATE ixbrowser_sora_generate_jobs
+            SET publish_status = 'running',
+                publish_attempts = COALESCE(publish_attempts, 0) + 1,
+                publish_error = NULL,
+                publish_next_at = NULL,
+                updated_at = ?
+            WHERE id = ? AND publish_status != 'running'
+            ''',
+            (now, int(job_id)),
+        )
+        success = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return success
+
+    def list_ixbrowser_generate_publish_retries(self) -> List[Dict[str, Any]]:
+        """等待延迟重试发布的兼容生成任务，供重启后挂回定时器。"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            '''
+            SELECT *
+            FROM ixbrowser_sora_generate_jobs
+            WHERE publish_status = 'queued' AND publish_next_at IS NOT NULL
+            ORDER BY publish_next_at ASC
+            '''
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
     def get_ixbrowser_generate_job(self, job_id: int) -> Optional[Dict[str, Any]]:
         conn = self._get_conn()
         cursor = conn.cursor()
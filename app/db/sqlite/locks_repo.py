@@ -1,11 +1,18 @@
-"""调度器锁（scheduler_locks）操作。"""
+"""调度器锁（scheduler_locks）与 ixBrowser 窗口租约（browser_window_leases）操作。"""
 
 from __future__ import annotations
 
 from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
 
 
 class SQLiteLocksRepo:
+    # 写入路径上的周期性维护（日志清理等）是否由本进程执行；多进程部署时只有 leader 开启
+    _background_maintenance_enabled = True
+
+    def set_background_maintenance_enabled(self, enabled: bool) -> None:
+        self._background_maintenance_enabled = bool(enabled)
+
     def try_acquire_scheduler_lock(self, lock_key: str, owner: str, ttl_seconds: int = 120) -> bool:
         safe_key = str(lock_key or "").strip()
         safe_owner = str(owner or "unknown").strip() or "unknown"
@@ -49,3 +56,152 @@ class SQLiteLocksRepo:
         finally:
             conn.close()
 
+    def acquire_leader_lease(self, lock_key: str, owner: str, ttl_seconds: int = 30) -> bool:
+        """抢占或续租 leader 租约：锁空闲、已过期或本就属于 owner 时写入并返回 True。"""
+        safe_key = str(lock_key or "").strip()
+        safe_owner = str(owner or "").strip()
+        if not safe_key or not safe_owner:
+            return False
+        now = self._now_str()
+        lock_until = (datetime.now() + timedelta(seconds=max(1, int(ttl_seconds)))).strftime("%Y-%m-%d %H:%M:%S")
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                '''
+                INSERT INTO scheduler_locks (lock_key, owner, locked_until, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(lock_key) DO UPDATE SET
+                    owner = excluded.owner,
+                    locked_until = excluded.locked_until,
+                    updated_at = excluded.updated_at
+                WHERE scheduler_locks.owner = excluded.owner
+                   OR scheduler_locks.locked_until < ?
+                ''',
+                (safe_key, safe_owner, lock_until, now, now),
+            )
+            acquired = cursor.rowcount > 0
+            conn.commit()
+            return bool(acquired)
+        except Exception:
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def release_scheduler_lock(self, lock_key: str, owner: str) -> bool:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM scheduler_locks WHERE lock_key = ? AND owner = ?",
+            (str(lock_key or "").strip(), str(owner or "").strip()),
+        )
+        released = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return bool(released)
+
+    def get_scheduler_lock(self, lock_key: str) -> Optional[Dict[str, Any]]:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM scheduler_locks WHERE lock_key = ?", (str(lock_key or "").strip(),))
+        row = cursor.fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def try_acquire_window_lease(
+        self,
+        profile_id: int,
+        owner: str,
+        capacity: int,
+        priority: int = 0,
+        ttl_seconds: int = 60,
+    ) -> str:
+        """跨进程申请窗口租约。
+
+        返回 `acquired`（已写入或本就属于 owner）、`busy`（profile 被其他进程持有）、
+        `full`（全局窗口数已达 capacity）。过期租约视为已释放，顺手删除。
+        """
+        pid = int(profile_id)
+        safe_owner = str(owner or "").strip()
+        if not safe_owner:
+            return "busy"
+        now = self._now_str()
+        lease_until = (datetime.now() + timedelta(seconds=max(1, int(ttl_seconds)))).strftime("%Y-%m-%d %H:%M:%S")
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("DELETE FROM browser_window_leases WHERE lease_until < ?", (now,))
+            cursor.execute("SELECT owner FROM browser_window_leases WHERE profile_id = ?", (pid,))
+            row = cursor.fetchone()
+            if row and str(row["owner"]) != safe_owner:
+                conn.rollback()
+                return "busy"
+            if not row:
+                cursor.execute("SELECT COUNT(*) FROM browser_window_leases")
+                if int(cursor.fetchone()[0] or 0) >= max(1, int(capacity)):
+                    conn.rollback()
+                    return "full"
+            cursor.execute(
+                '''
+                INSERT INTO browser_window_leases (profile_id, owner, priority, lease_until, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(profile_id) DO UPDATE SET
+                    priority = excluded.priority,
+                    lease_until = excluded.lease_until,
+                    updated_at = excluded.updated_at
+                ''',
+                (pid, safe_owner, int(priority), lease_until, now),
+            )
+            conn.commit()
+            return "acquired"
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def renew_window_leases(self, owner: str, ttl_seconds: int = 60) -> int:
+        now = self._now_str()
+        lease_until = (datetime.now() + timedelta(seconds=max(1, int(ttl_seconds)))).strftime("%Y-%m-%d %H:%M:%S")
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE browser_window_leases SET lease_until = ?, updated_at = ? WHERE owner = ?",
+            (lease_until, now, str(owner or "").strip()),
+        )
+        renewed = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return int(renewed or 0)
+
+    def release_window_lease(self, profile_id: int, owner: str) -> bool:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM browser_window_leases WHERE profile_id = ? AND owner = ?",
+            (int(profile_id), str(owner or "").strip()),
+        )
+        released = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return bool(released)
+
+    def release_window_leases(self, owner: str) -> int:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM browser_window_leases WHERE owner = ?", (str(owner or "").strip(),))
+        released = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return int(released or 0)
+
+    def count_window_leases(self) -> int:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM browser_window_leases WHERE lease_until >= ?", (self._now_str(),))
+        count = int(cursor.fetchone()[0] or 0)
+        conn.close()
+        return count
@@ -2,17 +2,25 @@
 
 from __future__ import annotations
 
+import bisect
 import json
 import math
+import os
 import sqlite3
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from app.core.log_mask import mask_log_payload
+from app.db.sqlite.event_log_partitions import EVENT_LOG_PARTITION_PREFIX
+from app.db.sqlite.event_log_writer import EventLogWriter
 
 
 class SQLiteLogsRepo:
+    _event_log_writer: Optional[EventLogWriter] = None
+    _event_log_writer_lock = threading.Lock()
+
     def _parse_cursor_id(self, cursor: Optional[str | int]) -> Optional[int]:
         if cursor is None:
             return None
@@ -35,6 +43,30 @@ class SQLiteLogsRepo:
             return []
         return list(dict.fromkeys(values))
 
+    def _event_logs_fts_usable(self, keyword: str, table: str) -> bool:
+        # FTS 建在各分区上；trigram 至少需要 3 个字符才能命中索引，更短的关键字仍走 LIKE
+        if not table.startswith(EVENT_LOG_PARTITION_PREFIX):
+            return False
+        return bool(getattr(self, "_event_logs_fts_enabled", False)) and len(keyword) >= 3
+
+    @staticmethod
+    def _event_logs_fts_phrase(keyword: str) -> str:
+        return '"' + keyword.replace('"', '""') + '"'
+
+    def _event_log_keyword_source(self, keyword: Optional[str], table: str) -> Tuple[str, List[Any], str]:
+        """分区列表查询的 FROM 子句：命中 FTS 时以索引 rowid 倒序驱动 JOIN，LIMIT 可提前结束。
+
+        返回 (from_clause, params, order_column)；未走 FTS 时 params 为空。
+        """
+        keyword_text = str(keyword).strip() if keyword else ""
+        if keyword_text and self._event_logs_fts_usable(keyword_text, table):
+            from_clause = (
+                f"(SELECT rowid AS fts_rowid FROM {table}_fts WHERE {table}_fts MATCH ?) AS fts "
+                f"JOIN {table} ON {table}.id = fts.fts_rowid"
+            )
+            return from_clause, [self._event_logs_fts_phrase(keyword_text)], "fts.fts_rowid"
+        return table, [], "id"
+
     def _build_event_log_conditions(
         self,
         *,
@@ -54,6 +86,7 @@ class SQLiteLogsRepo:
         resource_id: Optional[str] = None,
         before_id: Optional[int] = None,
         after_id: Optional[int] = None,
+        table: str = "event_logs",
     ) -> Tuple[str, List[Any]]:
         conditions: List[str] = []
         params: List[Any] = []
@@ -105,8 +138,12 @@ class SQLiteLogsRepo:
         if after_id is not None and after_id > 0:
             conditions.append("id > ?")
             params.append(int(after_id))
-        if keyword:
-            like = f"%{str(keyword).strip()}%"
+        keyword_text = str(keyword).strip() if keyword else ""
+        if keyword_text and self._event_logs_fts_usable(keyword_text, table):
+            conditions.append(f"id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)")
+            params.append(self._event_logs_fts_phrase(keyword_text))
+        elif keyword_text:
+            like = f"%{keyword_text}%"
             conditions.append(
                 "("
                 "message LIKE ? OR action LIKE ? OR path LIKE ? OR query_text LIKE ? OR "
@@ -120,6 +157,7 @@ class SQLiteLogsRepo:
 
     def _decode_event_log_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
         data = dict(row)
+        data.pop("approx_bytes", None)
         data["is_slow"] = bool(int(data.get("is_slow") or 0))
         raw = data.pop("metadata_json", None)
         metadata = None
@@ -135,7 +173,7 @@ class SQLiteLogsRepo:
         data["metadata"] = metadata
         return data
 
-    def create_event_log(
+    def _build_event_log_row(
         self,
         *,
         source: str,
@@ -164,7 +202,7 @@ class SQLiteLogsRepo:
         metadata: Optional[Dict[str, Any]] = None,
         created_at: Optional[str] = None,
         mask_mode: Optional[str] = None,
-    ) -> int:
+    ) -> Tuple[Any, ...]:
         try:
             from app.core.config import settings
         except Exception:
@@ -182,52 +220,228 @@ class SQLiteLogsRepo:
 
         created_at_text = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         metadata_json = json.dumps(masked_metadata, ensure_ascii=False) if masked_metadata is not None else None
+        return (
+            created_at_text,
+            str(source or "system").strip().lower(),
+            str(action or "unknown").strip(),
+            str(event).strip() if event is not None else None,
+            str(phase).strip() if phase is not None else None,
+            str(status).strip().lower() if status is not None else None,
+            str(level).strip().upper() if level is not None else None,
+            masked_message,
+            trace_id,
+            request_id,
+            method,
+            path,
+            masked_query,
+            int(status_code) if status_code is not None else None,
+            int(duration_ms) if duration_ms is not None else None,
+            1 if is_slow else 0,
+            int(operator_user_id) if operator_user_id is not None else None,
+            operator_username,
+            ip,
+            user_agent,
+            resource_type,
+            resource_id,
+            error_type,
+            int(error_code) if error_code is not None else None,
+            metadata_json,
+        )
 
-        conn = self._get_conn()
-        cursor = conn.cursor()
-        cursor.execute(
-            '''
-            INSERT INTO event_logs (
-                created_at, source, action, event, phase, status, level, message,
-                trace_id, request_id, method, path, query_text, status_code, duration_ms,
-                is_slow, operator_user_id, operator_username, ip, user_agent,
-                resource_type, resource_id, error_type, error_code, metadata_json
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''',
-            (
-                created_at_text,
-                str(source or "system").strip().lower(),
-                str(action or "unknown").strip(),
-                str(event).strip() if event is not None else None,
-                str(phase).strip() if phase is not None else None,
-                str(status).strip().lower() if status is not None else None,
-                str(level).strip().upper() if level is not None else None,
-                masked_message,
-                trace_id,
-                request_id,
-                method,
-                path,
-                masked_query,
-                int(status_code) if status_code is not None else None,
-                int(duration_ms) if duration_ms is not None else None,
-                1 if is_slow else 0,
-                int(operator_user_id) if operator_user_id is not None else None,
-                operator_username,
-                ip,
-                user_agent,
-                resource_type,
-                resource_id,
-                error_type,
-                int(error_code) if error_code is not None else None,
-                metadata_json,
-            ),
+    def create_event_log(
+        self,
+        *,
+        source: str,
+        action: str,
+        event: Optional[str] = None,
+        phase: Optional[str] = None,
+        status: Optional[str] = None,
+        level: Optional[str] = None,
+        message: Optional[str] = None,
+        trace_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        method: Optional[str] = None,
+        path: Optional[str] = None,
+        query_text: Optional[str] = None,
+        status_code: Optional[int] = None,
+        duration_ms: Optional[int] = None,
+        is_slow: bool = False,
+        operator_user_id: Optional[int] = None,
+        operator_username: Optional[str] = None,
+        ip: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        error_type: Optional[str] = None,
+        error_code: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[str] = None,
+        mask_mode: Optional[str] = None,
+    ) -> int:
+        """同步写入一条事件日志并返回 id；不需要 id 的调用方请用 `enqueue_event_log`。"""
+        row = self._build_event_log_row(
+            source=source,
+            action=action,
+            event=event,
+            phase=phase,
+            status=status,
+            level=level,
+            message=message,
+            trace_id=trace_id,
+            request_id=request_id,
+            method=method,
+            path=path,
+            query_text=query_text,
+            status_code=status_code,
+            duration_ms=duration_ms,
+            is_slow=is_slow,
+            operator_user_id=operator_user_id,
+            operator_username=operator_username,
+            ip=ip,
+            user_agent=user_agent,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            error_type=error_type,
+            error_code=error_code,
+            metadata=metadata,
+            created_at=created_at,
+            mask_mode=mask_mode,
         )
-        log_id = int(cursor.lastrowid)
-        conn.commit()
-        conn.close()
+        self.flush_event_logs()
+        conn = self._get_conn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            log_id = self._insert_event_log_rows(cursor, [row])[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
         self._maybe_cleanup_event_logs()
         return log_id
 
+    def enqueue_event_log(
+        self,
+        *,
+        source: str,
+        action: str,
+        event: Optional[str] = None,
+        phase: Optional[str] = None,
+        status: Optional[str] = None,
+        level: Optional[str] = None,
+        message: Optional[str] = None,
+        trace_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        method: Optional[str] = None,
+        path: Optional[str] = None,
+        query_text: Optional[str] = None,
+        status_code: Optional[int] = None,
+        duration_ms: Optional[int] = None,
+        is_slow: bool = False,
+        operator_user_id: Optional[int] = None,
+        operator_username: Optional[str] = None,
+        ip: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        error_type: Optional[str] = None,
+        error_code: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[str] = None,
+        mask_mode: Optional[str] = None,
+    ) -> bool:
+        """fire-and-forget 写入：进入组提交缓冲，由后台线程批量落库。
+
+        返回 False 表示缓冲已满被丢弃（见 `event_log_writer_stats()["dropped"]`）。
+        """
+        row = self._build_event_log_row(
+            source=source,
+            action=action,
+            event=event,
+            phase=phase,
+            status=status,
+            level=level,
+            message=message,
+            trace_id=trace_id,
+            request_id=request_id,
+            method=method,
+            path=path,
+            query_text=query_text,
+            status_code=status_code,
+            duration_ms=duration_ms,
+            is_slow=is_slow,
+            operator_user_id=operator_user_id,
+            operator_username=operator_username,
+            ip=ip,
+            user_agent=user_agent,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            error_type=error_type,
+            error_code=error_code,
+            metadata=metadata,
+            created_at=created_at,
+            mask_mode=mask_mode,
+        )
+        return self._get_event_log_writer().submit(self._db_path, row)
+
+    def _get_event_log_writer(self) -> EventLogWriter:
+        writer = getattr(self, "_event_log_writer", None)
+        if writer is not None:
+            return writer
+        with self._event_log_writer_lock:
+            writer = getattr(self, "_event_log_writer", None)
+            if writer is None:
+                try:
+                    from app.core.config import settings
+                except Exception:
+                    settings = None
+                writer = EventLogWriter(
+                    self._write_event_log_batch,
+                    flush_interval_ms=int(getattr(settings, "event_log_flush_interval_ms", 200) or 200),
+                    batch_size=int(getattr(settings, "event_log_flush_batch_size", 500) or 500),
+                    max_queue_size=int(getattr(settings, "event_log_queue_max", 20000) or 20000),
+                    on_flushed=self._maybe_cleanup_event_logs,
+                )
+                self._event_log_writer = writer
+        return writer
+
+    def _write_event_log_batch(self, db_path: str, rows: Sequence[Tuple[Any, ...]]) -> None:
+        if db_path == self._db_path:
+            conn = self._get_conn()
+        else:
+            conn = sqlite3.connect(db_path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            self._insert_event_log_rows(cursor, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def flush_event_logs(self) -> int:
+        """同步写出组提交缓冲中的事件日志（读日志前调用，保证读己之写）。"""
+        writer = getattr(self, "_event_log_writer", None)
+        if writer is None:
+            return 0
+        return writer.flush()
+
+    def stop_event_log_writer(self) -> None:
+        writer = getattr(self, "_event_log_writer", None)
+        if writer is not None:
+            writer.stop()
+
+    def event_log_writer_stats(self) -> Dict[str, int]:
+        writer = getattr(self, "_event_log_writer", None)
+        if writer is None:
+            return {"pending": 0, "submitted": 0, "flushed": 0, "dropped": 0, "failed": 0, "batches": 0}
+        return writer.stats()
+
     def list_event_logs(
         self,
         *,
@@ -248,14 +462,14 @@ class SQLiteLogsRepo:
         limit: int = 200,
         cursor: Optional[str | int] = None,
     ) -> Dict[str, Any]:
+        self.flush_event_logs()
         safe_limit = min(max(int(limit), 1), 500)
         cursor_id = self._parse_cursor_id(cursor)
-        where_clause, params = self._build_event_log_conditions(
+        filters = dict(
             source=source,
             status=status,
             level=level,
             operator_username=operator_username,
-            keyword=keyword,
             action=action,
             path=path,
             trace_id=trace_id,
@@ -267,14 +481,36 @@ class SQLiteLogsRepo:
             resource_id=resource_id,
             before_id=cursor_id,
         )
-        sql = f"SELECT * FROM event_logs {where_clause} ORDER BY id DESC LIMIT ?"
-        params.append(safe_limit + 1)
+        need = safe_limit + 1
 
         conn = self._get_conn()
         cursor_obj = conn.cursor()
-        cursor_obj.execute(sql, params)
-        rows = cursor_obj.fetchall()
+        partitions = self._event_log_partition_bounds(cursor_obj, start_at=start_at, end_at=end_at)
+        if cursor_id is not None:
+            partitions = [part for part in partitions if part["min_id"] < cursor_id]
+        # 分区按 max_id 从新到旧遍历；已凑够 need 行且后续分区不可能有更大的 id 时提前结束
+        partitions.sort(key=lambda part: part["max_id"], reverse=True)
+        rows: List[sqlite3.Row] = []
+        for part in partitions:
+            if len(rows) >= need:
+                rows.sort(key=lambda row: int(row["id"]), reverse=True)
+                if part["max_id"] < int(rows[need - 1]["id"]):
+                    break
+            table = part["table"]
+            from_clause, from_params, order_column = self._event_log_keyword_source(keyword, table)
+            where_clause, params = self._build_event_log_conditions(
+                **filters,
+                keyword=None if from_params else keyword,
+                table=table,
+            )
+            cursor_obj.execute(
+                f"SELECT {table}.* FROM {from_clause} {where_clause} ORDER BY {order_column} DESC LIMIT ?",
+                from_params + params + [need],
+            )
+            rows.extend(cursor_obj.fetchall())
         conn.close()
+        rows.sort(key=lambda row: int(row["id"]), reverse=True)
+        rows = rows[:need]
 
         has_more = len(rows) > safe_limit
         if has_more:
@@ -297,21 +533,35 @@ class SQLiteLogsRepo:
         resource_id: Optional[str] = None,
         limit: int = 200,
     ) -> List[Dict[str, Any]]:
+        self.flush_event_logs()
         safe_limit = min(max(int(limit), 1), 500)
-        where_clause, params = self._build_event_log_conditions(
-            source=source,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            after_id=int(after_id or 0),
-        )
-        sql = f"SELECT * FROM event_logs {where_clause} ORDER BY id ASC LIMIT ?"
-        params.append(safe_limit)
+        after_id_int = int(after_id or 0)
+
         conn = self._get_conn()
         cursor_obj = conn.cursor()
-        cursor_obj.execute(sql, params)
-        rows = cursor_obj.fetchall()
+        partitions = [part for part in self._event_log_partition_bounds(cursor_obj) if part["max_id"] > after_id_int]
+        partitions.sort(key=lambda part: part["min_id"])
+        rows: List[sqlite3.Row] = []
+        for part in partitions:
+            if len(rows) >= safe_limit:
+                rows.sort(key=lambda row: int(row["id"]))
+                if part["min_id"] > int(rows[safe_limit - 1]["id"]):
+                    break
+            where_clause, params = self._build_event_log_conditions(
+                source=source,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                after_id=after_id_int,
+                table=part["table"],
+            )
+            cursor_obj.execute(
+                f"SELECT * FROM {part['table']} {where_clause} ORDER BY id ASC LIMIT ?",
+                params + [safe_limit],
+            )
+            rows.extend(cursor_obj.fetchall())
         conn.close()
-        return [self._decode_event_log_row(dict(row)) for row in rows]
+        rows.sort(key=lambda row: int(row["id"]))
+        return [self._decode_event_log_row(dict(row)) for row in rows[:safe_limit]]
 
     def stats_event_logs(
         self,
@@ -331,7 +581,28 @@ class SQLiteLogsRepo:
         resource_type: Optional[str] = None,
         resource_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        where_clause, params = self._build_event_log_conditions(
+        self.flush_event_logs()
+        rollup_answerable = not any(
+            [
+                status and str(status).strip().lower() != "all",
+                level and str(level).strip().upper() != "ALL",
+                operator_username,
+                keyword,
+                action,
+                path,
+                trace_id,
+                request_id,
+                slow_only,
+                resource_type,
+                resource_id,
+            ]
+        )
+        if rollup_answerable:
+            rollup_stats = self._stats_event_logs_from_rollups(source=source, start_at=start_at, end_at=end_at)
+            if rollup_stats is not None:
+                return rollup_stats
+
+        filters = dict(
             source=source,
             status=status,
             level=level,
@@ -350,13 +621,24 @@ class SQLiteLogsRepo:
         conn = self._get_conn()
         cursor_obj = conn.cursor()
 
+        # 各分区各自套用过滤条件（含分区 FTS），合并为 scoped 结果集后统一聚合
+        selects: List[str] = []
+        params: List[Any] = []
+        for part in self._event_log_partition_bounds(cursor_obj, start_at=start_at, end_at=end_at):
+            part_where, part_params = self._build_event_log_conditions(**filters, table=part["table"])
+            selects.append(f"SELECT * FROM {part['table']} {part_where}")
+            params.extend(part_params)
+        scoped = self._event_log_union_all(selects) if selects else "SELECT * FROM event_logs WHERE 0"
+        with_scoped = f"WITH scoped AS ({scoped})"
+
         cursor_obj.execute(
             f'''
+            {with_scoped}
             SELECT
               COUNT(*) AS total_count,
               SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) AS failed_count,
               SUM(CASE WHEN is_slow = 1 THEN 1 ELSE 0 END) AS slow_count
-            FROM event_logs {where_clause}
+            FROM scoped
             ''',
             params,
         )
@@ -366,11 +648,12 @@ class SQLiteLogsRepo:
         slow_count = int(row["slow_count"] or 0) if row else 0
         failure_rate = round((failed_count / total_count) * 100, 2) if total_count > 0 else 0.0
 
-        duration_where = f"{where_clause} {'AND' if where_clause else 'WHERE'} duration_ms IS NOT NULL"
         cursor_obj.execute(
             f'''
+            {with_scoped}
             SELECT duration_ms
-            FROM event_logs {duration_where}
+            FROM scoped
+            WHERE duration_ms IS NOT NULL
             ORDER BY duration_ms ASC
             ''',
             params,
@@ -384,8 +667,9 @@ class SQLiteLogsRepo:
 
         cursor_obj.execute(
             f'''
+            {with_scoped}
             SELECT source AS key, COUNT(*) AS count
-            FROM event_logs {where_clause}
+            FROM scoped
             GROUP BY source
             ORDER BY count DESC, key ASC
             ''',
@@ -398,8 +682,9 @@ class SQLiteLogsRepo:
 
         cursor_obj.execute(
             f'''
+            {with_scoped}
             SELECT action AS key, COUNT(*) AS count
-            FROM event_logs {where_clause}
+            FROM scoped
             GROUP BY action
             ORDER BY count DESC, key ASC
             LIMIT 5
@@ -411,11 +696,12 @@ class SQLiteLogsRepo:
             for item in cursor_obj.fetchall()
         ]
 
-        failed_where = f"{where_clause} {'AND' if where_clause else 'WHERE'} status = 'failed'"
         cursor_obj.execute(
             f'''
+            {with_scoped}
             SELECT COALESCE(NULLIF(TRIM(message), ''), '(无消息)') AS key, COUNT(*) AS count
-            FROM event_logs {failed_where}
+            FROM scoped
+            WHERE status = 'failed'
             GROUP BY key
             ORDER BY count DESC, key ASC
             LIMIT 5
@@ -439,7 +725,187 @@ class SQLiteLogsRepo:
             "top_failed_reasons": top_failed_reasons,
         }
 
+    def _stats_event_logs_from_rollups(
+        self,
+        *,
+        source: Optional[str] = None,
+        start_at: Optional[str] = None,
+        end_at: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """仅按来源/时间过滤时，从分钟级 rollup 汇总统计；不足一分钟的边界段回查原表。"""
+        try:
+            start_dt = datetime.strptime(start_at, "%Y-%m-%d %H:%M:%S") if start_at else None
+            end_dt = datetime.strptime(end_at, "%Y-%m-%d %H:%M:%S") if end_at else None
+        except (TypeError, ValueError):
+            return None
+
+        # rollup 覆盖 [full_start, full_end)，两端非整分钟的部分走原表
+        full_start = None
+        if start_dt is not None:
+            full_start = start_dt.replace(second=0)
+            if start_dt.second:
+                full_start += timedelta(minutes=1)
+        full_end = None
+        if end_dt is not None:
+            full_end = end_dt.replace(second=0)
+            if end_dt.second == 59:
+                full_end += timedelta(minutes=1)
+
+        raw_ranges: List[Tuple[Optional[str], Optional[str], bool]] = []
+        use_rollups = True
+        if full_start is not None and full_end is not None and full_start >= full_end:
+            use_rollups = False
+            raw_ranges.append((start_at, end_at, True))
+        else:
+            if start_dt is not None and full_start is not None and start_dt < full_start:
+                raw_ranges.append((start_at, full_start.strftime("%Y-%m-%d %H:%M:%S"), False))
+            if end_dt is not None and full_end is not None and full_end <= end_dt:
+                raw_ranges.append((full_end.strftime("%Y-%m-%d %H:%M:%S"), end_at, True))
+
+        sources = self._normalize_sources(source)
+        bounds = list(self._EVENT_LOG_LATENCY_BOUNDS_MS)
+        hist_columns = self._event_log_rollup_hist_columns()
+        hist = [0] * len(hist_columns)
+        total_count = failed_count = slow_count = 0
+        max_duration: Optional[int] = None
+        source_counts: Dict[str, int] = {}
+        action_counts: Dict[str, int] = {}
+
+        conn = self._get_conn()
+        cursor_obj = conn.cursor()
+        if use_rollups:
+            conditions: List[str] = []
+            params: List[Any] = []
+            if sources:
+                conditions.append(f"source IN ({','.join(['?'] * len(sources))})")
+                params.extend(sources)
+            if full_start is not None:
+                conditions.append("bucket_minute >= ?")
+                params.append(full_start.strftime("%Y-%m-%d %H:%M"))
+            if full_end is not None:
+                conditions.append("bucket_minute < ?")
+                params.append(full_end.strftime("%Y-%m-%d %H:%M"))
+            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            hist_select = ", ".join(f"SUM({col}) AS {col}" for col in hist_columns)
+            cursor_obj.execute(
+                f'''
+                SELECT source, action,
+                       SUM(total_count) AS total_count,
+                       SUM(failed_count) AS failed_count,
+                       SUM(slow_count) AS slow_count,
+                       MAX(max_duration_ms) AS max_duration_ms,
+                       {hist_select}
+                FROM event_log_rollups_minute {where_clause}
+                GROUP BY source, action
+                HAVING SUM(total_count) > 0
+                ''',
+                params,
+            )
+            for row in cursor_obj.fetchall():
+                count = int(row["total_count"] or 0)
+                total_count += count
+                failed_count += int(row["failed_count"] or 0)
+                slow_count += int(row["slow_count"] or 0)
+                source_key = str(row["source"] or "")
+                action_key = str(row["action"] or "")
+                source_counts[source_key] = source_counts.get(source_key, 0) + count
+                action_counts[action_key] = action_counts.get(action_key, 0) + count
+                for idx, col in enumerate(hist_columns):
+                    hist[idx] += int(row[col] or 0)
+                if row["max_duration_ms"] is not None:
+                    max_duration = max(int(row["max_duration_ms"]), max_duration or 0)
+
+        for range_start, range_end, end_inclusive in raw_ranges:
+            conditions = []
+            params = []
+            if sources:
+                conditions.append(f"source IN ({','.join(['?'] * len(sources))})")
+                params.extend(sources)
+            if range_start:
+                conditions.append("created_at >= ?")
+                params.append(range_start)
+            if range_end:
+                conditions.append("created_at <= ?" if end_inclusive else "created_at < ?")
+                params.append(range_end)
+            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            cursor_obj.execute(
+                f"SELECT source, action, status, is_slow, duration_ms FROM event_logs {where_clause}",
+                params,
+            )
+            for row in cursor_obj.fetchall():
+                total_count += 1
+                failed_count += 1 if row["status"] == "failed" else 0
+                slow_count += 1 if int(row["is_slow"] or 0) == 1 else 0
+                source_key = str(row["source"] or "")
+                action_key = str(row["action"] or "")
+                source_counts[source_key] = source_counts.get(source_key, 0) + 1
+                action_counts[action_key] = action_counts.get(action_key, 0) + 1
+                if row["duration_ms"] is not None:
+                    duration = int(row["duration_ms"])
+                    hist[bisect.bisect_left(bounds, duration)] += 1
+                    max_duration = max(duration, max_duration or 0)
+
+        failed_where, failed_params = self._build_event_log_conditions(
+            source=source,
+            status="failed",
+            start_at=start_at,
+            end_at=end_at,
+        )
+        cursor_obj.execute(
+            f'''
+            SELECT COALESCE(NULLIF(TRIM(message), ''), '(无消息)') AS key, COUNT(*) AS count
+            FROM event_logs {failed_where}
+            GROUP BY key
+            ORDER BY count DESC, key ASC
+            LIMIT 5
+            ''',
+            failed_params,
+        )
+        top_failed_reasons = [
+            {"key": str(item["key"] or "(无消息)"), "count": int(item["count"] or 0)}
+            for item in cursor_obj.fetchall()
+        ]
+        conn.close()
+
+        # p95 取直方图中第 ceil(n*0.95) 个样本所在档的上界，并以实际最大值截断
+        p95_duration_ms = None
+        duration_total = sum(hist)
+        if duration_total > 0:
+            rank = max(1, math.ceil(duration_total * 0.95))
+            cumulative = 0
+            for idx, count in enumerate(hist):
+                cumulative += count
+                if cumulative >= rank:
+                    upper = bounds[idx] if idx < len(bounds) else None
+                    if upper is None:
+                        p95_duration_ms = max_duration
+                    elif max_duration is None:
+                        p95_duration_ms = upper
+                    else:
+                        p95_duration_ms = min(upper, max_duration)
+                    break
+
+        def _top(counts: Dict[str, int], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+            items = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+            if limit is not None:
+                items = items[:limit]
+            return [{"key": key, "count": int(count)} for key, count in items]
+
+        failure_rate = round((failed_count / total_count) * 100, 2) if total_count > 0 else 0.0
+        return {
+            "total_count": total_count,
+            "failed_count": failed_count,
+            "failure_rate": failure_rate,
+            "p95_duration_ms": p95_duration_ms,
+            "slow_count": slow_count,
+            "source_distribution": _top(source_counts),
+            "top_actions": _top(action_counts, 5),
+            "top_failed_reasons": top_failed_reasons,
+        }
+
     def _maybe_cleanup_event_logs(self) -> None:
+        if not self._background_maintenance_enabled:
+            return
         try:
             from app.core.config import settings
         except Exception:
@@ -459,92 +925,179 @@ class SQLiteLogsRepo:
         self.cleanup_event_logs(retention_days=retention_days, max_bytes=max_bytes)
 
     def _estimate_event_logs_size_bytes(self, cursor_obj: sqlite3.Cursor) -> int:
+        # 由各分区插入/删除触发器增量维护，O(分区数) 读取
         cursor_obj.execute(
-            '''
-            SELECT COALESCE(SUM(
-                LENGTH(COALESCE(created_at, '')) +
-                LENGTH(COALESCE(source, '')) +
-                LENGTH(COALESCE(action, '')) +
-                LENGTH(COALESCE(event, '')) +
-                LENGTH(COALESCE(phase, '')) +
-                LENGTH(COALESCE(status, '')) +
-                LENGTH(COALESCE(level, '')) +
-                LENGTH(COALESCE(message, '')) +
-                LENGTH(COALESCE(trace_id, '')) +
-                LENGTH(COALESCE(request_id, '')) +
-                LENGTH(COALESCE(method, '')) +
-                LENGTH(COALESCE(path, '')) +
-                LENGTH(COALESCE(query_text, '')) +
-                LENGTH(COALESCE(CAST(status_code AS TEXT), '')) +
-                LENGTH(COALESCE(CAST(duration_ms AS TEXT), '')) +
-                LENGTH(COALESCE(CAST(is_slow AS TEXT), '')) +
-                LENGTH(COALESCE(CAST(operator_user_id AS TEXT), '')) +
-                LENGTH(COALESCE(operator_username, '')) +
-                LENGTH(COALESCE(ip, '')) +
-                LENGTH(COALESCE(user_agent, '')) +
-                LENGTH(COALESCE(resource_type, '')) +
-                LENGTH(COALESCE(resource_id, '')) +
-                LENGTH(COALESCE(error_type, '')) +
-                LENGTH(COALESCE(CAST(error_code AS TEXT), '')) +
-                LENGTH(COALESCE(metadata_json, '')) +
-                64
-            ), 0) AS approx_size
-            FROM event_logs
-            '''
+            "SELECT COALESCE(SUM(approx_bytes), 0) AS approx_bytes FROM table_size_stats WHERE table_name GLOB ?",
+            (f"{EVENT_LOG_PARTITION_PREFIX}*",),
         )
         row = cursor_obj.fetchone()
-        return int(row["approx_size"] or 0) if row else 0
-
-    def _cleanup_event_logs_by_size(self, cursor_obj: sqlite3.Cursor, max_bytes: int) -> int:
-        if max_bytes <= 0:
-            return 0
-
-        deleted = 0
-        estimated_size = self._estimate_event_logs_size_bytes(cursor_obj)
-        if estimated_size <= max_bytes:
-            return 0
+        return int(row["approx_bytes"] or 0) if row else 0
 
-        # 按最老数据批量裁剪，避免在高频写入下逐行删除。
-        batch_size = 500
-        while estimated_size > max_bytes:
-            cursor_obj.execute(
-                '''
-                DELETE FROM event_logs
-                WHERE id IN (
-                    SELECT id FROM event_logs
-                    ORDER BY id ASC
-                    LIMIT ?
-                )
-                ''',
-                (batch_size,),
-            )
-            step_deleted = int(cursor_obj.rowcount or 0)
-            if step_deleted <= 0:
-                break
-            deleted += step_deleted
+    def _event_log_partition_bytes(self, cursor_obj: sqlite3.Cursor, table: str) -> int:
+        cursor_obj.execute("SELECT approx_bytes FROM table_size_stats WHERE table_name = ?", (table,))
+        row = cursor_obj.fetchone()
+        return int(row["approx_bytes"] or 0) if row else 0
+
+    @staticmethod
+    def _event_log_cleanup_where(step: Dict[str, Any], max_id: Optional[int] = None) -> Tuple[str, List[Any]]:
+        """清理步骤的删除条件：多个条件取 OR，再用快照里的 max_id 封顶，之后写入的行不受影响。"""
+        clauses = [f"({' OR '.join(step['conditions'])})"] if step["conditions"] else []
+        params = list(step["params"])
+        if max_id is not None:
+            clauses.append("id <= ?")
+            params.append(int(max_id))
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def _plan_event_log_cleanup(
+        self,
+        cursor_obj: sqlite3.Cursor,
+        retention_days: int,
+        max_bytes: int,
+    ) -> List[Dict[str, Any]]:
+        """在读快照里规划清理：每个分区至多一个步骤，整天过期的 DROP，其余按条件删除。"""
+        steps: Dict[str, Dict[str, Any]] = {}
+        partitions = self._list_event_log_partitions(cursor_obj)
+        if retention_days > 0:
+            # 早于截止日的整天分区直接 DROP，截止日当天的分区内再按时间删除
+            cutoff = datetime.now() - timedelta(days=int(retention_days))
+            cutoff_day = cutoff.strftime("%Y-%m-%d")
+            cutoff_str = cutoff.strftime("%Y-%m-%d %H:%M:%S")
+            for table in partitions:
+                day = self._event_log_partition_day_of(table)
+                if day < cutoff_day:
+                    steps[table] = {
+                        "table": table,
+                        "drop": True,
+                        "conditions": [],
+                        "params": [],
+                        "bytes": self._event_log_partition_bytes(cursor_obj, table),
+                    }
+                elif day == cutoff_day:
+                    cursor_obj.execute(
+                        f"SELECT COALESCE(SUM(approx_bytes), 0) AS freed FROM {table} WHERE created_at < ?",
+                        (cutoff_str,),
+                    )
+                    steps[table] = {
+                        "table": table,
+                        "drop": False,
+                        "conditions": ["created_at < ?"],
+                        "params": [cutoff_str],
+                        "bytes": int(cursor_obj.fetchone()["freed"] or 0),
+                    }
+
+        if max_bytes > 0:
             estimated_size = self._estimate_event_logs_size_bytes(cursor_obj)
-        return deleted
+            excess = estimated_size - sum(step["bytes"] for step in steps.values()) - max_bytes
+            # 从最老的分区开始：整天都要删的直接 DROP，其余在边界分区内按 id 累加定位删除上界。
+            remaining = [table for table in partitions if not steps.get(table, {}).get("drop")]
+            for index, table in enumerate(remaining):
+                if excess <= 0:
+                    break
+                existing = steps.get(table)
+                table_bytes = self._event_log_partition_bytes(cursor_obj, table) - (existing["bytes"] if existing else 0)
+                if table_bytes <= excess and index < len(remaining) - 1:
+                    steps[table] = {"table": table, "drop": True, "conditions": [], "params": [], "bytes": table_bytes}
+                    excess -= table_bytes
+                    continue
+
+                cutoff_id = None
+                freed = 0
+                if existing:
+                    # 按时间已要删除的行不重复计入
+                    cursor_obj.execute(
+                        f"SELECT id, approx_bytes FROM {table} WHERE NOT ({' OR '.join(existing['conditions'])}) "
+                        "ORDER BY id ASC",
+                        existing["params"],
+                    )
+                else:
+                    cursor_obj.execute(f"SELECT id, approx_bytes FROM {table} ORDER BY id ASC")
+                while freed < excess:
+                    rows = cursor_obj.fetchmany(1000)
+                    if not rows:
+                        break
+                    for item in rows:
+                        freed += int(item["approx_bytes"] or 0)
+                        cutoff_id = int(item["id"])
+                        if freed >= excess:
+                            break
+                if cutoff_id is not None:
+                    step = existing or steps.setdefault(
+                        table,
+                        {"table": table, "drop": False, "conditions": [], "params": [], "bytes": 0},
+                    )
+                    step["conditions"].append("id <= ?")
+                    step["params"].append(cutoff_id)
+                    step["bytes"] += freed
+                excess -= freed
+        return list(steps.values())
 
     def cleanup_event_logs(self, retention_days: int, max_bytes: int = 0) -> int:
         if retention_days <= 0 and max_bytes <= 0:
             return 0
 
+        self.flush_event_logs()
         conn = self._get_conn()
         cursor_obj = conn.cursor()
         deleted = 0
-        if retention_days > 0:
-            cutoff = datetime.now() - timedelta(days=int(retention_days))
-            cutoff_str = cutoff.strftime("%Y-%m-%d %H:%M:%S")
-            cursor_obj.execute('DELETE FROM event_logs WHERE created_at < ?', (cutoff_str,))
-            deleted += int(cursor_obj.rowcount or 0)
-
-        deleted += self._cleanup_event_logs_by_size(cursor_obj, int(max_bytes or 0))
-        if deleted > 0:
+        segments: List[Dict[str, Any]] = []
+        try:
+            # 第一阶段：读快照里规划并写出冷归档段，不持有写锁，心跳/领取/日志写入不受影响
+            cursor_obj.execute("BEGIN")
+            steps = self._plan_event_log_cleanup(cursor_obj, int(retention_days), int(max_bytes or 0))
+            for step in steps:
+                where, params = self._event_log_cleanup_where(step)
+                cursor_obj.execute(f"SELECT COALESCE(MAX(id), 0) AS max_id FROM {step['table']} {where}", params)
+                step["max_id"] = int(cursor_obj.fetchone()["max_id"] or 0)
+                if step["max_id"] <= 0:
+                    continue
+                where, params = self._event_log_cleanup_where(step, step["max_id"])
+                step["segment"] = self._write_event_log_archive_segment(conn, step["table"], where, params)
+                if step["segment"]:
+                    segments.append(step["segment"])
+            conn.rollback()
+            steps = [step for step in steps if step["drop"] or step["max_id"] > 0]
+            if not steps:
+                return 0
+
+            # 第二阶段：短写事务只登记段索引，并按快照里的 max_id 删除 / DROP
+            cursor_obj.execute("BEGIN IMMEDIATE")
+            partitions_before = self._list_event_log_partitions(cursor_obj)
+            for step in steps:
+                table = step["table"]
+                if table not in partitions_before:
+                    if step.get("segment"):
+                        os.remove(step["segment"]["path"])
+                        segments.remove(step["segment"])
+                    continue
+                if step.get("segment"):
+                    self._register_event_log_archive_segment(cursor_obj, step["segment"])
+                if step["drop"]:
+                    cursor_obj.execute(f"SELECT 1 FROM {table} WHERE id > ? LIMIT 1", (step["max_id"],))
+                    if cursor_obj.fetchone() is None:
+                        deleted += self._drop_event_log_partition(cursor_obj, table)
+                        continue
+                where, params = self._event_log_cleanup_where(step, step["max_id"])
+                cursor_obj.execute(f"DELETE FROM {table} {where}", params)
+                deleted += int(cursor_obj.rowcount or 0)
+            if self._list_event_log_partitions(cursor_obj) != partitions_before:
+                self._refresh_event_logs_view(cursor_obj)
+            if deleted > 0:
+                cursor_obj.execute("DELETE FROM event_log_rollups_minute WHERE total_count <= 0")
             conn.commit()
-        conn.close()
+        except Exception:
+            conn.rollback()
+            # 索引未登记或已随事务回滚，已写出的段文件一并删除，下次清理会重新归档
+            for segment in segments:
+                try:
+                    os.remove(segment["path"])
+                except OSError:
+                    pass
+            raise
+        finally:
+            conn.close()
         return deleted
 
-    def create_sora_job_event(self, job_id: int, phase: str, event: str, message: Optional[str] = None) -> int:
+    def create_sora_job_event(self, job_id: int, phase: str, event: str, message: Optional[str] = None) -> bool:
         row = self.get_sora_job(int(job_id)) or {}
         level = "ERROR" if str(event or "").strip().lower() == "fail" else "INFO"
         metadata = {
@@ -559,7 +1112,7 @@ class SQLiteLogsRepo:
             "prompt": row.get("prompt"),
             "job_status": row.get("status"),
         }
-        return self.create_event_log(
+        return self.enqueue_event_log(
             source="task",
             action=f"sora.job.{str(event or '').strip().lower()}",
             event=str(event),
@@ -850,6 +1403,7 @@ class SQLiteLogsRepo:
         status: Optional[str] = None,
         limit: int = 200,
     ) -> List[Dict[str, Any]]:
+        self.flush_event_logs()
         conn = self._get_conn()
         cursor = conn.cursor()
         conditions = []
@@ -930,7 +1484,7 @@ class SQLiteLogsRepo:
         conn.close()
         return self.get_watermark_free_config()
 
-    def create_audit_log(
+    def _build_audit_event_kwargs(
         self,
         category: str,
         action: str,
@@ -948,7 +1502,7 @@ class SQLiteLogsRepo:
         operator_user_id: Optional[int] = None,
         operator_username: Optional[str] = None,
         extra: Optional[Dict[str, Any]] = None,
-    ) -> int:
+    ) -> Dict[str, Any]:
         try:
             from app.core.config import settings
         except Exception:
@@ -981,7 +1535,7 @@ class SQLiteLogsRepo:
                 threshold = int(getattr(settings, "api_slow_threshold_ms", 2000) or 2000)
             is_slow = int(duration_ms) >= int(threshold)
 
-        return self.create_event_log(
+        return dict(
             source=source,
             action=str(action),
             status=status,
@@ -1005,7 +1559,89 @@ class SQLiteLogsRepo:
             metadata=metadata,
         )
 
+    def create_audit_log(
+        self,
+        category: str,
+        action: str,
+        status: Optional[str] = None,
+        level: Optional[str] = None,
+        message: Optional[str] = None,
+        method: Optional[str] = None,
+        path: Optional[str] = None,
+        status_code: Optional[int] = None,
+        duration_ms: Optional[int] = None,
+        ip: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        operator_user_id: Optional[int] = None,
+        operator_username: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        return self.create_event_log(
+            **self._build_audit_event_kwargs(
+                category,
+                action,
+                status=status,
+                level=level,
+                message=message,
+                method=method,
+                path=path,
+                status_code=status_code,
+                duration_ms=duration_ms,
+                ip=ip,
+                user_agent=user_agent,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                operator_user_id=operator_user_id,
+                operator_username=operator_username,
+                extra=extra,
+            )
+        )
+
+    def enqueue_audit_log(
+        self,
+        category: str,
+        action: str,
+        status: Optional[str] = None,
+        level: Optional[str] = None,
+        message: Optional[str] = None,
+        method: Optional[str] = None,
+        path: Optional[str] = None,
+        status_code: Optional[int] = None,
+        duration_ms: Optional[int] = None,
+        ip: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        operator_user_id: Optional[int] = None,
+        operator_username: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        return self.enqueue_event_log(
+            **self._build_audit_event_kwargs(
+                category,
+                action,
+                status=status,
+                level=level,
+                message=message,
+                method=method,
+                path=path,
+                status_code=status_code,
+                duration_ms=duration_ms,
+                ip=ip,
+                user_agent=user_agent,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                operator_user_id=operator_user_id,
+                operator_username=operator_username,
+                extra=extra,
+            )
+        )
+
     def _maybe_cleanup_audit_logs(self) -> None:
+        if not self._background_maintenance_enabled:
+            return
         try:
             from app.core.config import settings
         except Exception:
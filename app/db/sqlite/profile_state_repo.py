@@ -0,0 +1,380 @@
+"""ixbrowser_profile_state：每个 (分组, 窗口) 一行的“最新账号状态”物化表。
+
+说明：
+- 每写入一条扫描结果（完整扫描或“实时使用”配额）就在同一事务内合并更新对应行，
+  读取端只需按 (group_title, profile_id) 点查或按分组范围读取，不再 GROUP BY MAX(run_id)。
+- 行内按来源分槽保存：
+  - `scan_*`：最新一次完整扫描（非实时）的结果；
+  - `realtime_*`：最新一次实时配额；
+  - `good_*` / `prev_good_*`：run_id 最大与次大的“有效结果”（成功且带账号/套餐/配额信息），
+    用于“取某个 run 之前的最近有效结果”做回填；
+  - `session_*`：最近一次带 session 的结果（静默更新复用）。
+- 物化行保留旧 run 被裁剪前的信息；`check_ixbrowser_profile_state()` 以结果表重放比对，
+  `rebuild_ixbrowser_profile_state()` 全量重建。
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+IXBROWSER_REALTIME_OPERATOR = "实时使用"
+
+_SCAN_FIELDS = (
+    "session_status",
+    "account",
+    "account_plan",
+    "quota_remaining_count",
+    "quota_total_count",
+    "quota_reset_at",
+    "quota_source",
+    "quota_error",
+    "success",
+)
+_REALTIME_FIELDS = (
+    "quota_remaining_count",
+    "quota_total_count",
+    "quota_reset_at",
+    "quota_source",
+    "quota_error",
+    "quota_payload_blob_hash",
+)
+_GOOD_FIELDS = (
+    "account",
+    "account_plan",
+    "quota_remaining_count",
+    "quota_total_count",
+    "quota_reset_at",
+    "session_blob_hash",
+)
+_SESSION_FIELDS = ("session_blob_hash", "session_raw_blob_hash")
+
+_COLUMN_TYPES = {
+    "session_status": "INTEGER",
+    "quota_remaining_count": "INTEGER",
+    "quota_total_count": "INTEGER",
+    "success": "INTEGER",
+}
+
+# 槽位：(前缀, 字段, 该槽 run_id 列, 时间列)
+_SLOTS = (
+    ("scan_", _SCAN_FIELDS, "scan_run_id", "scan_scanned_at"),
+    ("realtime_", _REALTIME_FIELDS, "realtime_run_id", "realtime_scanned_at"),
+    ("good_", _GOOD_FIELDS, "good_run_id", "good_run_scanned_at"),
+    ("prev_good_", _GOOD_FIELDS, "prev_good_run_id", "prev_good_run_scanned_at"),
+    ("session_", _SESSION_FIELDS, "session_run_id", "session_scanned_at"),
+)
+
+STATE_COLUMNS = ("group_id", "window_name") + tuple(
+    column
+    for prefix, fields, run_column, time_column in _SLOTS
+    for column in (run_column, time_column) + tuple(
+        field if prefix == "session_" else f"{prefix}{field}" for field in fields
+    )
+)
+_BLOB_COLUMNS = (
+    "realtime_quota_payload_blob_hash",
+    "good_session_blob_hash",
+    "prev_good_session_blob_hash",
+    "session_blob_hash",
+    "session_raw_blob_hash",
+)
+
+
+def _slot_column(prefix: str, field: str) -> str:
+    return field if prefix == "session_" else f"{prefix}{field}"
+
+
+def _is_good_result(row: Dict[str, Any]) -> bool:
+    if not int(row.get("success") or 0):
+        return False
+    for key in ("account", "account_plan", "quota_reset_at"):
+        value = row.get(key)
+        if isinstance(value, str) and value.strip():
+            return True
+    return row.get("quota_remaining_count") is not None
+
+
+def merge_ixbrowser_profile_state(
+    state: Optional[Dict[str, Any]],
+    run: Dict[str, Any],
+    row: Dict[str, Any],
+) -> Dict[str, Any]:
+    """把一条扫描结果合并进物化行（纯函数，写入与一致性校验共用）。"""
+    merged: Dict[str, Any] = {column: None for column in STATE_COLUMNS}
+    if state:
+        merged.update({column: state.get(column) for column in STATE_COLUMNS})
+    run_id = int(row.get("run_id") or run.get("id") or 0)
+    merged["group_id"] = int(row.get("group_id") or merged.get("group_id") or 0)
+    if row.get("window_name"):
+        merged["window_name"] = row.get("window_name")
+
+    def _assign(prefix: str, fields: Sequence[str], run_column: str, time_column: str, scanned_at: Any) -> None:
+        merged[run_column] = run_id
+        merged[time_column] = scanned_at
+        for field in fields:
+            merged[_slot_column(prefix, field)] = row.get(field)
+
+    def _copy(src: str, dst: str) -> None:
+        for field in ("run_id", "run_scanned_at") + _GOOD_FIELDS:
+            merged[f"{dst}{field}"] = merged.get(f"{src}{field}")
+
+    def _clear(prefix: str) -> None:
+        for field in ("run_id", "run_scanned_at") + _GOOD_FIELDS:
+            merged[f"{prefix}{field}"] = None
+
+    if str(run.get("operator_username") or "") == IXBROWSER_REALTIME_OPERATOR:
+        if run_id >= int(merged.get("realtime_run_id") or 0):
+            _assign("realtime_", _REALTIME_FIELDS, "realtime_run_id", "realtime_scanned_at", row.get("scanned_at"))
+    elif run_id >= int(merged.get("scan_run_id") or 0):
+        _assign("scan_", _SCAN_FIELDS, "scan_run_id", "scan_scanned_at", row.get("scanned_at"))
+
+    good_run_id = int(merged.get("good_run_id") or 0)
+    prev_run_id = int(merged.get("prev_good_run_id") or 0)
+    run_scanned_at = run.get("scanned_at")
+    if _is_good_result(row):
+        if run_id > good_run_id:
+            if good_run_id:
+                _copy("good_", "prev_good_")
+            _assign("good_", _GOOD_FIELDS, "good_run_id", "good_run_scanned_at", run_scanned_at)
+        elif run_id == good_run_id:
+            _assign("good_", _GOOD_FIELDS, "good_run_id", "good_run_scanned_at", run_scanned_at)
+        elif run_id >= prev_run_id:
+            _assign("prev_good_", _GOOD_FIELDS, "prev_good_run_id", "prev_good_run_scanned_at", run_scanned_at)
+    elif run_id == good_run_id:
+        # 原有效结果被覆盖为无效：次优顶上，次优本身未知（读取端回退原表）
+        _copy("prev_good_", "good_")
+        _clear("prev_good_")
+    elif run_id == prev_run_id:
+        _clear("prev_good_")
+
+    if row.get("session_blob_hash") and run_id >= int(merged.get("session_run_id") or 0):
+        _assign("session_", _SESSION_FIELDS, "session_run_id", "session_scanned_at", row.get("scanned_at"))
+    return merged
+
+
+class SQLiteProfileStateRepo:
+    def _ensure_ixbrowser_profile_state(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ixbrowser_profile_state'")
+        created = cursor.fetchone() is None
+        column_defs = []
+        for column in STATE_COLUMNS:
+            field = column
+            for prefix in ("prev_good_", "good_", "realtime_", "scan_"):
+                if column.startswith(prefix):
+                    field = column[len(prefix):]
+                    break
+            column_type = "INTEGER" if column.endswith("run_id") or column == "group_id" else _COLUMN_TYPES.get(field, "TEXT")
+            column_defs.append(f"{column} {column_type}")
+        cursor.execute(
+            f'''
+            CREATE TABLE IF NOT EXISTS ixbrowser_profile_state (
+                group_title TEXT NOT NULL,
+                profile_id INTEGER NOT NULL,
+                {", ".join(column_defs)},
+                updated_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (group_title, profile_id)
+            )
+            '''
+        )
+        self._create_scan_blob_ref_triggers(
+            cursor,
+            "ixbrowser_profile_state",
+            _BLOB_COLUMNS,
+            trigger_prefix="trg_ix_profile_state_blob",
+        )
+        if created:
+            self._rebuild_ixbrowser_profile_state(cursor)
+
+    def _load_ixbrowser_profile_state_row(
+        self,
+        cursor: sqlite3.Cursor,
+        group_title: str,
+        profile_id: int,
+    ) -> Optional[Dict[str, Any]]:
+        cursor.execute(
+            "SELECT * FROM ixbrowser_profile_state WHERE group_title = ? AND profile_id = ?",
+            (str(group_title or ""), int(profile_id)),
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def _write_ixbrowser_profile_state(
+        self,
+        cursor: sqlite3.Cursor,
+        group_title: str,
+        profile_id: int,
+        state: Dict[str, Any],
+    ) -> None:
+        columns = ("group_title", "profile_id") + STATE_COLUMNS + ("updated_at",)
+        values = [str(group_title or ""), int(profile_id)] + [state.get(column) for column in STATE_COLUMNS]
+        values.append(self._now_str())
+        updates = ", ".join(f"{column} = excluded.{column}" for column in STATE_COLUMNS + ("updated_at",))
+        cursor.execute(
+            f'''
+            INSERT INTO ixbrowser_profile_state ({", ".join(columns)})
+            VALUES ({", ".join(["?"] * len(columns))})
+            ON CONFLICT(group_title, profile_id) DO UPDATE SET {updates}
+            ''',
+            values,
+        )
+
+    def _record_ixbrowser_profile_state(self, cursor: sqlite3.Cursor, result_id: int) -> None:
+        """扫描结果写入后调用：按结果行（含 run 信息）合并更新物化行。"""
+        cursor.execute(
+            '''
+            SELECT r.*, runs.operator_username AS run_operator_username, runs.scanned_at AS run_scanned_at
+            FROM ixbrowser_scan_results r
+            JOIN ixbrowser_scan_runs runs ON runs.id = r.run_id
+            WHERE r.id = ?
+            ''',
+            (int(result_id),),
+        )
+        row = cursor.fetchone()
+        if not row:
+            return
+        data = dict(row)
+        run = {
+            "id": data["run_id"],
+            "operator_username": data.get("run_operator_username"),
+            "scanned_at": data.get("run_scanned_at"),
+        }
+        state = self._load_ixbrowser_profile_state_row(cursor, data["group_title"], data["profile_id"])
+        merged = merge_ixbrowser_profile_state(state, run, data)
+        self._write_ixbrowser_profile_state(cursor, data["group_title"], data["profile_id"], merged)
+
+    def _replay_ixbrowser_profile_state(
+        self,
+        cursor: sqlite3.Cursor,
+        group_title: Optional[str] = None,
+    ) -> Dict[tuple, Dict[str, Any]]:
+        """按 run_id/id 顺序重放结果表，返回 {(group_title, profile_id): 物化行}。"""
+        params: List[Any] = []
+        where = ""
+        if group_title:
+            where = "WHERE r.group_title = ?"
+            params.append(str(group_title))
+        cursor.execute(
+            f'''
+            SELECT r.*, runs.operator_username AS run_operator_username, runs.scanned_at AS run_scanned_at
+            FROM ixbrowser_scan_results r
+            JOIN ixbrowser_scan_runs runs ON runs.id = r.run_id
+            {where}
+            ORDER BY r.run_id ASC, r.id ASC
+            ''',
+            params,
+        )
+        states: Dict[tuple, Dict[str, Any]] = {}
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for row in rows:
+                data = dict(row)
+                run = {
+                    "id": data["run_id"],
+                    "operator_username": data.get("run_operator_username"),
+                    "scanned_at": data.get("run_scanned_at"),
+                }
+                key = (str(data["group_title"]), int(data["profile_id"]))
+                states[key] = merge_ixbrowser_profile_state(states.get(key), run, data)
+        return states
+
+    def _rebuild_ixbrowser_profile_state(self, cursor: sqlite3.Cursor, group_title: Optional[str] = None) -> int:
+        states = self._replay_ixbrowser_profile_state(cursor, group_title)
+        if group_title:
+            cursor.execute("DELETE FROM ixbrowser_profile_state WHERE group_title = ?", (str(group_title),))
+        else:
+            cursor.execute("DELETE FROM ixbrowser_profile_state")
+        for (title, profile_id), state in states.items():
+            self._write_ixbrowser_profile_state(cursor, title, profile_id, state)
+        return len(states)
+
+    def rebuild_ixbrowser_profile_state(self, group_title: Optional[str] = None) -> int:
+        """按现存扫描结果全量重建物化表（已被裁剪的历史会丢失），返回重建行数。"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            count = self._rebuild_ixbrowser_profile_state(cursor, group_title)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return count
+
+    def check_ixbrowser_profile_state(self, group_title: Optional[str] = None) -> Dict[str, Any]:
+        """以结果表重放结果比对物化表。
+
+        只比对重放能确定的槽位：重放得到的 run_id 不小于物化行时要求完全一致；
+        物化行更新（对应 run 已被裁剪）视为正常。
+        """
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        expected = self._replay_ixbrowser_profile_state(cursor, group_title)
+        if group_title:
+            cursor.execute("SELECT * FROM ixbrowser_profile_state WHERE group_title = ?", (str(group_title),))
+        else:
+            cursor.execute("SELECT * FROM ixbrowser_profile_state")
+        actual = {(str(row["group_title"]), int(row["profile_id"])): dict(row) for row in cursor.fetchall()}
+        conn.close()
+
+        missing: List[Dict[str, Any]] = []
+        mismatched: List[Dict[str, Any]] = []
+        for key, state in expected.items():
+            current = actual.get(key)
+            if current is None:
+                missing.append({"group_title": key[0], "profile_id": key[1]})
+                continue
+            for prefix, fields, run_column, time_column in _SLOTS:
+                if prefix == "prev_good_":
+                    continue
+                expected_run = int(state.get(run_column) or 0)
+                if not expected_run or int(current.get(run_column) or 0) > expected_run:
+                    continue
+                columns = (run_column, time_column) + tuple(_slot_column(prefix, field) for field in fields)
+                diff = [column for column in columns if state.get(column) != current.get(column)]
+                if diff:
+                    mismatched.append({"group_title": key[0], "profile_id": key[1], "columns": diff})
+        return {
+            "checked": len(expected),
+            "state_rows": len(actual),
+            "missing": missing,
+            "mismatched": mismatched,
+            "ok": not missing and not mismatched,
+        }
+
+    def list_ixbrowser_profile_states(self, group_title: str) -> List[Dict[str, Any]]:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM ixbrowser_profile_state WHERE group_title = ? ORDER BY profile_id DESC",
+            (str(group_title or ""),),
+        )
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        for row in rows:
+            for column in _BLOB_COLUMNS:
+                row.pop(column, None)
+        return rows
+
+    def get_ixbrowser_profile_state(self, group_title: str, profile_id: int) -> Optional[Dict[str, Any]]:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        row = self._load_ixbrowser_profile_state_row(cursor, group_title, profile_id)
+        if row:
+            self._resolve_scan_blob_columns(
+                cursor,
+                [row],
+                (
+                    ("realtime_quota_payload_blob_hash", "realtime_quota_payload_json", True),
+                    ("good_session_blob_hash", "good_session_json", True),
+                    ("prev_good_session_blob_hash", "prev_good_session_json", True),
+                    ("session_blob_hash", "session_json", True),
+                    ("session_raw_blob_hash", "session_raw", False),
+                ),
+            )
+        conn.close()
+        return row
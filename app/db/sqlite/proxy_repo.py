@@ -1,13 +1,155 @@
-"""proxies 表与相关事件操作。"""
+"""proxies 表与相关事件操作。
+
+说明：
+- `proxy_cf_events` 只追加；每个代理（未知代理记为 proxy_key=0）在 `proxy_cf_counters` 中维护一个
+  固定 `PROXY_CF_WINDOW` 槽位的环形缓冲（slots 字符串：'1' 命中 CF、'0' 未命中、'-' 空槽）
+  及滚动 `cf_count` / `total_count`，由插入触发器 O(1) 更新。
+- 代理列表直接读计数行；事件表按代理保留最近 N 条的裁剪改为按间隔批量执行。
+"""
 
 from __future__ import annotations
 
 import json
+import sqlite3
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+PROXY_CF_WINDOW = 30
+# 明细裁剪由 leader 的维护循环定时执行，不在写入路径上
+PROXY_CF_TRIM_INTERVAL_SEC = 600
+PROXY_CF_KEEP_PER_PROXY = 300
+_PROXY_CF_EMPTY_SLOT = "-"
+
+
+def _proxy_cf_stat_from_counter(row: Any, window: int) -> Dict[str, Any]:
+    """从环形缓冲行计算最近 window 条的统计；window 等于槽位数时直接取滚动计数。"""
+    if window >= PROXY_CF_WINDOW:
+        cf_count = int(row["cf_count"] or 0)
+        total_count = int(row["total_count"] or 0)
+    else:
+        slots = str(row["slots"] or "")
+        head = int(row["head"] or 0)
+        recent = [slots[(head - offset) % len(slots)] for offset in range(1, window + 1)] if slots else []
+        cf_count = sum(1 for slot in recent if slot == "1")
+        total_count = sum(1 for slot in recent if slot != _PROXY_CF_EMPTY_SLOT)
+    ratio = round((cf_count / total_count) * 100, 1) if total_count > 0 else 0.0
+    return {
+        "cf_recent_count": cf_count,
+        "cf_recent_total": total_count,
+        "cf_recent_ratio": float(ratio),
+    }
+
 
 class SQLiteProxyRepo:
+    def _ensure_proxy_cf_counters(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS proxy_cf_counters (
+                proxy_key INTEGER PRIMARY KEY,
+                head INTEGER NOT NULL DEFAULT 0,
+                slots TEXT NOT NULL,
+                cf_count INTEGER NOT NULL DEFAULT 0,
+                total_count INTEGER NOT NULL DEFAULT 0,
+                last_event_id INTEGER,
+                updated_at TIMESTAMP NOT NULL
+            )
+            '''
+        )
+        # 槽位数写死在触发器里：每次启动重建触发器，槽位数变化时按事件表重建计数
+        cursor.execute("DROP TRIGGER IF EXISTS trg_proxy_cf_events_counter_ai")
+        cursor.execute(
+            f'''
+            CREATE TRIGGER trg_proxy_cf_events_counter_ai
+            AFTER INSERT ON proxy_cf_events
+            BEGIN
+                INSERT INTO proxy_cf_counters (
+                    proxy_key, head, slots, cf_count, total_count, last_event_id, updated_at
+                ) VALUES (
+                    COALESCE(NEW.proxy_id, 0),
+                    {1 % PROXY_CF_WINDOW},
+                    (CASE WHEN NEW.is_cf = 1 THEN '1' ELSE '0' END) || '{_PROXY_CF_EMPTY_SLOT * (PROXY_CF_WINDOW - 1)}',
+                    CASE WHEN NEW.is_cf = 1 THEN 1 ELSE 0 END,
+                    1,
+                    NEW.id,
+                    NEW.created_at
+                )
+                ON CONFLICT(proxy_key) DO UPDATE SET
+                    slots = substr(slots, 1, head) || excluded.cf_count || substr(slots, head + 2),
+                    cf_count = cf_count + excluded.cf_count - (substr(slots, head + 1, 1) = '1'),
+                    total_count = total_count + (substr(slots, head + 1, 1) = '{_PROXY_CF_EMPTY_SLOT}'),
+                    head = (head + 1) % {PROXY_CF_WINDOW},
+                    last_event_id = excluded.last_event_id,
+                    updated_at = excluded.updated_at;
+            END
+            '''
+        )
+        cursor.execute(
+            "SELECT 1 FROM proxy_cf_counters WHERE length(slots) != ? LIMIT 1",
+            (PROXY_CF_WINDOW,),
+        )
+        stale = cursor.fetchone() is not None
+        cursor.execute("SELECT 1 FROM proxy_cf_counters LIMIT 1")
+        empty = cursor.fetchone() is None
+        if stale or empty:
+            self._rebuild_proxy_cf_counters(cursor)
+
+    def _rebuild_proxy_cf_counters(self, cursor: sqlite3.Cursor) -> int:
+        """按事件表重放每个代理最近 PROXY_CF_WINDOW 条，重建环形缓冲。"""
+        cursor.execute("DELETE FROM proxy_cf_counters")
+        cursor.execute(
+            '''
+            SELECT proxy_key, id, is_cf, created_at
+            FROM (
+              SELECT
+                COALESCE(proxy_id, 0) AS proxy_key,
+                id,
+                is_cf,
+                created_at,
+                ROW_NUMBER() OVER (PARTITION BY COALESCE(proxy_id, 0) ORDER BY id DESC) AS rn
+              FROM proxy_cf_events
+            ) t
+            WHERE rn <= ?
+            ORDER BY proxy_key ASC, id ASC
+            ''',
+            (PROXY_CF_WINDOW,),
+        )
+        buffers: Dict[int, List[Any]] = {}
+        for row in cursor.fetchall():
+            key = int(row["proxy_key"] or 0)
+            buffers.setdefault(key, []).append(row)
+        for key, events in buffers.items():
+            slots = ["1" if int(event["is_cf"] or 0) == 1 else "0" for event in events]
+            cf_count = slots.count("1")
+            total_count = len(slots)
+            slots.extend([_PROXY_CF_EMPTY_SLOT] * (PROXY_CF_WINDOW - total_count))
+            cursor.execute(
+                '''
+                INSERT INTO proxy_cf_counters (
+                    proxy_key, head, slots, cf_count, total_count, last_event_id, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''',
+                (
+                    key,
+                    total_count % PROXY_CF_WINDOW,
+                    "".join(slots),
+                    cf_count,
+                    total_count,
+                    int(events[-1]["id"]),
+                    events[-1]["created_at"] or self._now_str(),
+                ),
+            )
+        return len(buffers)
+
+    def rebuild_proxy_cf_counters(self) -> int:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        try:
+            rebuilt = self._rebuild_proxy_cf_counters(cursor)
+            conn.commit()
+        finally:
+            conn.close()
+        return rebuilt
+
     def list_proxies(
         self,
         *,
@@ -290,7 +432,6 @@ class SQLiteProxyRepo:
         status_code: Optional[int],
         error_text: Optional[str],
         is_cf: bool,
-        keep_per_proxy: int = 300,
         created_at: Optional[str] = None,
     ) -> int:
         safe_proxy_id: Optional[int]
@@ -313,7 +454,6 @@ class SQLiteProxyRepo:
         except Exception:
             safe_status = None
 
-        safe_keep = max(int(keep_per_proxy or 0), 1)
         now = str(created_at or "").strip() or self._now_str()
 
         conn = self._get_conn()
@@ -336,43 +476,42 @@ class SQLiteProxyRepo:
             ),
         )
         event_id = int(cursor.lastrowid or 0)
+        conn.commit()
+        conn.close()
+        return event_id
 
-        if safe_proxy_id is None:
+    def trim_proxy_cf_events(self, keep_per_proxy: int = PROXY_CF_KEEP_PER_PROXY) -> int:
+        """每个代理（含未知代理）只保留最近 keep_per_proxy 条事件；计数表不受影响。"""
+        safe_keep = max(int(keep_per_proxy or 0), PROXY_CF_WINDOW)
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        try:
             cursor.execute(
                 '''
                 DELETE FROM proxy_cf_events
-                WHERE proxy_id IS NULL
-                  AND id NOT IN (
-                    SELECT id
+                WHERE id IN (
+                  SELECT id
+                  FROM (
+                    SELECT
+                      id,
+                      ROW_NUMBER() OVER (PARTITION BY COALESCE(proxy_id, 0) ORDER BY id DESC) AS rn
                     FROM proxy_cf_events
-                    WHERE proxy_id IS NULL
-                    ORDER BY id DESC
-                    LIMIT ?
-                  )
+                  ) t
+                  WHERE rn > ?
+                )
                 ''',
                 (safe_keep,),
             )
-        else:
+            deleted = int(cursor.rowcount or 0)
             cursor.execute(
-                '''
-                DELETE FROM proxy_cf_events
-                WHERE proxy_id = ?
-                  AND id NOT IN (
-                    SELECT id
-                    FROM proxy_cf_events
-                    WHERE proxy_id = ?
-                    ORDER BY id DESC
-                    LIMIT ?
-                  )
-                ''',
-                (safe_proxy_id, safe_proxy_id, safe_keep),
+                "DELETE FROM proxy_cf_counters WHERE proxy_key > 0 AND proxy_key NOT IN (SELECT id FROM proxies)"
             )
+            conn.commit()
+        finally:
+            conn.close()
+        return deleted
 
-        conn.commit()
-        conn.close()
-        return event_id
-
-    def get_proxy_cf_recent_stats(self, proxy_ids: List[int], window: int = 30) -> Dict[int, Dict[str, Any]]:
+    def get_proxy_cf_recent_stats(self, proxy_ids: List[int], window: int = PROXY_CF_WINDOW) -> Dict[int, Dict[str, Any]]:
         ids: List[int] = []
         seen = set()
         for raw in proxy_ids or []:
@@ -387,79 +526,28 @@ class SQLiteProxyRepo:
         if not ids:
             return {}
 
-        safe_window = min(max(int(window or 30), 1), 500)
+        safe_window = min(max(int(window or PROXY_CF_WINDOW), 1), PROXY_CF_WINDOW)
         placeholders = ",".join(["?"] * len(ids))
         conn = self._get_conn()
         cursor = conn.cursor()
         cursor.execute(
-            f'''
-            SELECT
-              proxy_id,
-              SUM(CASE WHEN is_cf = 1 THEN 1 ELSE 0 END) AS cf_count,
-              COUNT(*) AS total_count
-            FROM (
-              SELECT
-                proxy_id,
-                is_cf,
-                ROW_NUMBER() OVER (PARTITION BY proxy_id ORDER BY id DESC) AS rn
-              FROM proxy_cf_events
-              WHERE proxy_id IN ({placeholders})
-            ) t
-            WHERE rn <= ?
-            GROUP BY proxy_id
-            ''',
-            [*ids, safe_window],
+            f"SELECT * FROM proxy_cf_counters WHERE proxy_key IN ({placeholders})",
+            ids,
         )
         rows = cursor.fetchall()
         conn.close()
+        return {int(row["proxy_key"]): _proxy_cf_stat_from_counter(row, safe_window) for row in rows}
 
-        result: Dict[int, Dict[str, Any]] = {}
-        for row in rows:
-            try:
-                proxy_id = int(row["proxy_id"] or 0)
-            except Exception:
-                continue
-            if proxy_id <= 0:
-                continue
-            total_count = int(row["total_count"] or 0)
-            cf_count = int(row["cf_count"] or 0)
-            ratio = round((cf_count / total_count) * 100, 1) if total_count > 0 else 0.0
-            result[proxy_id] = {
-                "cf_recent_count": cf_count,
-                "cf_recent_total": total_count,
-                "cf_recent_ratio": float(ratio),
-            }
-        return result
-
-    def get_unknown_proxy_cf_recent_stats(self, window: int = 30) -> Dict[str, Any]:
-        safe_window = min(max(int(window or 30), 1), 500)
+    def get_unknown_proxy_cf_recent_stats(self, window: int = PROXY_CF_WINDOW) -> Dict[str, Any]:
+        safe_window = min(max(int(window or PROXY_CF_WINDOW), 1), PROXY_CF_WINDOW)
         conn = self._get_conn()
         cursor = conn.cursor()
-        cursor.execute(
-            '''
-            SELECT
-              SUM(CASE WHEN is_cf = 1 THEN 1 ELSE 0 END) AS cf_count,
-              COUNT(*) AS total_count
-            FROM (
-              SELECT is_cf
-              FROM proxy_cf_events
-              WHERE proxy_id IS NULL
-              ORDER BY id DESC
-              LIMIT ?
-            ) t
-            ''',
-            (safe_window,),
-        )
+        cursor.execute("SELECT * FROM proxy_cf_counters WHERE proxy_key = 0")
         row = cursor.fetchone()
         conn.close()
-        total_count = int(row["total_count"] or 0) if row else 0
-        cf_count = int(row["cf_count"] or 0) if row else 0
-        ratio = round((cf_count / total_count) * 100, 1) if total_count > 0 else 0.0
-        return {
-            "cf_recent_count": cf_count,
-            "cf_recent_total": total_count,
-            "cf_recent_ratio": float(ratio),
-        }
+        if not row:
+            return {"cf_recent_count": 0, "cf_recent_total": 0, "cf_recent_ratio": 0.0}
+        return _proxy_cf_stat_from_counter(row, safe_window)
 
     def upsert_proxies_from_batch_import(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
         created = 0
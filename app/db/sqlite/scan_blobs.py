@@ -0,0 +1,230 @@
+"""扫描结果大字段的内容寻址存储（scan_blobs）。
+
+说明：
+- `session_json` / `session_raw` / `quota_payload_json` 每次扫描几乎不变，改为按 sha256 去重、
+  zlib 压缩后存进 `scan_blobs`，`ixbrowser_scan_results` 只保存 `*_blob_hash` 引用。
+- 引用计数由 `ixbrowser_scan_results` 上的触发器维护：插入/更新/删除（含清理旧 run）自动增减，
+  计数归零的 blob 随即删除，业务代码只需写入 blob 与引用。
+- 读取端只对实际返回的行按 hash 批量取 blob，解压结果按 hash 缓存（内容不可变）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (blob hash 列, 旧内联列, 是否 JSON)
+SCAN_BLOB_FIELDS = (
+    ("session_blob_hash", "session_json", True),
+    ("session_raw_blob_hash", "session_raw", False),
+    ("quota_payload_blob_hash", "quota_payload_json", True),
+)
+
+_BLOB_CACHE_SIZE = 512
+
+
+class SQLiteScanBlobsMixin:
+    _scan_blob_cache: "OrderedDict[str, str]" = OrderedDict()
+    _scan_blob_cache_lock = threading.Lock()
+
+    def _ensure_scan_blobs_storage(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS scan_blobs (
+                hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                raw_size INTEGER NOT NULL DEFAULT 0,
+                ref_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP NOT NULL
+            ) WITHOUT ROWID
+            '''
+        )
+        cursor.execute("PRAGMA table_info(ixbrowser_scan_results)")
+        columns = {row["name"] for row in cursor.fetchall()}
+        for hash_column, _, _ in SCAN_BLOB_FIELDS:
+            if hash_column not in columns:
+                cursor.execute(f"ALTER TABLE ixbrowser_scan_results ADD COLUMN {hash_column} TEXT")
+
+        self._create_scan_blob_ref_triggers(
+            cursor,
+            "ixbrowser_scan_results",
+            [column for column, _, _ in SCAN_BLOB_FIELDS],
+            trigger_prefix="trg_ix_scan_results_blob",
+        )
+        self._migrate_inline_scan_blobs(cursor)
+
+    def _create_scan_blob_ref_triggers(
+        self,
+        cursor: sqlite3.Cursor,
+        table: str,
+        columns: Sequence[str],
+        *,
+        trigger_prefix: str,
+    ) -> None:
+        """为引用 scan_blobs 的表建立引用计数触发器（插入 +1、删除 -1、更新先加后减）。"""
+        incr = "\n".join(
+            f"UPDATE scan_blobs SET ref_count = ref_count + 1 WHERE hash = NEW.{column};" for column in columns
+        )
+        decr = "\n".join(
+            f"UPDATE scan_blobs SET ref_count = ref_count - 1 WHERE hash = OLD.{column};" for column in columns
+        )
+        old_hashes = ", ".join(f"OLD.{column}" for column in columns)
+        release = f"DELETE FROM scan_blobs WHERE hash IN ({old_hashes}) AND ref_count <= 0;"
+        cursor.execute(
+            f'''
+            CREATE TRIGGER IF NOT EXISTS {trigger_prefix}_ai
+            AFTER INSERT ON {table}
+            BEGIN
+                {incr}
+            END
+            '''
+        )
+        cursor.execute(
+            f'''
+            CREATE TRIGGER IF NOT EXISTS {trigger_prefix}_ad
+            AFTER DELETE ON {table}
+            BEGIN
+                {decr}
+                {release}
+            END
+            '''
+        )
+        cursor.execute(
+            f'''
+            CREATE TRIGGER IF NOT EXISTS {trigger_prefix}_au
+            AFTER UPDATE OF {", ".join(columns)} ON {table}
+            BEGIN
+                {incr}
+                {decr}
+                {release}
+            END
+            '''
+        )
+
+    def _migrate_inline_scan_blobs(self, cursor: sqlite3.Cursor) -> None:
+        """旧库：把内联在 ixbrowser_scan_results 中的大字段搬进 scan_blobs。"""
+        inline_filter = " OR ".join(f"{inline} IS NOT NULL" for _, inline, _ in SCAN_BLOB_FIELDS)
+        select_columns = ", ".join(inline for _, inline, _ in SCAN_BLOB_FIELDS)
+        assignments = ", ".join(
+            [f"{column} = ?" for column, _, _ in SCAN_BLOB_FIELDS]
+            + [f"{inline} = NULL" for _, inline, _ in SCAN_BLOB_FIELDS]
+        )
+        while True:
+            cursor.execute(
+                f"SELECT id, {select_columns} FROM ixbrowser_scan_results WHERE {inline_filter} LIMIT 500"
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for row in rows:
+                hashes = []
+                for _, inline, _ in SCAN_BLOB_FIELDS:
+                    value = row[inline]
+                    hashes.append(self._put_scan_blob(cursor, value if isinstance(value, str) and value.strip() else None))
+                cursor.execute(
+                    f"UPDATE ixbrowser_scan_results SET {assignments} WHERE id = ?",
+                    (*hashes, int(row["id"])),
+                )
+
+    def _put_scan_blob(self, cursor: sqlite3.Cursor, text: Optional[str]) -> Optional[str]:
+        """写入（或复用）一个 blob，返回其 hash；引用计数由结果表触发器负责。"""
+        if text is None:
+            return None
+        raw = str(text).encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        cursor.execute("SELECT 1 FROM scan_blobs WHERE hash = ?", (digest,))
+        if cursor.fetchone() is None:
+            cursor.execute(
+                "INSERT INTO scan_blobs (hash, data, raw_size, ref_count, created_at) VALUES (?, ?, ?, 0, ?)",
+                (digest, zlib.compress(raw, 6), len(raw), self._now_str()),
+            )
+        return digest
+
+    def _put_scan_result_blobs(
+        self,
+        cursor: sqlite3.Cursor,
+        item: Dict[str, Any],
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        session_json = item.get("session")
+        quota_payload = item.get("quota_payload")
+        session_raw = item.get("session_raw")
+        return (
+            self._put_scan_blob(
+                cursor,
+                json.dumps(session_json, ensure_ascii=False) if isinstance(session_json, dict) else None,
+            ),
+            self._put_scan_blob(cursor, session_raw if isinstance(session_raw, str) else None),
+            self._put_scan_blob(
+                cursor,
+                json.dumps(quota_payload, ensure_ascii=False) if isinstance(quota_payload, dict) else None,
+            ),
+        )
+
+    def _load_scan_blobs(self, cursor: sqlite3.Cursor, hashes: Iterable[Optional[str]]) -> Dict[str, str]:
+        wanted = {str(value) for value in hashes if value}
+        result: Dict[str, str] = {}
+        cache = self._scan_blob_cache
+        with self._scan_blob_cache_lock:
+            for digest in wanted:
+                if digest in cache:
+                    cache.move_to_end(digest)
+                    result[digest] = cache[digest]
+        missing = [digest for digest in wanted if digest not in result]
+        for offset in range(0, len(missing), 500):
+            chunk = missing[offset:offset + 500]
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor.execute(f"SELECT hash, data FROM scan_blobs WHERE hash IN ({placeholders})", chunk)
+            for row in cursor.fetchall():
+                try:
+                    text = zlib.decompress(row["data"]).decode("utf-8")
+                except Exception:  # noqa: BLE001
+                    continue
+                result[str(row["hash"])] = text
+                with self._scan_blob_cache_lock:
+                    cache[str(row["hash"])] = text
+                    cache.move_to_end(str(row["hash"]))
+                    while len(cache) > _BLOB_CACHE_SIZE:
+                        cache.popitem(last=False)
+        return result
+
+    def _resolve_scan_blobs(
+        self,
+        cursor: sqlite3.Cursor,
+        items: List[Dict[str, Any]],
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """把行里的 `*_blob_hash` 还原为原字段（JSON 字段解析为 dict）；fields 为需要还原的原字段名。"""
+        wanted_fields = set(fields) if fields is not None else {inline for _, inline, _ in SCAN_BLOB_FIELDS}
+        active = [field for field in SCAN_BLOB_FIELDS if field[1] in wanted_fields]
+        for item in items:
+            for column, inline, _ in SCAN_BLOB_FIELDS:
+                if inline not in wanted_fields:
+                    item.pop(column, None)
+        return self._resolve_scan_blob_columns(cursor, items, active)
+
+    def _resolve_scan_blob_columns(
+        self,
+        cursor: sqlite3.Cursor,
+        items: List[Dict[str, Any]],
+        fields: Sequence[Tuple[str, str, bool]],
+    ) -> List[Dict[str, Any]]:
+        """按 (hash 列, 输出键, 是否 JSON) 批量还原 blob；hash 为空时保留输出键上已有的值。"""
+        blobs = self._load_scan_blobs(cursor, (item.get(column) for item in items for column, _, _ in fields))
+        for item in items:
+            for column, key, is_json in fields:
+                digest = item.pop(column, None)
+                text = blobs.get(digest) if digest else item.get(key)
+                if is_json and isinstance(text, str):
+                    try:
+                        value = json.loads(text)
+                    except Exception:  # noqa: BLE001
+                        value = None
+                    item[key] = value if isinstance(value, dict) else None
+                else:
+                    item[key] = text
+        return items
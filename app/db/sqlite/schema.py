@@ -53,50 +53,7 @@ class SQLiteSchemaMixin:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs(action)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_logs_operator ON audit_logs(operator_user_id)')
 
-        cursor.execute(
-            '''
-            CREATE TABLE IF NOT EXISTS event_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                created_at TIMESTAMP NOT NULL,
-                source TEXT NOT NULL,
-                action TEXT NOT NULL,
-                event TEXT,
-                phase TEXT,
-                status TEXT,
-                level TEXT,
-                message TEXT,
-                trace_id TEXT,
-                request_id TEXT,
-                method TEXT,
-                path TEXT,
-                query_text TEXT,
-                status_code INTEGER,
-                duration_ms INTEGER,
-                is_slow INTEGER NOT NULL DEFAULT 0,
-                operator_user_id INTEGER,
-                operator_username TEXT,
-                ip TEXT,
-                user_agent TEXT,
-                resource_type TEXT,
-                resource_id TEXT,
-                error_type TEXT,
-                error_code INTEGER,
-                metadata_json TEXT
-            )
-            '''
-        )
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_created ON event_logs(created_at DESC)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_source_created ON event_logs(source, created_at DESC)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_status_created ON event_logs(status, created_at DESC)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_level_created ON event_logs(level, created_at DESC)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_operator_created ON event_logs(operator_username, created_at DESC)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_trace_id ON event_logs(trace_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_request_id ON event_logs(request_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_resource_created ON event_logs(resource_type, resource_id, created_at DESC)')
-        cursor.execute(
-            'CREATE INDEX IF NOT EXISTS idx_event_logs_task_fail_lookup '
-            'ON event_logs(source, resource_type, event, created_at DESC, resource_id)'
-        )
+        self._init_event_log_storage(cursor)
 
         cursor.execute(
             '''
@@ -129,6 +86,20 @@ class SQLiteSchemaMixin:
             '''
         )
 
+        # ixBrowser 窗口租约：多进程部署时按 profile 互斥，并以行数限制全局同时打开的窗口数
+        cursor.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS browser_window_leases (
+                profile_id INTEGER PRIMARY KEY,
+                owner TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                lease_until TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+            '''
+        )
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_browser_window_leases_owner ON browser_window_leases(owner)')
+
         cursor.execute(
             '''
             CREATE TABLE IF NOT EXISTS watermark_free_config (
@@ -231,6 +202,8 @@ class SQLiteSchemaMixin:
             cursor.execute(
                 "ALTER TABLE ixbrowser_scan_results ADD COLUMN real_ip TEXT"
             )
+        self._ensure_scan_blobs_storage(cursor)
+        self._ensure_ixbrowser_profile_state(cursor)
 
         cursor.execute(
             '''
@@ -282,6 +255,7 @@ class SQLiteSchemaMixin:
                 publish_permalink TEXT,
                 publish_error TEXT,
                 publish_attempts INTEGER NOT NULL DEFAULT 0,
+                publish_next_at TIMESTAMP,
                 published_at TIMESTAMP,
                 task_id TEXT,
                 task_url TEXT,
@@ -340,6 +314,10 @@ class SQLiteSchemaMixin:
             cursor.execute(
                 "ALTER TABLE ixbrowser_sora_generate_jobs ADD COLUMN generation_id TEXT"
             )
+        if "publish_next_at" not in columns:
+            cursor.execute(
+                "ALTER TABLE ixbrowser_sora_generate_jobs ADD COLUMN publish_next_at TIMESTAMP"
+            )
 
         cursor.execute(
             '''
@@ -483,7 +461,34 @@ class SQLiteSchemaMixin:
             cursor.execute(
                 "ALTER TABLE sora_jobs ADD COLUMN run_last_error TEXT"
             )
+        if "watermark_lease_owner" not in columns:
+            cursor.execute(
+                "ALTER TABLE sora_jobs ADD COLUMN watermark_lease_owner TEXT"
+            )
+        if "watermark_lease_until" not in columns:
+            cursor.execute(
+                "ALTER TABLE sora_jobs ADD COLUMN watermark_lease_until TIMESTAMP"
+            )
+        if "watermark_next_at" not in columns:
+            cursor.execute(
+                "ALTER TABLE sora_jobs ADD COLUMN watermark_next_at TIMESTAMP"
+            )
+        if "not_before" not in columns:
+            cursor.execute(
+                "ALTER TABLE sora_jobs ADD COLUMN not_before TIMESTAMP"
+            )
+        if "phase_retry_count" not in columns:
+            cursor.execute(
+                "ALTER TABLE sora_jobs ADD COLUMN phase_retry_count INTEGER DEFAULT 0"
+            )
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sora_jobs_status_lease ON sora_jobs(status, lease_until, id ASC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sora_jobs_status_not_before ON sora_jobs(status, not_before, id ASC)')
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_sora_jobs_profile_status_lease ON sora_jobs(profile_id, status, lease_until)'
+        )
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_sora_jobs_watermark_queue ON sora_jobs(watermark_status, watermark_next_at, id ASC)'
+        )
 
         cursor.execute(
             '''
@@ -643,6 +648,7 @@ class SQLiteSchemaMixin:
         )
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_proxy_cf_events_proxy_id_id ON proxy_cf_events(proxy_id, id DESC)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_proxy_cf_events_created ON proxy_cf_events(created_at DESC)')
+        self._ensure_proxy_cf_counters(cursor)
 
         cursor.execute("PRAGMA table_info(watermark_free_config)")
         wm_columns = {row["name"] for row in cursor.fetchall()}
@@ -680,4 +686,3 @@ class SQLiteSchemaMixin:
 
         conn.commit()
         conn.close()
-
@@ -3,8 +3,15 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+# UPDATE ... RETURNING 需要 SQLite >= 3.35
+_SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# 需要打开 ixBrowser 窗口的阶段（含尚未开始的 queue）
+_SORA_WINDOW_PHASES_SQL = "('queue', 'submit', 'genid', 'publish')"
 
 
 class SQLiteSoraRepo:
@@ -19,9 +26,9 @@ class SQLiteSoraRepo:
                 status, phase, progress_pct, task_id, generation_id, publish_url, publish_post_id, publish_permalink,
                 dispatch_mode, dispatch_score, dispatch_quantity_score, dispatch_quality_score, dispatch_reason,
                 retry_of_job_id, retry_root_job_id, retry_index,
-                error,
+                error, not_before,
                 started_at, finished_at, operator_user_id, operator_username, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''',
             (
                 int(data.get("profile_id") or 0),
@@ -48,6 +55,7 @@ class SQLiteSoraRepo:
                 data.get("retry_root_job_id"),
                 int(data.get("retry_index") or 0),
                 data.get("error"),
+                data.get("not_before"),
                 data.get("started_at"),
                 data.get("finished_at"),
                 data.get("operator_user_id"),
@@ -100,6 +108,9 @@ class SQLiteSoraRepo:
             "watermark_attempts",
             "watermark_started_at",
             "watermark_finished_at",
+            "watermark_next_at",
+            "not_before",
+            "phase_retry_count",
             "error",
             "started_at",
             "finished_at",
@@ -276,6 +287,7 @@ class SQLiteSoraRepo:
         return [dict(row) for row in rows]
 
     def list_sora_fail_events_since(self, group_title: str, since_at: str) -> List[Dict[str, Any]]:
+        self.flush_event_logs()
         conn = self._get_conn()
         cursor = conn.cursor()
         cursor.execute(
@@ -362,53 +374,267 @@ class SQLiteSoraRepo:
         return result
 
     def claim_next_sora_job(self, owner: str, lease_seconds: int = 120) -> Optional[Dict[str, Any]]:
+        claimed = self.claim_sora_jobs(owner, 1, lease_seconds=lease_seconds)
+        return claimed[0] if claimed else None
+
+    def claim_sora_jobs(self, owner: str, n: int = 1, lease_seconds: int = 120) -> List[Dict[str, Any]]:
+        """一次事务内按 id 顺序为至多 n 个排队任务加租约，返回领取到的任务行（按 id 升序）。
+
+        - `not_before` 未到的延后任务（等待账号配额释放）不可领取；
+        - 需要窗口的任务按 profile 亲和领取：该 profile 已有持租约、处于窗口阶段的任务时跳过，
+          同一批也只领每个 profile 最早的一条，让并发槽位总落在不同窗口上。
+          未分配账号（profile_id<=0）与进度阶段的任务不受限制。
+        """
         safe_owner = str(owner or "").strip() or "unknown"
         now = self._now_str()
         lease_until = (datetime.now() + timedelta(seconds=max(10, int(lease_seconds)))).strftime("%Y-%m-%d %H:%M:%S")
+        return self._claim_sora_job_rows(
+            n,
+            claimable=f'''
+                status = 'queued' AND (lease_until IS NULL OR lease_until < ?)
+                AND (not_before IS NULL OR not_before <= ?)
+                AND (
+                    profile_id <= 0
+                    OR phase NOT IN {_SORA_WINDOW_PHASES_SQL}
+                    OR NOT EXISTS (
+                        SELECT 1 FROM sora_jobs AS busy
+                        WHERE busy.profile_id = sora_jobs.profile_id
+                          AND busy.status IN ('queued', 'running')
+                          AND busy.lease_until >= ?
+                          AND busy.phase IN {_SORA_WINDOW_PHASES_SQL}
+                          AND busy.id != sora_jobs.id
+                    )
+                )
+            ''',
+            claimable_params=(now, now, now),
+            group_key=f"CASE WHEN profile_id > 0 AND phase IN {_SORA_WINDOW_PHASES_SQL} THEN profile_id ELSE -id END",
+            assignments='''
+                lease_owner = ?,
+                lease_until = ?,
+                heartbeat_at = ?,
+                run_attempt = COALESCE(run_attempt, 0) + 1,
+                run_last_error = NULL
+            ''',
+            assignment_params=(safe_owner, lease_until, now),
+            owned="lease_owner = ? AND lease_until = ?",
+            owned_params=(safe_owner, lease_until),
+        )
+
+    def _claim_sora_job_rows(
+        self,
+        n: int,
+        *,
+        claimable: str,
+        claimable_params: Tuple[Any, ...],
+        assignments: str,
+        assignment_params: Tuple[Any, ...],
+        owned: str,
+        owned_params: Tuple[Any, ...],
+        group_key: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """`group_key` 非空时每组只取 id 最小的一条（如同一 profile 一批只领一个）。"""
+        safe_n = max(0, int(n or 0))
+        if safe_n <= 0:
+            return []
+        if group_key:
+            select_ids = f"SELECT MIN(id) AS id FROM sora_jobs WHERE {claimable} GROUP BY {group_key} ORDER BY id ASC LIMIT ?"
+        else:
+            select_ids = f"SELECT id FROM sora_jobs WHERE {claimable} ORDER BY id ASC LIMIT ?"
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            if _SQLITE_HAS_RETURNING:
+                cursor.execute(
+                    f'''
+                    UPDATE sora_jobs
+                    SET {assignments}
+                    WHERE id IN ({select_ids})
+                    RETURNING *
+                    ''',
+                    (*assignment_params, *claimable_params, safe_n),
+                )
+                rows = [dict(row) for row in cursor.fetchall()]
+            else:
+                cursor.execute(select_ids, (*claimable_params, safe_n))
+                job_ids = [int(row["id"]) for row in cursor.fetchall()]
+                rows = []
+                if job_ids:
+                    placeholders = ",".join(["?"] * len(job_ids))
+                    cursor.execute(
+                        f"UPDATE sora_jobs SET {assignments} WHERE id IN ({placeholders}) AND {claimable}",
+                        (*assignment_params, *job_ids, *claimable_params),
+                    )
+                    cursor.execute(
+                        f"SELECT * FROM sora_jobs WHERE id IN ({placeholders}) AND {owned}",
+                        (*job_ids, *owned_params),
+                    )
+                    rows = [dict(row) for row in cursor.fetchall()]
+            conn.commit()
+            rows.sort(key=lambda row: int(row.get("id") or 0))
+            return rows
+        except Exception:
+            conn.rollback()
+            return []
+        finally:
+            conn.close()
+
+    def list_sora_job_wakeups(self, limit: int = 500) -> List[Dict[str, Any]]:
+        """尚未到点的延后任务与去水印重试（id、生成队列 not_before、去水印 watermark_next_at），供 Worker 启动时挂回定时器。"""
+        now = self._now_str()
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            '''
+            SELECT id, status, not_before, watermark_status, watermark_next_at
+            FROM sora_jobs
+            WHERE (status = 'queued' AND not_before > ?)
+               OR (status = 'running' AND watermark_status = 'queued' AND watermark_next_at > ?)
+            ORDER BY id ASC
+            LIMIT ?
+            ''',
+            (now, now, max(1, int(limit))),
+        )
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def claim_sora_watermark_jobs(self, owner: str, n: int = 1, lease_seconds: int = 120) -> List[Dict[str, Any]]:
+        """领取待去水印的任务（独立于生成租约）。
+
+        可领取：`watermark_status='queued'` 且已过退避时间，或 `running` 但去水印租约已过期（Worker 崩溃）。
+        """
+        safe_owner = str(owner or "").strip() or "unknown"
+        now = self._now_str()
+        lease_until = (datetime.now() + timedelta(seconds=max(10, int(lease_seconds)))).strftime("%Y-%m-%d %H:%M:%S")
+        return self._claim_sora_job_rows(
+            n,
+            claimable='''
+                status = 'running' AND phase = 'watermark'
+                AND (watermark_lease_until IS NULL OR watermark_lease_until < ?)
+                AND (
+                    (watermark_status = 'queued' AND (watermark_next_at IS NULL OR watermark_next_at <= ?))
+                    OR (watermark_status = 'running' AND watermark_lease_until IS NOT NULL)
+                )
+            ''',
+            claimable_params=(now, now),
+            assignments="watermark_lease_owner = ?, watermark_lease_until = ?",
+            assignment_params=(safe_owner, lease_until),
+            owned="watermark_lease_owner = ? AND watermark_lease_until = ?",
+            owned_params=(safe_owner, lease_until),
+        )
+
+    def heartbeat_sora_watermark_lease(self, job_id: int, owner: str, lease_seconds: int = 120) -> bool:
+        lease_until = (datetime.now() + timedelta(seconds=max(10, int(lease_seconds)))).strftime("%Y-%m-%d %H:%M:%S")
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            '''
+            UPDATE sora_jobs
+            SET watermark_lease_until = ?
+            WHERE id = ? AND watermark_lease_owner = ?
+            ''',
+            (lease_until, int(job_id), str(owner or "")),
+        )
+        success = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return success
+
+    def clear_sora_watermark_lease(self, job_id: int, owner: str) -> bool:
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            '''
+            UPDATE sora_jobs
+            SET watermark_lease_owner = NULL,
+                watermark_lease_until = NULL
+            WHERE id = ? AND watermark_lease_owner = ?
+            ''',
+            (int(job_id), str(owner or "")),
+        )
+        success = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return success
+
+    def heartbeat_sora_job_leases(self, job_ids: List[int], owner: str, lease_seconds: int = 120) -> List[int]:
+        """一次事务为 owner 持有的多个生成租约续期，返回续期成功的 id（其余视为租约已丢失）。"""
+        return self._renew_leases(
+            "sora_jobs",
+            job_ids,
+            owner,
+            lease_seconds,
+            owner_column="lease_owner",
+            until_column="lease_until",
+            heartbeat_column="heartbeat_at",
+        )
+
+    def heartbeat_sora_watermark_leases(self, job_ids: List[int], owner: str, lease_seconds: int = 120) -> List[int]:
+        return self._renew_leases(
+            "sora_jobs",
+            job_ids,
+            owner,
+            lease_seconds,
+            owner_column="watermark_lease_owner",
+            until_column="watermark_lease_until",
+        )
+
+    def heartbeat_sora_nurture_batch_leases(self, batch_ids: List[int], owner: str, lease_seconds: int = 180) -> List[int]:
+        return self._renew_leases(
+            "sora_nurture_batches",
+            batch_ids,
+            owner,
+            lease_seconds,
+            owner_column="lease_owner",
+            until_column="lease_until",
+            heartbeat_column="heartbeat_at",
+        )
+
+    def _renew_leases(
+        self,
+        table: str,
+        ids: List[int],
+        owner: str,
+        lease_seconds: int,
+        *,
+        owner_column: str,
+        until_column: str,
+        heartbeat_column: Optional[str] = None,
+    ) -> List[int]:
+        safe_ids = sorted({int(item) for item in ids or [] if int(item) > 0})
+        if not safe_ids:
+            return []
+        safe_owner = str(owner or "")
+        lease_until = (datetime.now() + timedelta(seconds=max(10, int(lease_seconds)))).strftime("%Y-%m-%d %H:%M:%S")
+        assignments = f"{until_column} = ?"
+        params: List[Any] = [lease_until]
+        if heartbeat_column:
+            assignments += f", {heartbeat_column} = ?"
+            params.append(self._now_str())
+        placeholders = ",".join(["?"] * len(safe_ids))
         conn = self._get_conn()
         cursor = conn.cursor()
         try:
             cursor.execute("BEGIN IMMEDIATE")
             cursor.execute(
-                '''
-                SELECT id
-                FROM sora_jobs
-                WHERE status = 'queued'
-                  AND (lease_until IS NULL OR lease_until < ?)
-                ORDER BY id ASC
-                LIMIT 1
-                ''',
-                (now,),
-            )
-            row = cursor.fetchone()
-            if not row:
-                conn.rollback()
-                return None
-            job_id = int(row["id"])
-            cursor.execute(
-                '''
-                UPDATE sora_jobs
-                SET lease_owner = ?,
-                    lease_until = ?,
-                    heartbeat_at = ?,
-                    run_attempt = COALESCE(run_attempt, 0) + 1,
-                    run_last_error = NULL
-                WHERE id = ?
-                  AND status = 'queued'
-                  AND (lease_until IS NULL OR lease_until < ?)
-                ''',
-                (safe_owner, lease_until, now, job_id, now),
+                f"UPDATE {table} SET {assignments} WHERE {owner_column} = ? AND id IN ({placeholders})",
+                (*params, safe_owner, *safe_ids),
             )
-            if cursor.rowcount <= 0:
-                conn.rollback()
-                return None
-            cursor.execute("SELECT * FROM sora_jobs WHERE id = ?", (job_id,))
-            claimed = cursor.fetchone()
+            if int(cursor.rowcount or 0) >= len(safe_ids):
+                renewed = safe_ids
+            else:
+                # 有租约已被回收或接管：查出仍归属 owner 的那部分
+                cursor.execute(
+                    f"SELECT id FROM {table} WHERE {owner_column} = ? AND {until_column} = ? AND id IN ({placeholders})",
+                    (safe_owner, lease_until, *safe_ids),
+                )
+                renewed = sorted(int(row["id"]) for row in cursor.fetchall())
             conn.commit()
-            return dict(claimed) if claimed else None
+            return renewed
         except Exception:
             conn.rollback()
-            return None
+            raise
         finally:
             conn.close()
 
@@ -570,17 +796,28 @@ class SQLiteSoraRepo:
         conn.close()
         return success
 
-    def requeue_stale_sora_nurture_batches(self) -> int:
+    def requeue_stale_sora_nurture_batches(self, expired_only: bool = False) -> int:
+        """回收卡在 running 的养号批次。
+
+        expired_only=True 时只回收租约已过期的批次（运行期周期回收用）；
+        默认还会回收无租约的 running 批次（仅适合启动时，进程内直接执行的批次没有租约）。
+        """
         now = self._now_str()
+        if expired_only:
+            stale_cond = "lease_until IS NOT NULL AND lease_until < ?"
+            reason = "worker lease expired"
+        else:
+            stale_cond = "(lease_until IS NULL OR lease_until < ?)"
+            reason = "startup recovered stale running batch"
         conn = self._get_conn()
         cursor = conn.cursor()
         cursor.execute("BEGIN IMMEDIATE")
         cursor.execute(
-            '''
+            f'''
             SELECT id
             FROM sora_nurture_batches
             WHERE status = 'running'
-              AND (lease_until IS NULL OR lease_until < ?)
+              AND {stale_cond}
             ''',
             (now,),
         )
@@ -599,10 +836,10 @@ class SQLiteSoraRepo:
                 lease_owner = NULL,
                 lease_until = NULL,
                 heartbeat_at = NULL,
-                run_last_error = 'startup recovered stale running batch'
+                run_last_error = ?
             WHERE id IN ({placeholders})
             ''',
-            batch_ids,
+            [reason, *batch_ids],
         )
         # 回收中断中的子任务，避免批次重跑时卡在 running。
         cursor.execute(
@@ -610,11 +847,11 @@ class SQLiteSoraRepo:
             UPDATE sora_nurture_jobs
             SET status = 'queued',
                 phase = 'queue',
-                error = COALESCE(error, 'startup recovered stale running batch')
+                error = COALESCE(error, ?)
             WHERE batch_id IN ({placeholders})
               AND status = 'running'
             ''',
-            batch_ids,
+            [reason, *batch_ids],
         )
         count = len(batch_ids)
         conn.commit()
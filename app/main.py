@@ -4,6 +4,7 @@ import logging
 import os
 import sys
 from contextlib import asynccontextmanager
+from typing import Optional
 from uuid import uuid4
 
 from fastapi import FastAPI, Request, Response
@@ -16,10 +17,15 @@ from app.api import admin, auth, ixbrowser, nurture, proxy, sora, video_api
 from app.core.config import settings
 from app.core.errors import install_exception_handlers
 from app.core.logger import setup_logging
-from app.db.sqlite import sqlite_db
+from app.db.sqlite import async_db, sqlite_db
+from app.db.sqlite.proxy_repo import PROXY_CF_KEEP_PER_PROXY, PROXY_CF_TRIM_INTERVAL_SEC
 from app.services.account_recovery_scheduler import account_recovery_scheduler
+from app.services.ixbrowser.window_arbiter import window_arbiter
+from app.services.ixbrowser_service import ixbrowser_service
+from app.services.leader_election import leader_elector
 from app.services.scan_scheduler import scan_scheduler
 from app.services.system_settings import apply_runtime_settings, load_scan_scheduler_settings, load_system_settings
+from app.services.task_runtime import spawn
 from app.services.worker_runner import worker_runner
 
 # Windows 平台下，Playwright 需要使用 ProactorEventLoopPolicy 才能正常启动子进程
@@ -30,41 +36,108 @@ setup_logging()
 logger = logging.getLogger(__name__)
 apply_runtime_settings()
 
+_leader_maintenance_task: Optional[asyncio.Task] = None
+
+
+def _sync_leader_scheduler_settings() -> None:
+    scan_scheduler.apply_settings(load_scan_scheduler_settings())
+    account_recovery_scheduler.sync_settings(load_system_settings(mask_sensitive=False).sora.account_dispatch)
+
+
+async def _leader_maintenance_loop() -> None:
+    """leader 定时维护：裁剪代理 CF 事件明细（写入路径不再触发，独立 Worker 写入的事件也在这里裁剪）。"""
+    while True:
+        try:
+            deleted = await async_db.trim_proxy_cf_events(keep_per_proxy=PROXY_CF_KEEP_PER_PROXY)
+            if deleted > 0:
+                logger.info("已裁剪 %s 条代理 CF 事件", deleted)
+        except Exception:  # noqa: BLE001
+            logger.exception("裁剪代理 CF 事件失败")
+        await asyncio.sleep(PROXY_CF_TRIM_INTERVAL_SEC)
+
+
+async def _start_leader_services() -> None:
+    """当选 leader：回收中断任务、启动调度器、开启周期性维护。"""
+    global _leader_maintenance_task
+    sqlite_db.set_background_maintenance_enabled(True)
+    if _leader_maintenance_task is None or _leader_maintenance_task.done():
+        _leader_maintenance_task = spawn(
+            _leader_maintenance_loop(),
+            task_name="leader.maintenance.loop",
+            metadata={"owner": leader_elector.owner},
+        )
+    recovered_jobs = sqlite_db.fail_running_ixbrowser_silent_refresh_jobs("服务重启中断")
+    if recovered_jobs > 0:
+        sqlite_db.enqueue_event_log(
+            source="ixbrowser",
+            action="ixbrowser.silent_refresh.recover",
+            event="startup",
+            status="success",
+            level="WARN",
+            message=f"已回收 {recovered_jobs} 个中断的静默更新任务",
+            metadata={"recovered_jobs": int(recovered_jobs)},
+        )
+    # 兼容生成接口的发布重试只在内存定时器里，按库里的 publish_next_at 挂回
+    restored_publish = ixbrowser_service.sora_generation_workflow.restore_publish_retries()
+    if restored_publish > 0:
+        logger.info("已恢复 %s 个待重试的兼容生成发布", restored_publish)
+    _sync_leader_scheduler_settings()
+    await scan_scheduler.start()
+    await account_recovery_scheduler.start()
+
+
+async def _stop_leader_services() -> None:
+    global _leader_maintenance_task
+    sqlite_db.set_background_maintenance_enabled(False)
+    if _leader_maintenance_task is not None:
+        _leader_maintenance_task.cancel()
+        await asyncio.gather(_leader_maintenance_task, return_exceptions=True)
+        _leader_maintenance_task = None
+    await account_recovery_scheduler.stop()
+    await scan_scheduler.stop()
+
+
+async def _renew_leader_services() -> None:
+    # 配置可能在其他进程里被修改，续租时同步到本进程的调度器
+    try:
+        _sync_leader_scheduler_settings()
+    except Exception:  # noqa: BLE001
+        logger.exception("同步调度器配置失败")
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     try:
         if sys.platform == "win32":
             loop_type = type(asyncio.get_running_loop()).__name__
             logger.info("当前事件循环: %s", loop_type)
-        recovered_jobs = sqlite_db.fail_running_ixbrowser_silent_refresh_jobs("服务重启中断")
-        if recovered_jobs > 0:
-            sqlite_db.create_event_log(
-                source="ixbrowser",
-                action="ixbrowser.silent_refresh.recover",
-                event="startup",
-                status="success",
-                level="WARN",
-                message=f"已回收 {recovered_jobs} 个中断的静默更新任务",
-                metadata={"recovered_jobs": int(recovered_jobs)},
-            )
         apply_runtime_settings()
-        scan_scheduler.apply_settings(load_scan_scheduler_settings())
-        account_recovery_scheduler.apply_settings(load_system_settings(mask_sensitive=False).sora.account_dispatch)
-        await worker_runner.start()
-        await scan_scheduler.start()
-        await account_recovery_scheduler.start()
-        sqlite_db.create_event_log(
+        # 调度器与周期性维护只在 leader 进程运行；Worker 靠任务租约互斥，每个进程都可以启动
+        sqlite_db.set_background_maintenance_enabled(False)
+        # 窗口租约写 SQLite，API 与独立 Worker 共享 profile 互斥和窗口上限
+        window_arbiter.enable_shared_leases(sqlite_db, worker_runner.owner)
+        if settings.worker_embedded_enabled:
+            await worker_runner.start()
+        else:
+            logger.info("内嵌 Worker 已关闭（WORKER_EMBEDDED_ENABLED=false），任务由独立 Worker 进程执行")
+        await leader_elector.start(
+            on_elected=_start_leader_services,
+            on_demoted=_stop_leader_services,
+            on_renewed=_renew_leader_services,
+        )
+        sqlite_db.enqueue_event_log(
             source="system",
             action="app.startup.background_services",
             event="startup",
             status="success",
             level="INFO",
-            message="后台 Worker 与调度器已启动",
+            message=f"后台 Worker 已启动，leader={'是' if leader_elector.is_leader else '否'}",
+            metadata={"leader_owner": leader_elector.owner, "is_leader": leader_elector.is_leader},
         )
     except Exception as exc:  # noqa: BLE001
         logger.exception("后台服务启动失败")
         try:
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="system",
                 action="app.startup.background_services",
                 event="startup",
@@ -79,10 +152,14 @@ async def lifespan(_app: FastAPI):
         yield
     finally:
         try:
-            await account_recovery_scheduler.stop()
-            await scan_scheduler.stop()
-            await worker_runner.stop()
-            sqlite_db.create_event_log(
+            await leader_elector.stop()
+            # 恢复默认值：脚本/测试在同一进程内继续使用 sqlite_db 时仍按单进程执行维护
+            sqlite_db.set_background_maintenance_enabled(True)
+            if settings.worker_embedded_enabled:
+                await worker_runner.stop()
+            window_arbiter.disable_shared_leases()
+            async_db.shutdown(wait=False)
+            sqlite_db.enqueue_event_log(
                 source="system",
                 action="app.shutdown.background_services",
                 event="shutdown",
@@ -93,7 +170,7 @@ async def lifespan(_app: FastAPI):
         except Exception as exc:  # noqa: BLE001
             logger.exception("后台服务停止失败")
             try:
-                sqlite_db.create_event_log(
+                sqlite_db.enqueue_event_log(
                     source="system",
                     action="app.shutdown.background_services",
                     event="shutdown",
@@ -103,6 +180,7 @@ async def lifespan(_app: FastAPI):
                 )
             except Exception:  # noqa: BLE001
                 pass
+        sqlite_db.stop_event_log_writer()
 
 
 app = FastAPI(
@@ -185,7 +263,7 @@ async def log_requests(request: Request, call_next):
         query_text = str(request.url.query or "")
         try:
             if should_capture:
-                sqlite_db.create_event_log(
+                sqlite_db.enqueue_event_log(
                     source="api",
                     action="api.request",
                     event="request",
@@ -38,6 +38,21 @@ class IXBrowserOpenProfileResponse(BaseModel):
     debugging_address: Optional[str] = None
 
 
+class IXBrowserWindowArbiterStats(BaseModel):
+    capacity: int
+    in_use: int
+    # 是否启用跨进程租约；启用时 global_in_use 为所有进程合计占用
+    shared: bool = False
+    global_in_use: Optional[int] = None
+    waiting: int
+    peak_in_use: int
+    utilization: float
+    avg_utilization: float
+    # generation/publish/scan/nurture -> 发放次数、排队数、等待耗时（avg/p95/max 毫秒）
+    by_priority: Dict[str, Dict[str, float]] = Field(default_factory=dict)
+    holders: List[Dict[str, Any]] = Field(default_factory=list)
+
+
 class IXBrowserSessionScanItem(BaseModel):
     profile_id: int
     window_name: str
@@ -238,6 +253,8 @@ class SoraJob(BaseModel):
     retry_root_job_id: Optional[int] = None
     retry_index: Optional[int] = None
     resolved_from_job_id: Optional[int] = None
+    # 等待配额释放的延后任务：到该时间后重新分配账号
+    not_before: Optional[str] = None
     error: Optional[str] = None
     # 代理绑定（只读，按 ixBrowser 绑定关系）
     proxy_mode: Optional[int] = None
@@ -55,3 +55,23 @@ class LogEventStatsResponse(BaseModel):
     source_distribution: List[LogStatCountItem] = Field(default_factory=list)
     top_actions: List[LogStatCountItem] = Field(default_factory=list)
     top_failed_reasons: List[LogStatCountItem] = Field(default_factory=list)
+
+
+class LogArchiveQueryResponse(BaseModel):
+    items: List[LogEventItem] = Field(default_factory=list)
+    has_more: bool = False
+    next_after_id: Optional[int] = None
+    segments_scanned: int = 0
+
+
+class LogArchiveSegmentItem(BaseModel):
+    id: int
+    file_name: str
+    partition_day: str
+    start_at: str
+    end_at: str
+    min_id: int
+    max_id: int
+    row_count: int = 0
+    size_bytes: int = 0
+    created_at: str
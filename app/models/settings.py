@@ -1,7 +1,7 @@
 """系统设置模型"""
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -17,6 +17,11 @@ class IxBrowserSettings(BaseModel):
 
 class SoraSettings(BaseModel):
     job_max_concurrency: int = Field(2, ge=1, le=10)
+    progress_max_concurrency: int = Field(20, ge=1, le=200)
+    watermark_max_concurrency: int = Field(4, ge=1, le=50)
+    adaptive_concurrency_enabled: bool = False
+    adaptive_concurrency_min: int = Field(1, ge=1, le=10)
+    adaptive_concurrency_max: int = Field(6, ge=1, le=10)
     generate_poll_interval_sec: int = Field(6, ge=3, le=60)
     generate_max_minutes: int = Field(30, ge=1, le=120)
     draft_wait_timeout_minutes: int = Field(20, ge=1, le=120)
@@ -29,6 +34,41 @@ class SoraSettings(BaseModel):
     account_dispatch: "AccountDispatchSettings" = Field(default_factory=lambda: AccountDispatchSettings())
 
 
+class SoraConcurrencyDecision(BaseModel):
+    at: str
+    action: str
+    reason: str
+    from_limit: int
+    to_limit: int
+
+
+class SoraConcurrencyStatus(BaseModel):
+    enabled: bool
+    limit: int
+    base: int
+    floor: int
+    ceiling: int
+    in_use: int = 0
+    waiting: int = 0
+    success_streak: int = 0
+    signals: Dict[str, int] = Field(default_factory=dict)
+    history: List[SoraConcurrencyDecision] = Field(default_factory=list)
+
+
+class WorkerQueueWaitStat(BaseModel):
+    count: int = 0
+    avg_ms: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+class WorkerQueueWaitStatus(BaseModel):
+    owner: str
+    embedded: bool
+    queues: Dict[str, WorkerQueueWaitStat] = Field(default_factory=dict)
+
+
 class AccountDispatchIgnoreRule(BaseModel):
     phase: Optional[str] = None
     message_contains: str = Field(..., min_length=1)
@@ -43,7 +43,11 @@ def _fmt_dt(value: Optional[datetime]) -> Optional[str]:
 
 
 class AccountDispatchNoAvailableError(Exception):
-    """自动分配时没有可用账号"""
+    """自动分配时没有可用账号；`earliest_reset_at` 为最早预计释放配额的时间（未知时为 None）"""
+
+    def __init__(self, message: str, earliest_reset_at: Optional[datetime] = None) -> None:
+        super().__init__(message)
+        self.earliest_reset_at = earliest_reset_at
 
 
 class AccountDispatchService:
@@ -267,6 +271,7 @@ class AccountDispatchService:
             return selectable[0]
 
         earliest_reset_detail = ""
+        soonest_dt: Optional[datetime] = None
         try:
             scan_map = self._load_latest_scan_map(str(group_title or "Sora").strip() or "Sora")
             considered_ids = {int(item.profile_id) for item in weights}
@@ -304,13 +309,17 @@ class AccountDispatchService:
                 earliest_reset_detail = f"；最早预计在 {_fmt_dt(soonest_dt)} 释放（约 {minutes} 分钟后）"
         except Exception:
             earliest_reset_detail = ""
+            soonest_dt = None
 
         fragments: List[str] = []
         for item in weights[:5]:
             reason_text = "；".join(item.reasons[:3]) if item.reasons else "不可选"
             fragments.append(f"profile={item.profile_id}({reason_text})")
         detail = " | ".join(fragments)
-        raise AccountDispatchNoAvailableError(f"自动分配失败：当前无可用账号{earliest_reset_detail}。{detail}")
+        raise AccountDispatchNoAvailableError(
+            f"自动分配失败：当前无可用账号{earliest_reset_detail}。{detail}",
+            earliest_reset_at=soonest_dt,
+        )
 
     def _load_settings(self) -> AccountDispatchSettings:
         # Lazy import to avoid circular dependency at module import time.
@@ -344,7 +353,7 @@ class AccountDispatchService:
         )
         if not run_row:
             return []
-        rows = sqlite_db.get_ixbrowser_scan_results_by_run(int(run_row["id"]))
+        rows = sqlite_db.get_ixbrowser_scan_results_by_run(int(run_row["id"]), include_blobs=False)
         windows: List[IXBrowserWindow] = []
         for row in rows:
             try:
@@ -386,48 +395,57 @@ class AccountDispatchService:
         return windows
 
     def _load_latest_scan_map(self, group_title: str) -> Dict[int, dict]:
-        run_row = (
-            sqlite_db.get_ixbrowser_latest_scan_run_excluding_operator(group_title, "实时使用")
-            or sqlite_db.get_ixbrowser_latest_scan_run(group_title)
-        )
-        if not run_row:
-            return {}
-        base_run_id = int(run_row["id"])
-        rows = sqlite_db.get_ixbrowser_scan_results_by_run(base_run_id)
         result: Dict[int, dict] = {}
-        for row in rows:
+        for state in sqlite_db.list_ixbrowser_profile_states(group_title):
             try:
-                profile_id = int(row.get("profile_id") or 0)
+                profile_id = int(state.get("profile_id") or 0)
             except Exception:
                 continue
             if profile_id <= 0:
                 continue
-            result[profile_id] = row
-
-        # 叠加“实时使用”的配额更新（只覆盖 quota 字段，不覆盖账号/套餐字段）
-        realtime_run = sqlite_db.get_ixbrowser_latest_scan_run_by_operator(group_title, "实时使用")
-        if realtime_run and int(realtime_run.get("id") or 0) and int(realtime_run.get("id") or 0) != base_run_id:
-            realtime_rows = sqlite_db.get_ixbrowser_scan_results_by_run(int(realtime_run["id"]))
-            for row in realtime_rows:
-                try:
-                    profile_id = int(row.get("profile_id") or 0)
-                except Exception:
-                    continue
-                if profile_id <= 0:
-                    continue
-                base_row = result.get(profile_id)
-                if not isinstance(base_row, dict):
-                    result[profile_id] = row
-                    continue
-
-                base_scanned_at = _parse_dt(base_row.get("scanned_at"))
-                realtime_scanned_at = _parse_dt(row.get("scanned_at"))
-                if base_scanned_at and realtime_scanned_at and realtime_scanned_at < base_scanned_at:
-                    continue
 
-                for key in ("quota_remaining_count", "quota_total_count", "quota_reset_at", "quota_source"):
-                    if row.get(key) is not None:
-                        base_row[key] = row.get(key)
+            row: Optional[dict] = None
+            if state.get("scan_run_id"):
+                row = {
+                    "profile_id": profile_id,
+                    "run_id": state.get("scan_run_id"),
+                    "window_name": state.get("window_name"),
+                    "account": state.get("scan_account"),
+                    "account_plan": state.get("scan_account_plan"),
+                    "quota_remaining_count": state.get("scan_quota_remaining_count"),
+                    "quota_total_count": state.get("scan_quota_total_count"),
+                    "quota_reset_at": state.get("scan_quota_reset_at"),
+                    "quota_source": state.get("scan_quota_source"),
+                    "scanned_at": state.get("scan_scanned_at"),
+                }
+
+            # 叠加“实时使用”的配额更新（只覆盖 quota 字段，不覆盖账号/套餐字段）
+            if state.get("realtime_run_id"):
+                realtime = {
+                    "quota_remaining_count": state.get("realtime_quota_remaining_count"),
+                    "quota_total_count": state.get("realtime_quota_total_count"),
+                    "quota_reset_at": state.get("realtime_quota_reset_at"),
+                    "quota_source": state.get("realtime_quota_source"),
+                }
+                if row is None:
+                    row = {
+                        "profile_id": profile_id,
+                        "run_id": state.get("realtime_run_id"),
+                        "window_name": state.get("window_name"),
+                        "account": None,
+                        "account_plan": None,
+                        "scanned_at": state.get("realtime_scanned_at"),
+                        **realtime,
+                    }
+                else:
+                    base_scanned_at = _parse_dt(row.get("scanned_at"))
+                    realtime_scanned_at = _parse_dt(state.get("realtime_scanned_at"))
+                    if not (base_scanned_at and realtime_scanned_at and realtime_scanned_at < base_scanned_at):
+                        for key, value in realtime.items():
+                            if value is not None:
+                                row[key] = value
+            if row is not None:
+                result[profile_id] = row
         return result
 
     def _calc_quantity_score(self, *, quota_remaining: Optional[int], settings: AccountDispatchSettings) -> float:
@@ -7,7 +7,7 @@ import time
 from typing import Optional
 from uuid import uuid4
 
-from app.db.sqlite import sqlite_db
+from app.db.sqlite import async_db, sqlite_db
 from app.models.settings import AccountDispatchSettings
 from app.services.ixbrowser_service import ixbrowser_service
 from app.services.task_runtime import spawn
@@ -39,6 +39,12 @@ class AccountRecoveryScheduler:
         self._pause_reason = None
         self._next_run_at = now + interval * 60
 
+    def sync_settings(self, settings: AccountDispatchSettings) -> None:
+        """仅在配置变化时应用（apply_settings 会重置下一次触发时间）。"""
+        if settings == self._settings:
+            return
+        self.apply_settings(settings)
+
     async def start(self) -> None:
         self._stop_event.clear()
         if self._task and not self._task.done():
@@ -82,7 +88,7 @@ class AccountRecoveryScheduler:
         interval_minutes = max(1, int(cfg.auto_scan_interval_minutes or 10))
         slot = int(now // (interval_minutes * 60))
         lock_key = f"scheduler.account_recovery.{slot}"
-        if not sqlite_db.try_acquire_scheduler_lock(lock_key=lock_key, owner=self._owner, ttl_seconds=120):
+        if not await async_db.try_acquire_scheduler_lock(lock_key=lock_key, owner=self._owner, ttl_seconds=120):
             self._next_run_at = now + 5
             return
 
@@ -96,7 +102,7 @@ class AccountRecoveryScheduler:
                 with_fallback=True,
                 profile_ids=None,
             )
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="system",
                 action="scheduler.account_recovery.trigger",
                 event="trigger",
@@ -106,7 +112,7 @@ class AccountRecoveryScheduler:
                 metadata={"group_title": group_title, "interval_minutes": interval_minutes},
             )
         except Exception as exc:  # noqa: BLE001
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="system",
                 action="scheduler.account_recovery.trigger",
                 event="trigger",
@@ -127,7 +133,7 @@ class AccountRecoveryScheduler:
         elif normalized == "auto_scan_disabled":
             message = "账号恢复调度已暂停：auto_scan_enabled=false"
         try:
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="system",
                 action="scheduler.account_recovery.paused",
                 event="paused",
@@ -0,0 +1,124 @@
+"""Sora 提交并发的 AIMD 自适应控制。
+
+- 加性增：连续成功提交数达到当前上限（约一轮满载）后上限 +1，直到上限值（ceiling）；
+- 乘性减：命中 heavy load、CF 挑战或 ixBrowser 1008 繁忙时上限减半，不低于下限值（floor）；
+  同一波拥塞往往同时触发多条信号，冷却期内只降一次。
+- 关闭时固定使用系统设置里的「提交并发（窗口）」。
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN_SEC = 30.0
+HISTORY_SIZE = 100
+
+
+class AdaptiveConcurrencyController:
+    def __init__(self, base: int, floor: int = 1, ceiling: int = 6, enabled: bool = False) -> None:
+        self._base = max(1, int(base))
+        self._floor = max(1, int(floor))
+        self._ceiling = max(self._floor, int(ceiling))
+        self._enabled = bool(enabled)
+        self._limit = self._target_base()
+        self._success_streak = 0
+        self._last_decrease_at = 0.0
+        self._signals: Dict[str, int] = {}
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY_SIZE)
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def _target_base(self) -> int:
+        if not self._enabled:
+            return self._base
+        return min(self._ceiling, max(self._floor, self._base))
+
+    def set_base(self, base: int) -> Optional[Dict[str, Any]]:
+        """修改基础并发（系统设置）时从新的基础值重新开始探测。"""
+        self._base = max(1, int(base))
+        return self._reset("base_changed")
+
+    def configure(self, *, enabled: bool, floor: int, ceiling: int) -> Optional[Dict[str, Any]]:
+        floor_int = max(1, int(floor))
+        ceiling_int = max(floor_int, int(ceiling))
+        if (bool(enabled), floor_int, ceiling_int) == (self._enabled, self._floor, self._ceiling):
+            return None
+        self._enabled = bool(enabled)
+        self._floor = floor_int
+        self._ceiling = ceiling_int
+        return self._reset("configured")
+
+    def on_success(self) -> Optional[Dict[str, Any]]:
+        if not self._enabled:
+            return None
+        self._success_streak += 1
+        if self._limit >= self._ceiling or self._success_streak < self._limit:
+            return None
+        self._success_streak = 0
+        return self._change(self._limit + 1, "increase", "submit_success")
+
+    def on_congestion(self, reason: str) -> Optional[Dict[str, Any]]:
+        reason_text = str(reason or "unknown")
+        self._signals[reason_text] = self._signals.get(reason_text, 0) + 1
+        if not self._enabled:
+            return None
+        self._success_streak = 0
+        now = time.monotonic()
+        if self._last_decrease_at and now - self._last_decrease_at < DECREASE_COOLDOWN_SEC:
+            return None
+        self._last_decrease_at = now
+        target = max(self._floor, int(self._limit * DECREASE_FACTOR))
+        if target >= self._limit:
+            return None
+        return self._change(target, "decrease", reason_text)
+
+    def _reset(self, reason: str) -> Optional[Dict[str, Any]]:
+        self._success_streak = 0
+        self._last_decrease_at = 0.0
+        target = self._target_base()
+        if target == self._limit:
+            return None
+        return self._change(target, "reset", reason)
+
+    def _change(self, target: int, action: str, reason: str) -> Dict[str, Any]:
+        decision = {
+            "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "action": action,
+            "reason": reason,
+            "from_limit": self._limit,
+            "to_limit": int(target),
+        }
+        self._limit = int(target)
+        self._history.append(decision)
+        logger.info(
+            "Sora 提交并发调整 | action=%s | reason=%s | %s -> %s",
+            action,
+            reason,
+            decision["from_limit"],
+            decision["to_limit"],
+        )
+        return decision
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._enabled,
+            "limit": self._limit,
+            "base": self._base,
+            "floor": self._floor,
+            "ceiling": self._ceiling,
+            "success_streak": self._success_streak,
+            "signals": dict(self._signals),
+            "history": list(reversed(self._history)),
+        }
@@ -156,6 +156,7 @@ class BrowserPrepMixin:
         if not self._should_record_cf_nav_event(profile_id, endpoint):
             return
 
+        self.record_sora_congestion("cf_challenge")
         spawn(
             asyncio.to_thread(
                 self._record_proxy_cf_event,
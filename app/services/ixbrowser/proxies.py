@@ -126,7 +126,6 @@ class ProxiesMixin:
                 status_code=status_code,
                 error_text=str(error or "").strip() or None,
                 is_cf=bool(is_cf),
-                keep_per_proxy=300,
             )
         except Exception as exc:  # noqa: BLE001
             logger.debug("记录代理 CF 事件失败 | profile_id=%s | error=%s", int(pid), str(exc))
@@ -8,7 +8,7 @@ import time
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
-from app.db.sqlite import sqlite_db
+from app.db.sqlite import async_db, sqlite_db
 from app.services.task_runtime import spawn
 
 logger = logging.getLogger(__name__)
@@ -129,12 +129,13 @@ class RealtimeQuotaService:
                     break
 
         operator_username = str(getattr(self._service, "_realtime_operator_username", "实时使用") or "实时使用")
-        run_row = self._db.get_ixbrowser_latest_scan_run_by_operator(group_title, operator_username)
+        run_row = await async_db.run(self._db.get_ixbrowser_latest_scan_run_by_operator, group_title, operator_username)
         run_id = None
         if run_row:
             run_id = int(run_row["id"])
         else:
-            run_id = self._db.create_ixbrowser_scan_run(
+            run_id = await async_db.run(
+                self._db.create_ixbrowser_scan_run,
                 run_data={
                     "group_id": group_id,
                     "group_title": group_title,
@@ -180,8 +181,8 @@ class RealtimeQuotaService:
             "duration_ms": 0,
         }
 
-        self._db.upsert_ixbrowser_scan_result(run_id, item)
-        self._db.recalc_ixbrowser_scan_run_stats(run_id)
+        await async_db.run(self._db.upsert_ixbrowser_scan_result, run_id, item)
+        await async_db.run(self._db.recalc_ixbrowser_scan_run_stats, run_id)
         logger.info(
             "实时次数更新: profile=%s remaining=%s total=%s reset_at=%s source=%s url=%s",
             profile_id,
@@ -27,6 +27,7 @@ from app.services.ixbrowser.errors import (
     IXBrowserNotFoundError,
     IXBrowserServiceError,
 )
+from app.services.ixbrowser.window_arbiter import WINDOW_PRIORITY_SCAN, window_arbiter
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +70,7 @@ class ScanMixin:
         error: Optional[str] = None
         browser = None
 
+        window_lease = await window_arbiter.acquire(window.profile_id, WINDOW_PRIORITY_SCAN, owner="scan")
         try:
             open_data = await self._open_profile_with_retry(window.profile_id, max_attempts=2)
             ws_endpoint = open_data.get("ws")
@@ -125,6 +127,7 @@ class ScanMixin:
                 close_success = False
                 if not error:
                     error = f"窗口关闭失败：{close_exc}"
+            window_lease.release()
 
         duration_ms = int((time.perf_counter() - started_at) * 1000)
         return IXBrowserSessionScanItem(
@@ -686,6 +689,7 @@ class ScanMixin:
                 error: Optional[str] = None
                 browser = None
 
+                window_lease = await window_arbiter.acquire(window.profile_id, WINDOW_PRIORITY_SCAN, owner="scan")
                 try:
                     open_data = await self._open_profile_with_retry(window.profile_id, max_attempts=2)
                     ws_endpoint = open_data.get("ws")
@@ -742,6 +746,7 @@ class ScanMixin:
                         close_success = False
                         if not error:
                             error = f"窗口关闭失败：{close_exc}"
+                    window_lease.release()
 
                 duration_ms = int((time.perf_counter() - started_at) * 1000)
                 item = IXBrowserSessionScanItem(
@@ -63,7 +63,7 @@ class SilentRefreshMixin:
 
         running = sqlite_db.get_running_ixbrowser_silent_refresh_job(normalized_group)
         if running:
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="ixbrowser",
                 action="ixbrowser.silent_refresh.reused",
                 event="reused",
@@ -98,7 +98,7 @@ class SilentRefreshMixin:
         if not row:
             raise IXBrowserServiceError(f"静默更新任务创建失败：{job_id}")
 
-        sqlite_db.create_event_log(
+        sqlite_db.enqueue_event_log(
             source="ixbrowser",
             action="ixbrowser.silent_refresh.start",
             event="start",
@@ -191,7 +191,7 @@ class SilentRefreshMixin:
                     "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 },
             )
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="ixbrowser",
                 action="ixbrowser.silent_refresh.finish",
                 event="finish",
@@ -229,7 +229,7 @@ class SilentRefreshMixin:
                     "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 },
             )
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="ixbrowser",
                 action="ixbrowser.silent_refresh.fail",
                 event="fail",
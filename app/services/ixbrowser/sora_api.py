@@ -55,6 +55,8 @@ class SoraApiMixin:
             is_cf=is_cf,
             assume_proxy_chain=True,
         )
+        if is_cf:
+            self.record_sora_congestion("cf_challenge")
         return {
             "status": int(status) if isinstance(status, int) else status,
             "raw": raw_text,
@@ -459,6 +461,8 @@ class SoraApiMixin:
             is_cf=is_cf,
             assume_proxy_chain=True,
         )
+        if is_cf:
+            self.record_sora_congestion("cf_challenge")
         return {
             "status": int(status) if isinstance(status, int) else status,
             "raw": raw_text,
@@ -9,6 +9,9 @@ from typing import Any, Dict, Optional, Tuple
 from uuid import uuid4
 
 from app.db.sqlite import sqlite_db
+from app.services.ixbrowser.window_arbiter import WINDOW_PRIORITY_GENERATION, WindowLease, window_arbiter
+from app.services.retry_timer import retry_timer
+from app.services.task_runtime import spawn
 
 logger = logging.getLogger(__name__)
 
@@ -87,16 +90,47 @@ class SoraGenerationWorkflow:
             sqlite_db.update_sora_job(job_id, {"generation_id": generation_id})
             return
         sqlite_db.update_ixbrowser_generate_job(job_id, {"generation_id": generation_id})
-    async def run_sora_submit_and_progress(
+
+    async def _connect_ws_endpoint(self, profile_id: int, max_attempts: int, error_prefix: str) -> str:
+        open_data = await self._open_profile_with_retry(profile_id, max_attempts=max_attempts)
+        ws_endpoint = open_data.get("ws")
+        if not ws_endpoint:
+            debugging_address = open_data.get("debugging_address")
+            if debugging_address:
+                ws_endpoint = f"http://{debugging_address}"
+        if not ws_endpoint:
+            raise self._connection_error(f"{error_prefix}：未返回调试地址（ws/debugging_address）")
+        return ws_endpoint
+
+    async def run_sora_submit(
         self,
         job_id: int,
         profile_id: int,
         prompt: str,
         duration: str,
         aspect_ratio: str,
-        started_at: str,
         image_url: Optional[str] = None,
-    ) -> Tuple[str, Optional[str]]:
+    ) -> Tuple[str, str]:
+        """提交阶段：占用浏览器窗口提交任务并取得 accessToken，返回前关闭窗口。"""
+        async with window_arbiter.lease(profile_id, WINDOW_PRIORITY_GENERATION, owner=f"sora_job:{job_id}:submit"):
+            return await self._run_sora_submit(
+                job_id=job_id,
+                profile_id=profile_id,
+                prompt=prompt,
+                duration=duration,
+                aspect_ratio=aspect_ratio,
+                image_url=image_url,
+            )
+
+    async def _run_sora_submit(
+        self,
+        job_id: int,
+        profile_id: int,
+        prompt: str,
+        duration: str,
+        aspect_ratio: str,
+        image_url: Optional[str] = None,
+    ) -> Tuple[str, str]:
         duration_to_frames = {
             "10s": 300,
             "15s": 450,
@@ -107,22 +141,10 @@ class SoraGenerationWorkflow:
         sqlite_db.update_sora_job(job_id, {"phase": "submit"})
         sqlite_db.create_sora_job_event(job_id, "submit", "start", "开始提交任务")
 
-        open_data = await self._open_profile_with_retry(profile_id, max_attempts=3)
-        ws_endpoint = open_data.get("ws")
-        if not ws_endpoint:
-            debugging_address = open_data.get("debugging_address")
-            if debugging_address:
-                ws_endpoint = f"http://{debugging_address}"
-        if not ws_endpoint:
-            raise self._connection_error("提交失败：未返回调试地址（ws/debugging_address）")
+        ws_endpoint = await self._connect_ws_endpoint(profile_id, max_attempts=3, error_prefix="提交失败")
 
-        submit_attempts = 0
-        poll_attempts = 0
-        generation_id: Optional[str] = None
         task_id: Optional[str] = None
         access_token: Optional[str] = None
-        last_progress = 0
-        last_draft_fetch_at = 0.0
 
         async with self.playwright_factory() as playwright:
             browser = await playwright.chromium.connect_over_cdp(ws_endpoint, timeout=20_000)
@@ -137,7 +159,6 @@ class SoraGenerationWorkflow:
                 device_id = await self._publish_workflow.get_device_id_from_context(context)
                 last_submit_error: Optional[str] = None
                 for attempt in range(1, 3):
-                    submit_attempts = attempt
                     submit_data = await self._publish_workflow.submit_video_request_from_page(
                         page=page,
                         prompt=prompt,
@@ -170,115 +191,13 @@ class SoraGenerationWorkflow:
                     }
                 )
                 sqlite_db.create_sora_job_event(job_id, "submit", "finish", f"提交成功：{task_id}")
+                # 新任务要进入 pending 列表，丢弃该账号的合并轮询缓存
+                self._publish_workflow.pending_poller.invalidate(profile_id)
 
                 if not access_token:
                     access_token = await self._publish_workflow.get_access_token_from_page(page)
                 if not access_token:
                     raise self._service_error("提交成功但未获取到 accessToken，无法监听任务状态")
-
-                sqlite_db.update_sora_job(job_id, {"phase": "progress"})
-                sqlite_db.create_sora_job_event(job_id, "progress", "start", "进入进度轮询")
-
-                started = time.perf_counter()
-                last_draft_fetch_at = started
-                use_proxy_poll = True
-                reconnect_attempts = 0
-                max_reconnect_attempts = 3
-                # 新方式可用时不占用浏览器窗口；命中 CF 再快速切回页面轮询。
-                try:
-                    await browser.close()
-                except Exception:  # noqa: BLE001
-                    pass
-                browser = None
-                page = None
-                try:
-                    await self._close_profile(profile_id)
-                except Exception:  # noqa: BLE001
-                    pass
-                while True:
-                    if self._is_sora_job_canceled(job_id):
-                        raise self._service_error("任务已取消")
-                    if (time.perf_counter() - started) >= self.generate_timeout_seconds:
-                        raise self._service_error(f"任务监听超时（>{self.generate_timeout_seconds}s）")
-
-                    poll_attempts += 1
-                    now = time.perf_counter()
-                    fetch_drafts = False
-                    if not generation_id and (now - last_draft_fetch_at) >= self.draft_manual_poll_interval_seconds:
-                        fetch_drafts = True
-                        last_draft_fetch_at = now
-
-                    if use_proxy_poll:
-                        state = await self._publish_workflow.poll_sora_task_via_proxy_api(
-                            profile_id=profile_id,
-                            task_id=task_id,
-                            access_token=access_token,
-                            fetch_drafts=fetch_drafts,
-                        )
-                        if bool(state.get("cf_challenge")):
-                            use_proxy_poll = False
-                            reconnect_attempts = 0
-                            browser, page, access_token = await self._reconnect_sora_page(playwright, profile_id)
-                            continue
-                    else:
-                        try:
-                            state = await self._publish_workflow.poll_sora_task_from_page(
-                                page=page,
-                                task_id=task_id,
-                                access_token=access_token,
-                                fetch_drafts=fetch_drafts,
-                            )
-                        except Exception as poll_exc:  # noqa: BLE001
-                            if self._is_page_closed_error(poll_exc) and reconnect_attempts < max_reconnect_attempts:
-                                reconnect_attempts += 1
-                                try:
-                                    if browser:
-                                        await browser.close()
-                                except Exception:  # noqa: BLE001
-                                    pass
-                                browser, page, access_token = await self._reconnect_sora_page(playwright, profile_id)
-                                continue
-                            raise self._service_error(f"任务轮询失败：{poll_exc}") from poll_exc
-
-                    progress = self._normalize_progress(state.get("progress"))
-                    if progress is None and not bool(state.get("cf_challenge")):
-                        progress = self._estimate_progress(started, self.generate_timeout_seconds)
-                    progress = max(int(progress or 0), last_progress)
-                    last_progress = progress
-                    sqlite_db.update_sora_job(
-                        job_id,
-                        {
-                            "progress_pct": progress,
-                        }
-                    )
-                    state_generation_id = state.get("generation_id")
-                    if isinstance(state_generation_id, str) and state_generation_id.strip():
-                        generation_id = state_generation_id.strip()
-                        sqlite_db.update_sora_job(job_id, {"generation_id": generation_id})
-
-                    if state.get("state") == "failed":
-                        raise self._service_error(state.get("error") or "任务失败")
-
-                    if state.get("state") == "completed":
-                        sqlite_db.create_sora_job_event(job_id, "progress", "finish", "进度完成")
-                        return task_id, generation_id
-
-                    if use_proxy_poll:
-                        await asyncio.sleep(self.generate_poll_interval_seconds)
-                    else:
-                        try:
-                            await page.wait_for_timeout(self.generate_poll_interval_seconds * 1000)
-                        except Exception as wait_exc:  # noqa: BLE001
-                            if self._is_page_closed_error(wait_exc) and reconnect_attempts < max_reconnect_attempts:
-                                reconnect_attempts += 1
-                                try:
-                                    if browser:
-                                        await browser.close()
-                                except Exception:  # noqa: BLE001
-                                    pass
-                                browser, page, access_token = await self._reconnect_sora_page(playwright, profile_id)
-                                continue
-                            raise self._service_error(f"任务监听中断：{wait_exc}") from wait_exc
             finally:
                 try:
                     await browser.close()
@@ -289,7 +208,34 @@ class SoraGenerationWorkflow:
                 except Exception:  # noqa: BLE001
                     pass
 
-        raise self._service_error("任务提交流程异常结束")
+        return task_id, access_token
+
+    async def run_sora_submit_and_progress(
+        self,
+        job_id: int,
+        profile_id: int,
+        prompt: str,
+        duration: str,
+        aspect_ratio: str,
+        started_at: str,
+        image_url: Optional[str] = None,
+    ) -> Tuple[str, Optional[str]]:
+        task_id, access_token = await self.run_sora_submit(
+            job_id=job_id,
+            profile_id=profile_id,
+            prompt=prompt,
+            duration=duration,
+            aspect_ratio=aspect_ratio,
+            image_url=image_url,
+        )
+        generation_id = await self.run_sora_progress_only(
+            job_id=job_id,
+            profile_id=profile_id,
+            task_id=task_id,
+            started_at=started_at,
+            access_token=access_token,
+        )
+        return task_id, generation_id
 
     async def run_sora_progress_only(
         self,
@@ -297,130 +243,160 @@ class SoraGenerationWorkflow:
         profile_id: int,
         task_id: str,
         started_at: str,
+        access_token: Optional[str] = None,
     ) -> Optional[str]:
+        """进度阶段：默认走代理 API 轮询，不占用浏览器窗口；仅命中 CF 时临时接回页面轮询。
+
+        已有 accessToken（提交阶段直接交接）时不再打开窗口；断点续跑时才打开一次窗口取 token。
+        """
         sqlite_db.update_sora_job(job_id, {"phase": "progress"})
         sqlite_db.create_sora_job_event(job_id, "progress", "start", "进入进度轮询")
 
-        open_data = await self._open_profile_with_retry(profile_id, max_attempts=2)
-        ws_endpoint = open_data.get("ws")
-        if not ws_endpoint:
-            debugging_address = open_data.get("debugging_address")
-            if debugging_address:
-                ws_endpoint = f"http://{debugging_address}"
-        if not ws_endpoint:
-            raise self._connection_error("进度轮询失败：未返回调试地址")
-
-        generation_id: Optional[str] = None
-        last_progress = 0
-        last_draft_fetch_at = 0.0
-
         async with self.playwright_factory() as playwright:
-            browser = await playwright.chromium.connect_over_cdp(ws_endpoint, timeout=20_000)
-            try:
-                context = browser.contexts[0] if browser.contexts else await browser.new_context()
-                page = context.pages[0] if context.pages else await context.new_page()
-                await self._prepare_sora_page(page, profile_id)
-                await page.goto("https://sora.chatgpt.com/drafts", wait_until="domcontentloaded", timeout=40_000)
-                await page.wait_for_timeout(1200)
-                access_token = await self._publish_workflow.get_access_token_from_page(page)
-                if not access_token:
-                    raise self._service_error("进度轮询未获取到 accessToken")
+            if not access_token:
+                access_token = await self._fetch_access_token_for_progress(playwright, profile_id)
+            return await self._poll_sora_progress(
+                playwright,
+                job_id=job_id,
+                profile_id=profile_id,
+                task_id=task_id,
+                access_token=access_token,
+            )
 
-                started = time.perf_counter()
-                last_draft_fetch_at = started
-                use_proxy_poll = True
-                reconnect_attempts = 0
-                max_reconnect_attempts = 3
-                try:
-                    await browser.close()
-                except Exception:  # noqa: BLE001
-                    pass
-                browser = None
-                page = None
-                try:
-                    await self._close_profile(profile_id)
-                except Exception:  # noqa: BLE001
-                    pass
-                while True:
-                    if self._is_sora_job_canceled(job_id):
-                        raise self._service_error("任务已取消")
-                    if (time.perf_counter() - started) >= self.generate_timeout_seconds:
-                        raise self._service_error(f"任务监听超时（>{self.generate_timeout_seconds}s）")
+    async def _fetch_access_token_for_progress(self, playwright, profile_id: int) -> str:
+        async with window_arbiter.lease(profile_id, WINDOW_PRIORITY_GENERATION, owner="sora_progress:token"):
+            return await self._fetch_access_token_from_window(playwright, profile_id)
 
-                    now = time.perf_counter()
-                    fetch_drafts = False
-                    if not generation_id and (now - last_draft_fetch_at) >= self.draft_manual_poll_interval_seconds:
-                        fetch_drafts = True
-                        last_draft_fetch_at = now
+    async def _fetch_access_token_from_window(self, playwright, profile_id: int) -> str:
+        ws_endpoint = await self._connect_ws_endpoint(profile_id, max_attempts=2, error_prefix="进度轮询失败")
+        browser = await playwright.chromium.connect_over_cdp(ws_endpoint, timeout=20_000)
+        try:
+            context = browser.contexts[0] if browser.contexts else await browser.new_context()
+            page = context.pages[0] if context.pages else await context.new_page()
+            await self._prepare_sora_page(page, profile_id)
+            await page.goto("https://sora.chatgpt.com/drafts", wait_until="domcontentloaded", timeout=40_000)
+            await page.wait_for_timeout(1200)
+            access_token = await self._publish_workflow.get_access_token_from_page(page)
+            if not access_token:
+                raise self._service_error("进度轮询未获取到 accessToken")
+            return access_token
+        finally:
+            try:
+                await browser.close()
+            except Exception:  # noqa: BLE001
+                pass
+            try:
+                await self._close_profile(profile_id)
+            except Exception:  # noqa: BLE001
+                pass
 
-                    if use_proxy_poll:
-                        state = await self._publish_workflow.poll_sora_task_via_proxy_api(
-                            profile_id=profile_id,
+    async def _poll_sora_progress(
+        self,
+        playwright,
+        job_id: int,
+        profile_id: int,
+        task_id: str,
+        access_token: str,
+    ) -> Optional[str]:
+        generation_id: Optional[str] = None
+        last_progress = 0
+        started = time.perf_counter()
+        last_draft_fetch_at = started
+        use_proxy_poll = True
+        reconnect_attempts = 0
+        max_reconnect_attempts = 3
+        browser = None
+        page = None
+        window_lease: Optional[WindowLease] = None
+        try:
+            while True:
+                if self._is_sora_job_canceled(job_id):
+                    raise self._service_error("任务已取消")
+                if (time.perf_counter() - started) >= self.generate_timeout_seconds:
+                    raise self._service_error(f"任务监听超时（>{self.generate_timeout_seconds}s）")
+
+                now = time.perf_counter()
+                fetch_drafts = False
+                if not generation_id and (now - last_draft_fetch_at) >= self.draft_manual_poll_interval_seconds:
+                    fetch_drafts = True
+                    last_draft_fetch_at = now
+
+                if use_proxy_poll:
+                    state = await self._publish_workflow.poll_sora_task_via_proxy_api(
+                        profile_id=profile_id,
+                        task_id=task_id,
+                        access_token=access_token,
+                        fetch_drafts=fetch_drafts,
+                    )
+                    if bool(state.get("cf_challenge")):
+                        use_proxy_poll = False
+                        reconnect_attempts = 0
+                        # 切回页面轮询要占用窗口，先向仲裁器申请租约
+                        window_lease = await window_arbiter.acquire(
+                            profile_id,
+                            WINDOW_PRIORITY_GENERATION,
+                            owner=f"sora_job:{job_id}:progress",
+                        )
+                        browser, page, access_token = await self._reconnect_sora_page(playwright, profile_id)
+                        continue
+                else:
+                    try:
+                        state = await self._publish_workflow.poll_sora_task_from_page(
+                            page=page,
                             task_id=task_id,
                             access_token=access_token,
                             fetch_drafts=fetch_drafts,
                         )
-                        if bool(state.get("cf_challenge")):
-                            use_proxy_poll = False
-                            reconnect_attempts = 0
+                    except Exception as poll_exc:  # noqa: BLE001
+                        if self._is_page_closed_error(poll_exc) and reconnect_attempts < max_reconnect_attempts:
+                            reconnect_attempts += 1
+                            try:
+                                if browser:
+                                    await browser.close()
+                            except Exception:  # noqa: BLE001
+                                pass
                             browser, page, access_token = await self._reconnect_sora_page(playwright, profile_id)
                             continue
-                    else:
-                        try:
-                            state = await self._publish_workflow.poll_sora_task_from_page(
-                                page=page,
-                                task_id=task_id,
-                                access_token=access_token,
-                                fetch_drafts=fetch_drafts,
-                            )
-                        except Exception as poll_exc:  # noqa: BLE001
-                            if self._is_page_closed_error(poll_exc) and reconnect_attempts < max_reconnect_attempts:
-                                reconnect_attempts += 1
-                                try:
-                                    if browser:
-                                        await browser.close()
-                                except Exception:  # noqa: BLE001
-                                    pass
-                                browser, page, access_token = await self._reconnect_sora_page(playwright, profile_id)
-                                continue
-                            raise self._service_error(f"任务轮询失败：{poll_exc}") from poll_exc
+                        raise self._service_error(f"任务轮询失败：{poll_exc}") from poll_exc
 
-                    progress = self._normalize_progress(state.get("progress"))
-                    if progress is None and not bool(state.get("cf_challenge")):
-                        progress = self._estimate_progress(started, self.generate_timeout_seconds)
-                    progress = max(int(progress or 0), last_progress)
-                    last_progress = progress
-                    sqlite_db.update_sora_job(job_id, {"progress_pct": progress})
+                progress = self._normalize_progress(state.get("progress"))
+                if progress is None and not bool(state.get("cf_challenge")):
+                    progress = self._estimate_progress(started, self.generate_timeout_seconds)
+                progress = max(int(progress or 0), last_progress)
+                last_progress = progress
+                sqlite_db.update_sora_job(job_id, {"progress_pct": progress})
 
-                    state_generation_id = state.get("generation_id")
-                    if isinstance(state_generation_id, str) and state_generation_id.strip():
-                        generation_id = state_generation_id.strip()
-                        sqlite_db.update_sora_job(job_id, {"generation_id": generation_id})
+                state_generation_id = state.get("generation_id")
+                if isinstance(state_generation_id, str) and state_generation_id.strip():
+                    generation_id = state_generation_id.strip()
+                    sqlite_db.update_sora_job(job_id, {"generation_id": generation_id})
 
-                    if state.get("state") == "failed":
-                        raise self._service_error(state.get("error") or "任务失败")
+                if state.get("state") == "failed":
+                    raise self._service_error(state.get("error") or "任务失败")
 
-                    if state.get("state") == "completed":
-                        sqlite_db.create_sora_job_event(job_id, "progress", "finish", "进度完成")
-                        return generation_id
+                if state.get("state") == "completed":
+                    sqlite_db.create_sora_job_event(job_id, "progress", "finish", "进度完成")
+                    return generation_id
 
-                    if use_proxy_poll:
-                        await asyncio.sleep(self.generate_poll_interval_seconds)
-                    else:
-                        try:
-                            await page.wait_for_timeout(self.generate_poll_interval_seconds * 1000)
-                        except Exception as wait_exc:  # noqa: BLE001
-                            if self._is_page_closed_error(wait_exc) and reconnect_attempts < max_reconnect_attempts:
-                                reconnect_attempts += 1
-                                try:
-                                    if browser:
-                                        await browser.close()
-                                except Exception:  # noqa: BLE001
-                                    pass
-                                browser, page, access_token = await self._reconnect_sora_page(playwright, profile_id)
-                                continue
-                            raise self._service_error(f"任务监听中断：{wait_exc}") from wait_exc
-            finally:
+                if use_proxy_poll:
+                    await asyncio.sleep(self.generate_poll_interval_seconds)
+                else:
+                    try:
+                        await page.wait_for_timeout(self.generate_poll_interval_seconds * 1000)
+                    except Exception as wait_exc:  # noqa: BLE001
+                        if self._is_page_closed_error(wait_exc) and reconnect_attempts < max_reconnect_attempts:
+                            reconnect_attempts += 1
+                            try:
+                                if browser:
+                                    await browser.close()
+                            except Exception:  # noqa: BLE001
+                                pass
+                            browser, page, access_token = await self._reconnect_sora_page(playwright, profile_id)
+                            continue
+                        raise self._service_error(f"任务监听中断：{wait_exc}") from wait_exc
+        finally:
+            # 只有切回页面轮询时才会持有窗口
+            if browser is not None:
                 try:
                     await browser.close()
                 except Exception:  # noqa: BLE001
@@ -429,8 +405,8 @@ class SoraGenerationWorkflow:
                     await self._close_profile(profile_id)
                 except Exception:  # noqa: BLE001
                     pass
-
-        return generation_id
+            if window_lease is not None:
+                window_lease.release()
 
     async def run_sora_generate_job(self, job_id: int) -> None:
         row = sqlite_db.get_ixbrowser_generate_job(job_id)
@@ -530,6 +506,31 @@ class SoraGenerationWorkflow:
         poll_interval_seconds: int,
         job_id: int,
         created_after: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        async with window_arbiter.lease(profile_id, WINDOW_PRIORITY_GENERATION, owner=f"generate_job:{job_id}"):
+            return await self._submit_and_monitor_sora_video(
+                profile_id=profile_id,
+                prompt=prompt,
+                duration=duration,
+                aspect_ratio=aspect_ratio,
+                max_submit_attempts=max_submit_attempts,
+                timeout_seconds=timeout_seconds,
+                poll_interval_seconds=poll_interval_seconds,
+                job_id=job_id,
+                created_after=created_after,
+            )
+
+    async def _submit_and_monitor_sora_video(
+        self,
+        profile_id: int,
+        prompt: str,
+        duration: str,
+        aspect_ratio: str,
+        max_submit_attempts: int,
+        timeout_seconds: int,
+        poll_interval_seconds: int,
+        job_id: int,
+        created_after: Optional[str] = None,
     ) -> Dict[str, Any]:
         duration_to_frames = {
             "10s": 300,
@@ -813,7 +814,9 @@ class SoraGenerationWorkflow:
         task_id: Optional[str],
         task_url: Optional[str],
         prompt: str,
+        attempt: int = 1,
     ) -> None:
+        """发布一次；ixBrowser 繁忙时交给延迟重试定时器按退避重新发起，等待期间不占协程。"""
         row = sqlite_db.get_ixbrowser_generate_job(job_id)
         if not row:
             return
@@ -830,55 +833,62 @@ class SoraGenerationWorkflow:
             )
             return
 
-        base_attempts = int(row.get("publish_attempts") or 0)
         last_error = None
         max_attempts = 8
+        if not sqlite_db.claim_ixbrowser_generate_publish(job_id):
+            return
+        retryable = False
+        try:
+            publish_url = await self._publish_workflow.publish_sora_video(
+                profile_id=profile_id,
+                task_id=task_id,
+                task_url=task_url,
+                prompt=prompt,
+                created_after=str(row.get("started_at") or row.get("created_at") or ""),
+                generation_id=row.get("generation_id"),
+            )
+            if publish_url:
+                publish_post_id = self._service.extract_share_id_from_url(str(publish_url))
+                sqlite_db.update_ixbrowser_generate_job(
+                    job_id,
+                    {
+                        "publish_status": "completed",
+                        "publish_url": publish_url,
+                        "publish_post_id": publish_post_id,
+                        "publish_permalink": publish_url,
+                        "published_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    }
+                )
+                return
+            last_error = "未获取到发布链接"
+        except self._api_error_cls as exc:
+            last_error = f"ixBrowser API error {exc.code}: {exc.message}"
+            retryable = exc.code == 1008
+        except Exception as exc:  # noqa: BLE001
+            last_error = str(exc)
+            retryable = "server busy" in last_error.lower()
 
-        for attempt in range(1, max_attempts + 1):
-            current_attempt = base_attempts + attempt
+        if retryable and attempt < max_attempts:
+            due_at = time.time() + 3.0 * attempt
+            # 重试时间落库，重启后由 restore_publish_retries 挂回定时器
             sqlite_db.update_ixbrowser_generate_job(
                 job_id,
                 {
-                    "publish_status": "running",
-                    "publish_attempts": current_attempt,
-                    "publish_error": None,
+                    "publish_status": "queued",
+                    "publish_error": last_error,
+                    "publish_next_at": datetime.fromtimestamp(due_at).strftime("%Y-%m-%d %H:%M:%S"),
                 }
             )
-            try:
-                publish_url = await self._publish_workflow.publish_sora_video(
-                    profile_id=profile_id,
-                    task_id=task_id,
-                    task_url=task_url,
-                    prompt=prompt,
-                    created_after=str(row.get("started_at") or row.get("created_at") or ""),
-                    generation_id=row.get("generation_id"),
-                )
-                if publish_url:
-                    publish_post_id = self._service.extract_share_id_from_url(str(publish_url))
-                    sqlite_db.update_ixbrowser_generate_job(
-                        job_id,
-                        {
-                            "publish_status": "completed",
-                            "publish_url": publish_url,
-                            "publish_post_id": publish_post_id,
-                            "publish_permalink": publish_url,
-                            "published_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        }
-                    )
-                    return
-                last_error = "未获取到发布链接"
-            except self._api_error_cls as exc:
-                last_error = f"ixBrowser API error {exc.code}: {exc.message}"
-                if exc.code == 1008 and attempt < max_attempts:
-                    await asyncio.sleep(3.0 * attempt)
-                    continue
-            except Exception as exc:  # noqa: BLE001
-                last_error = str(exc)
-                if "server busy" in last_error.lower() and attempt < max_attempts:
-                    await asyncio.sleep(3.0 * attempt)
-                    continue
-
-            break
+            self._schedule_publish_retry(
+                job_id=job_id,
+                profile_id=profile_id,
+                task_id=task_id,
+                task_url=task_url,
+                prompt=prompt,
+                attempt=attempt + 1,
+                due_at=due_at,
+            )
+            return
 
         sqlite_db.update_ixbrowser_generate_job(
             job_id,
@@ -888,11 +898,68 @@ class SoraGenerationWorkflow:
             }
         )
 
+    def _schedule_publish_retry(
+        self,
+        *,
+        job_id: int,
+        profile_id: int,
+        task_id: Optional[str],
+        task_url: Optional[str],
+        prompt: str,
+        attempt: int,
+        due_at: float,
+    ) -> None:
+        retry_timer.schedule(
+            ("compat.generate.publish", int(job_id)),
+            due_at,
+            lambda: spawn(
+                self.run_sora_publish_job(
+                    job_id=job_id,
+                    profile_id=profile_id,
+                    task_id=task_id,
+                    task_url=task_url,
+                    prompt=prompt,
+                    attempt=attempt,
+                ),
+                task_name="compat.generate.publish",
+                metadata={"job_id": int(job_id), "attempt": attempt},
+            ),
+        )
+
+    def restore_publish_retries(self) -> int:
+        """按库里的 publish_next_at 把等待重试的发布挂回定时器（已过期的立即执行），返回数量。"""
+        restored = 0
+        for row in sqlite_db.list_ixbrowser_generate_publish_retries():
+            try:
+                due_at = datetime.strptime(str(row.get("publish_next_at") or ""), "%Y-%m-%d %H:%M:%S").timestamp()
+            except Exception:  # noqa: BLE001
+                continue
+            self._schedule_publish_retry(
+                job_id=int(row["id"]),
+                profile_id=int(row.get("profile_id") or 0),
+                task_id=row.get("task_id"),
+                task_url=row.get("task_url"),
+                prompt=str(row.get("prompt") or ""),
+                attempt=int(row.get("publish_attempts") or 0) + 1,
+                due_at=due_at,
+            )
+            restored += 1
+        return restored
+
     async def run_sora_fetch_generation_id(
         self,
         job_id: int,
         profile_id: int,
         task_id: str,
+    ) -> Optional[str]:
+        async with window_arbiter.lease(profile_id, WINDOW_PRIORITY_GENERATION, owner=f"sora_job:{job_id}:genid"):
+            return await self._run_sora_fetch_generation_id(job_id=job_id, profile_id=profile_id, task_id=task_id)
+
+    async def _run_sora_fetch_generation_id(
+        self,
+        job_id: int,
+        profile_id: int,
+        task_id: str,
     ) -> Optional[str]:
         logger.info("获取 genid 开始: profile=%s task_id=%s", profile_id, task_id)
         deadline = time.monotonic() + self.draft_wait_timeout_seconds
@@ -4,186 +4,415 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
-from datetime import datetime
-from typing import Any, Dict, Optional
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Optional, Union
 from urllib.parse import urlparse
 
 import httpx
 
 from app.db.sqlite import sqlite_db
+from app.services.ixbrowser.adaptive_concurrency import AdaptiveConcurrencyController
+from app.services.queue_notifier import SORA_QUEUE, WATERMARK_QUEUE, queue_notifier
+from app.services.retry_timer import retry_timer
 
 logger = logging.getLogger(__name__)
 
+WATERMARK_RETRY_BASE_DELAY_SEC = 5
+WATERMARK_RETRY_MAX_DELAY_SEC = 300
+# 窗口阶段（提交 / genid / 发布）遇到 ixBrowser 繁忙时的延迟重试
+PHASE_RETRY_MAX_ATTEMPTS = 5
+PHASE_RETRY_BASE_DELAY_SEC = 10
+PHASE_RETRY_MAX_DELAY_SEC = 300
+
+
+class _WindowSlots:
+    """窗口槽位：上限可在运行中调整（自适应并发），调低时已占用的槽位不回收，降到新上限以下前不再发放。"""
+
+    def __init__(self, limit: int) -> None:
+        self._limit = max(1, int(limit))
+        self._in_use = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for fut in self._waiters if not fut.done())
+
+    def set_limit(self, limit: int) -> None:
+        self._limit = max(1, int(limit))
+        self._wake()
+
+    async def acquire(self) -> None:
+        if self._in_use < self._limit and not self._waiters:
+            self._in_use += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self) -> None:
+        self._in_use = max(0, self._in_use - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_use < self._limit:
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self._in_use += 1
+            fut.set_result(None)
+
+
+_Slots = Union[asyncio.Semaphore, _WindowSlots]
+
+
+class _StageSlot:
+    """run_sora_job 当前占用的并发槽位；切换阶段时先释放旧槽位再排队获取新槽位。"""
+
+    def __init__(self) -> None:
+        self._semaphore: Optional[_Slots] = None
+
+    async def switch(self, semaphore: _Slots) -> None:
+        if semaphore is self._semaphore:
+            return
+        self.release()
+        await semaphore.acquire()
+        self._semaphore = semaphore
+
+    def release(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+            self._semaphore = None
+
 
 class SoraJobRunner:
+    """按阶段限流执行 SoraJob。
+
+    - 提交 / genid / 发布需要浏览器窗口，共用 `sora_job_max_concurrency` 个槽位；去水印由 Worker 的独立队列执行；
+    - 进度轮询只发 HTTP 请求，拿到 task_id 后立即释放窗口槽位，转入上限更大的
+      `sora_progress_max_concurrency` 槽位，避免 30 分钟的轮询占住稀缺的提交并发。
+    - 开启自适应并发后窗口槽位上限由 AIMD 控制器按提交成功 / 拥塞信号调整。
+    """
+
     def __init__(self, service, db=sqlite_db) -> None:
         self._service = service
         self._db = db
         self._max_concurrency = max(1, int(getattr(service, "sora_job_max_concurrency", 2) or 2))
-        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._progress_max_concurrency = max(1, int(getattr(service, "sora_progress_max_concurrency", 20) or 20))
+        self._concurrency = AdaptiveConcurrencyController(
+            base=self._max_concurrency,
+            floor=int(getattr(service, "sora_adaptive_concurrency_min", 1) or 1),
+            ceiling=int(getattr(service, "sora_adaptive_concurrency_max", 6) or 6),
+            enabled=bool(getattr(service, "sora_adaptive_concurrency_enabled", False)),
+        )
+        self._semaphore = _WindowSlots(self._concurrency.limit)
+        self._progress_semaphore: Optional[asyncio.Semaphore] = None
+        self._progress_stage_count = 0
+
+    @property
+    def progress_stage_count(self) -> int:
+        """处于进度阶段（含排队等待进度槽位）的任务数。"""
+        return self._progress_stage_count
+
+    @property
+    def window_concurrency_limit(self) -> int:
+        """当前窗口槽位上限（自适应关闭时即 `sora_job_max_concurrency`）。"""
+        return self._concurrency.limit
 
     def set_max_concurrency(self, n: int) -> None:
         n_int = max(1, int(n))
         if self._max_concurrency == n_int:
             return
         self._max_concurrency = n_int
-        if self._semaphore is not None:
-            # 运行中的任务不回收，仅对后续任务生效。
-            self._semaphore = asyncio.Semaphore(n_int)
+        self._apply_concurrency_decision(self._concurrency.set_base(n_int))
+
+    def configure_adaptive_concurrency(self, *, enabled: bool, floor: int, ceiling: int) -> None:
+        self._apply_concurrency_decision(self._concurrency.configure(enabled=enabled, floor=floor, ceiling=ceiling))
+
+    def record_concurrency_signal(self, reason: str) -> None:
+        """拥塞信号（heavy load / CF / ixBrowser 1008）：乘性降低窗口并发。"""
+        self._apply_concurrency_decision(self._concurrency.on_congestion(reason))
+
+    def _record_submit_success(self) -> None:
+        self._apply_concurrency_decision(self._concurrency.on_success())
+
+    def _apply_concurrency_decision(self, decision: Optional[Dict[str, Any]]) -> None:
+        if not decision:
+            return
+        # 运行中的任务不回收槽位，调低只影响后续发放
+        self._semaphore.set_limit(self._concurrency.limit)
+        if decision["to_limit"] > decision["from_limit"]:
+            # 上限提高后 Worker 可多领任务
+            queue_notifier.notify(SORA_QUEUE)
+
+    def concurrency_snapshot(self) -> Dict[str, Any]:
+        snapshot = self._concurrency.snapshot()
+        snapshot["in_use"] = self._semaphore.in_use
+        snapshot["waiting"] = self._semaphore.waiting
+        return snapshot
+
+    def set_progress_max_concurrency(self, n: int) -> None:
+        n_int = max(1, int(n))
+        if self._progress_max_concurrency == n_int:
+            return
+        self._progress_max_concurrency = n_int
+        if self._progress_semaphore is not None:
+            self._progress_semaphore = asyncio.Semaphore(n_int)
+
+    def _get_semaphore(self) -> _WindowSlots:
+        return self._semaphore
+
+    def _get_progress_semaphore(self) -> asyncio.Semaphore:
+        if self._progress_semaphore is None:
+            self._progress_semaphore = asyncio.Semaphore(self._progress_max_concurrency)
+        return self._progress_semaphore
 
     def _service_error(self, message: str) -> Exception:
         err_cls = getattr(self._service, "_service_error_cls", RuntimeError)
         return err_cls(message)
 
     async def run_sora_job(self, job_id: int) -> None:
-        if self._semaphore is None:
-            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        slot = _StageSlot()
+        try:
+            await self._run_sora_job_stages(job_id, slot)
+        finally:
+            slot.release()
 
-        async with self._semaphore:
-            generation_workflow = self._service.sora_generation_workflow
-            publish_workflow = self._service.sora_publish_workflow
+    async def _run_sora_job_stages(self, job_id: int, slot: _StageSlot) -> None:
+        generation_workflow = self._service.sora_generation_workflow
+        publish_workflow = self._service.sora_publish_workflow
 
-            row = self._db.get_sora_job(job_id)
+        row = self._db.get_sora_job(job_id)
+        if not row:
+            return
+        if str(row.get("status") or "") == "canceled":
+            return
+
+        phase = str(row.get("phase") or "queue")
+        if phase == "deferred":
+            # 等待配额释放的任务到点：先重新分配账号（不占窗口槽位）
+            row = await self._service.redispatch_deferred_sora_job(job_id, row)
             if not row:
                 return
-            if str(row.get("status") or "") == "canceled":
+            phase = "queue"
+        if phase == "queue":
+            phase = "submit"
+        if phase != "progress":
+            await slot.switch(self._get_semaphore())
+            # 排队等槽位期间可能已被取消
+            row = self._db.get_sora_job(job_id)
+            if not row or str(row.get("status") or "") == "canceled":
                 return
 
-            phase = str(row.get("phase") or "queue")
-            if phase == "queue":
-                phase = "submit"
-            started_at = row.get("started_at") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self._db.update_sora_job(
-                job_id,
-                {
-                    "status": "running",
-                    "phase": phase,
-                    "started_at": started_at,
-                    "error": None,
-                },
-            )
-            self._db.create_sora_job_event(job_id, phase, "start", "开始执行")
-
-            task_id = row.get("task_id")
-            generation_id = row.get("generation_id")
+        started_at = row.get("started_at") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._db.update_sora_job(
+            job_id,
+            {
+                "status": "running",
+                "phase": phase,
+                "started_at": started_at,
+                "error": None,
+            },
+        )
+        self._db.create_sora_job_event(job_id, phase, "start", "开始执行")
 
-            try:
-                if phase == "submit":
-                    task_id, generation_id = await generation_workflow.run_sora_submit_and_progress(
-                        job_id=job_id,
-                        profile_id=int(row["profile_id"]),
-                        prompt=str(row["prompt"]),
-                        image_url=str(row.get("image_url") or "").strip() or None,
-                        duration=str(row["duration"]),
-                        aspect_ratio=str(row["aspect_ratio"]),
-                        started_at=started_at,
-                    )
-                    phase = "genid"
+        task_id = row.get("task_id")
+        generation_id = row.get("generation_id")
+        access_token: Optional[str] = None
 
-                if phase == "progress":
-                    if not task_id:
-                        raise self._service_error("缺少 task_id，无法进入进度阶段")
+        try:
+            if phase == "submit":
+                task_id, access_token = await generation_workflow.run_sora_submit(
+                    job_id=job_id,
+                    profile_id=int(row["profile_id"]),
+                    prompt=str(row["prompt"]),
+                    image_url=str(row.get("image_url") or "").strip() or None,
+                    duration=str(row["duration"]),
+                    aspect_ratio=str(row["aspect_ratio"]),
+                )
+                self._record_submit_success()
+                phase = "progress"
+                # 等待进度槽位期间中断时，从进度阶段续跑而不是重新提交
+                self._db.update_sora_job(job_id, {"phase": "progress"})
+                # 该 profile 的窗口已空出，同账号排队中的任务可以领取了
+                queue_notifier.notify(SORA_QUEUE)
+
+            if phase == "progress":
+                if not task_id:
+                    raise self._service_error("缺少 task_id，无法进入进度阶段")
+                self._progress_stage_count += 1
+                try:
+                    await slot.switch(self._get_progress_semaphore())
                     generation_id = await generation_workflow.run_sora_progress_only(
                         job_id=job_id,
                         profile_id=int(row["profile_id"]),
                         task_id=task_id,
                         started_at=started_at,
+                        access_token=access_token,
                     )
-                    phase = "genid"
-
-                if phase == "genid":
-                    if not task_id:
-                        raise self._service_error("缺少 task_id，无法获取 genid")
-                    self._db.update_sora_job(job_id, {"phase": "genid"})
-                    self._db.create_sora_job_event(job_id, "genid", "start", "开始获取 genid")
-                    if not generation_id:
-                        generation_id = await generation_workflow.run_sora_fetch_generation_id(
-                            job_id=job_id,
-                            profile_id=int(row["profile_id"]),
-                            task_id=task_id,
-                        )
-                    if not generation_id:
-                        raise self._service_error("20分钟内未捕获generation_id")
-                    self._db.update_sora_job(job_id, {"generation_id": generation_id})
-                    self._db.create_sora_job_event(job_id, "genid", "finish", "已获取 genid")
-                    phase = "publish"
-
-                if phase == "publish":
-                    if not generation_id:
-                        raise self._service_error("缺少 genid，无法发布")
-                    self._db.update_sora_job(job_id, {"phase": "publish"})
-                    self._db.create_sora_job_event(job_id, "publish", "start", "开始发布")
-                    publish_url = await publish_workflow.publish_sora_video(
+                finally:
+                    self._progress_stage_count -= 1
+                phase = "genid"
+
+            if phase in ("genid", "publish"):
+                # 后续阶段仍需浏览器窗口，重新排队获取窗口槽位
+                await slot.switch(self._get_semaphore())
+
+            if phase == "genid":
+                if not task_id:
+                    raise self._service_error("缺少 task_id，无法获取 genid")
+                self._db.update_sora_job(job_id, {"phase": "genid"})
+                self._db.create_sora_job_event(job_id, "genid", "start", "开始获取 genid")
+                if not generation_id:
+                    generation_id = await generation_workflow.run_sora_fetch_generation_id(
+                        job_id=job_id,
                         profile_id=int(row["profile_id"]),
                         task_id=task_id,
-                        task_url=None,
-                        prompt=str(row.get("prompt") or ""),
-                        created_after=started_at,
-                        generation_id=generation_id,
                     )
-                    if not publish_url:
-                        raise self._service_error("发布未返回链接")
-                    publish_permalink = self._normalize_publish_permalink(publish_url)
-                    publish_post_id = self.extract_share_id_from_url(publish_url)
+                if not generation_id:
+                    raise self._service_error("20分钟内未捕获generation_id")
+                self._db.update_sora_job(job_id, {"generation_id": generation_id})
+                self._db.create_sora_job_event(job_id, "genid", "finish", "已获取 genid")
+                phase = "publish"
+
+            if phase == "publish":
+                if not generation_id:
+                    raise self._service_error("缺少 genid，无法发布")
+                self._db.update_sora_job(job_id, {"phase": "publish"})
+                self._db.create_sora_job_event(job_id, "publish", "start", "开始发布")
+                publish_url = await publish_workflow.publish_sora_video(
+                    profile_id=int(row["profile_id"]),
+                    task_id=task_id,
+                    task_url=None,
+                    prompt=str(row.get("prompt") or ""),
+                    created_after=started_at,
+                    generation_id=generation_id,
+                )
+                if not publish_url:
+                    raise self._service_error("发布未返回链接")
+                publish_permalink = self._normalize_publish_permalink(publish_url)
+                publish_post_id = self.extract_share_id_from_url(publish_url)
+                self._db.update_sora_job(
+                    job_id,
+                    {
+                        "publish_url": publish_url,
+                        "publish_post_id": publish_post_id,
+                        "publish_permalink": publish_permalink,
+                        "status": "running",
+                        "phase": "watermark",
+                        "progress_pct": 90,
+                        "watermark_status": "queued",
+                        "watermark_attempts": 0,
+                        "watermark_next_at": None,
+                    },
+                )
+                self._db.create_sora_job_event(job_id, "publish", "finish", "发布完成")
+                # 去水印交给独立队列，解析服务变慢不再占用生成槽位与租约
+                queue_notifier.notify(WATERMARK_QUEUE, job_id)
+                return
+
+            if phase == "watermark":
+                # 中断后回到生成队列的去水印任务：重新交还给去水印队列
+                if str(row.get("watermark_status") or "") != "queued":
                     self._db.update_sora_job(
                         job_id,
                         {
-                            "publish_url": publish_url,
-                            "publish_post_id": publish_post_id,
-                            "publish_permalink": publish_permalink,
-                            "status": "running",
-                            "phase": "watermark",
-                            "progress_pct": 90,
                             "watermark_status": "queued",
                             "watermark_attempts": 0,
+                            "watermark_error": None,
+                            "watermark_next_at": None,
                         },
                     )
-                    self._db.create_sora_job_event(job_id, "publish", "finish", "发布完成")
-
-                    try:
-                        watermark_url = await self.run_sora_watermark(job_id=job_id, publish_url=publish_url)
-                    except Exception as watermark_exc:  # noqa: BLE001
-                        config = self._db.get_watermark_free_config() or {}
-                        if self._is_fallback_enabled(config) and self._is_watermark_fallback_candidate(str(watermark_exc)):
-                            self.complete_sora_job_with_publish_fallback(
-                                job_id=job_id,
-                                publish_url=publish_url,
-                                reason=str(watermark_exc),
-                            )
-                            return
-                        raise
-                    self.complete_sora_job_after_watermark(job_id=job_id, watermark_url=watermark_url)
-                    return
-
-                if phase == "done":
-                    self._db.update_sora_job(
-                        job_id,
-                        {
-                            "status": "completed",
-                            "phase": "done",
-                            "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        },
-                    )
-            except Exception as exc:  # noqa: BLE001
-                current_row = self._db.get_sora_job(job_id) or {}
-                failed_phase = str(current_row.get("phase") or phase)
+                queue_notifier.notify(WATERMARK_QUEUE, job_id)
+                return
+
+            if phase == "done":
                 self._db.update_sora_job(
                     job_id,
                     {
-                        "status": "failed",
-                        "error": str(exc),
-                        "phase": failed_phase,
+                        "status": "completed",
+                        "phase": "done",
                         "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     },
                 )
-                self._db.create_sora_job_event(job_id, failed_phase, "fail", str(exc))
-                if str(failed_phase or "").strip().lower() == "submit" and self._service.is_sora_overload_error(str(exc)):
-                    try:
-                        updated_row = self._db.get_sora_job(job_id) or current_row
-                        await self._service.spawn_sora_job_on_overload(updated_row, trigger="auto")
-                    except Exception as retry_exc:  # noqa: BLE001
-                        self._db.create_sora_job_event(job_id, failed_phase, "auto_retry_giveup", str(retry_exc))
+        except Exception as exc:  # noqa: BLE001
+            current_row = self._db.get_sora_job(job_id) or {}
+            failed_phase = str(current_row.get("phase") or phase)
+            if self._schedule_phase_retry(job_id, failed_phase, exc, current_row):
                 return
+            self._db.update_sora_job(
+                job_id,
+                {
+                    "status": "failed",
+                    "error": str(exc),
+                    "phase": failed_phase,
+                    "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                },
+            )
+            self._db.create_sora_job_event(job_id, failed_phase, "fail", str(exc))
+            if str(failed_phase or "").strip().lower() == "submit" and self._service.is_sora_overload_error(str(exc)):
+                self.record_concurrency_signal("overload")
+                # 换号重建只做分配与入库，不再占着窗口槽位
+                slot.release()
+                try:
+                    updated_row = self._db.get_sora_job(job_id) or current_row
+                    await self._service.spawn_sora_job_on_overload(updated_row, trigger="auto")
+                except Exception as retry_exc:  # noqa: BLE001
+                    self._db.create_sora_job_event(job_id, failed_phase, "auto_retry_giveup", str(retry_exc))
+            return
+
+    @staticmethod
+    def phase_retry_delay_seconds(attempt: int) -> int:
+        """窗口阶段第 attempt 次繁忙后的退避：10s 起指数增长，封顶 5 分钟。"""
+        return int(min(PHASE_RETRY_MAX_DELAY_SEC, PHASE_RETRY_BASE_DELAY_SEC * (2 ** max(0, int(attempt) - 1))))
+
+    @staticmethod
+    def _is_phase_retryable_error(exc: Exception) -> bool:
+        if getattr(exc, "code", None) == 1008:
+            return True
+        return "server busy" in str(exc).lower()
+
+    def _schedule_phase_retry(self, job_id: int, phase: str, exc: Exception, row: Dict[str, Any]) -> bool:
+        """窗口阶段遇到 ixBrowser 繁忙：记下 not_before 后交还租约与槽位，到点由定时器唤醒重新领取该阶段。"""
+        if phase not in ("submit", "genid", "publish") or not self._is_phase_retryable_error(exc):
+            return False
+        attempt = int(row.get("phase_retry_count") or 0) + 1
+        if attempt > PHASE_RETRY_MAX_ATTEMPTS:
+            return False
+        delay = self.phase_retry_delay_seconds(attempt)
+        due = datetime.now() + timedelta(seconds=delay)
+        self._db.update_sora_job(
+            job_id,
+            {
+                "status": "queued",
+                "phase": phase,
+                "not_before": due.strftime("%Y-%m-%d %H:%M:%S"),
+                "phase_retry_count": attempt,
+                "run_last_error": str(exc),
+            },
+        )
+        self._db.create_sora_job_event(
+            job_id,
+            phase,
+            "retry_wait",
+            f"{delay}s 后重试（{attempt}/{PHASE_RETRY_MAX_ATTEMPTS}）：{exc}",
+        )
+        retry_timer.schedule_queue(SORA_QUEUE, job_id, due.timestamp())
+        return True
 
     def complete_sora_job_after_watermark(self, job_id: int, watermark_url: str) -> None:
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -223,26 +452,88 @@ class SoraJobRunner:
         row = self._db.get_sora_job(job_id)
         return bool(row and str(row.get("status") or "") == "canceled")
 
-    async def run_sora_watermark_retry(self, job_id: int, publish_url: str) -> None:
+    def _fail_sora_job_watermark(self, job_id: int, publish_url: str, reason: str, config: Dict[str, Any]) -> None:
+        if self._is_fallback_enabled(config) and self._is_watermark_fallback_candidate(reason):
+            self.complete_sora_job_with_publish_fallback(job_id=job_id, publish_url=publish_url, reason=reason)
+            return
+        failed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._db.update_sora_job(
+            job_id,
+            {
+                "status": "failed",
+                "phase": "watermark",
+                "error": reason,
+                "finished_at": failed_at,
+            },
+        )
+        self._db.create_sora_job_event(job_id, "watermark", "fail", reason)
+
+    @staticmethod
+    def watermark_retry_delay_seconds(attempt: int) -> int:
+        """第 attempt 次失败后的退避：5s 起指数增长，封顶 5 分钟。"""
+        return int(min(WATERMARK_RETRY_MAX_DELAY_SEC, WATERMARK_RETRY_BASE_DELAY_SEC * (2 ** max(0, int(attempt) - 1))))
+
+    async def run_sora_watermark_stage(self, job_id: int) -> None:
+        """去水印队列的单次执行：每次领取只尝试一次，失败按退避重新排队，用完 retry_max 后收尾。"""
+        row = self._db.get_sora_job(job_id)
+        if not row or str(row.get("status") or "") != "running":
+            return
+        if str(row.get("watermark_status") or "") not in {"queued", "running"}:
+            return
+
+        publish_url = str(row.get("publish_url") or "").strip()
+        config = self._db.get_watermark_free_config() or {}
+        retry_max = max(0, min(int(config.get("retry_max") or 0), 10))
+        attempt = int(row.get("watermark_attempts") or 0) + 1
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        patch: Dict[str, Any] = {
+            "phase": "watermark",
+            "watermark_status": "running",
+            "watermark_attempts": attempt,
+            "watermark_error": None,
+            "watermark_next_at": None,
+        }
+        if attempt == 1:
+            patch["watermark_started_at"] = now
+        self._db.update_sora_job(job_id, patch)
+        if attempt == 1:
+            self._db.create_sora_job_event(job_id, "watermark", "start", "开始去水印")
+        else:
+            self._db.create_sora_job_event(job_id, "watermark", "retry", f"重试 {attempt - 1}/{retry_max}")
+
         try:
-            watermark_url = await self.run_sora_watermark(job_id=job_id, publish_url=publish_url)
-            self.complete_sora_job_after_watermark(job_id=job_id, watermark_url=watermark_url)
+            if not bool(config.get("enabled", True)):
+                raise self._service_error("去水印功能已关闭")
+            if not publish_url:
+                raise self._service_error("缺少分享链接，无法去水印")
+            watermark_url = await self._resolve_watermark_url(config, publish_url)
         except Exception as exc:  # noqa: BLE001
-            config = self._db.get_watermark_free_config() or {}
-            if self._is_fallback_enabled(config) and self._is_watermark_fallback_candidate(str(exc)):
-                self.complete_sora_job_with_publish_fallback(job_id=job_id, publish_url=publish_url, reason=str(exc))
+            reason = str(exc)
+            if attempt <= retry_max and self._is_watermark_fallback_candidate(reason):
+                delay = self.watermark_retry_delay_seconds(attempt)
+                due = datetime.now() + timedelta(seconds=delay)
+                self._db.update_sora_job(
+                    job_id,
+                    {
+                        "watermark_status": "queued",
+                        "watermark_error": reason,
+                        "watermark_next_at": due.strftime("%Y-%m-%d %H:%M:%S"),
+                    },
+                )
+                self._db.create_sora_job_event(job_id, "watermark", "retry_wait", f"{delay}s 后重试：{reason}")
+                retry_timer.schedule_queue(WATERMARK_QUEUE, job_id, due.timestamp())
                 return
-            failed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             self._db.update_sora_job(
                 job_id,
                 {
-                    "status": "failed",
-                    "phase": "watermark",
-                    "error": str(exc),
-                    "finished_at": failed_at,
+                    "watermark_status": "failed",
+                    "watermark_error": reason or "去水印失败",
+                    "watermark_finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 },
             )
-            self._db.create_sora_job_event(job_id, "watermark", "fail", str(exc))
+            self._fail_sora_job_watermark(job_id=job_id, publish_url=publish_url, reason=reason, config=config)
+            return
+        self.complete_sora_job_after_watermark(job_id=job_id, watermark_url=watermark_url)
 
     @staticmethod
     def _is_fallback_enabled(config: Dict[str, Any]) -> bool:
@@ -272,76 +563,20 @@ class SoraJobRunner:
             return f"https://sora.chatgpt.com{parsed.path}"
         return None
 
-    async def run_sora_watermark(self, job_id: int, publish_url: str) -> str:
-        config = self._db.get_watermark_free_config() or {}
-        enabled = bool(config.get("enabled", True))
-        if not enabled:
-            raise self._service_error("去水印功能已关闭")
-
+    async def _resolve_watermark_url(self, config: Dict[str, Any], publish_url: str) -> str:
         parse_method = str(config.get("parse_method") or "custom").strip().lower()
-        parse_url = str(config.get("custom_parse_url") or "").strip()
-        parse_token = str(config.get("custom_parse_token") or "").strip()
-        parse_path = self.normalize_custom_parse_path(str(config.get("custom_parse_path") or ""))
-        retry_max = int(config.get("retry_max") or 0)
-        retry_max = max(0, min(retry_max, 10))
-
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self._db.update_sora_job(
-            job_id,
-            {
-                "phase": "watermark",
-                "watermark_status": "running",
-                "watermark_started_at": now,
-                "watermark_error": None,
-            },
-        )
-        self._db.create_sora_job_event(job_id, "watermark", "start", "开始去水印")
-
-        last_error: Optional[str] = None
-        for attempt in range(1, retry_max + 2):
-            self._db.update_sora_job(
-                job_id,
-                {
-                    "watermark_attempts": attempt,
-                    "watermark_error": None,
-                },
+        if parse_method == "third_party":
+            watermark_url = self.build_third_party_watermark_url(publish_url)
+        else:
+            watermark_url = await self.call_custom_watermark_parse(
+                publish_url=publish_url,
+                parse_url=str(config.get("custom_parse_url") or "").strip(),
+                parse_path=self.normalize_custom_parse_path(str(config.get("custom_parse_path") or "")),
+                parse_token=str(config.get("custom_parse_token") or "").strip(),
             )
-            if attempt > 1:
-                self._db.create_sora_job_event(
-                    job_id,
-                    "watermark",
-                    "retry",
-                    f"重试 {attempt - 1}/{retry_max}",
-                )
-            try:
-                if parse_method == "third_party":
-                    watermark_url = self.build_third_party_watermark_url(publish_url)
-                else:
-                    watermark_url = await self.call_custom_watermark_parse(
-                        publish_url=publish_url,
-                        parse_url=parse_url,
-                        parse_path=parse_path,
-                        parse_token=parse_token,
-                    )
-                if not watermark_url:
-                    raise self._service_error("去水印未返回链接")
-                return watermark_url
-            except Exception as exc:  # noqa: BLE001
-                last_error = str(exc)
-                self._db.update_sora_job(job_id, {"watermark_error": last_error})
-                if attempt > retry_max:
-                    break
-
-        finished_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self._db.update_sora_job(
-            job_id,
-            {
-                "watermark_status": "failed",
-                "watermark_error": last_error or "去水印失败",
-                "watermark_finished_at": finished_at,
-            },
-        )
-        raise self._service_error(last_error or "去水印失败")
+        if not watermark_url:
+            raise self._service_error("去水印未返回链接")
+        return watermark_url
 
     @staticmethod
     def normalize_custom_parse_path(path: str) -> str:
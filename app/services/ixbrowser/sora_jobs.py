@@ -5,9 +5,10 @@ from __future__ import annotations
 import logging
 import re
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
+from app.core.config import settings
 from app.db.sqlite import sqlite_db
 from app.models.ixbrowser import (
     IXBrowserGenerateJob,
@@ -20,10 +21,15 @@ from app.models.ixbrowser import (
 )
 from app.services.account_dispatch_service import AccountDispatchNoAvailableError, account_dispatch_service
 from app.services.ixbrowser.errors import IXBrowserNotFoundError, IXBrowserServiceError
+from app.services.queue_notifier import SORA_QUEUE, WATERMARK_QUEUE, queue_notifier
+from app.services.retry_timer import retry_timer
 from app.services.task_runtime import spawn
 
 logger = logging.getLogger(__name__)
 
+# 预计释放时间只是扫描推算值，到点后稍等再分配
+_DEFERRED_RESET_BUFFER_SECONDS = 30
+
 
 class SoraJobsMixin:
     async def create_sora_generate_job(
@@ -107,6 +113,8 @@ class SoraJobsMixin:
             }
         )
 
+        # 手动发布取代尚在退避中的自动重试
+        retry_timer.cancel(("compat.generate.publish", int(job_id)))
         spawn(
             self._sora_generation_workflow.run_sora_publish_job(
                 job_id=job_id,
@@ -193,6 +201,7 @@ class SoraJobsMixin:
         dispatch_quantity_score = None
         dispatch_quality_score = None
         selected_window_name: Optional[str] = None
+        deferred_until: Optional[str] = None
         dispatch_calc_ms = 0.0
         window_lookup_ms = 0.0
 
@@ -208,25 +217,32 @@ class SoraJobsMixin:
             selected_window_name = str(target_window.name or "").strip() or f"窗口-{selected_profile_id}"
             dispatch_reason = f"手动指定 profile={selected_profile_id}"
         else:
+            weight = None
             try:
                 dispatch_started = time.perf_counter()
                 weight = await account_dispatch_service.pick_best_account(group_title=group_title)
                 dispatch_calc_ms = (time.perf_counter() - dispatch_started) * 1000.0
             except AccountDispatchNoAvailableError as exc:
-                raise IXBrowserServiceError(str(exc)) from exc
-            selected_profile_id = int(weight.profile_id)
-            selected_window_name = str(weight.window_name or "").strip() or None
-            if not selected_window_name:
-                lookup_started = time.perf_counter()
-                target_window = await self._get_window_from_group(selected_profile_id, group_title)
-                window_lookup_ms = (time.perf_counter() - lookup_started) * 1000.0
-                if not target_window:
-                    raise IXBrowserNotFoundError(f"自动分配失败，窗口 {selected_profile_id} 不在 {group_title} 分组中")
-                selected_window_name = str(target_window.name or "").strip() or f"窗口-{selected_profile_id}"
-            dispatch_score = float(weight.score_total)
-            dispatch_quantity_score = float(weight.score_quantity)
-            dispatch_quality_score = float(weight.score_quality)
-            dispatch_reason = " | ".join(weight.reasons or []) or "自动分配"
+                if exc.earliest_reset_at is None:
+                    raise IXBrowserServiceError(str(exc)) from exc
+                # 账号只是在等配额释放：先收下任务，到点后由 Worker 重新分配
+                selected_profile_id = 0
+                deferred_until = self._deferred_not_before(exc.earliest_reset_at)
+                dispatch_reason = f"{exc}；延后到 {deferred_until} 重新分配"
+            if weight is not None:
+                selected_profile_id = int(weight.profile_id)
+                selected_window_name = str(weight.window_name or "").strip() or None
+                if not selected_window_name:
+                    lookup_started = time.perf_counter()
+                    target_window = await self._get_window_from_group(selected_profile_id, group_title)
+                    window_lookup_ms = (time.perf_counter() - lookup_started) * 1000.0
+                    if not target_window:
+                        raise IXBrowserNotFoundError(f"自动分配失败，窗口 {selected_profile_id} 不在 {group_title} 分组中")
+                    selected_window_name = str(target_window.name or "").strip() or f"窗口-{selected_profile_id}"
+                dispatch_score = float(weight.score_total)
+                dispatch_quantity_score = float(weight.score_quantity)
+                dispatch_quality_score = float(weight.score_quality)
+                dispatch_reason = " | ".join(weight.reasons or []) or "自动分配"
 
         job_id = sqlite_db.create_sora_job(
             {
@@ -238,7 +254,8 @@ class SoraJobsMixin:
                 "duration": request.duration,
                 "aspect_ratio": request.aspect_ratio,
                 "status": "queued",
-                "phase": "queue",
+                "phase": "deferred" if deferred_until else "queue",
+                "not_before": deferred_until,
                 "progress_pct": 0,
                 "dispatch_mode": dispatch_mode,
                 "dispatch_score": dispatch_score,
@@ -249,8 +266,14 @@ class SoraJobsMixin:
                 "operator_username": operator_user.get("username") if isinstance(operator_user, dict) else None,
             }
         )
-        sqlite_db.create_sora_job_event(job_id, "dispatch", "select", dispatch_reason)
-        sqlite_db.create_sora_job_event(job_id, "queue", "queue", "进入队列")
+        if deferred_until:
+            sqlite_db.create_sora_job_event(job_id, "dispatch", "defer", dispatch_reason)
+            sqlite_db.create_sora_job_event(job_id, "deferred", "queue", f"等待配额释放，{deferred_until} 后重新分配")
+            retry_timer.schedule_queue(SORA_QUEUE, job_id, self._not_before_timestamp(deferred_until))
+        else:
+            sqlite_db.create_sora_job_event(job_id, "dispatch", "select", dispatch_reason)
+            sqlite_db.create_sora_job_event(job_id, "queue", "queue", "进入队列")
+            queue_notifier.notify(SORA_QUEUE, job_id)
 
         total_ms = (time.perf_counter() - create_started) * 1000.0
         logger.info(
@@ -268,6 +291,71 @@ class SoraJobsMixin:
         job = self.get_sora_job(job_id)
         return SoraJobCreateResponse(job=job)
 
+    @staticmethod
+    def _deferred_not_before(earliest_reset_at: Optional[datetime]) -> str:
+        now = datetime.now()
+        if earliest_reset_at is None:
+            target = now + timedelta(seconds=max(30, int(settings.sora_deferred_retry_sec)))
+        else:
+            target = max(earliest_reset_at, now) + timedelta(seconds=_DEFERRED_RESET_BUFFER_SECONDS)
+        return target.strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def _not_before_timestamp(not_before: str) -> float:
+        return datetime.strptime(not_before, "%Y-%m-%d %H:%M:%S").timestamp()
+
+    async def redispatch_deferred_sora_job(self, job_id: int, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """到点的延后任务重新分配账号。
+
+        分到账号返回更新后的任务行（从提交阶段继续）；仍无账号则推迟 `not_before` 或超过最长延后时间判失败，返回 None。
+        """
+        group_title = str(row.get("group_title") or "Sora").strip() or "Sora"
+        try:
+            weight = await account_dispatch_service.pick_best_account(group_title=group_title)
+        except AccountDispatchNoAvailableError as exc:
+            try:
+                created_at = datetime.strptime(str(row.get("created_at") or ""), "%Y-%m-%d %H:%M:%S")
+            except Exception:  # noqa: BLE001
+                created_at = None
+            max_wait = timedelta(hours=max(1, int(settings.sora_deferred_max_wait_hours)))
+            if created_at is not None and datetime.now() - created_at >= max_wait:
+                message = f"等待配额超过 {int(max_wait.total_seconds() // 3600)} 小时：{exc}"
+                sqlite_db.update_sora_job(
+                    job_id,
+                    {
+                        "status": "failed",
+                        "error": message,
+                        "not_before": None,
+                        "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    },
+                )
+                sqlite_db.create_sora_job_event(job_id, "deferred", "fail", message)
+                return None
+            deferred_until = self._deferred_not_before(exc.earliest_reset_at)
+            reason = f"{exc}；延后到 {deferred_until} 重新分配"
+            sqlite_db.update_sora_job(job_id, {"not_before": deferred_until, "dispatch_reason": reason})
+            sqlite_db.create_sora_job_event(job_id, "dispatch", "defer", reason)
+            retry_timer.schedule_queue(SORA_QUEUE, job_id, self._not_before_timestamp(deferred_until))
+            return None
+
+        profile_id = int(weight.profile_id)
+        dispatch_reason = " | ".join(weight.reasons or []) or "自动分配"
+        sqlite_db.update_sora_job(
+            job_id,
+            {
+                "profile_id": profile_id,
+                "window_name": str(weight.window_name or "").strip() or f"窗口-{profile_id}",
+                "phase": "queue",
+                "not_before": None,
+                "dispatch_score": float(weight.score_total),
+                "dispatch_quantity_score": float(weight.score_quantity),
+                "dispatch_quality_score": float(weight.score_quality),
+                "dispatch_reason": dispatch_reason,
+            },
+        )
+        sqlite_db.create_sora_job_event(job_id, "dispatch", "select", dispatch_reason)
+        return sqlite_db.get_sora_job(job_id)
+
     def get_sora_job(self, job_id: int, follow_retry: bool = False) -> SoraJob:
         row = sqlite_db.get_sora_job(job_id)
         if not row:
@@ -434,6 +522,7 @@ class SoraJobsMixin:
         )
         sqlite_db.create_sora_job_event(new_job_id, "dispatch", "select", dispatch_reason)
         sqlite_db.create_sora_job_event(new_job_id, "queue", "queue", "进入队列")
+        queue_notifier.notify(SORA_QUEUE, new_job_id)
         total_ms = (time.perf_counter() - retry_started) * 1000.0
         logger.info(
             "sora.job.overload.retry.spawned | old_job_id=%s | new_job_id=%s | group=%s | from_profile=%s | "
@@ -478,6 +567,7 @@ class SoraJobsMixin:
             patch["progress_pct"] = 0
         sqlite_db.update_sora_job(job_id, patch)
         sqlite_db.create_sora_job_event(job_id, phase, "retry", "手动重试")
+        queue_notifier.notify(SORA_QUEUE, job_id)
         return self.get_sora_job(job_id)
 
     async def retry_sora_watermark(self, job_id: int) -> SoraJob:
@@ -505,16 +595,13 @@ class SoraJobsMixin:
                 "watermark_attempts": 0,
                 "watermark_started_at": None,
                 "watermark_finished_at": None,
+                "watermark_next_at": None,
                 "error": None,
                 "finished_at": None,
             },
         )
         sqlite_db.create_sora_job_event(job_id, "watermark", "retry", "手动重试")
-        spawn(
-            self._run_sora_watermark_retry(job_id=job_id, publish_url=publish_url),
-            task_name="sora.job.watermark.retry",
-            metadata={"job_id": int(job_id)},
-        )
+        queue_notifier.notify(WATERMARK_QUEUE, job_id)
         return self.get_sora_job(job_id)
 
     async def parse_sora_watermark_link(self, share_url: str) -> Dict[str, str]:
@@ -599,18 +686,16 @@ class SoraJobsMixin:
     async def _run_sora_job(self, job_id: int) -> None:
         await self._sora_job_runner.run_sora_job(job_id)
 
+    async def run_sora_watermark_stage(self, job_id: int) -> None:
+        """去水印队列执行入口：每次领取尝试一次，失败由执行器按退避重新排队。"""
+        await self._sora_job_runner.run_sora_watermark_stage(job_id)
+
     def _complete_sora_job_after_watermark(self, job_id: int, watermark_url: str) -> None:
         self._sora_job_runner.complete_sora_job_after_watermark(job_id, watermark_url)
 
     def _is_sora_job_canceled(self, job_id: int) -> bool:
         return self._sora_job_runner.is_sora_job_canceled(job_id)
 
-    async def _run_sora_watermark_retry(self, job_id: int, publish_url: str) -> None:
-        await self._sora_job_runner.run_sora_watermark_retry(job_id, publish_url)
-
-    async def _run_sora_watermark(self, job_id: int, publish_url: str) -> str:
-        return await self._sora_job_runner.run_sora_watermark(job_id, publish_url)
-
     @staticmethod
     def _normalize_custom_parse_path(path: str) -> str:
         from app.services.ixbrowser.sora_job_runner import SoraJobRunner  # noqa: WPS433
@@ -684,6 +769,7 @@ class SoraJobsMixin:
             retry_root_job_id=row.get("retry_root_job_id"),
             retry_index=row.get("retry_index"),
             resolved_from_job_id=row.get("resolved_from_job_id"),
+            not_before=row.get("not_before"),
             error=row.get("error"),
             proxy_mode=proxy_bind.get("proxy_mode"),
             proxy_id=proxy_bind.get("proxy_id"),
@@ -0,0 +1,100 @@
+"""按账号合并 Sora pending 列表轮询。
+
+同一账号下多个任务在进度阶段都要拉 `/backend/nf/pending/v2`，返回的是同一份列表。
+这里按 (profile_id, endpoint) 合并：同一时刻只发一次请求，其余任务等待同一个 Future；
+结果在轮询间隔内复用，使每个账号每个间隔只打一次接口，降低同代理下的 CF 风险。
+pending 已结束、草稿还没出现时的 `/backend/project_y/profile/drafts` 查询也走同一套合并。
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+PendingFetcher = Callable[[], Awaitable[Dict[str, Any]]]
+
+# 结果在 0.8×间隔内视为新鲜：各任务按间隔轮询时，每轮只有第一个到达的任务触发请求
+_FRESH_RATIO = 0.8
+# 连续拿到空列表时间隔翻倍，最多放大到基础间隔的 8 倍
+_MAX_BACKOFF_FACTOR = 8.0
+
+
+@dataclass
+class _PendingSlot:
+    interval: float
+    result: Optional[Dict[str, Any]] = None
+    fetched_at: float = 0.0
+    inflight: Optional[asyncio.Task] = None
+
+
+class SoraPendingPoller:
+    def __init__(self, base_interval: Callable[[], float]) -> None:
+        self._base_interval = base_interval
+        self._slots: Dict[Tuple[int, str], _PendingSlot] = {}
+        self._requests = 0
+        self._shared = 0
+
+    def _base(self) -> float:
+        return max(0.0, float(self._base_interval() or 0))
+
+    async def fetch(self, profile_id: int, endpoint: str, fetcher: PendingFetcher) -> Dict[str, Any]:
+        """返回该账号该接口的 pending 结果；间隔内或已有请求在途时复用，不重复请求。"""
+        key = (int(profile_id), str(endpoint))
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = _PendingSlot(interval=self._base())
+            self._slots[key] = slot
+
+        now = time.monotonic()
+        if slot.result is not None and (now - slot.fetched_at) < slot.interval * _FRESH_RATIO:
+            self._shared += 1
+            return slot.result
+
+        task = slot.inflight
+        if task is not None and (task.done() or task.get_loop() is not asyncio.get_running_loop()):
+            task = None
+        if task is None:
+            task = asyncio.ensure_future(self._run_fetch(key, slot, fetcher))
+            slot.inflight = task
+            self._requests += 1
+        else:
+            self._shared += 1
+        # shield：某个等待方被取消不影响其他任务拿结果
+        return await asyncio.shield(task)
+
+    async def _run_fetch(self, key: Tuple[int, str], slot: _PendingSlot, fetcher: PendingFetcher) -> Dict[str, Any]:
+        try:
+            result = await fetcher()
+        finally:
+            slot.inflight = None
+        slot.result = result
+        slot.fetched_at = time.monotonic()
+        slot.interval = self._next_interval(slot.interval, result)
+        return result
+
+    def _next_interval(self, current: float, result: Dict[str, Any]) -> float:
+        base = self._base()
+        payload = result.get("json") if isinstance(result, dict) else None
+        if int(result.get("status") or 0) == 200 and isinstance(payload, list) and not payload:
+            # 账号下没有排队中的任务：放慢拉取，等提交新任务时 invalidate 重置
+            return min(max(current, base) * 2, base * _MAX_BACKOFF_FACTOR)
+        return base
+
+    def invalidate(self, profile_id: int) -> None:
+        """账号提交了新任务后丢弃缓存并重置退避，保证下一次轮询拿到最新列表。"""
+        profile_key = int(profile_id)
+        for key in [key for key in self._slots if key[0] == profile_key]:
+            slot = self._slots[key]
+            if slot.inflight is None:
+                self._slots.pop(key, None)
+            else:
+                slot.result = None
+                slot.interval = self._base()
+
+    def interval_for(self, profile_id: int, endpoint: str) -> float:
+        slot = self._slots.get((int(profile_id), str(endpoint)))
+        return slot.interval if slot else self._base()
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self._requests, "shared": self._shared, "profiles": len({key[0] for key in self._slots})}
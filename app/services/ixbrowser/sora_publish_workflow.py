@@ -18,18 +18,25 @@ import httpx
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from app.db.sqlite import sqlite_db
+from app.services.ixbrowser.sora_pending_poller import SoraPendingPoller
+from app.services.ixbrowser.window_arbiter import WINDOW_PRIORITY_PUBLISH, window_arbiter
 from app.services.task_runtime import spawn
 
 logger = logging.getLogger(__name__)
 
 
 class SoraPublishWorkflow:
-    DRAFT_RETRY_BACKOFF_SECONDS: Tuple[int, ...] = (1, 2, 3, 10, 60)
-
     def __init__(self, service) -> None:
         self._service = service
         self._service_error_cls = getattr(service, "_service_error_cls", RuntimeError)
         self._connection_error_cls = getattr(service, "_connection_error_cls", RuntimeError)
+        self._pending_poller = SoraPendingPoller(
+            lambda: float(getattr(self._service, "generate_poll_interval_seconds", 6))
+        )
+
+    @property
+    def pending_poller(self) -> SoraPendingPoller:
+        return self._pending_poller
 
     def _require_service_method(self, name: str):
         method = getattr(self._service, name, None)
@@ -153,14 +160,15 @@ class SoraPublishWorkflow:
         created_after: Optional[str] = None,
         generation_id: Optional[str] = None,
     ) -> Optional[str]:
-        return await self._publish_sora_video(
-            profile_id=profile_id,
-            task_id=task_id,
-            task_url=task_url,
-            prompt=prompt,
-            created_after=created_after,
-            generation_id=generation_id,
-        )
+        async with window_arbiter.lease(profile_id, WINDOW_PRIORITY_PUBLISH, owner=f"publish:{task_id or generation_id}"):
+            return await self._publish_sora_video(
+                profile_id=profile_id,
+                task_id=task_id,
+                task_url=task_url,
+                prompt=prompt,
+                created_after=created_after,
+                generation_id=generation_id,
+            )
 
     async def publish_sora_from_page(
         self,
@@ -3384,15 +3392,6 @@ class SoraPublishWorkflow:
             "source": source,
         }
 
-    async def _wait_poll_backoff(self, seconds: float, *, page=None) -> None:
-        delay = max(float(seconds or 0), 0.0)
-        if delay <= 0:
-            return
-        if page is not None and hasattr(page, "wait_for_timeout"):
-            await page.wait_for_timeout(int(delay * 1000))
-            return
-        await asyncio.sleep(delay)
-
     def _is_cf_result(self, result: Dict[str, Any]) -> bool:
         status = result.get("status")
         raw = result.get("raw")
@@ -3541,43 +3540,21 @@ class SoraPublishWorkflow:
         if not should_fetch_drafts:
             return self._state_processing(progress=pending_progress, pending_missing=False, source="page")
 
-        pending_from_draft = pending_progress
-        delays = self.DRAFT_RETRY_BACKOFF_SECONDS
-        for idx in range(len(delays) + 1):
-            if idx > 0:
-                await self._wait_poll_backoff(delays[idx - 1], page=page)
-            try:
-                target = await self._fetch_draft_item_by_task_id(
-                    page=page,
-                    task_id=task_id,
-                    limit=15,
-                    max_pages=3,
-                    retries=1,
-                    delay_ms=0,
-                )
-            except Exception as exc:  # noqa: BLE001
-                if self._is_page_closed_error(exc):
-                    raise
-                target = None
-
-            if not isinstance(target, dict):
-                continue
-
-            reason = target.get("reason_str") or target.get("markdown_reason_str")
-            kind = str(target.get("kind") or "")
-            task_url = target.get("url") or target.get("downloadable_url")
-            progress = self._pick_progress(target)
-            pending_from_draft = progress if progress is not None else pending_from_draft
-            generation_id = self._extract_generation_id(target)
-
-            if self._normalize_error_text(reason):
-                return self._state_failed(reason, progress=pending_from_draft, source="page")
-            if kind == "sora_content_violation":
-                return self._state_failed("内容审核未通过", progress=pending_from_draft, source="page")
-            if generation_id:
-                return self._state_completed(task_url=task_url, generation_id=generation_id, source="page")
-
-        return self._state_processing(progress=pending_from_draft, pending_missing=True, source="page")
+        # 草稿暂未出现时不在这里退避重试：返回 processing，由外层按轮询间隔再查，等待期间不占窗口与槽位
+        try:
+            target = await self._fetch_draft_item_by_task_id(
+                page=page,
+                task_id=task_id,
+                limit=15,
+                max_pages=3,
+                retries=1,
+                delay_ms=0,
+            )
+        except Exception as exc:  # noqa: BLE001
+            if self._is_page_closed_error(exc):
+                raise
+            target = None
+        return self._state_from_draft_target(target, pending_progress, source="page")
 
     async def _poll_sora_task_via_proxy_api(
         self,
@@ -3595,11 +3572,16 @@ class SoraPublishWorkflow:
             "https://sora.chatgpt.com/backend/nf/pending",
         )
         for endpoint in pending_endpoints:
-            pending_result = await self._fetch_json_via_proxy_api(
-                profile_id=profile_id,
-                access_token=access_token,
-                url=endpoint,
-                request_context=request_context,
+            # 同账号的任务共用一次 pending 拉取，各自在列表里找自己的 task_id
+            pending_result = await self._pending_poller.fetch(
+                profile_id,
+                endpoint,
+                lambda endpoint=endpoint: self._fetch_json_via_proxy_api(
+                    profile_id=profile_id,
+                    access_token=access_token,
+                    url=endpoint,
+                    request_context=request_context,
+                ),
             )
             if self._is_cf_result(pending_result):
                 return self._state_processing(
@@ -3641,52 +3623,53 @@ class SoraPublishWorkflow:
             return self._state_processing(progress=pending_progress, pending_missing=False, source="proxy_api")
 
         task_id_norm = self._normalize_task_id(task_id)
-        pending_from_draft = pending_progress
-        delays = self.DRAFT_RETRY_BACKOFF_SECONDS
-        for idx in range(len(delays) + 1):
-            if idx > 0:
-                await self._wait_poll_backoff(delays[idx - 1])
-
-            drafts_result = await self._fetch_json_via_proxy_api(
+        drafts_url = "https://sora.chatgpt.com/backend/project_y/profile/drafts?limit=15"
+        # 草稿未出现时每轮都会查 drafts：同账号的任务共用一次拉取，间隔内复用结果
+        drafts_result = await self._pending_poller.fetch(
+            profile_id,
+            drafts_url,
+            lambda: self._fetch_json_via_proxy_api(
                 profile_id=profile_id,
                 access_token=access_token,
-                url="https://sora.chatgpt.com/backend/project_y/profile/drafts?limit=15",
+                url=drafts_url,
                 request_context=request_context,
+            ),
+        )
+        if self._is_cf_result(drafts_result):
+            return self._state_processing(
+                progress=pending_progress,
+                pending_missing=True,
+                cf_challenge=True,
+                source="proxy_api",
             )
-            if self._is_cf_result(drafts_result):
-                return self._state_processing(
-                    progress=pending_from_draft,
-                    pending_missing=True,
-                    cf_challenge=True,
-                    source="proxy_api",
-                )
-            drafts_json = drafts_result.get("json")
-            items = drafts_json.get("items") if isinstance(drafts_json, dict) else None
-            if not isinstance(items, list) and isinstance(drafts_json, dict):
-                items = drafts_json.get("data")
-            if not isinstance(items, list):
-                continue
-
-            target = None
-            for item in items:
-                if isinstance(item, dict) and task_id_norm and self._match_task_id_in_item(item, task_id_norm):
-                    target = item
-                    break
-            if not isinstance(target, dict):
-                continue
-
-            reason = target.get("reason_str") or target.get("markdown_reason_str")
-            kind = str(target.get("kind") or "")
-            task_url = target.get("url") or target.get("downloadable_url")
-            progress = self._pick_progress(target)
-            pending_from_draft = progress if progress is not None else pending_from_draft
-            generation_id = self._extract_generation_id(target)
-
-            if self._normalize_error_text(reason):
-                return self._state_failed(reason, progress=pending_from_draft, source="proxy_api")
-            if kind == "sora_content_violation":
-                return self._state_failed("内容审核未通过", progress=pending_from_draft, source="proxy_api")
-            if generation_id:
-                return self._state_completed(task_url=task_url, generation_id=generation_id, source="proxy_api")
-
-        return self._state_processing(progress=pending_from_draft, pending_missing=True, source="proxy_api")
+        drafts_json = drafts_result.get("json")
+        items = drafts_json.get("items") if isinstance(drafts_json, dict) else None
+        if not isinstance(items, list) and isinstance(drafts_json, dict):
+            items = drafts_json.get("data")
+
+        target = None
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and task_id_norm and self._match_task_id_in_item(item, task_id_norm):
+                target = item
+                break
+        return self._state_from_draft_target(target, pending_progress, source="proxy_api")
+
+    def _state_from_draft_target(self, target: Any, pending_progress: Any, *, source: str) -> Dict[str, Any]:
+        """单次草稿查询结果转成轮询状态；未命中时返回 pending_missing 的 processing。"""
+        if not isinstance(target, dict):
+            return self._state_processing(progress=pending_progress, pending_missing=True, source=source)
+
+        reason = target.get("reason_str") or target.get("markdown_reason_str")
+        kind = str(target.get("kind") or "")
+        task_url = target.get("url") or target.get("downloadable_url")
+        progress = self._pick_progress(target)
+        pending_from_draft = progress if progress is not None else pending_progress
+        generation_id = self._extract_generation_id(target)
+
+        if self._normalize_error_text(reason):
+            return self._state_failed(reason, progress=pending_from_draft, source=source)
+        if kind == "sora_content_violation":
+            return self._state_failed("内容审核未通过", progress=pending_from_draft, source=source)
+        if generation_id:
+            return self._state_completed(task_url=task_url, generation_id=generation_id, source=source)
+        return self._state_processing(progress=pending_from_draft, pending_missing=True, source=source)
@@ -0,0 +1,328 @@
+"""ixBrowser 窗口租约仲裁。
+
+扫描、养号、生成提交、genid、发布都会各自打开 ixBrowser 窗口。这里统一发放窗口租约：
+- 同一 profile 同一时刻只发给一个持有者（同一调用链内重入直接放行，例如发布内的重连）；
+- 进程内同时打开的窗口数不超过 `BROWSER_MAX_OPEN_WINDOWS`；
+- 调用 `enable_shared_leases` 后，每次发放还要在 SQLite `browser_window_leases` 表写入租约行，
+  profile 互斥与窗口上限对所有进程（API 与独立 Worker）生效；其他进程释放的名额靠定时轮询发现；
+- 名额紧张时按优先级发放（生成 > 发布 > 扫描 > 养号），同级先到先得；等待越久优先级越高，
+  避免低优先级任务被持续饿死。目标 profile 被占用的等待者不会挡住其他 profile。
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, FrozenSet, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+WINDOW_PRIORITY_GENERATION = 0
+WINDOW_PRIORITY_PUBLISH = 1
+WINDOW_PRIORITY_SCAN = 2
+WINDOW_PRIORITY_NURTURE = 3
+
+WINDOW_PRIORITY_NAMES = {
+    WINDOW_PRIORITY_GENERATION: "generation",
+    WINDOW_PRIORITY_PUBLISH: "publish",
+    WINDOW_PRIORITY_SCAN: "scan",
+    WINDOW_PRIORITY_NURTURE: "nurture",
+}
+
+# 每等待这么久，有效优先级提升一级
+_AGING_SECONDS = 60.0
+# 每个优先级保留最近的等待耗时用于计算 p95
+_WAIT_SAMPLE_SIZE = 200
+# 跨进程模式下：轮询其他进程释放的名额、顺带续租的间隔
+_SHARED_POLL_SECONDS = 1.0
+
+# 当前调用链已持有的 profile（子任务继承），用于重入判断
+_held_profiles: contextvars.ContextVar[FrozenSet[int]] = contextvars.ContextVar(
+    "window_arbiter_held_profiles",
+    default=frozenset(),
+)
+
+
+@dataclass
+class _Waiter:
+    profile_id: int
+    priority: int
+    owner: str
+    seq: int
+    enqueued_at: float
+    future: asyncio.Future
+
+
+@dataclass
+class _PriorityStats:
+    granted: int = 0
+    wait_total_ms: float = 0.0
+    wait_max_ms: float = 0.0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=_WAIT_SAMPLE_SIZE))
+
+
+class WindowLease:
+    def __init__(
+        self,
+        arbiter: Optional["WindowArbiter"],
+        profile_id: int,
+        priority: int,
+        owner: str,
+        wait_ms: float = 0.0,
+    ) -> None:
+        self._arbiter = arbiter
+        self.profile_id = int(profile_id)
+        self.priority = int(priority)
+        self.owner = owner
+        self.wait_ms = wait_ms
+        self.acquired_at = time.monotonic()
+        self._released = arbiter is None
+
+    @property
+    def reentrant(self) -> bool:
+        return self._arbiter is None
+
+    def release(self) -> None:
+        """归还租约；重复调用无副作用。重入得到的租约不占名额，release 为空操作。"""
+        if self._released:
+            return
+        self._released = True
+        _held_profiles.set(_held_profiles.get() - {self.profile_id})
+        self._arbiter._release(self)  # noqa: SLF001
+
+
+class WindowArbiter:
+    def __init__(self, capacity: Callable[[], int]) -> None:
+        self._capacity = capacity
+        self._holders: Dict[int, WindowLease] = {}
+        self._waiters: List[_Waiter] = []
+        self._seq = 0
+        self._stats: Dict[int, _PriorityStats] = {}
+        self._peak_in_use = 0
+        self._busy_area = 0.0
+        self._started_at = time.monotonic()
+        self._last_change_at = self._started_at
+        # 跨进程租约（SQLite），None 表示只在进程内仲裁
+        self._store: Any = None
+        self._shared_owner = ""
+        self._shared_ttl = 60
+        self._last_renew_at = 0.0
+        self._tick_handle: Optional[asyncio.TimerHandle] = None
+
+    def capacity(self) -> int:
+        return max(1, int(self._capacity() or 1))
+
+    @property
+    def shared(self) -> bool:
+        return self._store is not None
+
+    def enable_shared_leases(self, store: Any, owner: str, ttl_seconds: int = 60) -> None:
+        """开启跨进程租约：store 需提供 try_acquire/renew/release_window_lease(s) 与 count_window_leases。"""
+        self._store = store
+        self._shared_owner = str(owner or "").strip()
+        self._shared_ttl = max(3, int(ttl_seconds))
+        self._last_renew_at = time.monotonic()
+
+    def disable_shared_leases(self) -> None:
+        """关闭跨进程租约并删除本进程写入的租约行（进程退出前调用）。"""
+        store, owner = self._store, self._shared_owner
+        self._store = None
+        if self._tick_handle is not None:
+            self._tick_handle.cancel()
+            self._tick_handle = None
+        if store is None:
+            return
+        try:
+            store.release_window_leases(owner)
+        except Exception:  # noqa: BLE001
+            logger.warning("释放窗口租约行失败 | owner=%s", owner, exc_info=True)
+
+    async def acquire(self, profile_id: int, priority: int, owner: str = "") -> WindowLease:
+        """等待并取得 profile 的窗口租约；调用方负责在关闭窗口后 release。"""
+        pid = int(profile_id)
+        if pid in _held_profiles.get() and pid in self._holders:
+            return WindowLease(None, pid, priority, owner)
+
+        loop = asyncio.get_running_loop()
+        self._seq += 1
+        waiter = _Waiter(
+            profile_id=pid,
+            priority=int(priority),
+            owner=str(owner or ""),
+            seq=self._seq,
+            enqueued_at=time.monotonic(),
+            future=loop.create_future(),
+        )
+        self._waiters.append(waiter)
+        self._dispatch()
+        try:
+            lease = await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 已发放但调用方被取消：立即归还，避免名额泄漏
+                waiter.future.result().release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._dispatch()
+            raise
+        _held_profiles.set(_held_profiles.get() | {pid})
+        return lease
+
+    @asynccontextmanager
+    async def lease(self, profile_id: int, priority: int, owner: str = "") -> AsyncIterator[WindowLease]:
+        granted = await self.acquire(profile_id, priority, owner)
+        try:
+            yield granted
+        finally:
+            granted.release()
+
+    def _effective_priority(self, waiter: _Waiter, now: float) -> float:
+        return waiter.priority - (now - waiter.enqueued_at) / _AGING_SECONDS
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        capacity = self.capacity()
+        # 本轮被其他进程占用 profile 的等待者，跳过它们继续发放其他 profile
+        refused: Set[int] = set()
+        while self._waiters and len(self._holders) < capacity:
+            candidates = [
+                waiter
+                for waiter in self._waiters
+                if waiter.profile_id not in self._holders and not waiter.future.done() and waiter.seq not in refused
+            ]
+            if not candidates:
+                break
+            waiter = min(candidates, key=lambda item: (self._effective_priority(item, now), item.seq))
+            verdict = self._try_acquire_shared(waiter, capacity)
+            if verdict == "full":
+                break
+            if verdict == "busy":
+                refused.add(waiter.seq)
+                continue
+            self._waiters.remove(waiter)
+            wait_ms = (now - waiter.enqueued_at) * 1000
+            lease = WindowLease(self, waiter.profile_id, waiter.priority, waiter.owner, wait_ms=wait_ms)
+            self._record_change(now)
+            self._holders[waiter.profile_id] = lease
+            self._peak_in_use = max(self._peak_in_use, len(self._holders))
+            stats = self._stats.setdefault(waiter.priority, _PriorityStats())
+            stats.granted += 1
+            stats.wait_total_ms += wait_ms
+            stats.wait_max_ms = max(stats.wait_max_ms, wait_ms)
+            stats.samples.append(wait_ms)
+            waiter.future.set_result(lease)
+        # 已取消的等待者顺手清理
+        self._waiters = [waiter for waiter in self._waiters if not waiter.future.done()]
+        if self._store is not None and (self._holders or self._waiters):
+            self._schedule_shared_tick()
+
+    def _try_acquire_shared(self, waiter: _Waiter, capacity: int) -> str:
+        if self._store is None:
+            return "acquired"
+        try:
+            return str(
+                self._store.try_acquire_window_lease(
+                    waiter.profile_id,
+                    self._shared_owner,
+                    capacity,
+                    priority=waiter.priority,
+                    ttl_seconds=self._shared_ttl,
+                )
+            )
+        except Exception:  # noqa: BLE001
+            # 数据库暂时不可用时按名额已满处理，等下一次轮询重试
+            logger.warning("申请窗口租约行失败 | profile_id=%s", waiter.profile_id, exc_info=True)
+            return "full"
+
+    def _schedule_shared_tick(self) -> None:
+        if self._tick_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._tick_handle = loop.call_later(_SHARED_POLL_SECONDS, self._shared_tick)
+
+    def _shared_tick(self) -> None:
+        self._tick_handle = None
+        if self._store is None:
+            return
+        now = time.monotonic()
+        if self._holders and now - self._last_renew_at >= self._shared_ttl / 3:
+            self._last_renew_at = now
+            try:
+                self._store.renew_window_leases(self._shared_owner, ttl_seconds=self._shared_ttl)
+            except Exception:  # noqa: BLE001
+                logger.warning("续租窗口租约行失败 | owner=%s", self._shared_owner, exc_info=True)
+        self._dispatch()
+
+    def _release(self, lease: WindowLease) -> None:
+        if self._holders.get(lease.profile_id) is not lease:
+            return
+        if self._store is not None:
+            try:
+                self._store.release_window_lease(lease.profile_id, self._shared_owner)
+            except Exception:  # noqa: BLE001
+                # 租约行到期后会被其他进程清理
+                logger.warning("释放窗口租约行失败 | profile_id=%s", lease.profile_id, exc_info=True)
+        self._record_change(time.monotonic())
+        self._holders.pop(lease.profile_id, None)
+        self._dispatch()
+
+    def _record_change(self, now: float) -> None:
+        self._busy_area += len(self._holders) * (now - self._last_change_at)
+        self._last_change_at = now
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        capacity = self.capacity()
+        in_use = len(self._holders)
+        busy_area = self._busy_area + in_use * (now - self._last_change_at)
+        elapsed = max(now - self._started_at, 1e-6)
+        by_priority: Dict[str, Dict[str, Any]] = {}
+        for priority, name in WINDOW_PRIORITY_NAMES.items():
+            stats = self._stats.get(priority) or _PriorityStats()
+            samples = sorted(stats.samples)
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+            by_priority[name] = {
+                "granted": stats.granted,
+                "waiting": sum(1 for waiter in self._waiters if waiter.priority == priority),
+                "wait_avg_ms": round(stats.wait_total_ms / stats.granted, 1) if stats.granted else 0.0,
+                "wait_p95_ms": round(p95, 1),
+                "wait_max_ms": round(stats.wait_max_ms, 1),
+            }
+        global_in_use: Optional[int] = None
+        if self._store is not None:
+            try:
+                global_in_use = int(self._store.count_window_leases())
+            except Exception:  # noqa: BLE001
+                global_in_use = None
+        return {
+            "capacity": capacity,
+            "in_use": in_use,
+            "shared": self._store is not None,
+            "global_in_use": global_in_use,
+            "waiting": len(self._waiters),
+            "peak_in_use": self._peak_in_use,
+            "utilization": round(in_use / capacity, 3),
+            "avg_utilization": round(busy_area / (elapsed * capacity), 3),
+            "by_priority": by_priority,
+            "holders": [
+                {
+                    "profile_id": lease.profile_id,
+                    "priority": WINDOW_PRIORITY_NAMES.get(lease.priority, str(lease.priority)),
+                    "owner": lease.owner,
+                    "held_seconds": round(now - lease.acquired_at, 1),
+                }
+                for lease in self._holders.values()
+            ],
+        }
+
+
+window_arbiter = WindowArbiter(capacity=lambda: getattr(settings, "browser_max_open_windows", 6))
@@ -87,6 +87,11 @@ class IXBrowserService(
     ixbrowser_busy_retry_delay_seconds = 1.2
     sora_blocked_resource_types = {"image", "media", "font"}
     sora_job_max_concurrency = 2
+    sora_progress_max_concurrency = 20
+    sora_watermark_max_concurrency = 4
+    sora_adaptive_concurrency_enabled = False
+    sora_adaptive_concurrency_min = 1
+    sora_adaptive_concurrency_max = 6
     heavy_load_retry_max_attempts = 4
 
     def __init__(self, deps: Optional[IXBrowserServiceDeps] = None) -> None:
@@ -190,6 +195,40 @@ class IXBrowserService(
         self.sora_job_max_concurrency = n_int
         self._sora_job_runner.set_max_concurrency(n_int)
 
+    def set_sora_progress_max_concurrency(self, n: int) -> None:
+        n_int = int(n)
+        if n_int < 1:
+            n_int = 1
+        if self.sora_progress_max_concurrency == n_int:
+            return
+        self.sora_progress_max_concurrency = n_int
+        self._sora_job_runner.set_progress_max_concurrency(n_int)
+
+    def set_sora_watermark_max_concurrency(self, n: int) -> None:
+        self.sora_watermark_max_concurrency = max(1, int(n))
+
+    def set_sora_adaptive_concurrency(self, enabled: bool, floor: int, ceiling: int) -> None:
+        self.sora_adaptive_concurrency_enabled = bool(enabled)
+        self.sora_adaptive_concurrency_min = max(1, int(floor))
+        self.sora_adaptive_concurrency_max = max(self.sora_adaptive_concurrency_min, int(ceiling))
+        self._sora_job_runner.configure_adaptive_concurrency(
+            enabled=self.sora_adaptive_concurrency_enabled,
+            floor=self.sora_adaptive_concurrency_min,
+            ceiling=self.sora_adaptive_concurrency_max,
+        )
+
+    def record_sora_congestion(self, reason: str) -> None:
+        """heavy load / CF / ixBrowser 1008 等拥塞信号，交给自适应并发控制器降低提交并发。"""
+        self._sora_job_runner.record_concurrency_signal(reason)
+
+    def sora_concurrency_snapshot(self) -> Dict[str, Any]:
+        return self._sora_job_runner.concurrency_snapshot()
+
+    def sora_job_claim_capacity(self) -> int:
+        """Worker 可同时持有的 Sora 任务数：窗口槽位（自适应时取当前上限）+ 已转入进度阶段的任务。"""
+        in_progress = min(self._sora_job_runner.progress_stage_count, self.sora_progress_max_concurrency)
+        return max(1, int(self._sora_job_runner.window_concurrency_limit)) + max(0, int(in_progress))
+
     async def open_profile_window(
         self,
         profile_id: int,
@@ -268,6 +307,8 @@ class IXBrowserService(
                         except (TypeError, ValueError):
                             code_int = -1
                         if code_int != 0:
+                            if code_int == 1008 and attempt == 0:
+                                self.record_sora_congestion("ixbrowser_busy")
                             if code_int == 1008 and attempt < self.ixbrowser_busy_retry_max:
                                 delay = self.ixbrowser_busy_retry_delay_seconds * (2 ** attempt)
                                 logger.warning(
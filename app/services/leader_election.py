@@ -0,0 +1,133 @@
+"""基于 scheduler_locks 租约的 leader 选举。
+
+`uvicorn --workers N` 时每个进程都会执行 lifespan；只有当选 leader 的进程启动调度器与周期性维护，
+其余进程照常提供 HTTP。leader 每 ttl/3 续租一次，进程退出或卡死导致租约过期后由其他进程接管。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+
+from app.core.config import settings
+from app.db.sqlite import async_db, sqlite_db
+from app.services.task_runtime import spawn
+
+logger = logging.getLogger(__name__)
+
+LEADER_LOCK_KEY = "leader.background_services"
+
+LeaderHook = Callable[[], Awaitable[None]]
+
+
+class LeaderElector:
+    def __init__(self, lock_key: str = LEADER_LOCK_KEY) -> None:
+        self.lock_key = lock_key
+        self.owner = f"leader-{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event = asyncio.Event()
+        self._is_leader = False
+        self._on_elected: Optional[LeaderHook] = None
+        self._on_demoted: Optional[LeaderHook] = None
+        self._on_renewed: Optional[LeaderHook] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    def _ttl_seconds(self) -> int:
+        return max(3, int(getattr(settings, "leader_lease_ttl_sec", 30) or 30))
+
+    async def start(
+        self,
+        *,
+        on_elected: Optional[LeaderHook] = None,
+        on_demoted: Optional[LeaderHook] = None,
+        on_renewed: Optional[LeaderHook] = None,
+    ) -> None:
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._on_renewed = on_renewed
+        self._stop_event.clear()
+        if self._task and not self._task.done():
+            return
+        # 首轮同步执行，单进程部署启动后立即成为 leader
+        await self._tick()
+        self._task = spawn(
+            self._loop(),
+            task_name="leader.election.loop",
+            metadata={"owner": self.owner, "lock_key": self.lock_key},
+        )
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._is_leader:
+            await self._demote("stop")
+            try:
+                await async_db.release_scheduler_lock(lock_key=self.lock_key, owner=self.owner)
+            except Exception:  # noqa: BLE001
+                logger.exception("释放 leader 租约失败")
+
+    async def _loop(self) -> None:
+        while not self._stop_event.is_set():
+            await asyncio.sleep(max(1.0, self._ttl_seconds() / 3))
+            try:
+                await self._tick()
+            except Exception:  # noqa: BLE001
+                logger.exception("Leader 选举 tick 失败")
+
+    async def _tick(self) -> None:
+        try:
+            acquired = await async_db.acquire_leader_lease(
+                lock_key=self.lock_key,
+                owner=self.owner,
+                ttl_seconds=self._ttl_seconds(),
+            )
+        except Exception:  # noqa: BLE001
+            # 无法确认租约时按失去 leader 处理，避免两个进程同时执行调度
+            logger.exception("Leader 租约续期失败")
+            acquired = False
+
+        if acquired and not self._is_leader:
+            self._is_leader = True
+            self._log_event("leader.elected", "当选 leader，启动调度器与后台维护")
+            if self._on_elected:
+                await self._on_elected()
+        elif acquired and self._on_renewed:
+            await self._on_renewed()
+        elif not acquired and self._is_leader:
+            await self._demote("lost")
+
+    async def _demote(self, reason: str) -> None:
+        self._is_leader = False
+        self._log_event(
+            "leader.demoted",
+            f"失去 leader（{reason}），停止调度器与后台维护",
+            level="INFO" if reason == "stop" else "WARN",
+        )
+        if self._on_demoted:
+            await self._on_demoted()
+
+    def _log_event(self, action: str, message: str, level: str = "INFO") -> None:
+        try:
+            sqlite_db.enqueue_event_log(
+                source="system",
+                action=action,
+                event=action.split(".")[-1],
+                status="success",
+                level=level,
+                message=message,
+                metadata={"owner": self.owner, "lock_key": self.lock_key, "pid": os.getpid()},
+            )
+        except Exception:  # noqa: BLE001
+            logger.exception("写入 leader 事件日志失败: %s", action)
+
+
+leader_elector = LeaderElector()
@@ -11,6 +11,7 @@ from urllib.parse import quote, unquote, urlparse
 import httpx
 
 from app.db.sqlite import sqlite_db
+from app.db.sqlite.proxy_repo import PROXY_CF_WINDOW
 from app.models.proxy import (
     ProxyActionResult,
     ProxyBatchCheckItem,
@@ -29,7 +30,7 @@ from app.services.ixbrowser_service import IXBrowserServiceError, ixbrowser_serv
 logger = logging.getLogger(__name__)
 
 DEFAULT_CHECK_URL = "https://ipinfo.io/json"
-CF_RECENT_WINDOW = 30
+CF_RECENT_WINDOW = PROXY_CF_WINDOW
 
 
 def _now_str() -> str:
@@ -0,0 +1,89 @@
+"""进程内队列唤醒通道：入队方 notify，Worker 循环 wait，避免固定间隔轮询。"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+SORA_QUEUE = "sora"
+NURTURE_QUEUE = "nurture"
+WATERMARK_QUEUE = "watermark"
+
+_ENQUEUED_AT_MAX = 2000
+
+
+class QueueNotifier:
+    """按通道维护一个 asyncio.Event。
+
+    - `notify()` 可在任意线程调用（async_db 线程池里的同步代码也可以），跨线程时转交给事件循环；
+    - 信号是“电平”而非“边沿”：Worker 未在等待时收到的通知会保留，下一次 `wait()` 立即返回；
+    - 其他进程写入的任务收不到通知，由调用方的兜底超时覆盖；
+    - 带 item_id 的通知会记下入队时刻（毫秒精度），供 Worker 统计排队等待。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._events: Dict[str, asyncio.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._enqueued_at: "OrderedDict[tuple, float]" = OrderedDict()
+
+    def _get_event(self, channel: str) -> asyncio.Event:
+        with self._lock:
+            event = self._events.get(channel)
+            if event is None:
+                event = asyncio.Event()
+                self._events[channel] = event
+            return event
+
+    def notify(self, channel: str, item_id: Optional[int] = None) -> None:
+        if item_id is not None:
+            with self._lock:
+                self._enqueued_at[(channel, int(item_id))] = time.time()
+                while len(self._enqueued_at) > _ENQUEUED_AT_MAX:
+                    self._enqueued_at.popitem(last=False)
+        event = self._get_event(channel)
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is None or running is loop or loop.is_closed():
+            event.set()
+            return
+        loop.call_soon_threadsafe(event.set)
+
+    async def wait(self, channel: str, timeout: float) -> bool:
+        """等待通知或超时；返回是否由通知唤醒。返回前清除信号。"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Event 绑定首次等待时的事件循环；换了循环（如重启/测试）就重建，并保留未消费的信号
+            with self._lock:
+                pending = {name for name, item in self._events.items() if item.is_set()}
+                self._events = {}
+                for name in pending:
+                    self._events[name] = asyncio.Event()
+                    self._events[name].set()
+                self._loop = loop
+        event = self._get_event(channel)
+        try:
+            await asyncio.wait_for(event.wait(), timeout=max(0.0, float(timeout)))
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            event.clear()
+
+    def pop_enqueued_at(self, channel: str, item_id: int) -> Optional[float]:
+        with self._lock:
+            return self._enqueued_at.pop((channel, int(item_id)), None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._enqueued_at.clear()
+            self._loop = None
+
+
+queue_notifier = QueueNotifier()
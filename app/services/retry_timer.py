@@ -0,0 +1,108 @@
+"""进程内延迟重试定时器：所有退避等待共用一个最小堆和一个后台任务。
+
+失败的阶段把下次执行时间落库（如 `sora_jobs.not_before` / `watermark_next_at`）后立即交还租约与槽位，
+这里只负责到点唤醒对应队列（或执行回调），避免协程持槽位 sleep 饿死其他任务。
+定时器不跨进程、不跨重启：错过的唤醒由 Worker 兜底轮询覆盖，Worker 启动时会按库里的时间重新挂上。
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.services.queue_notifier import queue_notifier
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _TimerEntry:
+    due_at: float
+    seq: int
+    callback: Callable[[], Any]
+
+
+class RetryTimer:
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, _TimerEntry] = {}
+        self._seq = 0
+        self._fired = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def schedule(self, key: Hashable, due_at: float, callback: Callable[[], Any]) -> None:
+        """在 `due_at`（time.time() 时间戳）调用 callback；同一 key 重复安排以最后一次为准。"""
+        self._seq += 1
+        entry = _TimerEntry(due_at=float(due_at), seq=self._seq, callback=callback)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, (entry.due_at, entry.seq, key))
+        self._ensure_running()
+
+    def schedule_queue(self, channel: str, item_id: int, due_at: float) -> None:
+        """到点唤醒队列，由 Worker 重新领取该任务。"""
+        item = int(item_id)
+        self.schedule((channel, item), due_at, lambda: queue_notifier.notify(channel, item))
+
+    def cancel(self, key: Hashable) -> None:
+        # 堆里的旧条目在出堆时按 seq 识别后丢弃
+        self._entries.pop(key, None)
+
+    def _ensure_running(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循环里（同步调用）：只记下条目，下次在循环内安排时一并处理
+            return
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            if self._wakeup is not None:
+                self._wakeup.set()
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run(self._wakeup))
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while self._heap:
+            due_at, seq, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is None or entry.seq != seq:
+                heapq.heappop(self._heap)
+                continue
+            delay = due_at - time.time()
+            if delay > 0:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            self._entries.pop(key, None)
+            self._fired += 1
+            try:
+                entry.callback()
+            except Exception:  # noqa: BLE001
+                logger.exception("延迟重试回调执行失败 | key=%s", key)
+
+    def stats(self) -> Dict[str, Any]:
+        next_due = min((entry.due_at for entry in self._entries.values()), default=None)
+        return {
+            "pending": len(self._entries),
+            "fired": self._fired,
+            "next_due_in_sec": round(max(0.0, next_due - time.time()), 1) if next_due is not None else None,
+        }
+
+    def reset(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._wakeup = None
+        self._heap.clear()
+        self._entries.clear()
+
+
+retry_timer = RetryTimer()
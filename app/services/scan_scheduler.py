@@ -8,7 +8,7 @@ from typing import List, Optional
 from uuid import uuid4
 from zoneinfo import ZoneInfo
 
-from app.db.sqlite import sqlite_db
+from app.db.sqlite import async_db, sqlite_db
 from app.models.settings import ScanSchedulerSettings
 from app.services.ixbrowser_service import ixbrowser_service
 from app.services.system_settings import load_system_settings
@@ -82,8 +82,8 @@ class ScanScheduler:
             return
 
         lock_key = f"scheduler.scan.{slot_key}"
-        if not sqlite_db.try_acquire_scheduler_lock(lock_key=lock_key, owner=self._owner, ttl_seconds=120):
-            sqlite_db.create_event_log(
+        if not await async_db.try_acquire_scheduler_lock(lock_key=lock_key, owner=self._owner, ttl_seconds=120):
+            sqlite_db.enqueue_event_log(
                 source="system",
                 action="scheduler.scan.lock_conflict",
                 event="skip",
@@ -111,7 +111,7 @@ class ScanScheduler:
                 with_fallback=True,
                 profile_ids=None,
             )
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="system",
                 action="scheduler.scan.trigger",
                 event="trigger",
@@ -121,7 +121,7 @@ class ScanScheduler:
                 metadata={"group_title": group_title, "slot_key": slot_key},
             )
         except Exception as exc:  # noqa: BLE001
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="system",
                 action="scheduler.scan.trigger",
                 event="trigger",
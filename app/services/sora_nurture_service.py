@@ -6,11 +6,14 @@ import json
 import logging
 import random
 import time
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
+from app.core.config import settings
 from app.db.sqlite import sqlite_db
 from app.models.nurture import SoraNurtureBatchCreateRequest
 from app.services.ixbrowser_service import (
@@ -19,7 +22,9 @@ from app.services.ixbrowser_service import (
     IXBrowserServiceError,
     ixbrowser_service,
 )
+from app.services.ixbrowser.window_arbiter import WINDOW_PRIORITY_NURTURE, window_arbiter
 from app.services.nurture.errors import SoraNurtureServiceError
+from app.services.queue_notifier import NURTURE_QUEUE, queue_notifier
 from app.services.task_runtime import spawn
 
 logger = logging.getLogger(__name__)
@@ -51,19 +56,47 @@ def _safe_json_loads(text: Optional[str]) -> Any:
         return None
 
 
+@dataclass
+class _NurtureBatchRunState:
+    """单个 batch 执行期间各 lane 共享的待执行队列与累计结果。"""
+
+    batch_id: int
+    group_title: str
+    scroll_count: int
+    like_probability: float
+    follow_probability: float
+    max_follows: int
+    max_likes: int
+    pending: Deque[dict]
+    canceled: bool = False
+    success_count: int = 0
+    failed_count: int = 0
+    canceled_count: int = 0
+    like_total: int = 0
+    follow_total: int = 0
+    first_error: Optional[str] = None
+
+    def record_failure(self, error: str) -> None:
+        self.failed_count += 1
+        self.first_error = self.first_error or error
+
+
 class SoraNurtureService:
     """
-    养号任务组串行执行器。
+    养号任务组执行器。
 
     说明：
-    - 串行：同一时刻仅执行 1 个 batch（避免抢窗口）
+    - 并行：单个 batch 内按 `NURTURE_BATCH_PARALLELISM` 个窗口并行执行，多个 batch 可同时运行
+    - 限流：同一窗口同一时刻只跑一个明细；全局同时打开的养号窗口不超过 `NURTURE_MAX_OPEN_WINDOWS`
     - 强依赖：ixBrowser 已启动，且对应 profile 已登录 Sora
     """
 
     def __init__(self, db=sqlite_db, ix=ixbrowser_service) -> None:
         self._db = db
         self._ix = ix
-        self._batch_semaphore: asyncio.Semaphore = asyncio.Semaphore(1)
+        self._profile_locks: Dict[int, asyncio.Lock] = {}
+        self._window_semaphore: Optional[asyncio.Semaphore] = None
+        self._window_limit = 0
         self._tasks: Dict[int, asyncio.Task] = {}
         self._tasks_lock = asyncio.Lock()
         self._job_timeout_seconds = int(NURTURE_JOB_TIMEOUT_SECONDS)
@@ -184,6 +217,8 @@ class SoraNurtureService:
                 }
             )
 
+        queue_notifier.notify(NURTURE_QUEUE, batch_id)
+
         row = self._db.get_sora_nurture_batch(batch_id)
         if not row:
             raise SoraNurtureServiceError("创建任务组失败：未写入数据库")
@@ -293,6 +328,8 @@ class SoraNurtureService:
             },
         )
 
+        queue_notifier.notify(NURTURE_QUEUE, int(batch_id))
+
         updated = self._db.get_sora_nurture_batch(int(batch_id))
         if not updated:
             raise SoraNurtureServiceError("重试失败：任务组状态更新异常")
@@ -313,199 +350,213 @@ class SoraNurtureService:
 
     async def _run_batch_impl(self, batch_id: int) -> None:
         try:
-            async with self._batch_semaphore:
-                batch = self._db.get_sora_nurture_batch(batch_id)
-                if not batch:
-                    return
-
-                status = str(batch.get("status") or "").strip().lower()
-                if status in {"running", "completed", "failed"}:
-                    return
-                if status == "canceled":
-                    await self._cancel_remaining_jobs(batch_id)
-                    return
-
-                batch_group_title = str(batch.get("group_title") or "Sora").strip() or "Sora"
-
-                scroll_count = int(batch.get("scroll_count") or 10)
-                like_probability = float(batch.get("like_probability") or 0.25)
-                follow_probability = float(batch.get("follow_probability") or 0.15)
-                max_follows = int(batch.get("max_follows_per_profile") or 1)
-                max_likes = int(batch.get("max_likes_per_profile") or 3)
-
-                started_at = _now_str()
-                self._db.update_sora_nurture_batch(batch_id, {"status": "running", "started_at": started_at, "error": None})
-
-                jobs_to_run = self._db.list_sora_nurture_jobs(batch_id=int(batch_id), limit=5000)
-                if not jobs_to_run:
-                    self._db.update_sora_nurture_batch(
-                        batch_id,
-                        {
-                            "status": "failed",
-                            "error": "任务明细为空",
-                            "finished_at": _now_str(),
-                        },
-                    )
-                    return
-
-                success_count = 0
-                failed_count = 0
-                canceled_count = 0
-                like_total = 0
-                follow_total = 0
-                first_error: Optional[str] = None
-
-                active_map_cache: Dict[str, Dict[int, int]] = {}
-                async with self._ix.playwright_factory() as playwright:
-                    for job_row in jobs_to_run:
-                        latest_batch = self._db.get_sora_nurture_batch(batch_id) or {}
-                        if str(latest_batch.get("status") or "").strip().lower() == "canceled":
-                            await self._cancel_remaining_jobs(batch_id)
-                            break
-
-                        job_id = int(job_row.get("id") or 0)
-                        profile_id = int(job_row.get("profile_id") or 0)
-                        job_group_title = str(job_row.get("group_title") or batch_group_title).strip() or batch_group_title
-                        if job_id <= 0 or profile_id <= 0:
-                            failed_count += 1
-                            first_error = first_error or "任务参数异常"
-                            self._db.update_sora_nurture_batch(
-                                batch_id,
-                                {
-                                    "failed_count": failed_count,
-                                    "like_total": like_total,
-                                    "follow_total": follow_total,
-                                    "error": first_error,
-                                },
-                            )
-                            continue
-
-                        row_status = str(job_row.get("status") or "").strip().lower()
-                        if row_status in {"completed", "failed", "canceled", "skipped"}:
-                            continue
-
-                        # 避免抢窗口：若当前窗口存在 Sora 生成任务，跳过
-                        try:
-                            active_map = active_map_cache.get(job_group_title)
-                            if active_map is None:
-                                active_map = self._db.count_sora_active_jobs_by_profile(job_group_title)
-                                active_map_cache[job_group_title] = active_map
-                        except Exception:  # noqa: BLE001
-                            active_map = {}
-                        if int(active_map.get(int(profile_id), 0)) > 0:
-                            self._db.update_sora_nurture_job(
-                                job_id,
-                                {
-                                    "status": "skipped",
-                                    "phase": "done",
-                                    "error": "该窗口存在运行中生成任务，已跳过",
-                                    "finished_at": _now_str(),
-                                },
-                            )
-                            failed_count += 1
-                            first_error = first_error or f"profile={profile_id} skipped: active sora job"
-                            self._db.update_sora_nurture_batch(
-                                batch_id,
-                                {
-                                    "failed_count": failed_count,
-                                    "like_total": like_total,
-                                    "follow_total": follow_total,
-                                    "error": first_error,
-                                },
-                            )
-                            continue
-
-                        try:
-                            job_result = await asyncio.wait_for(
-                                self._run_single_job(
-                                    playwright=playwright,
-                                    batch_id=batch_id,
-                                    job_id=job_id,
-                                    profile_id=profile_id,
-                                    group_title=job_group_title,
-                                    scroll_target=scroll_count,
-                                    like_probability=like_probability,
-                                    follow_probability=follow_probability,
-                                    max_follows=max_follows,
-                                    max_likes=max_likes,
-                                ),
-                                timeout=max(1, int(self._job_timeout_seconds)),
-                            )
-                            status = job_result.get("status")
-                            like_total += int(job_result.get("like_count") or 0)
-                            follow_total += int(job_result.get("follow_count") or 0)
-                            if status == "completed":
-                                success_count += 1
-                            elif status == "canceled":
-                                canceled_count += 1
-                            else:
-                                failed_count += 1
-                                first_error = first_error or str(job_result.get("error") or "unknown error")
-                        except asyncio.TimeoutError:
-                            failed_count += 1
-                            timeout_error = f"执行超时：超过 {max(1, int(self._job_timeout_seconds))} 秒"
-                            first_error = first_error or timeout_error
-                            self._db.update_sora_nurture_job(
-                                int(job_id),
-                                {
-                                    "status": "failed",
-                                    "phase": "done",
-                                    "error": timeout_error,
-                                    "finished_at": _now_str(),
-                                },
-                            )
-                        except Exception as exc:  # noqa: BLE001
-                            failed_count += 1
-                            first_error = first_error or str(exc)
-
-                        self._db.update_sora_nurture_batch(
-                            batch_id,
-                            {
-                                "success_count": success_count,
-                                "failed_count": failed_count,
-                                "canceled_count": canceled_count,
-                                "like_total": like_total,
-                                "follow_total": follow_total,
-                                "error": first_error,
-                            },
-                        )
-
-                finished_at = _now_str()
-                final_batch = self._db.get_sora_nurture_batch(batch_id) or {}
-                final_status = str(final_batch.get("status") or "").strip().lower()
-
-                stats = self._calc_batch_stats(batch_id)
-                success_count = stats["success_count"]
-                failed_count = stats["failed_count"]
-                canceled_count = stats["canceled_count"]
-                like_total = stats["like_total"]
-                follow_total = stats["follow_total"]
-                first_error = first_error or stats["first_error"]
-
-                if final_status == "canceled":
-                    status_to_set = "canceled"
-                elif failed_count > 0:
-                    status_to_set = "failed"
-                else:
-                    status_to_set = "completed"
+            batch = self._db.get_sora_nurture_batch(batch_id)
+            if not batch:
+                return
+
+            status = str(batch.get("status") or "").strip().lower()
+            if status in {"running", "completed", "failed"}:
+                return
+            if status == "canceled":
+                await self._cancel_remaining_jobs(batch_id)
+                return
 
+            batch_group_title = str(batch.get("group_title") or "Sora").strip() or "Sora"
+
+            started_at = _now_str()
+            self._db.update_sora_nurture_batch(batch_id, {"status": "running", "started_at": started_at, "error": None})
+
+            jobs_to_run = self._db.list_sora_nurture_jobs(batch_id=int(batch_id), limit=5000)
+            if not jobs_to_run:
                 self._db.update_sora_nurture_batch(
                     batch_id,
                     {
-                        "status": status_to_set,
-                        "success_count": success_count,
-                        "failed_count": failed_count,
-                        "canceled_count": canceled_count,
-                        "like_total": like_total,
-                        "follow_total": follow_total,
-                        "error": first_error,
-                        "finished_at": finished_at,
+                        "status": "failed",
+                        "error": "任务明细为空",
+                        "finished_at": _now_str(),
                     },
                 )
+                return
+
+            run_state = _NurtureBatchRunState(
+                batch_id=int(batch_id),
+                group_title=batch_group_title,
+                scroll_count=int(batch.get("scroll_count") or 10),
+                like_probability=float(batch.get("like_probability") or 0.25),
+                follow_probability=float(batch.get("follow_probability") or 0.15),
+                max_follows=int(batch.get("max_follows_per_profile") or 1),
+                max_likes=int(batch.get("max_likes_per_profile") or 3),
+                pending=deque(jobs_to_run),
+            )
+            parallelism = max(1, int(getattr(settings, "nurture_batch_parallelism", 1) or 1))
+            async with self._ix.playwright_factory() as playwright:
+                # 每个 lane 依次取下一条明细执行；不同 lane 之间按窗口并行
+                lanes = [
+                    self._run_batch_lane(playwright, run_state)
+                    for _ in range(min(parallelism, len(jobs_to_run)))
+                ]
+                await asyncio.gather(*lanes)
+
+            finished_at = _now_str()
+            final_batch = self._db.get_sora_nurture_batch(batch_id) or {}
+            final_status = str(final_batch.get("status") or "").strip().lower()
+
+            stats = self._calc_batch_stats(batch_id)
+            success_count = stats["success_count"]
+            failed_count = stats["failed_count"]
+            canceled_count = stats["canceled_count"]
+            like_total = stats["like_total"]
+            follow_total = stats["follow_total"]
+            first_error = run_state.first_error or stats["first_error"]
+
+            if final_status == "canceled":
+                status_to_set = "canceled"
+            elif failed_count > 0:
+                status_to_set = "failed"
+            else:
+                status_to_set = "completed"
+
+            self._db.update_sora_nurture_batch(
+                batch_id,
+                {
+                    "status": status_to_set,
+                    "success_count": success_count,
+                    "failed_count": failed_count,
+                    "canceled_count": canceled_count,
+                    "like_total": like_total,
+                    "follow_total": follow_total,
+                    "error": first_error,
+                    "finished_at": finished_at,
+                },
+            )
         finally:
             async with self._tasks_lock:
                 self._tasks.pop(batch_id, None)
 
+    async def _run_batch_lane(self, playwright, state: "_NurtureBatchRunState") -> None:
+        batch_id = state.batch_id
+        while state.pending and not state.canceled:
+            job_row = state.pending.popleft()
+            latest_batch = self._db.get_sora_nurture_batch(batch_id) or {}
+            if str(latest_batch.get("status") or "").strip().lower() == "canceled":
+                state.canceled = True
+                await self._cancel_remaining_jobs(batch_id)
+                return
+
+            job_id = int(job_row.get("id") or 0)
+            profile_id = int(job_row.get("profile_id") or 0)
+            job_group_title = str(job_row.get("group_title") or state.group_title).strip() or state.group_title
+            if job_id <= 0 or profile_id <= 0:
+                state.record_failure("任务参数异常")
+                self._update_batch_progress(state)
+                continue
+
+            row_status = str(job_row.get("status") or "").strip().lower()
+            if row_status in {"completed", "failed", "canceled", "skipped"}:
+                continue
+
+            # 同一窗口同一时刻只跑一个养号明细（跨批次），排队时不占用窗口名额
+            async with self._profile_lock(profile_id):
+                # 避免抢窗口：若当前窗口存在 Sora 生成任务，跳过（开跑前实时检查）
+                try:
+                    active_map = self._db.count_sora_active_jobs_by_profile(job_group_title)
+                except Exception:  # noqa: BLE001
+                    active_map = {}
+                if int(active_map.get(int(profile_id), 0)) > 0:
+                    self._db.update_sora_nurture_job(
+                        job_id,
+                        {
+                            "status": "skipped",
+                            "phase": "done",
+                            "error": "该窗口存在运行中生成任务，已跳过",
+                            "finished_at": _now_str(),
+                        },
+                    )
+                    state.record_failure(f"profile={profile_id} skipped: active sora job")
+                    self._update_batch_progress(state)
+                    continue
+
+                async with self._get_window_semaphore():
+                    async with window_arbiter.lease(profile_id, WINDOW_PRIORITY_NURTURE, owner=f"nurture:{batch_id}"):
+                        await self._run_batch_job(playwright, state, job_id, profile_id, job_group_title)
+            self._update_batch_progress(state)
+
+    async def _run_batch_job(
+        self,
+        playwright,
+        state: "_NurtureBatchRunState",
+        job_id: int,
+        profile_id: int,
+        group_title: str,
+    ) -> None:
+        try:
+            job_result = await asyncio.wait_for(
+                self._run_single_job(
+                    playwright=playwright,
+                    batch_id=state.batch_id,
+                    job_id=job_id,
+                    profile_id=profile_id,
+                    group_title=group_title,
+                    scroll_target=state.scroll_count,
+                    like_probability=state.like_probability,
+                    follow_probability=state.follow_probability,
+                    max_follows=state.max_follows,
+                    max_likes=state.max_likes,
+                ),
+                timeout=max(1, int(self._job_timeout_seconds)),
+            )
+            status = job_result.get("status")
+            state.like_total += int(job_result.get("like_count") or 0)
+            state.follow_total += int(job_result.get("follow_count") or 0)
+            if status == "completed":
+                state.success_count += 1
+            elif status == "canceled":
+                state.canceled_count += 1
+            else:
+                state.record_failure(str(job_result.get("error") or "unknown error"))
+        except asyncio.TimeoutError:
+            timeout_error = f"执行超时：超过 {max(1, int(self._job_timeout_seconds))} 秒"
+            state.record_failure(timeout_error)
+            self._db.update_sora_nurture_job(
+                int(job_id),
+                {
+                    "status": "failed",
+                    "phase": "done",
+                    "error": timeout_error,
+                    "finished_at": _now_str(),
+                },
+            )
+        except Exception as exc:  # noqa: BLE001
+            state.record_failure(str(exc))
+
+    def _update_batch_progress(self, state: "_NurtureBatchRunState") -> None:
+        self._db.update_sora_nurture_batch(
+            state.batch_id,
+            {
+                "success_count": state.success_count,
+                "failed_count": state.failed_count,
+                "canceled_count": state.canceled_count,
+                "like_total": state.like_total,
+                "follow_total": state.follow_total,
+                "error": state.first_error,
+            },
+        )
+
+    def _profile_lock(self, profile_id: int) -> asyncio.Lock:
+        lock = self._profile_locks.get(int(profile_id))
+        if lock is None:
+            lock = asyncio.Lock()
+            self._profile_locks[int(profile_id)] = lock
+        return lock
+
+    def _get_window_semaphore(self) -> asyncio.Semaphore:
+        limit = max(1, int(getattr(settings, "nurture_max_open_windows", 1) or 1))
+        if self._window_semaphore is None or self._window_limit != limit:
+            # 调整上限只影响后续获取；已打开的窗口照常释放到旧信号量
+            self._window_semaphore = asyncio.Semaphore(limit)
+            self._window_limit = limit
+        return self._window_semaphore
+
     async def _cancel_remaining_jobs(self, batch_id: int) -> None:
         jobs = self._db.list_sora_nurture_jobs(batch_id=int(batch_id), limit=5000)
         now = _now_str()
@@ -52,7 +52,7 @@ def _normalize_secret(value: Optional[str]) -> Optional[str]:
 def _log_scheduler_missing(name: str, exc: Exception) -> None:
     logger.warning("调度器缺失或加载失败: %s | %s", name, exc)
     try:
-        sqlite_db.create_event_log(
+        sqlite_db.enqueue_event_log(
             source="system",
             action="scheduler.missing",
             event="missing",
@@ -107,6 +107,11 @@ def default_system_settings(mask_sensitive: bool = False) -> SystemSettings:
         },
         "sora": {
             "job_max_concurrency": service_cls.sora_job_max_concurrency,
+            "progress_max_concurrency": service_cls.sora_progress_max_concurrency,
+            "watermark_max_concurrency": service_cls.sora_watermark_max_concurrency,
+            "adaptive_concurrency_enabled": service_cls.sora_adaptive_concurrency_enabled,
+            "adaptive_concurrency_min": service_cls.sora_adaptive_concurrency_min,
+            "adaptive_concurrency_max": service_cls.sora_adaptive_concurrency_max,
             "generate_poll_interval_sec": service_cls.generate_poll_interval_seconds,
             "generate_max_minutes": int(service_cls.generate_timeout_seconds // 60),
             "draft_wait_timeout_minutes": int(service_cls.draft_wait_timeout_seconds // 60),
@@ -251,6 +256,13 @@ def apply_runtime_settings(settings_data: Optional[SystemSettings] = None) -> No
     ixbrowser_service.set_group_windows_cache_ttl(float(data.ixbrowser.group_windows_cache_ttl_sec))
     ixbrowser_service.set_realtime_quota_cache_ttl(float(data.ixbrowser.realtime_quota_cache_ttl_sec))
     ixbrowser_service.set_sora_job_max_concurrency(int(data.sora.job_max_concurrency))
+    ixbrowser_service.set_sora_progress_max_concurrency(int(data.sora.progress_max_concurrency))
+    ixbrowser_service.set_sora_watermark_max_concurrency(int(data.sora.watermark_max_concurrency))
+    ixbrowser_service.set_sora_adaptive_concurrency(
+        bool(data.sora.adaptive_concurrency_enabled),
+        int(data.sora.adaptive_concurrency_min),
+        int(data.sora.adaptive_concurrency_max),
+    )
     ixbrowser_service.generate_poll_interval_seconds = data.sora.generate_poll_interval_sec
     ixbrowser_service.generate_timeout_seconds = data.sora.generate_max_minutes * 60
     ixbrowser_service.draft_wait_timeout_seconds = data.sora.draft_wait_timeout_minutes * 60
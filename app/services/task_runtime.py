@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 
 def _safe_log_background_exception(task_name: str, exc: Exception, metadata: Optional[Dict[str, Any]] = None) -> None:
     try:
-        sqlite_db.create_event_log(
+        sqlite_db.enqueue_event_log(
             source="system",
             action="background.task.error",
             event="error",
@@ -3,29 +3,60 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Dict, Optional
+import os
+import socket
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional, Set
 from uuid import uuid4
 
-from app.db.sqlite import sqlite_db
+from app.core.config import settings
+from app.db.sqlite import async_db, sqlite_db
 from app.services.ixbrowser_service import ixbrowser_service
+from app.services.queue_notifier import NURTURE_QUEUE, SORA_QUEUE, WATERMARK_QUEUE, queue_notifier
+from app.services.retry_timer import retry_timer
 from app.services.sora_nurture_service import sora_nurture_service
 from app.services.task_runtime import spawn
 
 logger = logging.getLogger(__name__)
 
+# 队列里记录「到点可领取」时间的列；排队等待从该时间起算
+_QUEUE_DUE_FIELDS = {SORA_QUEUE: "not_before", WATERMARK_QUEUE: "watermark_next_at"}
+
+
+def _parse_row_time(value: Any) -> Optional[float]:
+    try:
+        return datetime.strptime(str(value or "").strip(), "%Y-%m-%d %H:%M:%S").timestamp()
+    except Exception:  # noqa: BLE001
+        return None
+
 
 class WorkerRunner:
     def __init__(self) -> None:
-        self.owner = f"worker-{uuid4().hex[:8]}"
+        # 多进程共用队列时用 host/pid 区分租约持有者
+        self.owner = f"worker-{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
         self._stop_event = asyncio.Event()
         self._lifecycle_lock = asyncio.Lock()
         self._started = False
         self._sora_loop_task: Optional[asyncio.Task] = None
         self._nurture_loop_task: Optional[asyncio.Task] = None
+        self._watermark_loop_task: Optional[asyncio.Task] = None
+        self._heartbeat_loop_task: Optional[asyncio.Task] = None
         self._sora_running: Dict[int, asyncio.Task] = {}
-        self._nurture_running: Optional[asyncio.Task] = None
+        self._nurture_running: Dict[int, asyncio.Task] = {}
+        self._watermark_running: Dict[int, asyncio.Task] = {}
+        # 正在执行、需要续租的租约（按队列），由单个心跳协程批量续期
+        self._held_leases: Dict[str, Set[int]] = {SORA_QUEUE: set(), NURTURE_QUEUE: set(), WATERMARK_QUEUE: set()}
         self._sora_lease_seconds = 120
         self._nurture_lease_seconds = 180
+        self._watermark_lease_seconds = 120
+        # 最近 N 次领取的排队等待（入队/回队 -> 被 Worker 领取）毫秒数
+        self._queue_wait_ms: Dict[str, Deque[float]] = {
+            SORA_QUEUE: deque(maxlen=500),
+            NURTURE_QUEUE: deque(maxlen=500),
+            WATERMARK_QUEUE: deque(maxlen=500),
+        }
 
     async def start(self) -> None:
         async with self._lifecycle_lock:
@@ -42,8 +73,8 @@ class WorkerRunner:
             self._stop_event.clear()
             self._started = True
             try:
-                sora_cnt = sqlite_db.requeue_stale_sora_jobs()
-                nurture_cnt = sqlite_db.requeue_stale_sora_nurture_batches()
+                sora_cnt = await async_db.requeue_stale_sora_jobs()
+                nurture_cnt = await async_db.requeue_stale_sora_nurture_batches()
                 self._log_event(
                     action="worker.start",
                     event="start",
@@ -62,6 +93,7 @@ class WorkerRunner:
                     message="Worker 启动恢复失败",
                     metadata={"owner": self.owner},
                 )
+            await self._restore_retry_timers()
 
             self._sora_loop_task = spawn(
                 self._sora_loop(),
@@ -73,6 +105,35 @@ class WorkerRunner:
                 task_name="worker.nurture.loop",
                 metadata={"owner": self.owner},
             )
+            self._watermark_loop_task = spawn(
+                self._watermark_loop(),
+                task_name="worker.watermark.loop",
+                metadata={"owner": self.owner},
+            )
+            self._heartbeat_loop_task = spawn(
+                self._heartbeat_loop(),
+                task_name="worker.heartbeat.loop",
+                metadata={"owner": self.owner},
+            )
+
+    async def _restore_retry_timers(self) -> None:
+        """按库里记录的 not_before / watermark_next_at 把延迟重试挂回定时器（重启后不必等兜底轮询）。"""
+        try:
+            rows = await async_db.list_sora_job_wakeups()
+        except Exception:  # noqa: BLE001
+            logger.exception("恢复延迟重试定时器失败")
+            return
+        for row in rows or []:
+            job_id = int(row.get("id") or 0)
+            if str(row.get("status") or "") == "queued":
+                channel, due_text = SORA_QUEUE, row.get("not_before")
+            else:
+                channel, due_text = WATERMARK_QUEUE, row.get("watermark_next_at")
+            try:
+                due_at = datetime.strptime(str(due_text or ""), "%Y-%m-%d %H:%M:%S").timestamp()
+            except Exception:  # noqa: BLE001
+                continue
+            retry_timer.schedule_queue(channel, job_id, due_at)
 
     async def stop(self) -> None:
         async with self._lifecycle_lock:
@@ -94,19 +155,29 @@ class WorkerRunner:
             if self._nurture_loop_task and not self._nurture_loop_task.done():
                 self._nurture_loop_task.cancel()
                 wait_tasks.append(self._nurture_loop_task)
-            for task in list(self._sora_running.values()):
+            if self._watermark_loop_task and not self._watermark_loop_task.done():
+                self._watermark_loop_task.cancel()
+                wait_tasks.append(self._watermark_loop_task)
+            if self._heartbeat_loop_task and not self._heartbeat_loop_task.done():
+                self._heartbeat_loop_task.cancel()
+                wait_tasks.append(self._heartbeat_loop_task)
+            for task in [
+                *self._sora_running.values(),
+                *self._nurture_running.values(),
+                *self._watermark_running.values(),
+            ]:
                 if not task.done():
                     task.cancel()
                     wait_tasks.append(task)
-            if self._nurture_running and not self._nurture_running.done():
-                self._nurture_running.cancel()
-                wait_tasks.append(self._nurture_running)
             if wait_tasks:
                 await asyncio.gather(*wait_tasks, return_exceptions=True)
             self._sora_loop_task = None
             self._nurture_loop_task = None
+            self._watermark_loop_task = None
+            self._heartbeat_loop_task = None
             self._sora_running.clear()
-            self._nurture_running = None
+            self._nurture_running.clear()
+            self._watermark_running.clear()
             self._started = False
             self._log_event(
                 action="worker.stop",
@@ -124,10 +195,18 @@ class WorkerRunner:
             for job_id in done_ids:
                 self._sora_running.pop(job_id, None)
 
-            max_parallel = max(1, int(getattr(ixbrowser_service, "sora_job_max_concurrency", 2) or 2))
-            while len(self._sora_running) < max_parallel:
+            # 进度阶段已释放窗口槽位，按“窗口槽位 + 进度中任务数”继续领取
+            max_parallel = max(1, int(ixbrowser_service.sora_job_claim_capacity()))
+            free_slots = max_parallel - len(self._sora_running)
+            rows = []
+            if free_slots > 0:
+                # 一次往返填满所有空闲槽位
                 try:
-                    row = sqlite_db.claim_next_sora_job(owner=self.owner, lease_seconds=self._sora_lease_seconds)
+                    rows = await async_db.claim_sora_jobs(
+                        owner=self.owner,
+                        n=free_slots,
+                        lease_seconds=self._sora_lease_seconds,
+                    )
                 except Exception as exc:  # noqa: BLE001
                     self._log_event(
                         action="worker.sora.claim",
@@ -137,9 +216,8 @@ class WorkerRunner:
                         message=f"Sora 任务领取失败: {exc}",
                         metadata={"owner": self.owner, "error": str(exc)},
                     )
-                    break
-                if not row:
-                    break
+                    rows = []
+            for row in rows or []:
                 job_id = int(row.get("id") or 0)
                 if job_id <= 0:
                     self._log_event(
@@ -150,26 +228,23 @@ class WorkerRunner:
                         message="Sora 任务领取返回非法 job_id",
                         metadata={"owner": self.owner, "row": row},
                     )
-                    break
+                    continue
                 task = spawn(
                     self._run_one_sora_job(job_id),
                     task_name="worker.sora.run_one",
                     metadata={"owner": self.owner, "job_id": job_id},
                 )
                 self._sora_running[job_id] = task
+                self._record_queue_wait(SORA_QUEUE, row)
 
-            await asyncio.sleep(1.0)
+            await self._wait_for_queue(SORA_QUEUE)
 
     async def _run_one_sora_job(self, job_id: int) -> None:
-        hb = spawn(
-            self._heartbeat_sora_job(job_id),
-            task_name="worker.sora.heartbeat",
-            metadata={"owner": self.owner, "job_id": job_id},
-        )
+        self._held_leases[SORA_QUEUE].add(int(job_id))
         try:
             await ixbrowser_service.run_sora_job(job_id)
         except Exception as exc:  # noqa: BLE001
-            sqlite_db.update_sora_job(job_id, {"run_last_error": str(exc)})
+            await async_db.update_sora_job(job_id, {"run_last_error": str(exc)})
             self._log_event(
                 action="worker.sora.run",
                 event="fail",
@@ -180,9 +255,8 @@ class WorkerRunner:
             )
             raise
         finally:
-            hb.cancel()
-            await asyncio.gather(hb, return_exceptions=True)
-            cleared = sqlite_db.clear_sora_job_lease(job_id=job_id, owner=self.owner)
+            self._held_leases[SORA_QUEUE].discard(int(job_id))
+            cleared = await async_db.clear_sora_job_lease(job_id=job_id, owner=self.owner)
             if not cleared:
                 self._log_event(
                     action="worker.sora.lease.clear",
@@ -192,34 +266,90 @@ class WorkerRunner:
                     message="Sora 任务租约清理失败",
                     metadata={"owner": self.owner, "job_id": int(job_id)},
                 )
+            # 空出槽位，唤醒领取循环
+            queue_notifier.notify(SORA_QUEUE)
 
-    async def _heartbeat_sora_job(self, job_id: int) -> None:
+    async def _watermark_loop(self) -> None:
         while not self._stop_event.is_set():
-            ok = sqlite_db.heartbeat_sora_job_lease(
-                job_id=job_id,
-                owner=self.owner,
-                lease_seconds=self._sora_lease_seconds,
+            done_ids = [job_id for job_id, task in self._watermark_running.items() if task.done()]
+            for job_id in done_ids:
+                self._watermark_running.pop(job_id, None)
+
+            max_parallel = max(1, int(getattr(ixbrowser_service, "sora_watermark_max_concurrency", 4) or 4))
+            free_slots = max_parallel - len(self._watermark_running)
+            rows = []
+            if free_slots > 0:
+                try:
+                    rows = await async_db.claim_sora_watermark_jobs(
+                        owner=self.owner,
+                        n=free_slots,
+                        lease_seconds=self._watermark_lease_seconds,
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    self._log_event(
+                        action="worker.watermark.claim",
+                        event="claim",
+                        status="failed",
+                        level="WARN",
+                        message=f"去水印任务领取失败: {exc}",
+                        metadata={"owner": self.owner, "error": str(exc)},
+                    )
+                    rows = []
+            for row in rows or []:
+                job_id = int(row.get("id") or 0)
+                if job_id <= 0:
+                    continue
+                self._watermark_running[job_id] = spawn(
+                    self._run_one_watermark_job(job_id),
+                    task_name="worker.watermark.run_one",
+                    metadata={"owner": self.owner, "job_id": job_id},
+                )
+                self._record_queue_wait(WATERMARK_QUEUE, row)
+
+            # 退避到期的重试由 retry_timer 按 watermark_next_at 唤醒；其他进程写入的才靠兜底轮询
+            await self._wait_for_queue(WATERMARK_QUEUE)
+
+    async def _run_one_watermark_job(self, job_id: int) -> None:
+        self._held_leases[WATERMARK_QUEUE].add(int(job_id))
+        try:
+            await ixbrowser_service.run_sora_watermark_stage(job_id)
+        except Exception as exc:  # noqa: BLE001
+            self._log_event(
+                action="worker.watermark.run",
+                event="fail",
+                status="failed",
+                level="WARN",
+                message=f"去水印任务执行失败: {exc}",
+                metadata={"owner": self.owner, "job_id": int(job_id), "error": str(exc)},
             )
-            if not ok:
+            raise
+        finally:
+            self._held_leases[WATERMARK_QUEUE].discard(int(job_id))
+            cleared = await async_db.clear_sora_watermark_lease(job_id=job_id, owner=self.owner)
+            if not cleared:
                 self._log_event(
-                    action="worker.sora.heartbeat",
-                    event="lost",
+                    action="worker.watermark.lease.clear",
+                    event="clear",
                     status="failed",
                     level="WARN",
-                    message="Sora 任务心跳丢失，停止续租",
+                    message="去水印任务租约清理失败",
                     metadata={"owner": self.owner, "job_id": int(job_id)},
                 )
-                return
-            await asyncio.sleep(max(5, int(self._sora_lease_seconds // 3)))
+            queue_notifier.notify(WATERMARK_QUEUE)
 
     async def _nurture_loop(self) -> None:
         while not self._stop_event.is_set():
-            if self._nurture_running and not self._nurture_running.done():
-                await asyncio.sleep(1.0)
+            done_ids = [batch_id for batch_id, task in self._nurture_running.items() if task.done()]
+            for batch_id in done_ids:
+                self._nurture_running.pop(batch_id, None)
+
+            max_batches = max(1, int(getattr(settings, "nurture_max_concurrent_batches", 1) or 1))
+            if len(self._nurture_running) >= max_batches:
+                await self._wait_for_queue(NURTURE_QUEUE)
                 continue
 
             try:
-                row = sqlite_db.claim_next_sora_nurture_batch(owner=self.owner, lease_seconds=self._nurture_lease_seconds)
+                row = await async_db.claim_next_sora_nurture_batch(owner=self.owner, lease_seconds=self._nurture_lease_seconds)
             except Exception as exc:  # noqa: BLE001
                 self._log_event(
                     action="worker.nurture.claim",
@@ -232,29 +362,26 @@ class WorkerRunner:
                 await asyncio.sleep(1.0)
                 continue
             if not row:
-                await asyncio.sleep(1.0)
+                await self._wait_for_queue(NURTURE_QUEUE)
                 continue
 
             batch_id = int(row.get("id") or 0)
             if batch_id <= 0:
                 await asyncio.sleep(0.5)
                 continue
-            self._nurture_running = spawn(
+            self._record_queue_wait(NURTURE_QUEUE, row)
+            self._nurture_running[batch_id] = spawn(
                 self._run_one_nurture_batch(batch_id),
                 task_name="worker.nurture.run_one",
                 metadata={"owner": self.owner, "batch_id": batch_id},
             )
 
     async def _run_one_nurture_batch(self, batch_id: int) -> None:
-        hb = spawn(
-            self._heartbeat_nurture_batch(batch_id),
-            task_name="worker.nurture.heartbeat",
-            metadata={"owner": self.owner, "batch_id": batch_id},
-        )
+        self._held_leases[NURTURE_QUEUE].add(int(batch_id))
         try:
             await sora_nurture_service._run_batch_impl(batch_id)  # noqa: SLF001
         except Exception as exc:  # noqa: BLE001
-            sqlite_db.update_sora_nurture_batch(batch_id, {"error": str(exc)})
+            await async_db.update_sora_nurture_batch(batch_id, {"error": str(exc)})
             self._log_event(
                 action="worker.nurture.run",
                 event="fail",
@@ -265,9 +392,8 @@ class WorkerRunner:
             )
             raise
         finally:
-            hb.cancel()
-            await asyncio.gather(hb, return_exceptions=True)
-            cleared = sqlite_db.clear_sora_nurture_batch_lease(batch_id=batch_id, owner=self.owner)
+            self._held_leases[NURTURE_QUEUE].discard(int(batch_id))
+            cleared = await async_db.clear_sora_nurture_batch_lease(batch_id=batch_id, owner=self.owner)
             if not cleared:
                 self._log_event(
                     action="worker.nurture.lease.clear",
@@ -277,25 +403,138 @@ class WorkerRunner:
                     message="养号批次租约清理失败",
                     metadata={"owner": self.owner, "batch_id": int(batch_id)},
                 )
+            queue_notifier.notify(NURTURE_QUEUE)
 
-    async def _heartbeat_nurture_batch(self, batch_id: int) -> None:
+    async def _heartbeat_loop(self) -> None:
+        """单个协程批量续租本 Worker 持有的全部租约；续租失败（已被回收或接管）的任务直接取消。
+
+        每个租约周期顺带回收一次过期租约，其他 Worker 进程异常退出后遗留的 running 任务由存活进程接管。
+        """
+        lease_period = max(
+            10,
+            int(min(self._sora_lease_seconds, self._watermark_lease_seconds, self._nurture_lease_seconds)),
+        )
+        interval = max(5, lease_period // 3)
+        next_recover_at = time.monotonic() + lease_period
         while not self._stop_event.is_set():
-            ok = sqlite_db.heartbeat_sora_nurture_batch_lease(
-                batch_id=batch_id,
-                owner=self.owner,
-                lease_seconds=self._nurture_lease_seconds,
+            await self._renew_held_leases()
+            if time.monotonic() >= next_recover_at:
+                next_recover_at = time.monotonic() + lease_period
+                await self._requeue_expired_leases()
+            await asyncio.sleep(interval)
+
+    async def _requeue_expired_leases(self) -> None:
+        try:
+            sora_cnt = await async_db.requeue_stale_sora_jobs()
+            nurture_cnt = await async_db.requeue_stale_sora_nurture_batches(expired_only=True)
+        except Exception as exc:  # noqa: BLE001
+            self._log_event(
+                action="worker.lease.recover",
+                event="recover",
+                status="failed",
+                level="WARN",
+                message=f"过期租约回收失败: {exc}",
+                metadata={"owner": self.owner, "error": str(exc)},
+            )
+            return
+        if sora_cnt:
+            queue_notifier.notify(SORA_QUEUE)
+        if nurture_cnt:
+            queue_notifier.notify(NURTURE_QUEUE)
+        if sora_cnt or nurture_cnt:
+            self._log_event(
+                action="worker.lease.recover",
+                event="recover",
+                status="success",
+                level="WARN",
+                message=f"回收过期租约 sora={sora_cnt} nurture={nurture_cnt}",
+                metadata={"owner": self.owner, "sora_requeued": sora_cnt, "nurture_requeued": nurture_cnt},
             )
-            if not ok:
+
+    async def _renew_held_leases(self) -> None:
+        specs = (
+            (SORA_QUEUE, async_db.heartbeat_sora_job_leases, self._sora_lease_seconds, self._sora_running, "Sora 任务"),
+            (
+                WATERMARK_QUEUE,
+                async_db.heartbeat_sora_watermark_leases,
+                self._watermark_lease_seconds,
+                self._watermark_running,
+                "去水印任务",
+            ),
+            (
+                NURTURE_QUEUE,
+                async_db.heartbeat_sora_nurture_batch_leases,
+                self._nurture_lease_seconds,
+                self._nurture_running,
+                "养号批次",
+            ),
+        )
+        for channel, renew, lease_seconds, running, label in specs:
+            held = sorted(self._held_leases[channel])
+            if not held:
+                continue
+            try:
+                renewed = set(await renew(held, owner=self.owner, lease_seconds=lease_seconds))
+            except Exception as exc:  # noqa: BLE001
                 self._log_event(
-                    action="worker.nurture.heartbeat",
+                    action=f"worker.{channel}.heartbeat",
+                    event="renew",
+                    status="failed",
+                    level="WARN",
+                    message=f"{label}批量续租失败: {exc}",
+                    metadata={"owner": self.owner, "item_ids": held, "error": str(exc)},
+                )
+                continue
+            # 续租期间已执行完并自行释放的不算丢失
+            lost = [item_id for item_id in held if item_id not in renewed and item_id in self._held_leases[channel]]
+            for item_id in lost:
+                self._held_leases[channel].discard(item_id)
+                task = running.get(item_id)
+                if task is not None and not task.done():
+                    task.cancel()
+                self._log_event(
+                    action=f"worker.{channel}.heartbeat",
                     event="lost",
                     status="failed",
                     level="WARN",
-                    message="养号批次心跳丢失，停止续租",
-                    metadata={"owner": self.owner, "batch_id": int(batch_id)},
+                    message=f"{label}租约丢失，已取消执行",
+                    metadata={"owner": self.owner, "item_id": int(item_id)},
                 )
-                return
-            await asyncio.sleep(max(5, int(self._nurture_lease_seconds // 3)))
+
+    async def _wait_for_queue(self, channel: str) -> bool:
+        """等待入队通知；其他进程写入的任务靠兜底轮询间隔发现。"""
+        timeout = float(getattr(settings, "worker_queue_poll_interval_sec", 5.0) or 5.0)
+        return await queue_notifier.wait(channel, timeout=max(0.1, timeout))
+
+    def _record_queue_wait(self, channel: str, row: Dict[str, Any]) -> None:
+        """记录「可领取 -> 被领取」的等待；延后或退避中的任务从到点时间（not_before / watermark_next_at）起算。"""
+        item_id = int(row.get("id") or 0)
+        ready_at = queue_notifier.pop_enqueued_at(channel, item_id)
+        if ready_at is None:
+            # 其他进程入队或重启前遗留的任务：退回到行时间戳（秒级）
+            ready_at = _parse_row_time(row.get("updated_at") or row.get("created_at"))
+        due_field = _QUEUE_DUE_FIELDS.get(channel)
+        due_at = _parse_row_time(row.get(due_field)) if due_field else None
+        if due_at is not None and (ready_at is None or due_at > ready_at):
+            ready_at = due_at
+        if ready_at is None:
+            return
+        self._queue_wait_ms[channel].append(max(0.0, (time.time() - ready_at) * 1000))
+
+    def queue_wait_stats(self) -> Dict[str, Dict[str, Any]]:
+        """最近若干次领取的排队等待统计（毫秒）。"""
+        result: Dict[str, Dict[str, Any]] = {}
+        for channel, samples in self._queue_wait_ms.items():
+            values = sorted(samples)
+            count = len(values)
+            result[channel] = {
+                "count": count,
+                "avg_ms": round(sum(values) / count, 1) if count else 0.0,
+                "p50_ms": round(values[count // 2], 1) if count else 0.0,
+                "p95_ms": round(values[min(count - 1, int(count * 0.95))], 1) if count else 0.0,
+                "max_ms": round(values[-1], 1) if count else 0.0,
+            }
+        return result
 
     def _log_event(
         self,
@@ -308,7 +547,7 @@ class WorkerRunner:
         metadata: Optional[dict] = None,
     ) -> None:
         try:
-            sqlite_db.create_event_log(
+            sqlite_db.enqueue_event_log(
                 source="system",
                 action=action,
                 event=event,
@@ -0,0 +1,113 @@
+"""独立 Worker 进程入口。
+
+用法：
+    python -m app.worker [--processes 2] [--db data/video2api.db]
+
+说明：
+- 每个进程运行一个 `WorkerRunner`，与 API 进程共用同一个 SQLite 队列；任务靠租约（lease_owner/lease_until）
+  互斥，心跳续租；进程异常退出后，存活 Worker 的心跳协程每个租约周期调用 `requeue_stale_*` 回收过期租约。
+- 每个进程的 owner 形如 `worker-<host>-<pid>-<随机>`，可在任务行与事件日志里区分。
+- 与 API 进程分开部署时，在 API 的 `.env` 中设置 `WORKER_EMBEDDED_ENABLED=false` 关闭内嵌 Worker。
+- ixBrowser 窗口租约写入 SQLite `browser_window_leases`，profile 互斥与 `BROWSER_MAX_OPEN_WINDOWS` 对所有进程合计生效。
+- 独立 Worker 不参与 leader 选举，也不执行日志清理等周期性维护；代理 CF 事件明细由 API leader 进程的维护循环
+  每 10 分钟裁剪一次，独立 Worker 写入的事件同样会被裁剪。
+- 跨进程入队没有进程内唤醒信号，新任务按 `WORKER_QUEUE_POLL_INTERVAL_SEC` 兜底轮询发现。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import signal
+import sys
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+async def _serve() -> None:
+    from app.db.sqlite import async_db, sqlite_db
+    from app.services.ixbrowser.window_arbiter import window_arbiter
+    from app.services.system_settings import apply_runtime_settings
+    from app.services.worker_runner import worker_runner
+
+    apply_runtime_settings()
+    # 日志清理等周期性维护只由 API 进程中的 leader 执行
+    sqlite_db.set_background_maintenance_enabled(False)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows 事件循环不支持 add_signal_handler，退回 KeyboardInterrupt
+            pass
+
+    window_arbiter.enable_shared_leases(sqlite_db, worker_runner.owner)
+    await worker_runner.start()
+    logger.info("独立 Worker 已启动 | owner=%s", worker_runner.owner)
+    try:
+        await stop_event.wait()
+    finally:
+        await worker_runner.stop()
+        window_arbiter.disable_shared_leases()
+        async_db.shutdown(wait=False)
+        sqlite_db.flush_event_logs()
+        logger.info("独立 Worker 已停止 | owner=%s", worker_runner.owner)
+
+
+def run_worker_process(db_path: Optional[str] = None) -> None:
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+    from app.core.logger import setup_logging
+    from app.db.sqlite import sqlite_db
+
+    setup_logging()
+    if db_path:
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._ensure_data_dir()
+        sqlite_db._init_db()
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Video2Api 独立 Worker")
+    parser.add_argument("--processes", type=int, default=1, help="Worker 进程数")
+    parser.add_argument("--db", default=None, help="SQLite 文件路径（默认与 API 相同）")
+    args = parser.parse_args(argv)
+
+    processes = max(1, int(args.processes))
+    if processes == 1:
+        run_worker_process(args.db)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    children = [
+        ctx.Process(target=run_worker_process, args=(args.db,), name=f"video2api-worker-{idx}")
+        for idx in range(processes)
+    ]
+    for child in children:
+        child.start()
+
+    def _forward(signum, _frame) -> None:
+        for child in children:
+            if child.is_alive():
+                child.terminate()
+
+    signal.signal(signal.SIGTERM, _forward)
+    try:
+        for child in children:
+            child.join()
+    except KeyboardInterrupt:
+        # Ctrl+C 已同时送达子进程（同一进程组），这里只需等待它们退出
+        for child in children:
+            child.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""SQLite 仓储层基准测试
+
+用法：
+    python scripts/bench_sqlite.py pool [--ops 2000]
+    python scripts/bench_sqlite.py eventlog [--ops 5000]
+    python scripts/bench_sqlite.py fts [--rows 1000000] [--queries 20]
+    python scripts/bench_sqlite.py claim [--jobs 2000] [--workers 4] [--batch 4]
+
+说明：
+- 所有基准都在临时目录下的独立数据库上运行，不会触碰 data/video2api.db。
+- `pool`：对比连接池关闭（max_idle=0，等价于旧的每次新建连接）与开启时的 ops/sec。
+- `eventlog`：对比逐条提交（create_event_log）与组提交（enqueue_event_log + flush）的写入速率。
+- `fts`：在 N 行 event_logs 上对比 keyword 检索走 FTS5(trigram) 与 LIKE 回退的耗时。
+- `claim`：多个进程同时对同一数据库文件领取 sora_jobs，对比逐条 claim 与批量 claim 的吞吐与延迟。
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from app.db.sqlite import sqlite_db
+
+
+def _use_temp_db(tmp_dir: str, name: str) -> None:
+    sqlite_db._db_path = os.path.join(tmp_dir, name)
+    sqlite_db._ensure_data_dir()
+    sqlite_db._init_db()
+    sqlite_db._last_event_cleanup_at = time.time()
+    sqlite_db._last_audit_cleanup_at = time.time()
+
+
+def _seed_sora_jobs(count: int) -> int:
+    last_id = 0
+    for idx in range(count):
+        last_id = sqlite_db.create_sora_job(
+            {
+                # 每个任务独立账号：领取按账号亲和，同账号同时只放行一个窗口阶段任务
+                "profile_id": idx + 1,
+                "window_name": f"win-{idx}",
+                "group_title": "Sora",
+                "prompt": f"bench prompt {idx}",
+                "duration": "10s",
+                "aspect_ratio": "landscape",
+                "status": "queued",
+                "phase": "queue",
+            }
+        )
+    return last_id
+
+
+def _timed(ops: int, fn) -> float:
+    started = time.perf_counter()
+    for idx in range(ops):
+        fn(idx)
+    elapsed = time.perf_counter() - started
+    return ops / elapsed if elapsed > 0 else float("inf")
+
+
+def _bench_pool_once(tmp_dir: str, ops: int, max_idle: int) -> dict:
+    sqlite_db._pool_max_idle = int(max_idle)
+    _use_temp_db(tmp_dir, f"pool-{max_idle}.db")
+    last_job_id = _seed_sora_jobs(ops)
+
+    results = {}
+    results["create_event_log"] = _timed(
+        ops,
+        lambda idx: sqlite_db.create_event_log(
+            source="system",
+            action="bench.event",
+            status="success",
+            level="INFO",
+            message=f"bench-{idx}",
+            metadata={"idx": idx},
+        ),
+    )
+    results["get_sora_job"] = _timed(ops, lambda idx: sqlite_db.get_sora_job(last_job_id - (idx % ops)))
+    results["claim_next_sora_job"] = _timed(
+        ops,
+        lambda idx: sqlite_db.claim_next_sora_job(owner="bench-worker", lease_seconds=600),
+    )
+    sqlite_db.close_pool()
+    return results
+
+
+def bench_pool(ops: int) -> None:
+    old_db_path = sqlite_db._db_path
+    old_max_idle = sqlite_db._pool_max_idle
+    try:
+        with tempfile.TemporaryDirectory(prefix="video2api-bench-") as tmp_dir:
+            baseline = _bench_pool_once(tmp_dir, ops, max_idle=0)
+            pooled = _bench_pool_once(tmp_dir, ops, max_idle=old_max_idle or 8)
+    finally:
+        sqlite_db._pool_max_idle = old_max_idle
+        sqlite_db._db_path = old_db_path
+
+    print(f"连接池基准（ops={ops}）")
+    print(f"{'操作':<24}{'无连接池 ops/s':>18}{'连接池 ops/s':>18}{'提升':>10}")
+    for name, before in baseline.items():
+        after = pooled[name]
+        ratio = after / before if before > 0 else 0.0
+        print(f"{name:<24}{before:>18.1f}{after:>18.1f}{ratio:>9.2f}x")
+
+
+def _bench_event_log_row(idx: int) -> dict:
+    return {
+        "source": "api",
+        "action": "api.request",
+        "status": "success",
+        "level": "INFO",
+        "message": f"GET /bench/{idx}",
+        "method": "GET",
+        "path": f"/bench/{idx}",
+        "duration_ms": idx % 300,
+        "metadata": {"idx": idx},
+    }
+
+
+def bench_eventlog(ops: int) -> None:
+    old_db_path = sqlite_db._db_path
+    try:
+        with tempfile.TemporaryDirectory(prefix="video2api-bench-") as tmp_dir:
+            _use_temp_db(tmp_dir, "eventlog-sync.db")
+            sync_rate = _timed(ops, lambda idx: sqlite_db.create_event_log(**_bench_event_log_row(idx)))
+
+            _use_temp_db(tmp_dir, "eventlog-group.db")
+            started = time.perf_counter()
+            for idx in range(ops):
+                sqlite_db.enqueue_event_log(**_bench_event_log_row(idx))
+            sqlite_db.flush_event_logs()
+            elapsed = time.perf_counter() - started
+            group_rate = ops / elapsed if elapsed > 0 else float("inf")
+            stats = sqlite_db.event_log_writer_stats()
+            sqlite_db.stop_event_log_writer()
+            sqlite_db.close_pool()
+    finally:
+        sqlite_db._db_path = old_db_path
+
+    ratio = group_rate / sync_rate if sync_rate > 0 else 0.0
+    print(f"event_logs 写入基准（ops={ops}）")
+    print(f"逐条提交 rows/s: {sync_rate:.1f}")
+    print(f"组提交   rows/s: {group_rate:.1f}（{ratio:.2f}x，批次={stats['batches']}，丢弃={stats['dropped']}）")
+
+
+def _seed_event_logs_bulk(rows: int, chunk: int = 20000) -> None:
+    actions = ["api.request", "sora.job.start", "sora.job.fail", "logger.info", "scan.run"]
+    words = ["submit", "progress", "publish", "watermark", "timeout", "proxy", "quota", "genid"]
+    created_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    conn = sqlite_db._get_conn()
+    try:
+        for offset in range(0, rows, chunk):
+            batch = []
+            for idx in range(offset, min(rows, offset + chunk)):
+                batch.append(
+                    sqlite_db._build_event_log_row(
+                        source="api" if idx % 3 == 0 else "task",
+                        action=actions[idx % len(actions)],
+                        message=f"{words[idx % len(words)]} step {idx} {words[(idx * 7) % len(words)]}",
+                        path=f"/api/v1/bench/{idx % 500}",
+                        resource_id=str(idx),
+                        operator_username=f"user-{idx % 20}",
+                        trace_id=f"trace-{idx:08d}",
+                        created_at=created_at,
+                    )
+                )
+            conn.execute("BEGIN")
+            sqlite_db._insert_event_log_rows(conn.cursor(), batch)
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def bench_fts(rows: int, queries: int) -> None:
+    keywords = ["trace-00000042", "watermark step", "/bench/499", "not-present-anywhere"]
+    old_db_path = sqlite_db._db_path
+    old_enabled = getattr(sqlite_db, "_event_logs_fts_enabled", False)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="video2api-bench-") as tmp_dir:
+            _use_temp_db(tmp_dir, "fts.db")
+            if not sqlite_db._event_logs_fts_enabled:
+                print("当前 SQLite 不支持 FTS5 trigram，无法对比")
+                return
+            started = time.perf_counter()
+            _seed_event_logs_bulk(rows)
+            print(f"写入 {rows} 行（含 FTS 触发器）耗时 {time.perf_counter() - started:.1f}s")
+
+            for mode, enabled in (("LIKE", False), ("FTS5", True)):
+                sqlite_db._event_logs_fts_enabled = enabled
+                for keyword in keywords:
+                    started = time.perf_counter()
+                    for _ in range(queries):
+                        sqlite_db.list_event_logs(keyword=keyword, limit=50)
+                    list_ms = (time.perf_counter() - started) * 1000 / queries
+                    started = time.perf_counter()
+                    sqlite_db.stats_event_logs(keyword=keyword)
+                    stats_ms = (time.perf_counter() - started) * 1000
+                    results[(mode, keyword)] = (list_ms, stats_ms)
+            sqlite_db.close_pool()
+    finally:
+        sqlite_db._event_logs_fts_enabled = old_enabled
+        sqlite_db._db_path = old_db_path
+
+    print(f"keyword 检索基准（rows={rows}，list 取 {queries} 次平均）")
+    print(f"{'keyword':<24}{'LIKE list ms':>14}{'FTS list ms':>14}{'LIKE stats ms':>16}{'FTS stats ms':>15}")
+    for keyword in keywords:
+        like_list, like_stats = results[("LIKE", keyword)]
+        fts_list, fts_stats = results[("FTS5", keyword)]
+        print(f"{keyword:<24}{like_list:>14.2f}{fts_list:>14.2f}{like_stats:>16.1f}{fts_stats:>15.1f}")
+
+
+def _claim_worker(db_path: str, owner: str, batch: int, start_at: float, result_queue) -> None:
+    sqlite_db.close_pool()
+    sqlite_db._db_path = db_path
+    claimed = []
+    latencies = []
+    round_trips = 0
+    while time.time() < start_at:
+        time.sleep(0.001)
+    while True:
+        started = time.perf_counter()
+        rows = sqlite_db.claim_sora_jobs(owner=owner, n=batch, lease_seconds=600)
+        latencies.append((time.perf_counter() - started) * 1000)
+        round_trips += 1
+        if not rows:
+            break
+        claimed.extend(int(row["id"]) for row in rows)
+    sqlite_db.close_pool()
+    result_queue.put({"owner": owner, "claimed": claimed, "latencies": latencies, "round_trips": round_trips})
+
+
+def _bench_claim_once(tmp_dir: str, jobs: int, workers: int, batch: int) -> dict:
+    _use_temp_db(tmp_dir, f"claim-{batch}.db")
+    _seed_sora_jobs(jobs)
+    db_path = sqlite_db._db_path
+    sqlite_db.close_pool()
+
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    start_at = time.time() + 2.0
+    procs = [
+        ctx.Process(target=_claim_worker, args=(db_path, f"bench-{idx}", batch, start_at, result_queue))
+        for idx in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    results = [result_queue.get() for _ in procs]
+    finished = time.time()
+    for proc in procs:
+        proc.join()
+
+    claimed = [job_id for item in results for job_id in item["claimed"]]
+    latencies = sorted(value for item in results for value in item["latencies"])
+    elapsed = max(finished - start_at, 1e-9)
+    return {
+        "claimed": len(claimed),
+        "duplicates": len(claimed) - len(set(claimed)),
+        "round_trips": sum(item["round_trips"] for item in results),
+        "jobs_per_sec": len(claimed) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0,
+    }
+
+
+def bench_claim(jobs: int, workers: int, batch: int) -> None:
+    old_db_path = sqlite_db._db_path
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="video2api-bench-") as tmp_dir:
+            for size in sorted({1, batch}):
+                results[size] = _bench_claim_once(tmp_dir, jobs, workers, size)
+    finally:
+        sqlite_db._db_path = old_db_path
+
+    print(f"sora_jobs 并发领取基准（jobs={jobs}，进程={workers}）")
+    print(f"{'每次领取':<10}{'领取数':>8}{'重复':>6}{'往返次数':>10}{'jobs/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    for size, item in results.items():
+        print(
+            f"{size:<10}{item['claimed']:>8}{item['duplicates']:>6}{item['round_trips']:>10}"
+            f"{item['jobs_per_sec']:>10.1f}{item['p50_ms']:>9.2f}{item['p99_ms']:>9.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite 仓储层基准测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pool_parser = sub.add_parser("pool", help="连接池开启/关闭的 ops/sec 对比")
+    pool_parser.add_argument("--ops", type=int, default=2000)
+
+    eventlog_parser = sub.add_parser("eventlog", help="event_logs 逐条提交与组提交的写入速率对比")
+    eventlog_parser.add_argument("--ops", type=int, default=5000)
+
+    fts_parser = sub.add_parser("fts", help="event_logs keyword 检索 FTS5 与 LIKE 的耗时对比")
+    fts_parser.add_argument("--rows", type=int, default=1_000_000)
+    fts_parser.add_argument("--queries", type=int, default=20)
+
+    claim_parser = sub.add_parser("claim", help="多进程并发领取 sora_jobs：逐条与批量 claim 的对比")
+    claim_parser.add_argument("--jobs", type=int, default=2000)
+    claim_parser.add_argument("--workers", type=int, default=4)
+    claim_parser.add_argument("--batch", type=int, default=4)
+
+    args = parser.parse_args()
+    if args.command == "pool":
+        bench_pool(max(1, int(args.ops)))
+    elif args.command == "eventlog":
+        bench_eventlog(max(1, int(args.ops)))
+    elif args.command == "fts":
+        bench_fts(max(1, int(args.rows)), max(1, int(args.queries)))
+    elif args.command == "claim":
+        bench_claim(max(1, int(args.jobs)), max(1, int(args.workers)), max(1, int(args.batch)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""校验 ixbrowser_profile_state 物化表与扫描结果是否一致
+
+用法：
+    python scripts/check_profile_state.py [--group Sora] [--repair]
+
+说明：
+- 以 ixbrowser_scan_results 按 run 顺序重放，逐窗口比对 scan/realtime/good/session 槽位。
+- 发现缺失或不一致时以非零状态码退出；`--repair` 会按现存扫描结果重建（已被裁剪的历史不可恢复）。
+"""
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from app.db.sqlite import sqlite_db
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ixbrowser_profile_state 一致性校验")
+    parser.add_argument("--group", default=None, help="仅校验指定分组（默认全部）")
+    parser.add_argument("--repair", action="store_true", help="不一致时按扫描结果重建")
+    args = parser.parse_args()
+
+    report = sqlite_db.check_ixbrowser_profile_state(args.group)
+    print(f"校验窗口数: {report['checked']}，物化行数: {report['state_rows']}")
+    for item in report["missing"]:
+        print(f"缺失: group={item['group_title']} profile={item['profile_id']}")
+    for item in report["mismatched"]:
+        print(f"不一致: group={item['group_title']} profile={item['profile_id']} columns={','.join(item['columns'])}")
+    if report["ok"]:
+        print("一致")
+        return 0
+    if args.repair:
+        count = sqlite_db.rebuild_ixbrowser_profile_state(args.group)
+        print(f"已重建 {count} 行")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -51,7 +51,7 @@ async def test_heavy_load_submit_auto_retry_spawns_new_job_and_visible_in_tasks(
                 )
             ]
 
-        async def _fake_submit_and_progress(**_kwargs):
+        async def _fake_submit(**_kwargs):
             raise IXBrowserServiceError("We're under heavy load, please try again later.")
 
         async def _fake_pick_best_account(group_title="Sora", exclude_profile_ids=None):
@@ -67,7 +67,7 @@ async def test_heavy_load_submit_auto_retry_spawns_new_job_and_visible_in_tasks(
             )
 
         monkeypatch.setattr(ixbrowser_service, "list_group_windows", _fake_list_group_windows)
-        monkeypatch.setattr(ixbrowser_service._sora_generation_workflow, "run_sora_submit_and_progress", _fake_submit_and_progress)
+        monkeypatch.setattr(ixbrowser_service._sora_generation_workflow, "run_sora_submit", _fake_submit)
         monkeypatch.setattr(account_dispatch_service, "pick_best_account", _fake_pick_best_account)
 
         port = find_free_port()
@@ -105,47 +105,30 @@ def test_load_latest_scan_map_overlays_realtime_quota_without_overwriting_accoun
     service = AccountDispatchService()
 
     monkeypatch.setattr(
-        "app.services.account_dispatch_service.sqlite_db.get_ixbrowser_latest_scan_run_excluding_operator",
-        lambda _group_title, _operator_username: {"id": 36},
-    )
-    monkeypatch.setattr(
-        "app.services.account_dispatch_service.sqlite_db.get_ixbrowser_latest_scan_run",
-        lambda _group_title: {"id": 27},
-    )
-    monkeypatch.setattr(
-        "app.services.account_dispatch_service.sqlite_db.get_ixbrowser_latest_scan_run_by_operator",
-        lambda _group_title, _operator_username: {"id": 27},
-    )
-
-    def _fake_get_results_by_run(run_id: int):
-        if int(run_id) == 36:
-            return [
-                {
-                    "profile_id": 1,
-                    "account_plan": "plus",
-                    "quota_remaining_count": 10,
-                    "quota_source": "https://sora.chatgpt.com/backend/nf/check",
-                    "scanned_at": "2026-02-09 00:00:00",
-                    "account": "a@example.com",
-                }
-            ]
-        if int(run_id) == 27:
-            return [
-                {
-                    "profile_id": 1,
-                    "account_plan": None,
-                    "quota_remaining_count": 9,
-                    "quota_source": "realtime",
-                    "quota_reset_at": "2026-02-10T00:00:00+00:00",
-                    "scanned_at": "2026-02-10 00:00:00",
-                    "account": None,
-                }
-            ]
-        return []
-
-    monkeypatch.setattr(
-        "app.services.account_dispatch_service.sqlite_db.get_ixbrowser_scan_results_by_run",
-        _fake_get_results_by_run,
+        "app.services.account_dispatch_service.sqlite_db.list_ixbrowser_profile_states",
+        lambda _group_title: [
+            {
+                "profile_id": 1,
+                "scan_run_id": 36,
+                "scan_account": "a@example.com",
+                "scan_account_plan": "plus",
+                "scan_quota_remaining_count": 10,
+                "scan_quota_source": "https://sora.chatgpt.com/backend/nf/check",
+                "scan_scanned_at": "2026-02-09 00:00:00",
+                "realtime_run_id": 27,
+                "realtime_quota_remaining_count": 9,
+                "realtime_quota_source": "realtime",
+                "realtime_quota_reset_at": "2026-02-10T00:00:00+00:00",
+                "realtime_scanned_at": "2026-02-10 00:00:00",
+            },
+            {
+                "profile_id": 2,
+                "realtime_run_id": 27,
+                "realtime_quota_remaining_count": 4,
+                "realtime_quota_source": "realtime",
+                "realtime_scanned_at": "2026-02-10 00:00:00",
+            },
+        ],
     )
 
     scan_map = service._load_latest_scan_map("Sora")
@@ -153,6 +136,8 @@ def test_load_latest_scan_map_overlays_realtime_quota_without_overwriting_accoun
     assert scan_map[1]["account"] == "a@example.com"
     assert scan_map[1]["quota_remaining_count"] == 9
     assert scan_map[1]["quota_source"] == "realtime"
+    assert scan_map[2]["account"] is None
+    assert scan_map[2]["quota_remaining_count"] == 4
 
 
 @pytest.mark.asyncio
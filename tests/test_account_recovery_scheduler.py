@@ -35,7 +35,7 @@ async def test_account_recovery_pauses_when_disabled_and_logs(monkeypatch):
         calls.append(kwargs)
         return None
 
-    monkeypatch.setattr("app.services.account_recovery_scheduler.sqlite_db.create_event_log", lambda **kwargs: logs.append(kwargs) or 1)
+    monkeypatch.setattr("app.services.account_recovery_scheduler.sqlite_db.enqueue_event_log", lambda **kwargs: logs.append(kwargs) or 1)
     monkeypatch.setattr("app.services.account_recovery_scheduler.ixbrowser_service.scan_group_sora_sessions", _fake_scan_group_sora_sessions)
 
     scheduler.apply_settings(_build_cfg(enabled=False, auto_scan_enabled=True))
@@ -67,7 +67,7 @@ async def test_account_recovery_tick_triggers_and_updates_next_run(monkeypatch):
         return None
 
     monkeypatch.setattr("app.services.account_recovery_scheduler.sqlite_db.try_acquire_scheduler_lock", lambda **kwargs: True)
-    monkeypatch.setattr("app.services.account_recovery_scheduler.sqlite_db.create_event_log", lambda **kwargs: logs.append(kwargs) or 1)
+    monkeypatch.setattr("app.services.account_recovery_scheduler.sqlite_db.enqueue_event_log", lambda **kwargs: logs.append(kwargs) or 1)
     monkeypatch.setattr("app.services.account_recovery_scheduler.ixbrowser_service.scan_group_sora_sessions", _fake_scan_group_sora_sessions)
 
     await scheduler._tick()  # noqa: SLF001
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.services.ixbrowser import adaptive_concurrency
+from app.services.ixbrowser.adaptive_concurrency import AdaptiveConcurrencyController
+from app.services.ixbrowser.sora_job_runner import _WindowSlots
+
+pytestmark = pytest.mark.unit
+
+
+def test_aimd_increases_per_full_window_and_halves_on_congestion(monkeypatch):
+    controller = AdaptiveConcurrencyController(base=2, floor=1, ceiling=4, enabled=True)
+    assert controller.limit == 2
+
+    assert controller.on_success() is None
+    decision = controller.on_success()
+    assert decision["action"] == "increase"
+    assert controller.limit == 3
+    for _ in range(3):
+        controller.on_success()
+    assert controller.limit == 4
+    for _ in range(10):
+        controller.on_success()
+    assert controller.limit == 4
+
+    decision = controller.on_congestion("cf_challenge")
+    assert decision["action"] == "decrease"
+    assert controller.limit == 2
+    # 冷却期内同一波拥塞不再继续减半
+    assert controller.on_congestion("overload") is None
+    assert controller.limit == 2
+
+    monkeypatch.setattr(adaptive_concurrency, "DECREASE_COOLDOWN_SEC", 0.0)
+    controller.on_congestion("ixbrowser_busy")
+    controller.on_congestion("ixbrowser_busy")
+    assert controller.limit == 1
+
+    snapshot = controller.snapshot()
+    assert snapshot["signals"] == {"cf_challenge": 1, "overload": 1, "ixbrowser_busy": 2}
+    assert snapshot["history"][0]["to_limit"] == 1
+    assert [item["action"] for item in snapshot["history"]].count("increase") == 2
+
+
+def test_aimd_disabled_uses_base_and_configure_resets():
+    controller = AdaptiveConcurrencyController(base=3, floor=1, ceiling=6, enabled=False)
+    assert controller.on_congestion("overload") is None
+    assert controller.limit == 3
+
+    controller.configure(enabled=True, floor=4, ceiling=6)
+    assert controller.limit == 4
+    controller.set_base(8)
+    assert controller.limit == 6
+    controller.configure(enabled=False, floor=4, ceiling=6)
+    assert controller.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_window_slots_resize_applies_to_later_grants():
+    slots = _WindowSlots(1)
+    await slots.acquire()
+    waiter = asyncio.create_task(slots.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    slots.set_limit(2)
+    await asyncio.wait_for(waiter, timeout=1)
+    assert slots.in_use == 2
+
+    slots.set_limit(1)
+    slots.release()
+    blocked = asyncio.create_task(slots.acquire())
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    slots.release()
+    await asyncio.wait_for(blocked, timeout=1)
+    assert slots.in_use == 1
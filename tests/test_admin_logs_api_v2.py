@@ -1,6 +1,8 @@
 import asyncio
 import json
 import os
+import time
+from datetime import datetime, timedelta
 
 import pytest
 from fastapi.testclient import TestClient
@@ -80,6 +82,24 @@ def test_admin_logs_v2_list_and_stats(client):
     assert stats["p95_duration_ms"] == 2200
 
 
+def test_admin_logs_archive_query(client):
+    sqlite_db._last_event_cleanup_at = time.time()
+    old_at = (datetime.now() - timedelta(days=60)).strftime("%Y-%m-%d 08:00:00")
+    sqlite_db.create_event_log(source="api", action="api.request", message="archived", trace_id="t-1", created_at=old_at)
+    sqlite_db.create_event_log(source="api", action="api.request", message="other", trace_id="t-2", created_at=old_at)
+    sqlite_db.cleanup_event_logs(retention_days=30)
+
+    resp = client.get("/api/v1/admin/logs/archive", params={"trace_id": "t-1"})
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert [item["message"] for item in payload["items"]] == ["archived"]
+    assert payload["has_more"] is False
+
+    seg_resp = client.get("/api/v1/admin/logs/archive/segments")
+    assert seg_resp.status_code == 200
+    assert [item["row_count"] for item in seg_resp.json()] == [2]
+
+
 def test_admin_logs_stream_requires_token(client):
     sqlite_db.create_user("stream-user", "x", role="admin")
 
@@ -1,4 +1,5 @@
 import os
+from collections import deque
 
 import pytest
 from fastapi.testclient import TestClient
@@ -6,6 +7,7 @@ from fastapi.testclient import TestClient
 from app.core.auth import get_current_active_user
 from app.db.sqlite import sqlite_db
 from app.main import app
+from app.services.ixbrowser_service import ixbrowser_service
 
 pytestmark = pytest.mark.unit
 
@@ -56,6 +58,43 @@ def test_admin_system_settings_get_and_put(client):
     assert updated["data"]["video_api"]["bearer_token"] == "video-api-token"
 
 
+def test_admin_sora_concurrency_status_reports_adaptive_decisions(client):
+    payload = client.get("/api/v1/admin/settings/system").json()["data"]
+    payload["sora"]["job_max_concurrency"] = 4
+    payload["sora"]["adaptive_concurrency_enabled"] = True
+    payload["sora"]["adaptive_concurrency_min"] = 1
+    payload["sora"]["adaptive_concurrency_max"] = 6
+    try:
+        assert client.put("/api/v1/admin/settings/system", json=payload).status_code == 200
+        ixbrowser_service.record_sora_congestion("overload")
+
+        resp = client.get("/api/v1/admin/concurrency/sora")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["enabled"] is True
+        assert body["limit"] == 2
+        assert body["signals"]["overload"] == 1
+        assert body["history"][0]["action"] == "decrease"
+        assert body["history"][0]["from_limit"] == 4
+        assert ixbrowser_service.sora_job_claim_capacity() >= 2
+    finally:
+        ixbrowser_service.set_sora_adaptive_concurrency(False, 1, 6)
+        ixbrowser_service.set_sora_job_max_concurrency(2)
+
+
+def test_admin_worker_queue_wait_stats(client, monkeypatch):
+    from app.services.queue_notifier import SORA_QUEUE
+    from app.services.worker_runner import worker_runner
+
+    monkeypatch.setattr(worker_runner, "_queue_wait_ms", {SORA_QUEUE: deque([10.0, 30.0, 20.0], maxlen=500)})
+
+    resp = client.get("/api/v1/admin/worker/queue-wait")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["owner"] == worker_runner.owner
+    assert body["queues"][SORA_QUEUE] == {"count": 3, "avg_ms": 20.0, "p50_ms": 20.0, "p95_ms": 30.0, "max_ms": 30.0}
+
+
 def test_admin_scan_scheduler_put_validation_and_get(client):
     bad_resp = client.put(
         "/api/v1/admin/settings/scheduler/scan",
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.db.sqlite import async_db, sqlite_db
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def temp_db(tmp_path):
+    old_db_path = sqlite_db._db_path
+    try:
+        db_path = tmp_path / "async-db.db"
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._ensure_data_dir()
+        sqlite_db._init_db()
+        sqlite_db._last_event_cleanup_at = time.time()
+        sqlite_db._last_audit_cleanup_at = 0.0
+        yield db_path
+    finally:
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+@pytest.mark.asyncio
+async def test_async_db_proxies_repository_methods(temp_db):
+    del temp_db
+    job_id = await async_db.create_sora_job(
+        {
+            "profile_id": 3,
+            "window_name": "win-3",
+            "group_title": "Sora",
+            "prompt": "hello",
+            "duration": "10s",
+            "aspect_ratio": "landscape",
+        }
+    )
+    row = await async_db.get_sora_job(job_id)
+    assert row and int(row["profile_id"]) == 3
+
+    with pytest.raises(AttributeError):
+        async_db._get_conn  # noqa: B018
+
+
+@pytest.mark.asyncio
+async def test_async_db_sees_monkeypatched_methods(monkeypatch):
+    monkeypatch.setattr(sqlite_db, "get_sora_job", lambda job_id: {"id": job_id, "patched": True})
+    row = await async_db.get_sora_job(7)
+    assert row == {"id": 7, "patched": True}
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_while_writer_holds_lock(temp_db):
+    locker = sqlite3.connect(str(temp_db), timeout=5.0, check_same_thread=False)
+    locker.execute("BEGIN IMMEDIATE")
+    locker.execute(
+        "INSERT INTO scheduler_locks (lock_key, owner, locked_until, updated_at) VALUES (?, ?, ?, ?)",
+        ("held", "tester", "2000-01-01 00:00:00", "2000-01-01 00:00:00"),
+    )
+    hold_seconds = 0.8
+    releaser = threading.Timer(hold_seconds, locker.commit)
+    releaser.start()
+
+    max_gap = 0.0
+    stop = asyncio.Event()
+
+    async def _ticker():
+        nonlocal max_gap
+        last = time.monotonic()
+        while not stop.is_set():
+            await asyncio.sleep(0.01)
+            now = time.monotonic()
+            max_gap = max(max_gap, now - last)
+            last = now
+
+    ticker = asyncio.create_task(_ticker())
+    started = time.monotonic()
+    try:
+        acquired = await async_db.try_acquire_scheduler_lock(lock_key="blocked", owner="worker", ttl_seconds=60)
+        elapsed = time.monotonic() - started
+    finally:
+        stop.set()
+        await ticker
+        releaser.join()
+        locker.close()
+
+    assert acquired is True
+    # 写入确实被锁阻塞过，但事件循环始终保持调度。
+    assert elapsed >= hold_seconds * 0.5
+    assert max_gap < 0.25
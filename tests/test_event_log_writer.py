@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.db.sqlite import sqlite_db
+from app.db.sqlite.event_log_writer import EventLogWriter
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def temp_db(tmp_path):
+    old_db_path = sqlite_db._db_path
+    try:
+        db_path = tmp_path / "event-log-writer.db"
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._ensure_data_dir()
+        sqlite_db._init_db()
+        sqlite_db._last_event_cleanup_at = time.time()
+        sqlite_db._last_audit_cleanup_at = time.time()
+        yield db_path
+    finally:
+        sqlite_db.flush_event_logs()
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+def _count_event_logs(db_path) -> int:
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return int(conn.execute("SELECT COUNT(*) FROM event_logs").fetchone()[0])
+    finally:
+        conn.close()
+
+
+def test_writer_batches_rows_and_flushes_on_demand():
+    batches = []
+    writer = EventLogWriter(lambda path, rows: batches.append((path, list(rows))), flush_interval_ms=60000, batch_size=1000)
+    try:
+        for idx in range(5):
+            assert writer.submit("a.db", (idx,)) is True
+        writer.submit("b.db", ("b",))
+
+        assert batches == []
+        assert writer.flush() == 6
+        assert sorted((path, len(rows)) for path, rows in batches) == [("a.db", 5), ("b.db", 1)]
+        stats = writer.stats()
+        assert stats["submitted"] == 6
+        assert stats["flushed"] == 6
+        assert stats["pending"] == 0
+    finally:
+        writer.stop()
+
+
+def test_writer_wakes_up_when_batch_size_reached():
+    flushed = threading.Event()
+    writer = EventLogWriter(lambda _path, _rows: flushed.set(), flush_interval_ms=60000, batch_size=3)
+    try:
+        for idx in range(3):
+            writer.submit("a.db", (idx,))
+        assert flushed.wait(2.0)
+    finally:
+        writer.stop()
+
+
+def test_writer_drops_when_queue_full_and_counts_failures():
+    def _boom(_path, _rows):
+        raise RuntimeError("disk full")
+
+    writer = EventLogWriter(_boom, flush_interval_ms=60000, batch_size=1000, max_queue_size=2)
+    try:
+        assert writer.submit("a.db", (1,)) is True
+        assert writer.submit("a.db", (2,)) is True
+        assert writer.submit("a.db", (3,)) is False
+        assert writer.flush() == 0
+        stats = writer.stats()
+        assert stats["dropped"] == 1
+        assert stats["failed"] == 2
+        assert stats["flushed"] == 0
+    finally:
+        writer.stop()
+
+
+def test_enqueue_event_log_is_visible_to_readers(temp_db):
+    before = sqlite_db.event_log_writer_stats()["flushed"]
+    for idx in range(20):
+        assert sqlite_db.enqueue_event_log(
+            source="system",
+            action="writer.test",
+            level="INFO",
+            message=f"row-{idx}",
+            metadata={"idx": idx},
+        )
+
+    result = sqlite_db.list_event_logs(source="system", action="writer.test", limit=50)
+    assert len(result["items"]) == 20
+    assert result["items"][0]["message"] == "row-19"
+    assert _count_event_logs(temp_db) == 20
+    assert sqlite_db.event_log_writer_stats()["flushed"] - before >= 20
+
+
+def test_stop_event_log_writer_flushes_pending_rows(temp_db):
+    sqlite_db.enqueue_event_log(source="system", action="writer.stop", message="pending")
+    sqlite_db.stop_event_log_writer()
+    assert _count_event_logs(temp_db) == 1
+
+    # 停止后再次写入会自动拉起后台线程。
+    sqlite_db.enqueue_event_log(source="system", action="writer.stop", message="again")
+    sqlite_db.flush_event_logs()
+    assert _count_event_logs(temp_db) == 2
@@ -1,4 +1,8 @@
+import inspect
 import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
 
 import pytest
 
@@ -75,6 +79,24 @@ def test_event_logs_cursor_and_stats(temp_db):
     assert stats["p95_duration_ms"] == 2500
 
 
+def test_log_writers_keep_explicit_signatures(temp_db):
+    del temp_db
+    # 旧调用方按位置传 category/action
+    log_id = sqlite_db.create_audit_log("audit", "user.positional", "success")
+    assert log_id > 0
+    assert sqlite_db.enqueue_audit_log("audit", "user.positional.enqueue") is True
+    sqlite_db.flush_event_logs()
+    actions = {item["action"] for item in sqlite_db.list_event_logs(source="audit", limit=10)["items"]}
+    assert actions == {"user.positional", "user.positional.enqueue"}
+
+    with pytest.raises(TypeError):
+        sqlite_db.create_event_log("system", "positional.not.allowed")
+    with pytest.raises(TypeError):
+        sqlite_db.enqueue_event_log(source="system", action="typo", mesage="x")
+    assert "source" in inspect.signature(sqlite_db.create_event_log).parameters
+    assert "extra" in inspect.signature(sqlite_db.enqueue_audit_log).parameters
+
+
 def test_create_audit_log_maps_to_event_log_and_masks(temp_db):
     del temp_db
     sqlite_db.create_audit_log(
@@ -187,3 +209,326 @@ def test_event_logs_size_limit_cleanup(temp_db):
         settings.event_log_retention_days = old_retention_days
         settings.event_log_cleanup_interval_sec = old_cleanup_interval
         settings.event_log_max_mb = old_max_mb
+
+
+def _seed_keyword_logs():
+    sqlite_db.create_event_log(source="api", action="api.request", message="GET /api/v1/Sora/jobs", path="/api/v1/sora/jobs")
+    sqlite_db.create_event_log(source="api", action="api.request", message="GET /api/v1/users", trace_id="trace-kw-42")
+    sqlite_db.create_event_log(source="task", action="sora.job.fail", message="窗口打开失败", resource_id="9001")
+
+
+@pytest.mark.parametrize("fts_enabled", [True, False])
+def test_event_logs_keyword_search_fts_and_like_fallback(temp_db, monkeypatch, fts_enabled):
+    del temp_db
+    assert sqlite_db._event_logs_fts_enabled is True
+    monkeypatch.setattr(sqlite_db, "_event_logs_fts_enabled", fts_enabled)
+    _seed_keyword_logs()
+
+    def _messages(keyword):
+        return sorted(item["message"] for item in sqlite_db.list_event_logs(keyword=keyword, limit=50)["items"])
+
+    # 子串、大小写不敏感与 LIKE 行为一致
+    assert _messages("sora/JOBS") == ["GET /api/v1/Sora/jobs"]
+    assert _messages("kw-42") == ["GET /api/v1/users"]
+    assert _messages("900") == ["窗口打开失败"]
+    # 短关键字（trigram 无法命中）回退到 LIKE
+    assert _messages("失败") == ["窗口打开失败"]
+    assert _messages('"quoted"') == []
+    assert sqlite_db.stats_event_logs(keyword="api/v1")["total_count"] == 2
+
+    first_page = sqlite_db.list_event_logs(keyword="api/v1", source="api", limit=1)
+    assert [item["message"] for item in first_page["items"]] == ["GET /api/v1/users"]
+    second_page = sqlite_db.list_event_logs(keyword="api/v1", source="api", limit=1, cursor=first_page["next_cursor"])
+    assert [item["message"] for item in second_page["items"]] == ["GET /api/v1/Sora/jobs"]
+    assert second_page["has_more"] is False
+
+
+def test_event_logs_fts_follows_deletes(temp_db):
+    del temp_db
+    _seed_keyword_logs()
+    assert sqlite_db.cleanup_event_logs(retention_days=0, max_bytes=1) > 0
+    assert sqlite_db.list_event_logs(keyword="api/v1", limit=50)["items"] == []
+
+    sqlite_db.create_event_log(source="system", action="fts.row", message="fresh keyword row")
+    rows = sqlite_db.list_event_logs(keyword="keyword row", limit=50)["items"]
+    assert [row["message"] for row in rows] == ["fresh keyword row"]
+
+
+def _full_scan_size_bytes():
+    conn = sqlite_db._get_conn()
+    try:
+        row = conn.execute("SELECT COUNT(*) AS total_count, COALESCE(SUM(approx_bytes), 0) AS total_bytes FROM event_logs").fetchone()
+        stats = conn.execute(
+            "SELECT COALESCE(SUM(row_count), 0) AS row_count, COALESCE(SUM(approx_bytes), 0) AS approx_bytes "
+            "FROM table_size_stats WHERE table_name GLOB 'event_logs_p*'"
+        ).fetchone()
+        return (int(row["total_count"]), int(row["total_bytes"])), (int(stats["row_count"]), int(stats["approx_bytes"]))
+    finally:
+        conn.close()
+
+
+def test_event_logs_size_counter_tracks_inserts_and_deletes(temp_db):
+    del temp_db
+    for idx in range(30):
+        sqlite_db.create_event_log(source="system", action="size.counter", message="m" * idx, metadata={"idx": idx})
+    actual, tracked = _full_scan_size_bytes()
+    assert actual == tracked
+    assert tracked[0] == 30
+
+    table = sqlite_db._event_log_partition_table(datetime.now().strftime("%Y-%m-%d"))
+    conn = sqlite_db._get_conn()
+    conn.execute(f"UPDATE {table} SET message = 'shorter' WHERE id % 2 = 0")
+    conn.execute(f"DELETE FROM {table} WHERE id <= 10")
+    conn.commit()
+    conn.close()
+    actual, tracked = _full_scan_size_bytes()
+    assert actual == tracked
+    assert tracked[0] == 20
+
+    # 单次删除裁剪到容量上限以内
+    max_bytes = tracked[1] // 2
+    deleted = sqlite_db.cleanup_event_logs(retention_days=0, max_bytes=max_bytes)
+    actual, tracked = _full_scan_size_bytes()
+    assert deleted > 0
+    assert actual == tracked
+    assert 0 < tracked[1] <= max_bytes
+
+
+def test_stats_event_logs_served_from_minute_rollups(temp_db, monkeypatch):
+    del temp_db
+    base = datetime.now().replace(second=0, microsecond=0) - timedelta(hours=1)
+
+    def _at(minutes, seconds):
+        return (base + timedelta(minutes=minutes, seconds=seconds)).strftime("%Y-%m-%d %H:%M:%S")
+
+    rows = [
+        (_at(0, 5), "api", "api.request", "success", 120),
+        (_at(0, 40), "api", "api.request", "failed", 2500),
+        (_at(1, 10), "api", "api.login", "success", 40),
+        (_at(2, 59), "task", "sora.job.fail", "failed", None),
+        (_at(3, 0), "system", "logger.info", "success", None),
+    ]
+    for created_at, source, action_name, status, duration in rows:
+        sqlite_db.create_event_log(
+            source=source,
+            action=action_name,
+            status=status,
+            message=f"{action_name} {status}",
+            duration_ms=duration,
+            is_slow=bool(duration and duration >= 2000),
+            created_at=created_at,
+        )
+
+    raw_calls = []
+    original_build = sqlite_db._build_event_log_conditions
+
+    def _tracking_build(**kwargs):
+        raw_calls.append(kwargs)
+        return original_build(**kwargs)
+
+    monkeypatch.setattr(sqlite_db, "_build_event_log_conditions", _tracking_build)
+
+    stats = sqlite_db.stats_event_logs(source="api")
+    assert stats["total_count"] == 3
+    assert stats["failed_count"] == 1
+    assert stats["slow_count"] == 1
+    # 直方图 (2000, 3000] 档以实际最大值截断
+    assert stats["p95_duration_ms"] == 2500
+    assert stats["top_actions"][0] == {"key": "api.request", "count": 2}
+    assert stats["top_failed_reasons"] == [{"key": "api.request failed", "count": 1}]
+    # 只有失败原因查询回到原表
+    assert [call.get("status") for call in raw_calls] == ["failed"]
+
+    # 非整分钟边界：+0:30 ~ +2:59 由 rollup(+1~+2 分钟) + 原表边界段组成
+    stats = sqlite_db.stats_event_logs(start_at=_at(0, 30), end_at=_at(2, 59))
+    assert stats["total_count"] == 3
+    assert stats["failed_count"] == 2
+    assert {item["key"]: item["count"] for item in stats["source_distribution"]} == {"api": 2, "task": 1}
+    assert stats["p95_duration_ms"] == 2500
+
+    stats = sqlite_db.stats_event_logs(start_at=_at(0, 0), end_at=_at(0, 10))
+    assert stats["total_count"] == 1
+    assert stats["p95_duration_ms"] == 120
+
+    # rollup 无法回答的过滤条件回退到原表
+    raw_calls.clear()
+    sqlite_db.stats_event_logs(level="INFO")
+    assert raw_calls and raw_calls[0].get("level") == "INFO"
+
+    # 删除后 rollup 同步扣减
+    sqlite_db.cleanup_event_logs(retention_days=0, max_bytes=1)
+    assert sqlite_db.stats_event_logs()["total_count"] == 0
+
+
+def _partition_tables():
+    conn = sqlite_db._get_conn()
+    try:
+        return sqlite_db._list_event_log_partitions(conn.cursor())
+    finally:
+        conn.close()
+
+
+def test_event_logs_partitioned_by_day_and_dropped_by_retention(temp_db):
+    del temp_db
+    now = datetime.now()
+    days = [now - timedelta(days=offset) for offset in (0, 1, 2, 40)]
+    for day in days:
+        for idx in range(3):
+            sqlite_db.create_event_log(
+                source="system",
+                action="partition.test",
+                message=f"{day:%Y-%m-%d} row {idx}",
+                created_at=day.replace(microsecond=0).strftime("%Y-%m-%d %H:%M:%S"),
+            )
+
+    tables = _partition_tables()
+    assert tables == sorted(sqlite_db._event_log_partition_table(day.strftime("%Y-%m-%d")) for day in days)
+
+    # 游标翻页跨分区，id 全局递减且不重复
+    seen = []
+    cursor = None
+    while True:
+        page = sqlite_db.list_event_logs(action="partition.test", limit=5, cursor=cursor)
+        seen.extend(int(item["id"]) for item in page["items"])
+        if not page["has_more"]:
+            break
+        cursor = page["next_cursor"]
+    assert len(seen) == 12
+    assert seen == sorted(seen, reverse=True)
+
+    since = sqlite_db.list_event_logs_since(after_id=seen[-1], limit=100)
+    assert [int(item["id"]) for item in since] == sorted(seen)[1:]
+
+    # 过期分区整体 DROP，不逐行删除
+    removed = sqlite_db.cleanup_event_logs(retention_days=30, max_bytes=0)
+    assert removed == 3
+    assert sqlite_db._event_log_partition_table(days[-1].strftime("%Y-%m-%d")) not in _partition_tables()
+    assert sqlite_db.stats_event_logs()["total_count"] == 9
+
+
+def test_legacy_event_logs_table_migrated_into_partitions(tmp_path):
+    old_db_path = sqlite_db._db_path
+    db_path = tmp_path / "legacy-event-logs.db"
+    now = datetime.now()
+    legacy_rows = [
+        (5, (now - timedelta(days=1)).strftime("%Y-%m-%d 10:00:00"), "api", "api.request", "legacy yesterday"),
+        (9, now.strftime("%Y-%m-%d 00:00:01"), "task", "sora.job.fail", "legacy today"),
+    ]
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(
+        "CREATE TABLE event_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, created_at TIMESTAMP NOT NULL, "
+        "source TEXT NOT NULL, action TEXT NOT NULL, event TEXT, phase TEXT, status TEXT, level TEXT, "
+        "message TEXT, trace_id TEXT, request_id TEXT, method TEXT, path TEXT, query_text TEXT, "
+        "status_code INTEGER, duration_ms INTEGER, is_slow INTEGER NOT NULL DEFAULT 0, operator_user_id INTEGER, "
+        "operator_username TEXT, ip TEXT, user_agent TEXT, resource_type TEXT, resource_id TEXT, "
+        "error_type TEXT, error_code INTEGER, metadata_json TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO event_logs (id, created_at, source, action, message) VALUES (?, ?, ?, ?, ?)",
+        legacy_rows,
+    )
+    conn.commit()
+    conn.close()
+    try:
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._init_db()
+        sqlite_db._last_event_cleanup_at = time.time()
+
+        assert len(_partition_tables()) == 2
+        items = sqlite_db.list_event_logs(limit=10)["items"]
+        assert [(int(item["id"]), item["message"]) for item in items] == [(9, "legacy today"), (5, "legacy yesterday")]
+        assert [item["message"] for item in sqlite_db.list_event_logs(keyword="yesterday")["items"]] == ["legacy yesterday"]
+        assert sqlite_db.stats_event_logs()["total_count"] == 2
+
+        new_id = sqlite_db.create_event_log(source="system", action="after.migrate", message="new row")
+        assert new_id > 9
+    finally:
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+def test_expired_event_logs_archived_before_drop_and_queryable(temp_db):
+    sqlite_db._last_event_cleanup_at = time.time()
+    now = datetime.now()
+    old_day = now - timedelta(days=40)
+    for idx in range(4):
+        sqlite_db.create_event_log(
+            source="task",
+            action="sora.job.fail",
+            message=f"old row {idx}",
+            trace_id="trace-old" if idx % 2 == 0 else "trace-other",
+            resource_type="sora_job",
+            resource_id=str(idx),
+            metadata={"idx": idx},
+            created_at=old_day.strftime(f"%Y-%m-%d 10:00:0{idx}"),
+        )
+    sqlite_db.create_event_log(source="system", action="fresh", message="hot row")
+
+    assert sqlite_db.cleanup_event_logs(retention_days=30, max_bytes=0) == 4
+    assert sqlite_db.list_event_logs(action="sora.job.fail")["items"] == []
+
+    segments = sqlite_db.list_event_log_archive_segments()
+    assert len(segments) == 1
+    assert segments[0]["row_count"] == 4
+    assert segments[0]["partition_day"] == old_day.strftime("%Y-%m-%d")
+    assert os.path.exists(os.path.join(os.path.dirname(str(temp_db)), "event_log_archive", segments[0]["file_name"]))
+
+    result = sqlite_db.query_event_log_archive(trace_id="trace-old")
+    assert [item["message"] for item in result["items"]] == ["old row 0", "old row 2"]
+    assert result["items"][0]["metadata"] == {"idx": 0}
+    assert result["segments_scanned"] == 1
+
+    # 时间范围不相交的段直接被索引裁剪
+    assert sqlite_db.query_event_log_archive(start_at=now.strftime("%Y-%m-%d 00:00:00"))["segments_scanned"] == 0
+
+    page = sqlite_db.query_event_log_archive(resource_type="sora_job", limit=3)
+    assert page["has_more"] is True
+    rest = sqlite_db.query_event_log_archive(resource_type="sora_job", after_id=page["next_after_id"])
+    assert [item["resource_id"] for item in page["items"] + rest["items"]] == ["0", "1", "2", "3"]
+
+
+def test_size_cleanup_archives_trimmed_rows(temp_db):
+    del temp_db
+    for idx in range(50):
+        sqlite_db.create_event_log(source="system", action="size.archive", message=f"row {idx} " + "x" * 200)
+    deleted = sqlite_db.cleanup_event_logs(retention_days=0, max_bytes=4000)
+    assert deleted > 0
+    archived = sqlite_db.query_event_log_archive(limit=1000)["items"]
+    assert len(archived) == deleted
+    assert archived[0]["message"].startswith("row 0 ")
+
+
+def test_archive_segments_written_without_holding_write_lock(temp_db, monkeypatch):
+    sqlite_db._last_event_cleanup_at = time.time()
+    old_day = datetime.now() - timedelta(days=40)
+    for idx in range(3):
+        sqlite_db.create_event_log(
+            source="system",
+            action="archive.lock",
+            message=f"old row {idx}",
+            created_at=old_day.strftime(f"%Y-%m-%d 10:00:0{idx}"),
+        )
+
+    original_write = sqlite_db._write_event_log_archive_segment
+    concurrent_ids = []
+
+    def _write_while_other_writer_runs(*args, **kwargs):
+        # 段文件写出期间，其他连接的写入不能被 cleanup 阻塞
+        other = sqlite3.connect(str(temp_db), timeout=0.1)
+        try:
+            other.execute("CREATE TABLE IF NOT EXISTS lock_probe (v INTEGER)")
+            other.execute("INSERT INTO lock_probe (v) VALUES (1)")
+            other.commit()
+            concurrent_ids.append(other.execute("SELECT last_insert_rowid()").fetchone()[0])
+        finally:
+            other.close()
+        return original_write(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite_db, "_write_event_log_archive_segment", _write_while_other_writer_runs)
+
+    assert sqlite_db.cleanup_event_logs(retention_days=30, max_bytes=0) == 3
+    assert len(concurrent_ids) == 1
+    segments = sqlite_db.list_event_log_archive_segments()
+    assert [segment["row_count"] for segment in segments] == [3]
+    assert sqlite_db.list_event_logs(action="archive.lock")["items"] == []
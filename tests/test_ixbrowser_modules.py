@@ -1,5 +1,8 @@
+import asyncio
+
 import pytest
 
+from app.services.ixbrowser.sora_job_runner import SoraJobRunner
 from app.services.ixbrowser_service import IXBrowserService
 
 pytestmark = pytest.mark.unit
@@ -56,48 +59,58 @@ async def test_sora_publish_workflow_public_aliases_delegate(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_sora_job_runner_delegates_watermark_parse(monkeypatch):
+async def test_sora_job_runner_resolves_watermark_via_custom_parse(monkeypatch):
     service = IXBrowserService()
     runner = service._sora_job_runner  # noqa: SLF001
 
-    monkeypatch.setattr(
-        "app.services.ixbrowser.sora_job_runner.sqlite_db.get_watermark_free_config",
-        lambda: {
+    captured = {}
+
+    async def _fake_call_custom_watermark_parse(**kwargs):
+        captured.update(kwargs)
+        return "http://example.com/wm.mp4"
+
+    monkeypatch.setattr(runner, "call_custom_watermark_parse", _fake_call_custom_watermark_parse)
+
+    url = await runner._resolve_watermark_url(  # noqa: SLF001
+        {
             "enabled": True,
             "parse_method": "custom",
             "custom_parse_url": "http://127.0.0.1:19000",
             "custom_parse_token": None,
-            "custom_parse_path": "/parse",
+            "custom_parse_path": "parse",
             "retry_max": 0,
         },
+        "https://sora.chatgpt.com/p/s_1234abcd",
     )
-    monkeypatch.setattr("app.services.ixbrowser.sora_job_runner.sqlite_db.update_sora_job", lambda *_args, **_kwargs: True)
-    monkeypatch.setattr("app.services.ixbrowser.sora_job_runner.sqlite_db.create_sora_job_event", lambda *_args, **_kwargs: 1)
-
-    async def _fake_call_custom_watermark_parse(**kwargs):
-        del kwargs
-        return "http://example.com/wm.mp4"
-
-    monkeypatch.setattr(runner, "call_custom_watermark_parse", _fake_call_custom_watermark_parse)
-
-    url = await runner.run_sora_watermark(job_id=1, publish_url="https://sora.chatgpt.com/p/s_1234abcd")
     assert url == "http://example.com/wm.mp4"
+    assert captured["parse_url"] == "http://127.0.0.1:19000"
+    assert captured["parse_path"] == "/parse"
 
 
 @pytest.mark.asyncio
-async def test_sora_job_runner_watermark_retry_fallback_on_failure(monkeypatch):
+async def test_sora_job_runner_watermark_stage_fallback_on_failure(monkeypatch):
     service = IXBrowserService()
     runner = service._sora_job_runner  # noqa: SLF001
 
     monkeypatch.setattr(
         "app.services.ixbrowser.sora_job_runner.sqlite_db.get_watermark_free_config",
-        lambda: {"fallback_on_failure": True},
+        lambda: {"fallback_on_failure": True, "retry_max": 0},
+    )
+    monkeypatch.setattr(
+        "app.services.ixbrowser.sora_job_runner.sqlite_db.get_sora_job",
+        lambda _job_id: {
+            "id": 7,
+            "status": "running",
+            "watermark_status": "queued",
+            "watermark_attempts": 0,
+            "publish_url": "https://sora.chatgpt.com/p/s_1234abcd",
+        },
     )
 
-    async def _fake_run_sora_watermark(*_args, **_kwargs):
+    async def _fake_resolve_watermark_url(*_args, **_kwargs):
         raise RuntimeError("解析失败")
 
-    monkeypatch.setattr(runner, "run_sora_watermark", _fake_run_sora_watermark)
+    monkeypatch.setattr(runner, "_resolve_watermark_url", _fake_resolve_watermark_url)
 
     patched = {}
     events = []
@@ -110,7 +123,7 @@ async def test_sora_job_runner_watermark_retry_fallback_on_failure(monkeypatch):
         lambda _job_id, phase, event, message=None: events.append((phase, event, message)) or 1,
     )
 
-    await runner.run_sora_watermark_retry(job_id=7, publish_url="https://sora.chatgpt.com/p/s_1234abcd")
+    await runner.run_sora_watermark_stage(job_id=7)
 
     assert patched["status"] == "completed"
     assert patched["phase"] == "done"
@@ -120,19 +133,29 @@ async def test_sora_job_runner_watermark_retry_fallback_on_failure(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_sora_job_runner_watermark_retry_fallback_disabled(monkeypatch):
+async def test_sora_job_runner_watermark_stage_fallback_disabled(monkeypatch):
     service = IXBrowserService()
     runner = service._sora_job_runner  # noqa: SLF001
 
     monkeypatch.setattr(
         "app.services.ixbrowser.sora_job_runner.sqlite_db.get_watermark_free_config",
-        lambda: {"fallback_on_failure": False},
+        lambda: {"fallback_on_failure": False, "retry_max": 0},
+    )
+    monkeypatch.setattr(
+        "app.services.ixbrowser.sora_job_runner.sqlite_db.get_sora_job",
+        lambda _job_id: {
+            "id": 8,
+            "status": "running",
+            "watermark_status": "queued",
+            "watermark_attempts": 0,
+            "publish_url": "https://sora.chatgpt.com/p/s_1234abcd",
+        },
     )
 
-    async def _fake_run_sora_watermark(*_args, **_kwargs):
+    async def _fake_resolve_watermark_url(*_args, **_kwargs):
         raise RuntimeError("解析失败")
 
-    monkeypatch.setattr(runner, "run_sora_watermark", _fake_run_sora_watermark)
+    monkeypatch.setattr(runner, "_resolve_watermark_url", _fake_resolve_watermark_url)
 
     patched = {}
     events = []
@@ -145,8 +168,175 @@ async def test_sora_job_runner_watermark_retry_fallback_disabled(monkeypatch):
         lambda _job_id, phase, event, message=None: events.append((phase, event, message)) or 1,
     )
 
-    await runner.run_sora_watermark_retry(job_id=8, publish_url="https://sora.chatgpt.com/p/s_1234abcd")
+    await runner.run_sora_watermark_stage(job_id=8)
 
     assert patched["status"] == "failed"
     assert patched["phase"] == "watermark"
     assert any(item[1] == "fail" for item in events)
+
+
+@pytest.mark.asyncio
+async def test_sora_job_runner_releases_submit_slot_during_progress():
+    class _FakeDb:
+        def __init__(self):
+            self.rows = {
+                job_id: {
+                    "id": job_id,
+                    "profile_id": job_id,
+                    "prompt": "p",
+                    "duration": "10s",
+                    "aspect_ratio": "landscape",
+                    "status": "queued",
+                    "phase": "queue",
+                }
+                for job_id in (1, 2, 3)
+            }
+
+        def get_sora_job(self, job_id):
+            return dict(self.rows[job_id])
+
+        def update_sora_job(self, job_id, patch):
+            self.rows[job_id].update(patch)
+            return True
+
+        def create_sora_job_event(self, *_args, **_kwargs):
+            return 1
+
+    service = IXBrowserService()
+    service.sora_job_max_concurrency = 1
+    service.sora_progress_max_concurrency = 2
+    db = _FakeDb()
+    runner = SoraJobRunner(service=service, db=db)
+    service._sora_job_runner = runner  # noqa: SLF001
+    workflow = service.sora_generation_workflow
+    release_progress = asyncio.Event()
+    submitted = []
+
+    async def _fake_submit(job_id, **_kwargs):
+        submitted.append(job_id)
+        return f"task_{job_id}", f"token_{job_id}"
+
+    async def _fake_progress(job_id, access_token=None, **_kwargs):
+        assert access_token == f"token_{job_id}"
+        await release_progress.wait()
+        raise RuntimeError("stop")
+
+    workflow.run_sora_submit = _fake_submit
+    workflow.run_sora_progress_only = _fake_progress
+
+    tasks = [asyncio.create_task(runner.run_sora_job(job_id)) for job_id in (1, 2, 3)]
+    for _ in range(50):
+        if len(submitted) == 3:
+            break
+        await asyncio.sleep(0)
+
+    # 单个提交槽位依次完成三次提交，第三个任务在进度槽位上排队
+    assert submitted == [1, 2, 3]
+    assert runner.progress_stage_count == 3
+    assert service.sora_job_claim_capacity() == 1 + 2
+    assert db.rows[3]["phase"] == "progress"
+
+    release_progress.set()
+    await asyncio.gather(*tasks)
+    assert runner.progress_stage_count == 0
+    assert all(row["status"] == "failed" and row["phase"] == "progress" for row in db.rows.values())
+
+
+@pytest.mark.asyncio
+async def test_sora_pending_poller_shares_fetch_across_jobs_on_same_profile(monkeypatch):
+    service = IXBrowserService()
+    service.generate_poll_interval_seconds = 6
+    publish_workflow = service._sora_publish_workflow  # noqa: SLF001
+    pending_calls = []
+    release = asyncio.Event()
+
+    async def _fake_request(url, access_token, profile_id=None, **_kwargs):
+        pending_calls.append((profile_id, url))
+        await release.wait()
+        items = [{"id": f"task_{idx}", "progress_pct": 0.5} for idx in range(3)] if profile_id == 1 else []
+        return {"status": 200, "raw": "[]", "json": items, "error": None, "source": url}
+
+    monkeypatch.setattr(
+        publish_workflow,
+        "_build_proxy_request_context",
+        lambda _profile_id: {"proxy_url": None, "user_agent": "ua"},
+        raising=True,
+    )
+    monkeypatch.setattr(service, "_request_sora_api_via_curl_cffi", _fake_request, raising=True)
+
+    async def _poll(profile_id, task_id):
+        return await publish_workflow.poll_sora_task_via_proxy_api(
+            profile_id=profile_id,
+            task_id=task_id,
+            access_token="token",
+            fetch_drafts=False,
+        )
+
+    tasks = [asyncio.create_task(_poll(1, f"task_{idx}")) for idx in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert pending_calls == [(1, "https://sora.chatgpt.com/backend/nf/pending/v2")]
+    assert [item["progress"] for item in results] == [0.5, 0.5, 0.5]
+    assert all(item["state"] == "processing" and item["pending_missing"] is False for item in results)
+
+    # 间隔内再次轮询直接复用结果
+    await _poll(1, "task_0")
+    assert len(pending_calls) == 1
+
+    poller = publish_workflow.pending_poller
+    endpoint = "https://sora.chatgpt.com/backend/nf/pending/v2"
+    await poller.fetch(2, endpoint, lambda: _fake_request(endpoint, "token", profile_id=2))
+    assert poller.interval_for(2, endpoint) == 12
+    poller._slots[(2, endpoint)].fetched_at = 0  # noqa: SLF001
+    await poller.fetch(2, endpoint, lambda: _fake_request(endpoint, "token", profile_id=2))
+    assert poller.interval_for(2, endpoint) == 24
+
+    poller.invalidate(1)
+    poller.invalidate(2)
+    assert poller.interval_for(2, endpoint) == 6
+    await _poll(1, "task_0")
+    assert len(pending_calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_sora_drafts_fetch_shared_across_jobs_when_pending_missing(monkeypatch):
+    service = IXBrowserService()
+    service.generate_poll_interval_seconds = 6
+    publish_workflow = service._sora_publish_workflow  # noqa: SLF001
+    draft_calls = []
+
+    async def _fake_request(url, access_token, profile_id=None, **_kwargs):
+        del access_token
+        if "backend/nf/pending" in str(url):
+            return {"status": 200, "raw": "[]", "json": [], "error": None, "source": url}
+        draft_calls.append(profile_id)
+        await asyncio.sleep(0)
+        items = [{"id": "task_0", "generation_id": "gen_0"}]
+        return {"status": 200, "raw": "{}", "json": {"items": items}, "error": None, "source": url}
+
+    monkeypatch.setattr(
+        publish_workflow,
+        "_build_proxy_request_context",
+        lambda _profile_id: {"proxy_url": None, "user_agent": "ua"},
+        raising=True,
+    )
+    monkeypatch.setattr(service, "_request_sora_api_via_curl_cffi", _fake_request, raising=True)
+
+    async def _poll(task_id):
+        return await publish_workflow.poll_sora_task_via_proxy_api(
+            profile_id=1,
+            task_id=task_id,
+            access_token="token",
+            fetch_drafts=False,
+        )
+
+    results = await asyncio.gather(*[_poll(f"task_{idx}") for idx in range(3)])
+    assert draft_calls == [1]
+    assert results[0]["state"] == "completed" and results[0]["generation_id"] == "gen_0"
+    assert all(item["state"] == "processing" and item["pending_missing"] is True for item in results[1:])
+
+    # 间隔内各任务的下一轮轮询仍复用这份草稿
+    await _poll("task_1")
+    assert draft_calls == [1]
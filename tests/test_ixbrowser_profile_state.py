@@ -0,0 +1,114 @@
+import os
+import sqlite3
+
+import pytest
+
+from app.db.sqlite import sqlite_db
+from app.db.sqlite.profile_state_repo import IXBROWSER_REALTIME_OPERATOR
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def temp_db(tmp_path):
+    old_db_path = sqlite_db._db_path
+    try:
+        db_path = tmp_path / "profile-state.db"
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._ensure_data_dir()
+        sqlite_db._init_db()
+        sqlite_db._last_event_cleanup_at = 0.0
+        sqlite_db._last_audit_cleanup_at = 0.0
+        yield db_path
+    finally:
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+def _item(profile_id, *, account=None, remaining=None, success=True, session=None):
+    return {
+        "profile_id": profile_id,
+        "window_name": f"win-{profile_id}",
+        "group_id": 1,
+        "group_title": "Sora",
+        "account": account,
+        "account_plan": "plus" if account else None,
+        "session": session,
+        "quota_remaining_count": remaining,
+        "success": success,
+    }
+
+
+def _run(items, operator=None):
+    return sqlite_db.create_ixbrowser_scan_run(
+        {"group_id": 1, "group_title": "Sora", "total_windows": len(items), "operator_username": operator},
+        items,
+        keep_latest_runs=10,
+    )
+
+
+def test_profile_state_tracks_scan_realtime_and_fallback(temp_db):
+    del temp_db
+    run1 = _run([_item(1, account="a@example.com", remaining=5, session={"user": {"email": "a@example.com"}})])
+    run2 = _run([_item(1, success=False)])
+    realtime_run = _run([], operator=IXBROWSER_REALTIME_OPERATOR)
+    sqlite_db.upsert_ixbrowser_scan_result(realtime_run, {**_item(1, remaining=2), "quota_source": "realtime"})
+    sqlite_db.recalc_ixbrowser_scan_run_stats(realtime_run)
+
+    state = sqlite_db.get_ixbrowser_profile_state("Sora", 1)
+    assert state["scan_run_id"] == run2
+    assert state["scan_success"] == 0
+    assert state["realtime_run_id"] == realtime_run
+    assert state["realtime_quota_remaining_count"] == 2
+    assert state["good_run_id"] == realtime_run
+    assert state["prev_good_run_id"] == run1
+
+    # 最新一次完整扫描失败时，回填取 run2 之前最近的有效结果（run1）
+    fallback = sqlite_db.get_ixbrowser_latest_success_results_before_run("Sora", run2)
+    assert [(row["profile_id"], row["run_id"], row["account"]) for row in fallback] == [(1, run1, "a@example.com")]
+    assert fallback[0]["session_json"] == {"user": {"email": "a@example.com"}}
+
+    # 更早的历史 run 落在物化槽位之外，回退原表聚合
+    assert sqlite_db.get_ixbrowser_latest_success_results_before_run("Sora", run1) == []
+
+    session = sqlite_db.get_latest_ixbrowser_profile_session("Sora", 1)
+    assert session["run_id"] == run1
+    assert session["session_json"]["user"]["email"] == "a@example.com"
+
+    report = sqlite_db.check_ixbrowser_profile_state()
+    assert report["ok"] is True, report
+
+
+def test_profile_state_check_detects_drift_and_rebuild_repairs(temp_db):
+    _run([_item(1, account="a@example.com", remaining=5), _item(2, account="b@example.com", remaining=1)])
+
+    conn = sqlite3.connect(str(temp_db))
+    conn.execute("UPDATE ixbrowser_profile_state SET scan_quota_remaining_count = 99 WHERE profile_id = 1")
+    conn.execute("DELETE FROM ixbrowser_profile_state WHERE profile_id = 2")
+    conn.commit()
+    conn.close()
+
+    report = sqlite_db.check_ixbrowser_profile_state("Sora")
+    assert report["ok"] is False
+    assert report["missing"] == [{"group_title": "Sora", "profile_id": 2}]
+    assert report["mismatched"][0]["profile_id"] == 1
+    assert "scan_quota_remaining_count" in report["mismatched"][0]["columns"]
+
+    assert sqlite_db.rebuild_ixbrowser_profile_state("Sora") == 2
+    assert sqlite_db.check_ixbrowser_profile_state("Sora")["ok"] is True
+    assert [row["profile_id"] for row in sqlite_db.list_ixbrowser_profile_states("Sora")] == [2, 1]
+
+
+def test_profile_state_backfilled_for_existing_scan_results(temp_db):
+    run_id = _run([_item(3, account="c@example.com", remaining=7)])
+    conn = sqlite3.connect(str(temp_db))
+    conn.execute("DROP TABLE ixbrowser_profile_state")
+    conn.commit()
+    conn.close()
+
+    sqlite_db._init_db()
+    state = sqlite_db.get_ixbrowser_profile_state("Sora", 3)
+    assert state["scan_run_id"] == run_id
+    assert state["good_account"] == "c@example.com"
+    assert state["good_quota_remaining_count"] == 7
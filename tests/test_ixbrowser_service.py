@@ -1420,7 +1420,7 @@ def test_get_sora_job_follow_retry_returns_latest_child(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_retry_sora_watermark_resets_state_and_schedules(monkeypatch):
+async def test_retry_sora_watermark_resets_state_and_requeues(monkeypatch):
     service = IXBrowserService()
     job_id = 123
     row = {
@@ -1443,14 +1443,11 @@ async def test_retry_sora_watermark_resets_state_and_schedules(monkeypatch):
         lambda _job_id, phase, event, message=None: events.append((phase, event, message)) or 1,
     )
 
-    scheduled = []
-
-    def _fake_spawn(coro, *, task_name, metadata=None):
-        scheduled.append((task_name, metadata))
-        coro.close()
-        return None
-
-    monkeypatch.setattr("app.services.ixbrowser.sora_jobs.spawn", _fake_spawn)
+    notified = []
+    monkeypatch.setattr(
+        "app.services.ixbrowser.sora_jobs.queue_notifier.notify",
+        lambda channel, item_id=None: notified.append((channel, item_id)),
+    )
     service.get_sora_job = lambda _job_id: SimpleNamespace(job_id=job_id)
 
     result = await service.retry_sora_watermark(job_id)
@@ -1458,8 +1455,9 @@ async def test_retry_sora_watermark_resets_state_and_schedules(monkeypatch):
     assert patched["status"] == "running"
     assert patched["phase"] == "watermark"
     assert patched["watermark_status"] == "queued"
+    assert patched["watermark_next_at"] is None
     assert any(item[0] == "watermark" and item[1] == "retry" for item in events)
-    assert scheduled and scheduled[0][0] == "sora.job.watermark.retry"
+    assert notified == [("watermark", job_id)]
 
 
 @pytest.mark.asyncio
@@ -1736,10 +1734,10 @@ async def test_run_sora_job_submit_overload_auto_spawns_new_job(monkeypatch):
     service._get_window_from_group = _fake_get_window_from_group
     service.get_sora_job = lambda jid: SimpleNamespace(job_id=jid)
 
-    async def _fake_submit_and_progress(**_kwargs):
+    async def _fake_submit(**_kwargs):
         raise IXBrowserServiceError("We're under heavy load, please try again later.")
 
-    service._sora_generation_workflow.run_sora_submit_and_progress = _fake_submit_and_progress
+    service._sora_generation_workflow.run_sora_submit = _fake_submit
 
     await IXBrowserService._run_sora_job(service, old_job_id)
 
@@ -2066,7 +2064,7 @@ async def test_poll_sora_task_from_page_does_not_use_context_request(monkeypatch
 
 
 @pytest.mark.asyncio
-async def test_poll_sora_task_from_page_uses_stair_backoff_for_drafts(monkeypatch):
+async def test_poll_sora_task_from_page_draft_miss_returns_without_backoff(monkeypatch):
     service = IXBrowserService()
     publish_workflow = service._sora_publish_workflow  # noqa: SLF001
 
@@ -2103,13 +2101,15 @@ async def test_poll_sora_task_from_page_uses_stair_backoff_for_drafts(monkeypatc
         fetch_drafts=False,
     )
 
+    # 草稿未命中直接返回，由外层轮询间隔再查，不在窗口里退避等待
     assert result["state"] == "processing"
-    assert page.waits == [1000, 2000, 3000, 10000, 60000]
-    assert len(draft_calls) == 6
+    assert result["pending_missing"] is True
+    assert page.waits == []
+    assert len(draft_calls) == 1
 
 
 @pytest.mark.asyncio
-async def test_poll_sora_task_from_page_stops_backoff_after_draft_hit(monkeypatch):
+async def test_poll_sora_task_from_page_draft_hit_on_next_poll(monkeypatch):
     service = IXBrowserService()
     publish_workflow = service._sora_publish_workflow  # noqa: SLF001
 
@@ -2141,6 +2141,12 @@ async def test_poll_sora_task_from_page_stops_backoff_after_draft_hit(monkeypatc
     monkeypatch.setattr(publish_workflow, "_fetch_draft_item_by_task_id", _fake_fetch_draft, raising=True)
 
     page = _FakePage()
+    first = await publish_workflow.poll_sora_task_from_page(
+        page=page,
+        task_id="task_1",
+        access_token="token",
+        fetch_drafts=False,
+    )
     result = await publish_workflow.poll_sora_task_from_page(
         page=page,
         task_id="task_1",
@@ -2148,9 +2154,10 @@ async def test_poll_sora_task_from_page_stops_backoff_after_draft_hit(monkeypatc
         fetch_drafts=False,
     )
 
+    assert first["state"] == "processing"
     assert result["state"] == "completed"
     assert result["generation_id"] == "gen_ready"
-    assert page.waits == [1000]
+    assert page.waits == []
 
 
 @pytest.mark.asyncio
@@ -2189,7 +2196,7 @@ async def test_poll_sora_task_via_proxy_api_cf_fast_fallback(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_poll_sora_task_via_proxy_api_uses_stair_backoff_for_drafts(monkeypatch):
+async def test_poll_sora_task_via_proxy_api_draft_miss_returns_without_backoff(monkeypatch):
     service = IXBrowserService()
     publish_workflow = service._sora_publish_workflow  # noqa: SLF001
 
@@ -2238,12 +2245,12 @@ async def test_poll_sora_task_via_proxy_api_uses_stair_backoff_for_drafts(monkey
 
     assert result["state"] == "processing"
     assert result["pending_missing"] is True
-    assert sleep_calls == [1, 2, 3, 10, 60]
-    assert len(draft_calls) == 6
+    assert sleep_calls == []
+    assert len(draft_calls) == 1
 
 
 @pytest.mark.asyncio
-async def test_poll_sora_task_via_proxy_api_stops_backoff_after_draft_hit(monkeypatch):
+async def test_poll_sora_task_via_proxy_api_draft_hit_on_next_poll(monkeypatch):
     service = IXBrowserService()
     publish_workflow = service._sora_publish_workflow  # noqa: SLF001
 
@@ -2291,6 +2298,23 @@ async def test_poll_sora_task_via_proxy_api_stops_backoff_after_draft_hit(monkey
     )
     monkeypatch.setattr(service, "_request_sora_api_via_curl_cffi", _fake_request, raising=True)
 
+    first = await publish_workflow.poll_sora_task_via_proxy_api(
+        profile_id=1,
+        task_id="task_1",
+        access_token="token",
+        fetch_drafts=False,
+    )
+    # 间隔内的再次轮询复用同一份草稿结果，不重复请求
+    again = await publish_workflow.poll_sora_task_via_proxy_api(
+        profile_id=1,
+        task_id="task_1",
+        access_token="token",
+        fetch_drafts=False,
+    )
+    assert again["state"] == "processing"
+    assert len(draft_calls) == 1
+    for slot in publish_workflow.pending_poller._slots.values():  # noqa: SLF001
+        slot.fetched_at = 0
     result = await publish_workflow.poll_sora_task_via_proxy_api(
         profile_id=1,
         task_id="task_1",
@@ -2298,9 +2322,10 @@ async def test_poll_sora_task_via_proxy_api_stops_backoff_after_draft_hit(monkey
         fetch_drafts=False,
     )
 
+    assert first["state"] == "processing"
     assert result["state"] == "completed"
     assert result["generation_id"] == "gen_ready"
-    assert sleep_calls == [1]
+    assert sleep_calls == []
     assert len(draft_calls) == 2
 
 
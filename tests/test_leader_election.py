@@ -0,0 +1,84 @@
+import os
+import sqlite3
+
+import pytest
+
+from app.db.sqlite import sqlite_db
+from app.services.leader_election import LeaderElector
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def temp_db(tmp_path):
+    old_db_path = sqlite_db._db_path
+    try:
+        db_path = tmp_path / "leader.db"
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._ensure_data_dir()
+        sqlite_db._init_db()
+        yield db_path
+    finally:
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+def _elector(name, calls):
+    elector = LeaderElector(lock_key="leader.test")
+
+    async def _elected():
+        calls.append((name, "elected"))
+
+    async def _demoted():
+        calls.append((name, "demoted"))
+
+    elector._on_elected = _elected  # noqa: SLF001
+    elector._on_demoted = _demoted  # noqa: SLF001
+    return elector
+
+
+def test_leader_lease_acquire_renew_and_conflict(temp_db):
+    del temp_db
+    assert sqlite_db.acquire_leader_lease("leader.test", "a", ttl_seconds=30) is True
+    assert sqlite_db.acquire_leader_lease("leader.test", "b", ttl_seconds=30) is False
+    assert sqlite_db.acquire_leader_lease("leader.test", "a", ttl_seconds=30) is True
+    assert sqlite_db.get_scheduler_lock("leader.test")["owner"] == "a"
+    assert sqlite_db.release_scheduler_lock("leader.test", "b") is False
+    assert sqlite_db.release_scheduler_lock("leader.test", "a") is True
+    assert sqlite_db.acquire_leader_lease("leader.test", "b", ttl_seconds=30) is True
+
+
+@pytest.mark.asyncio
+async def test_leader_failover_after_lease_expiry(monkeypatch, temp_db):
+    monkeypatch.setattr("app.services.leader_election.sqlite_db.enqueue_event_log", lambda **kwargs: 1)
+    calls = []
+    first = _elector("a", calls)
+    second = _elector("b", calls)
+
+    await first._tick()  # noqa: SLF001
+    await second._tick()  # noqa: SLF001
+    assert first.is_leader is True
+    assert second.is_leader is False
+
+    # 模拟 leader 卡死：租约过期后 follower 接管，原 leader 下一次续租时降级
+    conn = sqlite3.connect(str(temp_db))
+    conn.execute("UPDATE scheduler_locks SET locked_until = '2000-01-01 00:00:00' WHERE lock_key = 'leader.test'")
+    conn.commit()
+    conn.close()
+    await second._tick()  # noqa: SLF001
+    await first._tick()  # noqa: SLF001
+    assert second.is_leader is True
+    assert first.is_leader is False
+
+    # 正常退出时释放租约，另一进程下一轮立即当选
+    await second.stop()
+    await first._tick()  # noqa: SLF001
+    assert first.is_leader is True
+    assert calls == [
+        ("a", "elected"),
+        ("b", "elected"),
+        ("a", "demoted"),
+        ("b", "demoted"),
+        ("a", "elected"),
+    ]
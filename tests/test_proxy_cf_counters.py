@@ -0,0 +1,124 @@
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+import app.main as main_module
+from app.db.sqlite import sqlite_db
+from app.db.sqlite.proxy_repo import PROXY_CF_WINDOW
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def temp_db(tmp_path):
+    old_db_path = sqlite_db._db_path
+    try:
+        db_path = tmp_path / "proxy-cf.db"
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._ensure_data_dir()
+        sqlite_db._init_db()
+        yield db_path
+    finally:
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+def _create_proxy():
+    sqlite_db.upsert_proxies_from_batch_import(
+        [{"proxy_type": "http", "proxy_ip": "9.9.9.9", "proxy_port": "80", "proxy_user": "", "proxy_password": ""}]
+    )
+    return int(sqlite_db.list_proxies()["items"][0]["id"])
+
+
+def _record(proxy_id, is_cf):
+    return sqlite_db.create_proxy_cf_event(
+        proxy_id=proxy_id,
+        profile_id=1,
+        source="test",
+        endpoint="/pending",
+        status_code=403 if is_cf else 200,
+        error_text=None,
+        is_cf=is_cf,
+    )
+
+
+def _window_stats_from_events(db_path, proxy_id, window):
+    conn = sqlite3.connect(str(db_path))
+    rows = conn.execute(
+        "SELECT is_cf FROM proxy_cf_events WHERE proxy_id = ? ORDER BY id DESC LIMIT ?",
+        (proxy_id, window),
+    ).fetchall()
+    conn.close()
+    return sum(row[0] for row in rows), len(rows)
+
+
+def test_proxy_cf_counters_roll_over_ring_buffer(temp_db):
+    proxy_id = _create_proxy()
+    pattern = [True, False, False, True, True] * 9  # 45 条，超过窗口后开始覆盖旧槽位
+    for is_cf in pattern:
+        _record(proxy_id, is_cf)
+    _record(None, True)
+    _record(None, False)
+
+    stats = sqlite_db.get_proxy_cf_recent_stats([proxy_id])[proxy_id]
+    cf_count, total = _window_stats_from_events(temp_db, proxy_id, PROXY_CF_WINDOW)
+    assert (stats["cf_recent_count"], stats["cf_recent_total"]) == (cf_count, total) == (18, PROXY_CF_WINDOW)
+    assert stats["cf_recent_ratio"] == 60.0
+
+    small = sqlite_db.get_proxy_cf_recent_stats([proxy_id], window=7)[proxy_id]
+    assert (small["cf_recent_count"], small["cf_recent_total"]) == _window_stats_from_events(temp_db, proxy_id, 7)
+
+    unknown = sqlite_db.get_unknown_proxy_cf_recent_stats()
+    assert (unknown["cf_recent_count"], unknown["cf_recent_total"]) == (1, 2)
+    assert sqlite_db.get_proxy_cf_recent_stats([proxy_id + 1]) == {}
+
+
+def test_proxy_cf_trim_is_batched_and_counters_rebuilt_from_events(temp_db):
+    proxy_id = _create_proxy()
+    for index in range(50):
+        _record(proxy_id, index % 3 == 0)
+
+    # 写入路径不再逐条裁剪，批量裁剪后计数保持不变
+    conn = sqlite3.connect(str(temp_db))
+    assert conn.execute("SELECT COUNT(*) FROM proxy_cf_events").fetchone()[0] == 50
+    conn.close()
+    before = sqlite_db.get_proxy_cf_recent_stats([proxy_id])
+    assert sqlite_db.trim_proxy_cf_events(keep_per_proxy=PROXY_CF_WINDOW) == 50 - PROXY_CF_WINDOW
+    assert sqlite_db.get_proxy_cf_recent_stats([proxy_id]) == before
+
+    conn = sqlite3.connect(str(temp_db))
+    conn.execute("DELETE FROM proxy_cf_counters")
+    conn.commit()
+    conn.close()
+    sqlite_db._init_db()
+    assert sqlite_db.get_proxy_cf_recent_stats([proxy_id]) == before
+
+    _record(proxy_id, True)
+    cf_count, total = _window_stats_from_events(temp_db, proxy_id, PROXY_CF_WINDOW)
+    stats = sqlite_db.get_proxy_cf_recent_stats([proxy_id])[proxy_id]
+    assert (stats["cf_recent_count"], stats["cf_recent_total"]) == (cf_count, total)
+
+
+@pytest.mark.asyncio
+async def test_leader_maintenance_loop_trims_proxy_cf_events(temp_db, monkeypatch):
+    proxy_id = _create_proxy()
+    for index in range(40):
+        _record(proxy_id, index % 2 == 0)
+    monkeypatch.setattr(main_module, "PROXY_CF_KEEP_PER_PROXY", PROXY_CF_WINDOW)
+
+    task = asyncio.create_task(main_module._leader_maintenance_loop())
+    try:
+        for _ in range(100):
+            conn = sqlite3.connect(str(temp_db))
+            count = conn.execute("SELECT COUNT(*) FROM proxy_cf_events").fetchone()[0]
+            conn.close()
+            if count == PROXY_CF_WINDOW:
+                break
+            await asyncio.sleep(0.02)
+        assert count == PROXY_CF_WINDOW
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
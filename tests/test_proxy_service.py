@@ -236,6 +236,11 @@ def test_proxy_cf_event_retention_limit_works():
             is_cf=bool(idx % 3 == 0),
         )
 
+    # 裁剪改为按间隔批量执行，这里直接触发一次
+    sqlite_db.trim_proxy_cf_events(keep_per_proxy=300)
+    stats = sqlite_db.get_proxy_cf_recent_stats([proxy_id])[proxy_id]
+    assert int(stats["cf_recent_total"]) == 30
+
     conn = sqlite_db._get_conn()
     cursor = conn.cursor()
     cursor.execute("SELECT COUNT(*) AS cnt FROM proxy_cf_events WHERE proxy_id = ?", (proxy_id,))
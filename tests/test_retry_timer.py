@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.queue_notifier import QueueNotifier
+from app.services.retry_timer import RetryTimer
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.asyncio
+async def test_retry_timer_fires_in_due_order_and_latest_schedule_wins():
+    timer = RetryTimer()
+    fired = []
+    now = time.time()
+
+    timer.schedule("b", now + 0.06, lambda: fired.append("b"))
+    timer.schedule("a", now + 0.02, lambda: fired.append("a"))
+    timer.schedule("c", now + 0.01, lambda: fired.append("c-early"))
+    # 同一 key 重新安排以最后一次为准
+    timer.schedule("c", now + 0.04, lambda: fired.append("c"))
+    timer.schedule("d", now + 0.03, lambda: fired.append("d"))
+    timer.cancel("d")
+    assert timer.stats()["pending"] == 3
+
+    await asyncio.sleep(0.15)
+
+    assert fired == ["a", "c", "b"]
+    stats = timer.stats()
+    assert stats["pending"] == 0
+    assert stats["fired"] == 3
+    assert stats["next_due_in_sec"] is None
+
+
+@pytest.mark.asyncio
+async def test_retry_timer_schedule_queue_wakes_channel(monkeypatch):
+    notifier = QueueNotifier()
+    monkeypatch.setattr("app.services.retry_timer.queue_notifier", notifier)
+    timer = RetryTimer()
+
+    timer.schedule_queue("sora", 7, time.time() + 0.02)
+    started = time.monotonic()
+    assert await notifier.wait("sora", timeout=1) is True
+    assert time.monotonic() - started >= 0.01
+    assert notifier.pop_enqueued_at("sora", 7) is not None
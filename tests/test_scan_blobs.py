@@ -0,0 +1,125 @@
+import os
+import sqlite3
+
+import pytest
+
+from app.db.sqlite import sqlite_db
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def temp_db(tmp_path):
+    old_db_path = sqlite_db._db_path
+    try:
+        db_path = tmp_path / "scan-blobs.db"
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._ensure_data_dir()
+        sqlite_db._init_db()
+        sqlite_db._last_event_cleanup_at = 0.0
+        sqlite_db._last_audit_cleanup_at = 0.0
+        yield db_path
+    finally:
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+def _scan_item(profile_id, *, remaining=8):
+    return {
+        "profile_id": profile_id,
+        "window_name": f"win-{profile_id}",
+        "group_id": 1,
+        "group_title": "Sora",
+        "session_status": 200,
+        "account": f"user{profile_id}@example.com",
+        "session": {"user": {"email": f"user{profile_id}@example.com"}, "expires": "2099-01-01"},
+        "session_raw": '{"user": {"email": "raw"}}',
+        "quota_remaining_count": remaining,
+        "quota_payload": {"remaining": remaining},
+        "success": True,
+    }
+
+
+def _blob_rows():
+    conn = sqlite_db._get_conn()
+    try:
+        return {row["hash"]: int(row["ref_count"]) for row in conn.execute("SELECT hash, ref_count FROM scan_blobs")}
+    finally:
+        conn.close()
+
+
+def test_scan_blobs_deduplicated_across_runs_and_released_on_prune(temp_db):
+    del temp_db
+    run_data = {"group_id": 1, "group_title": "Sora", "total_windows": 2, "success_count": 2}
+    run_ids = [
+        sqlite_db.create_ixbrowser_scan_run(run_data, [_scan_item(1), _scan_item(2)], keep_latest_runs=2)
+        for _ in range(3)
+    ]
+
+    # 两个窗口各自的 session + 共享的 session_raw / quota = 4 个 blob；
+    # 引用 = 保留的 2 个 run 共 4 行结果 + ixbrowser_profile_state（good/prev_good/session 槽位）
+    blobs = _blob_rows()
+    assert len(blobs) == 4
+    assert sorted(blobs.values()) == [4, 5, 5, 6]
+
+    results = sqlite_db.get_ixbrowser_scan_results_by_run(run_ids[-1])
+    assert [item["profile_id"] for item in results] == [2, 1]
+    assert results[0]["session_json"]["user"]["email"] == "user2@example.com"
+    assert results[0]["session_raw"] == '{"user": {"email": "raw"}}'
+    assert results[0]["quota_payload_json"] == {"remaining": 8}
+    assert "session_blob_hash" not in results[0]
+
+    light = sqlite_db.get_ixbrowser_scan_results_by_run(run_ids[-1], include_blobs=False)
+    assert light[0]["session_json"] is None
+    assert light[0]["account"] == "user2@example.com"
+
+    latest = sqlite_db.get_latest_ixbrowser_profile_session("Sora", 1)
+    assert latest["run_id"] == run_ids[-1]
+    assert latest["session_json"]["user"]["email"] == "user1@example.com"
+
+    # upsert 改变配额：新 payload 入库，旧 payload 在所有引用消失后被回收
+    for run_id in run_ids[-2:]:
+        sqlite_db.upsert_ixbrowser_scan_result(run_id, _scan_item(1, remaining=3))
+    assert sorted(_blob_rows().values()) == [2, 2, 5, 5, 6]
+    for run_id in run_ids[-2:]:
+        sqlite_db.upsert_ixbrowser_scan_result(run_id, _scan_item(2, remaining=3))
+    assert sorted(_blob_rows().values()) == [4, 5, 5, 6]
+    refreshed = sqlite_db.get_ixbrowser_scan_results_by_run(run_ids[-1])
+    assert {item["profile_id"]: item["quota_payload_json"] for item in refreshed}[1] == {"remaining": 3}
+
+    conn = sqlite_db._get_conn()
+    conn.execute("DELETE FROM ixbrowser_scan_results")
+    conn.execute("DELETE FROM ixbrowser_profile_state")
+    conn.commit()
+    conn.close()
+    assert _blob_rows() == {}
+
+
+def test_inline_scan_payloads_migrated_into_blobs(temp_db):
+    conn = sqlite3.connect(str(temp_db))
+    conn.execute("DROP TRIGGER trg_ix_scan_results_blob_ai")
+    conn.execute(
+        "INSERT INTO ixbrowser_scan_runs (group_id, group_title, total_windows, success_count, failed_count, scanned_at) "
+        "VALUES (1, 'Sora', 1, 1, 0, '2026-01-01 00:00:00')"
+    )
+    conn.execute(
+        "INSERT INTO ixbrowser_scan_results (run_id, profile_id, group_id, group_title, session_json, session_raw, "
+        "quota_payload_json, success, scanned_at) VALUES (1, 7, 1, 'Sora', ?, ?, ?, 1, '2026-01-01 00:00:00')",
+        ('{"user": {"email": "legacy@example.com"}}', "raw-text", '{"remaining": 1}'),
+    )
+    conn.commit()
+    conn.close()
+
+    sqlite_db._init_db()
+
+    conn = sqlite3.connect(str(temp_db))
+    inline = conn.execute("SELECT session_json, session_raw, quota_payload_json FROM ixbrowser_scan_results").fetchone()
+    conn.close()
+    assert inline == (None, None, None)
+    assert sorted(_blob_rows().values()) == [1, 1, 1]
+
+    rows = sqlite_db.get_ixbrowser_scan_results_by_run(1)
+    assert rows[0]["session_json"] == {"user": {"email": "legacy@example.com"}}
+    assert rows[0]["session_raw"] == "raw-text"
+    assert rows[0]["quota_payload_json"] == {"remaining": 1}
@@ -3,6 +3,7 @@ import json
 
 import pytest
 
+from app.core.config import settings
 from app.models.ixbrowser import IXBrowserGroupWindows, IXBrowserWindow
 from app.models.nurture import SoraNurtureBatchCreateRequest
 from app.services.sora_nurture_service import SoraNurtureService
@@ -373,6 +374,50 @@ async def test_run_batch_job_timeout_fail_fast_and_continue(monkeypatch):
     assert int(batch_row["success_count"] or 0) == 1
 
 
+@pytest.mark.asyncio
+async def test_run_batches_parallel_respects_window_cap_and_profile_lock(monkeypatch):
+    fake_db = _FakeDB()
+    service = SoraNurtureService(db=fake_db, ix=_FakeIX())
+    monkeypatch.setattr(settings, "nurture_batch_parallelism", 3)
+    monkeypatch.setattr(settings, "nurture_max_open_windows", 2)
+
+    batch_a = await service.create_batch(
+        SoraNurtureBatchCreateRequest(group_title="Sora", profile_ids=[1, 2, 3], scroll_count=10),
+        operator_user={"id": 1, "username": "admin"},
+    )
+    batch_b = await service.create_batch(
+        SoraNurtureBatchCreateRequest(group_title="Sora", profile_ids=[1, 2], scroll_count=10),
+        operator_user={"id": 1, "username": "admin"},
+    )
+
+    running_profiles = []
+    max_running = 0
+
+    async def _fake_run_single_job(*_args, **kwargs):
+        nonlocal max_running
+        profile_id = int(kwargs.get("profile_id"))
+        assert profile_id not in running_profiles
+        running_profiles.append(profile_id)
+        max_running = max(max_running, len(running_profiles))
+        await asyncio.sleep(0.05)
+        running_profiles.remove(profile_id)
+        fake_db.update_sora_nurture_job(int(kwargs.get("job_id")), {"status": "completed", "phase": "done"})
+        return {"status": "completed", "like_count": 0, "follow_count": 0, "scroll_done": 10, "error": None}
+
+    monkeypatch.setattr(service, "_run_single_job", _fake_run_single_job)
+
+    await asyncio.gather(
+        service._run_batch_impl(batch_a["batch_id"]),
+        service._run_batch_impl(batch_b["batch_id"]),
+    )
+
+    assert max_running == 2
+    for batch in (batch_a, batch_b):
+        batch_row = fake_db.get_sora_nurture_batch(batch["batch_id"])
+        assert batch_row["status"] == "completed"
+        assert batch_row["success_count"] == len(batch_row["profile_ids"])
+
+
 @pytest.mark.asyncio
 async def test_retry_batch_failed_jobs_only_resets_failed():
     fake_db = _FakeDB()
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from app.db.sqlite import sqlite_db
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def temp_db(tmp_path):
+    old_db_path = sqlite_db._db_path
+    try:
+        db_path = tmp_path / "pool.db"
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._ensure_data_dir()
+        sqlite_db._init_db()
+        sqlite_db._last_event_cleanup_at = 0.0
+        sqlite_db._last_audit_cleanup_at = 0.0
+        yield db_path
+    finally:
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+def test_pool_reuses_connection_after_close(temp_db):
+    del temp_db
+    conn = sqlite_db._get_conn()
+    conn.close()
+    conn.close()  # 重复 close 不应重复入池
+    conn2 = sqlite_db._get_conn()
+    assert conn2 is conn
+    conn3 = sqlite_db._get_conn()
+    assert conn3 is not conn2
+    conn2.close()
+    conn3.close()
+
+    stats = sqlite_db._get_pool().stats()
+    assert stats["idle"] == 2
+    assert stats["opened"] == 2
+
+
+def test_pool_rolls_back_uncommitted_work_on_release(temp_db):
+    del temp_db
+    with sqlite_db.connection() as conn:
+        conn.execute(
+            "INSERT INTO scheduler_locks (lock_key, owner, locked_until, updated_at) VALUES (?, ?, ?, ?)",
+            ("pool-test", "owner", "2000-01-01 00:00:00", "2000-01-01 00:00:00"),
+        )
+        assert conn.in_transaction
+
+    with sqlite_db.connection() as conn:
+        assert not conn.in_transaction
+        row = conn.execute("SELECT COUNT(*) AS cnt FROM scheduler_locks WHERE lock_key = 'pool-test'").fetchone()
+        assert int(row["cnt"]) == 0
+
+
+def test_pool_follows_db_path_switch(tmp_path, temp_db):
+    first_pool = sqlite_db._get_pool()
+    assert first_pool.db_path == str(temp_db)
+
+    other_path = tmp_path / "other.db"
+    old_path = sqlite_db._db_path
+    try:
+        sqlite_db._db_path = str(other_path)
+        sqlite_db._init_db()
+        assert sqlite_db._get_pool() is not first_pool
+        assert sqlite_db._get_pool().db_path == str(other_path)
+    finally:
+        sqlite_db._db_path = old_path
+
+
+def test_pool_disabled_when_max_idle_zero(temp_db, monkeypatch):
+    del temp_db
+    monkeypatch.setattr(sqlite_db, "_pool_max_idle", 0)
+    conn = sqlite_db._get_conn()
+    conn.close()
+    conn2 = sqlite_db._get_conn()
+    assert conn2 is not conn
+    conn2.close()
+    assert sqlite_db._get_pool().stats()["idle"] == 0
@@ -0,0 +1,157 @@
+import asyncio
+import os
+
+import pytest
+
+from app.db.sqlite import sqlite_db
+from app.services.ixbrowser import window_arbiter as window_arbiter_module
+from app.services.ixbrowser.window_arbiter import (
+    WINDOW_PRIORITY_GENERATION,
+    WINDOW_PRIORITY_NURTURE,
+    WINDOW_PRIORITY_PUBLISH,
+    WINDOW_PRIORITY_SCAN,
+    WindowArbiter,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def temp_db(tmp_path):
+    old_db_path = sqlite_db._db_path
+    try:
+        db_path = tmp_path / "window-arbiter.db"
+        sqlite_db._db_path = str(db_path)
+        sqlite_db._ensure_data_dir()
+        sqlite_db._init_db()
+        yield db_path
+    finally:
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+@pytest.mark.asyncio
+async def test_window_arbiter_grants_by_priority_and_keeps_profiles_exclusive():
+    arbiter = WindowArbiter(capacity=lambda: 1)
+    first = await arbiter.acquire(1, WINDOW_PRIORITY_SCAN, owner="scan")
+    order = []
+
+    async def _take(profile_id, priority, name):
+        lease = await arbiter.acquire(profile_id, priority, owner=name)
+        order.append(name)
+        await asyncio.sleep(0)
+        lease.release()
+
+    waiters = [
+        asyncio.create_task(_take(2, WINDOW_PRIORITY_NURTURE, "nurture")),
+        asyncio.create_task(_take(3, WINDOW_PRIORITY_SCAN, "scan")),
+        asyncio.create_task(_take(4, WINDOW_PRIORITY_PUBLISH, "publish")),
+        asyncio.create_task(_take(5, WINDOW_PRIORITY_GENERATION, "generation")),
+    ]
+    await asyncio.sleep(0.01)
+    assert order == []
+    assert arbiter.stats()["waiting"] == 4
+
+    first.release()
+    await asyncio.gather(*waiters)
+
+    assert order == ["generation", "publish", "scan", "nurture"]
+    stats = arbiter.stats()
+    assert stats["in_use"] == 0
+    assert stats["peak_in_use"] == 1
+    assert stats["by_priority"]["nurture"]["granted"] == 1
+    assert stats["by_priority"]["nurture"]["wait_max_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_window_arbiter_busy_profile_does_not_block_other_profiles():
+    arbiter = WindowArbiter(capacity=lambda: 2)
+    # 在独立任务里持有，避免当前调用链被视为重入
+    held = await asyncio.create_task(arbiter.acquire(1, WINDOW_PRIORITY_NURTURE))
+
+    same_profile = asyncio.create_task(arbiter.acquire(1, WINDOW_PRIORITY_GENERATION))
+    await asyncio.sleep(0)
+    other = await asyncio.wait_for(arbiter.acquire(2, WINDOW_PRIORITY_SCAN), timeout=1)
+    assert not same_profile.done()
+
+    held.release()
+    lease = await asyncio.wait_for(same_profile, timeout=1)
+    assert lease.profile_id == 1
+    lease.release()
+    other.release()
+
+
+@pytest.mark.asyncio
+async def test_window_arbiter_reentrant_and_cancel_cleanup():
+    arbiter = WindowArbiter(capacity=lambda: 1)
+    async with arbiter.lease(7, WINDOW_PRIORITY_GENERATION) as outer:
+        # 同一调用链内再次申请同一 profile（如发布内重连）直接放行
+        inner = await asyncio.wait_for(arbiter.acquire(7, WINDOW_PRIORITY_PUBLISH), timeout=1)
+        assert inner.reentrant
+        inner.release()
+        assert arbiter.stats()["holders"][0]["profile_id"] == outer.profile_id
+
+        blocked = asyncio.create_task(arbiter.acquire(8, WINDOW_PRIORITY_GENERATION))
+        await asyncio.sleep(0)
+        blocked.cancel()
+        await asyncio.gather(blocked, return_exceptions=True)
+        assert arbiter.stats()["waiting"] == 0
+
+    assert arbiter.stats()["in_use"] == 0
+    lease = await asyncio.wait_for(arbiter.acquire(8, WINDOW_PRIORITY_SCAN), timeout=1)
+    lease.release()
+
+
+@pytest.mark.asyncio
+async def test_window_arbiter_shared_leases_span_arbiters(temp_db, monkeypatch):
+    del temp_db
+    monkeypatch.setattr(window_arbiter_module, "_SHARED_POLL_SECONDS", 0.02)
+    # 两个仲裁器模拟两个进程，共享同一个 SQLite 文件
+    first = WindowArbiter(capacity=lambda: 2)
+    second = WindowArbiter(capacity=lambda: 2)
+    first.enable_shared_leases(sqlite_db, "proc-a")
+    second.enable_shared_leases(sqlite_db, "proc-b")
+    try:
+        held = await asyncio.create_task(first.acquire(1, WINDOW_PRIORITY_SCAN))
+
+        # 同一 profile 被另一进程持有：等待，但不挡住其他 profile
+        same_profile = asyncio.create_task(second.acquire(1, WINDOW_PRIORITY_GENERATION))
+        other = await asyncio.wait_for(asyncio.create_task(second.acquire(2, WINDOW_PRIORITY_SCAN)), timeout=1)
+        assert not same_profile.done()
+        assert second.stats()["global_in_use"] == 2
+
+        # 全局名额已满：第一个进程的新申请也要等
+        third = asyncio.create_task(first.acquire(3, WINDOW_PRIORITY_GENERATION))
+        await asyncio.sleep(0.1)
+        assert not third.done()
+
+        other.release()
+        lease3 = await asyncio.wait_for(third, timeout=1)
+        held.release()
+        lease1 = await asyncio.wait_for(same_profile, timeout=1)
+        assert lease1.profile_id == 1
+        lease1.release()
+        lease3.release()
+        assert sqlite_db.count_window_leases() == 0
+    finally:
+        first.disable_shared_leases()
+        second.disable_shared_leases()
+
+
+def test_window_lease_rows_expire_and_are_released_per_owner(temp_db):
+    del temp_db
+    assert sqlite_db.try_acquire_window_lease(1, "proc-a", capacity=1) == "acquired"
+    assert sqlite_db.try_acquire_window_lease(1, "proc-b", capacity=2) == "busy"
+    assert sqlite_db.try_acquire_window_lease(2, "proc-b", capacity=1) == "full"
+
+    # 进程崩溃后租约到期，其他进程可以接管
+    conn = sqlite_db._get_conn()
+    conn.execute("UPDATE browser_window_leases SET lease_until = '2000-01-01 00:00:00'")
+    conn.commit()
+    conn.close()
+    assert sqlite_db.count_window_leases() == 0
+    assert sqlite_db.try_acquire_window_lease(1, "proc-b", capacity=1) == "acquired"
+    assert sqlite_db.renew_window_leases("proc-b") == 1
+    assert sqlite_db.release_window_leases("proc-b") == 1
+    assert sqlite_db.count_window_leases() == 0
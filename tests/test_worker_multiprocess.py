@@ -0,0 +1,230 @@
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from app.db.sqlite import sqlite_db
+
+pytestmark = pytest.mark.unit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程：用假的 run_sora_job 记录执行情况，其余（领取、租约、心跳、清租约）走真实 WorkerRunner
+_CHILD_SCRIPT = textwrap.dedent(
+    """
+    import asyncio
+    import glob
+    import os
+    import sqlite3
+    import sys
+    import time
+
+    sys.path.insert(0, {root!r})
+    db_path, gate_dir = sys.argv[1], sys.argv[2]
+    ready_count = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    # hang：领取后卡住不结束，模拟执行中途被杀的进程
+    hang = len(sys.argv) > 4 and sys.argv[4] == "hang"
+
+    import app.worker as worker
+    from app.db.sqlite import sqlite_db
+    from app.services.ixbrowser_service import ixbrowser_service
+    from app.services.worker_runner import worker_runner
+
+    async def _fake_run_sora_job(job_id):
+        sqlite_db.update_sora_job(job_id, {{"status": "running"}})
+        conn = sqlite3.connect(db_path, timeout=10)
+        conn.execute("INSERT INTO test_executions (job_id, owner) VALUES (?, ?)", (int(job_id), worker_runner.owner))
+        conn.commit()
+        conn.close()
+        await asyncio.sleep(3600 if hang else 0.1)
+        sqlite_db.update_sora_job(job_id, {{"status": "completed"}})
+
+    ixbrowser_service.run_sora_job = _fake_run_sora_job
+    lease_seconds = os.environ.get("TEST_SORA_LEASE_SECONDS")
+    if lease_seconds:
+        worker_runner._sora_lease_seconds = int(lease_seconds)
+
+    # 两个进程都就绪后再开始领取，保证确实是并发消费
+    open(os.path.join(gate_dir, f"ready-{{os.getpid()}}"), "w").close()
+    deadline = time.time() + 60
+    while len(glob.glob(os.path.join(gate_dir, "ready-*"))) < ready_count and time.time() < deadline:
+        time.sleep(0.05)
+
+    worker.run_worker_process(db_path)
+    """
+)
+
+
+def _seed_jobs(count):
+    return [
+        sqlite_db.create_sora_job(
+            {
+                "profile_id": idx % 5 + 1,
+                "window_name": f"win-{idx}",
+                "group_title": "Sora",
+                "prompt": f"prompt {idx}",
+                "duration": "10s",
+                "aspect_ratio": "landscape",
+                "status": "queued",
+                "phase": "queue",
+            }
+        )
+        for idx in range(count)
+    ]
+
+
+def _prepare_db(tmp_path):
+    db_path = tmp_path / "multi-worker.db"
+    sqlite_db._db_path = str(db_path)
+    sqlite_db._ensure_data_dir()
+    sqlite_db._init_db()
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("CREATE TABLE test_executions (job_id INTEGER NOT NULL, owner TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+    script = tmp_path / "worker_child.py"
+    script.write_text(_CHILD_SCRIPT.format(root=ROOT_DIR), encoding="utf-8")
+    gate_dir = tmp_path / "gate"
+    gate_dir.mkdir()
+    return db_path, script, gate_dir
+
+
+def test_two_worker_processes_drain_queue_without_double_execution(tmp_path):
+    old_db_path = sqlite_db._db_path
+    procs = []
+    try:
+        db_path, script, gate_dir = _prepare_db(tmp_path)
+        job_ids = _seed_jobs(30)
+
+        env = {**os.environ, "WORKER_QUEUE_POLL_INTERVAL_SEC": "0.2"}
+        procs = [
+            subprocess.Popen([sys.executable, str(script), str(db_path), str(gate_dir)], cwd=str(tmp_path), env=env)
+            for _ in range(2)
+        ]
+
+        deadline = time.time() + 90
+        remaining = len(job_ids)
+        while time.time() < deadline:
+            assert all(proc.poll() is None for proc in procs), "worker 进程提前退出"
+            conn = sqlite3.connect(str(db_path), timeout=10)
+            remaining = conn.execute("SELECT COUNT(*) FROM sora_jobs WHERE status != 'completed'").fetchone()[0]
+            conn.close()
+            if remaining == 0:
+                break
+            time.sleep(0.2)
+        assert remaining == 0
+
+        for proc in procs:
+            proc.send_signal(signal.SIGTERM)
+        for proc in procs:
+            assert proc.wait(timeout=30) == 0
+
+        conn = sqlite3.connect(str(db_path))
+        executions = conn.execute("SELECT job_id, owner FROM test_executions").fetchall()
+        leases = conn.execute("SELECT COUNT(*) FROM sora_jobs WHERE lease_owner IS NOT NULL").fetchone()[0]
+        conn.close()
+        executed_ids = [row[0] for row in executions]
+        assert sorted(executed_ids) == sorted(job_ids)
+        assert len({row[1] for row in executions}) == 2
+        assert leases == 0
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+def test_surviving_worker_takes_over_job_of_killed_worker(tmp_path):
+    old_db_path = sqlite_db._db_path
+    procs = []
+    try:
+        db_path, script, gate_dir = _prepare_db(tmp_path)
+        job_ids = _seed_jobs(1)
+        env = {**os.environ, "WORKER_QUEUE_POLL_INTERVAL_SEC": "0.2", "TEST_SORA_LEASE_SECONDS": "10"}
+
+        victim = subprocess.Popen(
+            [sys.executable, str(script), str(db_path), str(gate_dir), "1", "hang"], cwd=str(tmp_path), env=env
+        )
+        procs.append(victim)
+        deadline = time.time() + 60
+        executions = []
+        while time.time() < deadline and not executions:
+            assert victim.poll() is None, "worker 进程提前退出"
+            conn = sqlite3.connect(str(db_path), timeout=10)
+            executions = conn.execute("SELECT owner FROM test_executions").fetchall()
+            conn.close()
+            time.sleep(0.2)
+        assert executions, "被杀进程未领取到任务"
+        victim.kill()
+        victim.wait(timeout=30)
+
+        # 租约仍有效时启动存活进程：启动时的回收拿不到它，只能靠运行期的周期回收接管
+        survivor = subprocess.Popen(
+            [sys.executable, str(script), str(db_path), str(gate_dir), "1"], cwd=str(tmp_path), env=env
+        )
+        procs.append(survivor)
+        deadline = time.time() + 90
+        job_row = None
+        while time.time() < deadline:
+            assert survivor.poll() is None, "worker 进程提前退出"
+            conn = sqlite3.connect(str(db_path), timeout=10)
+            job_row = conn.execute(
+                "SELECT status, lease_owner, run_attempt FROM sora_jobs WHERE id = ?", (job_ids[0],)
+            ).fetchone()
+            conn.close()
+            # 等到执行结束且租约已清理，再停进程
+            if job_row[0] == "completed" and job_row[1] is None:
+                break
+            time.sleep(0.2)
+        assert job_row[0] == "completed"
+        assert job_row[1] is None
+        assert int(job_row[2] or 0) == 2
+
+        survivor.send_signal(signal.SIGTERM)
+        assert survivor.wait(timeout=30) == 0
+
+        conn = sqlite3.connect(str(db_path))
+        owners = [row[0] for row in conn.execute("SELECT owner FROM test_executions").fetchall()]
+        conn.close()
+        assert len(owners) == 2 and owners[0] != owners[1]
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        sqlite_db._db_path = old_db_path
+        if os.path.exists(os.path.dirname(old_db_path)):
+            sqlite_db._init_db()
+
+
+def test_standalone_worker_disables_background_maintenance(monkeypatch):
+    import asyncio
+
+    import app.worker as worker
+    from app.services.worker_runner import worker_runner
+
+    seen = {}
+
+    async def _fake_start():
+        seen["maintenance"] = sqlite_db._background_maintenance_enabled
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    async def _fake_stop():
+        return None
+
+    monkeypatch.setattr(worker_runner, "start", _fake_start)
+    monkeypatch.setattr(worker_runner, "stop", _fake_stop)
+    monkeypatch.setattr(sqlite_db, "flush_event_logs", lambda: None)
+    try:
+        asyncio.run(worker._serve())
+    finally:
+        sqlite_db.set_background_maintenance_enabled(True)
+    assert seen["maintenance"] is False
@@ -1,8 +1,13 @@
 import os
+from datetime import datetime, timedelta
 
 import pytest
 
 from app.db.sqlite import sqlite_db
+from app.models.ixbrowser import SoraAccountWeight, SoraJobRequest
+from app.services.account_dispatch_service import AccountDispatchNoAvailableError
+from app.services.ixbrowser_service import IXBrowserAPIError, IXBrowserService
+from app.services.retry_timer import retry_timer
 
 pytestmark = pytest.mark.unit
 
@@ -69,6 +74,132 @@ def test_sora_job_claim_heartbeat_and_requeue(temp_db):
     assert row["lease_until"] is None
 
 
+@pytest.mark.parametrize("has_returning", [True, False])
+def test_sora_jobs_batch_claim_leases_in_id_order(monkeypatch, temp_db, has_returning):
+    del temp_db
+    monkeypatch.setattr("app.db.sqlite.sora_repo._SQLITE_HAS_RETURNING", has_returning)
+    job_ids = [
+        sqlite_db.create_sora_job(
+            {
+                "profile_id": idx + 1,
+                "window_name": f"win-{idx}",
+                "group_title": "Sora",
+                "prompt": "hello",
+                "duration": "10s",
+                "aspect_ratio": "landscape",
+                "status": "queued",
+                "phase": "queue",
+            }
+        )
+        for idx in range(5)
+    ]
+
+    first = sqlite_db.claim_sora_jobs(owner="worker-a", n=3, lease_seconds=30)
+    assert [int(row["id"]) for row in first] == job_ids[:3]
+    assert {row["lease_owner"] for row in first} == {"worker-a"}
+    assert all(int(row["run_attempt"] or 0) == 1 for row in first)
+
+    second = sqlite_db.claim_sora_jobs(owner="worker-b", n=10, lease_seconds=30)
+    assert [int(row["id"]) for row in second] == job_ids[3:]
+    assert sqlite_db.claim_sora_jobs(owner="worker-c", n=2, lease_seconds=30) == []
+    assert sqlite_db.claim_sora_jobs(owner="worker-c", n=0, lease_seconds=30) == []
+
+
+def test_sora_job_claim_skips_not_before_in_future(temp_db):
+    del temp_db
+    future = (datetime.now() + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
+    deferred_id = sqlite_db.create_sora_job(
+        {
+            "profile_id": 0,
+            "group_title": "Sora",
+            "prompt": "later",
+            "status": "queued",
+            "phase": "deferred",
+            "not_before": future,
+        }
+    )
+    ready_id = sqlite_db.create_sora_job(
+        {"profile_id": 2, "group_title": "Sora", "prompt": "now", "status": "queued", "phase": "queue"}
+    )
+
+    claimed = sqlite_db.claim_sora_jobs(owner="worker-a", n=5, lease_seconds=30)
+    assert [int(row["id"]) for row in claimed] == [ready_id]
+
+    sqlite_db.update_sora_job(deferred_id, {"not_before": "2000-01-01 00:00:00"})
+    due = sqlite_db.claim_next_sora_job(owner="worker-a", lease_seconds=30)
+    assert due and int(due["id"]) == deferred_id
+
+
+@pytest.mark.asyncio
+async def test_weighted_auto_job_deferred_until_quota_release_then_redispatched(monkeypatch, temp_db):
+    del temp_db
+    service = IXBrowserService()
+    reset_at = datetime.now() + timedelta(minutes=20)
+    picks = {"available": False}
+
+    async def _fake_pick_best_account(group_title="Sora", exclude_profile_ids=None):
+        if not picks["available"]:
+            raise AccountDispatchNoAvailableError("自动分配失败：当前无可用账号", earliest_reset_at=reset_at)
+        return SoraAccountWeight(profile_id=3, window_name="win-3", selectable=True, score_total=80, reasons=["ok"])
+
+    monkeypatch.setattr(
+        "app.services.ixbrowser.sora_jobs.account_dispatch_service.pick_best_account",
+        _fake_pick_best_account,
+    )
+
+    created = await service.create_sora_job(SoraJobRequest(prompt="hello", dispatch_mode="weighted_auto"))
+    job = created.job
+    assert job.status == "queued"
+    assert job.phase == "deferred"
+    assert job.profile_id == 0
+    assert datetime.strptime(job.not_before, "%Y-%m-%d %H:%M:%S") >= reset_at.replace(microsecond=0)
+    assert sqlite_db.claim_next_sora_job(owner="worker-a", lease_seconds=30) is None
+
+    row = sqlite_db.get_sora_job(job.job_id)
+    assert await service.redispatch_deferred_sora_job(job.job_id, row) is None
+    assert sqlite_db.get_sora_job(job.job_id)["phase"] == "deferred"
+
+    picks["available"] = True
+    updated = await service.redispatch_deferred_sora_job(job.job_id, row)
+    assert updated
+    assert int(updated["profile_id"]) == 3
+    assert updated["phase"] == "queue"
+    assert updated["not_before"] is None
+
+
+@pytest.mark.parametrize("has_returning", [True, False])
+def test_sora_job_claim_spreads_across_profiles(monkeypatch, temp_db, has_returning):
+    del temp_db
+    monkeypatch.setattr("app.db.sqlite.sora_repo._SQLITE_HAS_RETURNING", has_returning)
+
+    def _create(profile_id, phase="queue", status="queued"):
+        return sqlite_db.create_sora_job(
+            {"profile_id": profile_id, "group_title": "Sora", "prompt": "hello", "status": status, "phase": phase}
+        )
+
+    busy = _create(1, phase="submit")
+    assert sqlite_db.claim_next_sora_job(owner="worker-a", lease_seconds=30)
+    sqlite_db.update_sora_job(busy, {"status": "running"})
+
+    same_busy_profile = _create(1)
+    first_on_2 = _create(2)
+    second_on_2 = _create(2)
+    progress_on_1 = _create(1, phase="progress")
+    deferred_a = _create(0, phase="deferred")
+    deferred_b = _create(0, phase="deferred")
+
+    claimed = sqlite_db.claim_sora_jobs(owner="worker-b", n=10, lease_seconds=30)
+    # profile 1 的窗口被占用、profile 2 一批只领一个；进度阶段与未分配账号的任务不受限制
+    assert [int(row["id"]) for row in claimed] == [first_on_2, progress_on_1, deferred_a, deferred_b]
+
+    assert sqlite_db.claim_sora_jobs(owner="worker-b", n=10, lease_seconds=30) == []
+    sqlite_db.clear_sora_job_lease(job_id=first_on_2, owner="worker-b")
+    sqlite_db.update_sora_job(first_on_2, {"status": "completed"})
+    sqlite_db.update_sora_job(busy, {"status": "running", "phase": "progress"})
+    claimed = sqlite_db.claim_sora_jobs(owner="worker-b", n=10, lease_seconds=30)
+    assert [int(row["id"]) for row in claimed] == [same_busy_profile, second_on_2]
+
+
 def test_nurture_batch_claim_and_requeue(temp_db):
     del temp_db
     batch_id = sqlite_db.create_sora_nurture_batch(
@@ -121,6 +252,28 @@ def test_nurture_batch_claim_and_requeue(temp_db):
     assert jobs[0]["phase"] == "queue"
 
 
+def test_batched_lease_renewal_reports_only_owned_leases(temp_db):
+    del temp_db
+    batch_ids = [
+        sqlite_db.create_sora_nurture_batch(
+            {"name": f"batch-{idx}", "group_title": "Sora", "profile_ids_json": "[1]", "total_jobs": 1, "status": "queued"}
+        )
+        for idx in range(2)
+    ]
+    assert sqlite_db.claim_next_sora_nurture_batch(owner="worker-a", lease_seconds=30)
+    assert sqlite_db.claim_next_sora_nurture_batch(owner="worker-b", lease_seconds=30)
+    assert sqlite_db.heartbeat_sora_nurture_batch_leases(batch_ids, owner="worker-a", lease_seconds=60) == [batch_ids[0]]
+
+    job_id = sqlite_db.create_sora_job(
+        {"profile_id": 1, "group_title": "Sora", "prompt": "hello", "status": "running", "phase": "watermark"}
+    )
+    sqlite_db.update_sora_job(job_id, {"watermark_status": "queued"})
+    assert sqlite_db.claim_sora_watermark_jobs(owner="wm-a", n=1)
+    assert sqlite_db.heartbeat_sora_watermark_leases([job_id, 999], owner="wm-a", lease_seconds=60) == [job_id]
+    assert sqlite_db.heartbeat_sora_watermark_leases([job_id], owner="wm-b") == []
+    assert sqlite_db.heartbeat_sora_job_leases([], owner="wm-a") == []
+
+
 def test_nurture_running_without_lease_recovered_on_startup(temp_db):
     del temp_db
     batch_id = sqlite_db.create_sora_nurture_batch(
@@ -164,3 +317,210 @@ def test_nurture_running_without_lease_recovered_on_startup(temp_db):
     assert jobs and jobs[0]["status"] == "queued"
     assert jobs[0]["phase"] == "queue"
     assert jobs[0]["error"] == "startup recovered stale running batch"
+
+
+@pytest.mark.asyncio
+async def test_watermark_stage_claims_separately_and_backs_off(monkeypatch, temp_db):
+    del temp_db
+    job_id = sqlite_db.create_sora_job(
+        {
+            "profile_id": 1,
+            "window_name": "win-1",
+            "group_title": "Sora",
+            "prompt": "hello",
+            "duration": "10s",
+            "aspect_ratio": "landscape",
+            "status": "running",
+            "phase": "watermark",
+        }
+    )
+    sqlite_db.update_sora_job(
+        job_id,
+        {"publish_url": "https://sora.chatgpt.com/p/s_12345678", "watermark_status": "queued"},
+    )
+    sqlite_db.update_watermark_free_config({"retry_max": 1, "fallback_on_failure": 1})
+
+    # 生成租约不影响去水印领取，反之亦然
+    assert sqlite_db.claim_sora_jobs(owner="gen", n=5) == []
+    claimed = sqlite_db.claim_sora_watermark_jobs(owner="wm-a", n=5, lease_seconds=30)
+    assert [int(row["id"]) for row in claimed] == [job_id]
+    assert sqlite_db.claim_sora_watermark_jobs(owner="wm-b", n=5) == []
+
+    runner = IXBrowserService()._sora_job_runner  # noqa: SLF001
+    calls = []
+
+    async def _fail_parse(_config, publish_url):
+        calls.append(publish_url)
+        raise RuntimeError("parse server timeout")
+
+    monkeypatch.setattr(runner, "_resolve_watermark_url", _fail_parse)
+
+    await runner.run_sora_watermark_stage(job_id)
+    row = sqlite_db.get_sora_job(job_id)
+    assert row["status"] == "running"
+    assert row["watermark_status"] == "queued"
+    assert row["watermark_attempts"] == 1
+    assert row["watermark_next_at"] > row["updated_at"]
+    assert sqlite_db.clear_sora_watermark_lease(job_id=job_id, owner="wm-a") is True
+    # 退避未到期不可领取
+    assert sqlite_db.claim_sora_watermark_jobs(owner="wm-b", n=5) == []
+
+    sqlite_db.update_sora_job(job_id, {"watermark_next_at": "2000-01-01 00:00:00"})
+    assert [int(row["id"]) for row in sqlite_db.claim_sora_watermark_jobs(owner="wm-b", n=5)] == [job_id]
+    await runner.run_sora_watermark_stage(job_id)
+
+    row = sqlite_db.get_sora_job(job_id)
+    assert len(calls) == 2
+    assert row["status"] == "completed"
+    assert row["watermark_status"] == "fallback"
+    assert row["watermark_url"] == "https://sora.chatgpt.com/p/s_12345678"
+
+
+@pytest.mark.asyncio
+async def test_publish_busy_schedules_delayed_retry_and_releases_lease(monkeypatch, temp_db):
+    del temp_db
+    retry_timer.reset()
+    job_id = sqlite_db.create_sora_job(
+        {
+            "profile_id": 1,
+            "window_name": "win-1",
+            "group_title": "Sora",
+            "prompt": "hello",
+            "status": "queued",
+            "phase": "publish",
+        }
+    )
+    sqlite_db.update_sora_job(job_id, {"task_id": "task_1", "generation_id": "gen_1"})
+    assert sqlite_db.claim_next_sora_job(owner="worker-a", lease_seconds=30)
+
+    service = IXBrowserService()
+    publish_results = [IXBrowserAPIError(1008, "Server busy, please try again later"), "https://sora.chatgpt.com/p/s_12345678"]
+
+    async def _fake_publish(**_kwargs):
+        result = publish_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(service.sora_publish_workflow, "publish_sora_video", _fake_publish)
+
+    await service.run_sora_job(job_id)
+    row = sqlite_db.get_sora_job(job_id)
+    assert row["status"] == "queued"
+    assert row["phase"] == "publish"
+    assert row["phase_retry_count"] == 1
+    assert row["not_before"] > row["updated_at"]
+    assert retry_timer.stats()["pending"] == 1
+
+    # Worker 收尾释放租约后，退避未到期不可领取
+    assert sqlite_db.clear_sora_job_lease(job_id=job_id, owner="worker-a") is True
+    assert sqlite_db.claim_next_sora_job(owner="worker-b", lease_seconds=30) is None
+
+    sqlite_db.update_sora_job(job_id, {"not_before": "2000-01-01 00:00:00"})
+    assert sqlite_db.claim_next_sora_job(owner="worker-b", lease_seconds=30)
+    await service.run_sora_job(job_id)
+    row = sqlite_db.get_sora_job(job_id)
+    assert row["status"] == "running"
+    assert row["phase"] == "watermark"
+    retry_timer.reset()
+
+
+@pytest.mark.asyncio
+async def test_compat_publish_retry_persisted_and_restored_after_restart(monkeypatch, temp_db):
+    del temp_db
+    retry_timer.reset()
+    job_id = sqlite_db.create_ixbrowser_generate_job(
+        {"profile_id": 1, "prompt": "hello", "status": "completed", "task_id": "task_1", "publish_status": "queued"}
+    )
+    service = IXBrowserService()
+    workflow = service.sora_generation_workflow
+    publish_results = [IXBrowserAPIError(1008, "Server busy, please try again later"), "https://sora.chatgpt.com/p/s_12345678"]
+
+    async def _fake_publish(**_kwargs):
+        result = publish_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(service.sora_publish_workflow, "publish_sora_video", _fake_publish)
+
+    await workflow.run_sora_publish_job(job_id=job_id, profile_id=1, task_id="task_1", task_url=None, prompt="hello")
+    row = sqlite_db.get_ixbrowser_generate_job(job_id)
+    assert row["publish_status"] == "queued"
+    assert row["publish_attempts"] == 1
+    assert row["publish_next_at"]
+
+    # 模拟重启：内存定时器丢失，按库里的 publish_next_at 挂回
+    retry_timer.reset()
+    scheduled = []
+    monkeypatch.setattr(
+        "app.services.ixbrowser.sora_generation_workflow.retry_timer.schedule",
+        lambda key, due_at, callback: scheduled.append((key, callback)),
+    )
+    spawned = []
+    monkeypatch.setattr(
+        "app.services.ixbrowser.sora_generation_workflow.spawn",
+        lambda coro, *, task_name, metadata=None: spawned.append((coro, metadata)),
+    )
+    assert workflow.restore_publish_retries() == 1
+    assert scheduled[0][0] == ("compat.generate.publish", job_id)
+    scheduled[0][1]()
+    assert spawned[0][1] == {"job_id": job_id, "attempt": 2}
+    await spawned[0][0]
+
+    row = sqlite_db.get_ixbrowser_generate_job(job_id)
+    assert row["publish_status"] == "completed"
+    assert row["publish_attempts"] == 2
+    assert row["publish_next_at"] is None
+    assert workflow.restore_publish_retries() == 0
+    retry_timer.reset()
+
+
+def test_watermark_stage_reclaims_expired_running_lease(temp_db):
+    del temp_db
+    job_id = sqlite_db.create_sora_job(
+        {
+            "profile_id": 1,
+            "window_name": "win-1",
+            "group_title": "Sora",
+            "prompt": "hello",
+            "duration": "10s",
+            "aspect_ratio": "landscape",
+            "status": "running",
+            "phase": "watermark",
+        }
+    )
+    sqlite_db.update_sora_job(job_id, {"watermark_status": "running"})
+    conn = sqlite_db._get_conn()  # noqa: SLF001
+    conn.execute(
+        "UPDATE sora_jobs SET watermark_lease_owner = 'dead', watermark_lease_until = '2000-01-01 00:00:00' WHERE id = ?",
+        (job_id,),
+    )
+    conn.commit()
+    conn.close()
+
+    claimed = sqlite_db.claim_sora_watermark_jobs(owner="wm-a", n=1, lease_seconds=30)
+    assert [row["watermark_lease_owner"] for row in claimed] == ["wm-a"]
+    assert sqlite_db.heartbeat_sora_watermark_lease(job_id=job_id, owner="dead") is False
+    assert sqlite_db.heartbeat_sora_watermark_lease(job_id=job_id, owner="wm-a", lease_seconds=30) is True
+
+
+def test_nurture_periodic_recovery_skips_running_without_lease(temp_db):
+    del temp_db
+    no_lease_id = sqlite_db.create_sora_nurture_batch(
+        {"name": "in-process", "group_title": "Sora", "profile_ids_json": "[8]", "total_jobs": 1, "status": "running"}
+    )
+    expired_id = sqlite_db.create_sora_nurture_batch(
+        {"name": "dead-worker", "group_title": "Sora", "profile_ids_json": "[9]", "total_jobs": 1, "status": "running"}
+    )
+    sqlite_db.update_sora_nurture_batch(
+        expired_id,
+        {"status": "running", "lease_owner": "worker-dead", "lease_until": "2000-01-01 00:00:00"},
+    )
+
+    assert sqlite_db.requeue_stale_sora_nurture_batches(expired_only=True) == 1
+
+    assert sqlite_db.get_sora_nurture_batch(no_lease_id)["status"] == "running"
+    expired_row = sqlite_db.get_sora_nurture_batch(expired_id)
+    assert expired_row["status"] == "queued"
+    assert expired_row["run_last_error"] == "worker lease expired"
@@ -1,9 +1,11 @@
 import asyncio
 import os
+from datetime import datetime, timedelta
 
 import pytest
 
 from app.db.sqlite import sqlite_db
+from app.services.queue_notifier import SORA_QUEUE, queue_notifier
 from app.services.worker_runner import WorkerRunner
 
 pytestmark = pytest.mark.unit
@@ -35,7 +37,7 @@ async def test_worker_start_stop_is_idempotent(monkeypatch, temp_db):
     monkeypatch.setattr("app.services.worker_runner.sqlite_db.requeue_stale_sora_jobs", lambda: 0)
     monkeypatch.setattr("app.services.worker_runner.sqlite_db.requeue_stale_sora_nurture_batches", lambda: 0)
     monkeypatch.setattr(
-        "app.services.worker_runner.sqlite_db.create_event_log",
+        "app.services.worker_runner.sqlite_db.enqueue_event_log",
         lambda **kwargs: logs.append(kwargs) or 1,
     )
 
@@ -73,7 +75,7 @@ async def test_worker_sora_claim_failure_logs_and_fallback(monkeypatch, temp_db)
 
     logs = []
     monkeypatch.setattr(
-        "app.services.worker_runner.sqlite_db.create_event_log",
+        "app.services.worker_runner.sqlite_db.enqueue_event_log",
         lambda **kwargs: logs.append(kwargs) or 1,
     )
 
@@ -81,12 +83,13 @@ async def test_worker_sora_claim_failure_logs_and_fallback(monkeypatch, temp_db)
         del args, kwargs
         raise RuntimeError("claim failed")
 
-    monkeypatch.setattr("app.services.worker_runner.sqlite_db.claim_next_sora_job", _raise_claim)
+    monkeypatch.setattr("app.services.worker_runner.sqlite_db.claim_sora_jobs", _raise_claim)
 
-    async def _fake_sleep(_seconds):
+    async def _fake_wait(_channel):
         runner._stop_event.set()  # noqa: SLF001
+        return False
 
-    monkeypatch.setattr("app.services.worker_runner.asyncio.sleep", _fake_sleep)
+    monkeypatch.setattr(runner, "_wait_for_queue", _fake_wait)
     await runner._sora_loop()  # noqa: SLF001
 
     assert any(item.get("action") == "worker.sora.claim" for item in logs)
@@ -97,14 +100,7 @@ async def test_worker_run_one_sora_job_clears_lease_after_exception(monkeypatch,
     del temp_db
     runner = WorkerRunner()
 
-    monkeypatch.setattr("app.services.worker_runner.sqlite_db.create_event_log", lambda **kwargs: 1)
-
-    async def _fake_heartbeat(job_id):
-        del job_id
-        await asyncio.sleep(3600)
-
-    monkeypatch.setattr(runner, "_heartbeat_sora_job", lambda job_id: _fake_heartbeat(job_id))
-    monkeypatch.setattr("app.services.worker_runner.spawn", lambda coro, *, task_name, metadata=None: asyncio.create_task(coro))
+    monkeypatch.setattr("app.services.worker_runner.sqlite_db.enqueue_event_log", lambda **kwargs: 1)
 
     async def _raise_run(_job_id):
         raise RuntimeError("run failed")
@@ -127,3 +123,127 @@ async def test_worker_run_one_sora_job_clears_lease_after_exception(monkeypatch,
 
     assert any(call[0] == 88 and "run_last_error" in call[1] for call in patches)
     assert clear_calls and clear_calls[0][0] == 88
+    assert 88 not in runner._held_leases[SORA_QUEUE]  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_worker_heartbeat_renews_in_batch_and_cancels_lost_leases(monkeypatch, temp_db):
+    del temp_db
+    runner = WorkerRunner()
+    logs = []
+    monkeypatch.setattr(
+        "app.services.worker_runner.sqlite_db.enqueue_event_log",
+        lambda **kwargs: logs.append(kwargs) or 1,
+    )
+
+    job_ids = [
+        sqlite_db.create_sora_job(
+            {"profile_id": idx + 1, "group_title": "Sora", "prompt": "hello", "status": "queued", "phase": "queue"}
+        )
+        for idx in range(3)
+    ]
+    claimed = sqlite_db.claim_sora_jobs(owner=runner.owner, n=3, lease_seconds=30)
+    assert [int(row["id"]) for row in claimed] == job_ids
+    # 第三个任务的租约被其他 Worker 接管
+    sqlite_db.update_sora_job(job_ids[2], {"lease_owner": "worker-other"})
+
+    tasks = {}
+    for job_id in job_ids:
+        tasks[job_id] = asyncio.create_task(asyncio.sleep(3600))
+        runner._sora_running[job_id] = tasks[job_id]  # noqa: SLF001
+        runner._held_leases[SORA_QUEUE].add(job_id)  # noqa: SLF001
+
+    update_calls = []
+    original = sqlite_db.heartbeat_sora_job_leases
+
+    def _spy(ids, owner, lease_seconds=120):
+        update_calls.append(list(ids))
+        return original(ids, owner, lease_seconds=lease_seconds)
+
+    monkeypatch.setattr("app.services.worker_runner.sqlite_db.heartbeat_sora_job_leases", _spy)
+
+    await runner._renew_held_leases()  # noqa: SLF001
+    await asyncio.sleep(0)
+
+    assert update_calls == [job_ids]
+    assert runner._held_leases[SORA_QUEUE] == set(job_ids[:2])  # noqa: SLF001
+    assert tasks[job_ids[2]].cancelled()
+    assert not tasks[job_ids[0]].done() and not tasks[job_ids[1]].done()
+    assert any(item.get("action") == "worker.sora.heartbeat" and item.get("event") == "lost" for item in logs)
+    renewed = sqlite_db.get_sora_job(job_ids[0])
+    assert renewed["heartbeat_at"] is not None
+
+    for task in tasks.values():
+        task.cancel()
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_worker_sora_loop_wakes_on_enqueue_signal(monkeypatch, temp_db):
+    del temp_db
+    runner = WorkerRunner()
+    queue_notifier.reset()
+
+    monkeypatch.setattr("app.services.worker_runner.sqlite_db.enqueue_event_log", lambda **kwargs: 1)
+    monkeypatch.setattr("app.services.worker_runner.settings.worker_queue_poll_interval_sec", 60.0)
+    monkeypatch.setattr("app.services.worker_runner.spawn", lambda coro, *, task_name, metadata=None: asyncio.create_task(coro))
+
+    started = asyncio.Event()
+    ran = []
+
+    async def _fake_run_one(job_id):
+        ran.append(job_id)
+        started.set()
+
+    monkeypatch.setattr(runner, "_run_one_sora_job", _fake_run_one)
+
+    loop_task = asyncio.create_task(runner._sora_loop())  # noqa: SLF001
+    await asyncio.sleep(0.05)
+    assert ran == []
+
+    job_id = sqlite_db.create_sora_job(
+        {
+            "profile_id": 1,
+            "window_name": "win-1",
+            "group_title": "Sora",
+            "prompt": "hello",
+            "duration": "10s",
+            "aspect_ratio": "landscape",
+            "status": "queued",
+            "phase": "queue",
+        }
+    )
+    queue_notifier.notify(SORA_QUEUE, job_id)
+    # 兜底轮询为 60s，能在 2s 内领取说明是被入队信号唤醒
+    await asyncio.wait_for(started.wait(), timeout=2.0)
+    runner._stop_event.set()  # noqa: SLF001
+    loop_task.cancel()
+    await asyncio.gather(loop_task, return_exceptions=True)
+
+    assert ran == [job_id]
+    stats = runner.queue_wait_stats()[SORA_QUEUE]
+    assert stats["count"] == 1
+    assert stats["max_ms"] < 2000
+
+
+def test_queue_wait_measured_from_not_before_for_deferred_jobs(monkeypatch):
+    runner = WorkerRunner()
+    queue_notifier.reset()
+    logged = []
+    monkeypatch.setattr("app.services.worker_runner.sqlite_db.enqueue_event_log", lambda **kwargs: logged.append(kwargs))
+
+    now = datetime.now()
+    runner._record_queue_wait(  # noqa: SLF001
+        SORA_QUEUE,
+        {
+            "id": 7,
+            "updated_at": (now - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M:%S"),
+            "not_before": (now - timedelta(seconds=2)).strftime("%Y-%m-%d %H:%M:%S"),
+        },
+    )
+
+    stats = runner.queue_wait_stats()[SORA_QUEUE]
+    assert stats["count"] == 1
+    # 延后了 3 小时的任务只算到点后的等待，且不再每次领取写事件日志
+    assert stats["max_ms"] < 10_000
+    assert logged == []